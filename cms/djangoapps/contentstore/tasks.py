@@ -3,20 +3,38 @@ This file contains celery tasks for contentstore views
 """
 import json
 import logging
+import os
+import shutil
+import tarfile
 from celery.task import task
 from celery.utils.log import get_task_logger
-from datetime import datetime
+from datetime import datetime, timedelta
+from path import path
 from pytz import UTC
+from tempfile import mkdtemp
 
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.exceptions import SuspiciousOperation
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.files.temp import NamedTemporaryFile
 
+import dogstats_wrapper as dog_stats_api
 from contentstore.courseware_index import CoursewareSearchIndexer, LibrarySearchIndexer, SearchIndexingError
-from contentstore.utils import initialize_permissions
-from course_action_state.models import CourseRerunState
+from contentstore.utils import get_export_storage, get_export_tarball_dir, initialize_permissions
+from course_action_state.models import CourseRerunState, CourseImportState, CourseExportState
 from opaque_keys.edx.keys import CourseKey
+from opaque_keys.edx.locator import LibraryLocator
+from openedx.core.lib.extract_tar import safetar_extractall_stream
+from xmodule.contentstore.django import contentstore
 from xmodule.course_module import CourseFields
+from xmodule.exceptions import SerializationError
+from xmodule.modulestore import COURSE_ROOT, LIBRARY_ROOT
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.exceptions import DuplicateCourseError, ItemNotFoundError
+from xmodule.modulestore.xml_exporter import export_course_to_xml, export_library_to_xml
+from xmodule.modulestore.xml_importer import import_course_from_xml, import_library_from_xml
 
 LOGGER = get_task_logger(__name__)
 FULL_COURSE_REINDEX_THRESHOLD = 1
@@ -75,6 +93,183 @@ def rerun_course(source_course_key_string, destination_course_key_string, user_i
         return "exception: " + unicode(exc)
 
 
+@task()
+def import_olx(user_id, course_key_string, storage_path):
+    """
+    Imports the course or library in the uploaded .tar.gz archive stored at
+    `storage_path` in the default storage into the given course or library,
+    recording its progress in the CourseImportState of the course.
+
+    The archive is extracted into a temporary directory of GITHUB_REPO_ROOT.
+    Both are removed when the import is over.
+    """
+    courselike_key = CourseKey.from_string(course_key_string)
+    if isinstance(courselike_key, LibraryLocator):
+        root_name = LIBRARY_ROOT
+        import_func = import_library_from_xml
+    else:
+        root_name = COURSE_ROOT
+        import_func = import_course_from_xml
+
+    states = CourseImportState.objects
+    course_dir = path(mkdtemp(dir=settings.GITHUB_REPO_ROOT))
+    try:
+        states.advanced(courselike_key, states.State.EXTRACTING)
+        # Read the archive as a stream, extracting its members as they come
+        # rather than reading it all once to check it and again to extract it.
+        with default_storage.open(storage_path) as archive_file:
+            with tarfile.open(fileobj=archive_file, mode='r|*') as tar_file:
+                safetar_extractall_stream(tar_file, course_dir)
+        LOGGER.info(u"Course import %s: Uploaded file extracted", courselike_key)
+
+        states.advanced(courselike_key, states.State.VALIDATING)
+        dirpath = _get_dir_for_fname(course_dir, root_name)
+        if not dirpath:
+            states.failed(courselike_key, u'Could not find the {0} file in the package.'.format(root_name))
+            return "missing {0}".format(root_name)
+        dirpath = os.path.relpath(dirpath, settings.GITHUB_REPO_ROOT)
+        LOGGER.info(u"Course import %s: Extracted file verified", courselike_key)
+
+        # The static content and the blocks of the course are imported in
+        # bulk operations on the modulestore, which reindexes the course once
+        # they are published.
+        states.advanced(courselike_key, states.State.IMPORTING)
+        with dog_stats_api.timer(
+            'courselike_import.time',
+            tags=[u"courselike:{}".format(courselike_key)]
+        ):
+            import_func(
+                modulestore(), user_id,
+                settings.GITHUB_REPO_ROOT, [dirpath],
+                load_error_modules=False,
+                static_content_store=contentstore(),
+                target_id=courselike_key
+            )
+        LOGGER.info(u"Course import %s: Course import successful", courselike_key)
+
+        states.succeeded(courselike_key)
+        return "succeeded"
+
+    except SuspiciousOperation as exc:
+        states.failed(courselike_key, u'Unsafe tar file. Aborting import. {0}'.format(exc.args[0]))
+        return "unsafe archive"
+
+    # catch all exceptions so we can update the state and properly cleanup the files.
+    except Exception as exc:  # pylint: disable=broad-except
+        LOGGER.exception(u'Course import %s: Error importing course', courselike_key)
+        states.failed(courselike_key)
+        return "exception: " + unicode(exc)
+
+    finally:
+        if course_dir.isdir():
+            shutil.rmtree(course_dir)
+        default_storage.delete(storage_path)
+        LOGGER.info(u"Course import %s: Temp data cleared", courselike_key)
+
+
+def _get_dir_for_fname(directory, filename):
+    """
+    Returns the dirpath for the first file found in the directory with the
+    given name.  If there is no file in the directory with the specified name,
+    return None.
+    """
+    for dirpath, _dirnames, filenames in os.walk(directory):
+        if filename in filenames:
+            return dirpath
+    return None
+
+
+@task()
+def export_olx(user_id, course_key_string, tarball_name):
+    """
+    Exports the course or library to a .tar.gz archive, saved as
+    `tarball_name` in the export storage, recording the progress of the export
+    in the CourseExportState of the course.
+
+    Once the archive is saved, the archives of previous versions of the course
+    are removed from the storage, unless they were saved less than
+    COURSE_EXPORT_TARBALL_GRACE_PERIOD seconds ago: they may still be being
+    downloaded. They are removed by a later export instead.
+    """
+    courselike_key = CourseKey.from_string(course_key_string)
+    states = CourseExportState.objects
+    try:
+        if isinstance(courselike_key, LibraryLocator):
+            courselike_module = modulestore().get_library(courselike_key)
+        else:
+            courselike_module = modulestore().get_course(courselike_key)
+
+        storage = get_export_storage()
+        with NamedTemporaryFile(prefix=courselike_module.url_name + '.', suffix='.tar.gz') as tarball:
+            with dog_stats_api.timer(
+                'courselike_export.time',
+                tags=[u"courselike:{}".format(courselike_key)]
+            ):
+                create_export_tarball(courselike_module, courselike_key, tarball)
+            tarball.seek(0)
+            storage.save(tarball_name, File(tarball))
+        LOGGER.info(u"Course export %s: Saved as %s", courselike_key, tarball_name)
+
+        delete_old_export_tarballs(storage, courselike_key, tarball_name)
+
+        states.succeeded(courselike_key)
+        return "succeeded"
+
+    except SerializationError as exc:
+        LOGGER.exception(u'There was an error exporting %s', courselike_key)
+        states.failed(courselike_key, unicode(exc), failed_location=exc.location)
+        return "serialization error"
+
+    # catch all exceptions so we can update the state.
+    except Exception as exc:  # pylint: disable=broad-except
+        LOGGER.exception(u'There was an error exporting %s', courselike_key)
+        states.failed(courselike_key, unicode(exc))
+        return "exception: " + unicode(exc)
+
+
+def delete_old_export_tarballs(storage, courselike_key, tarball_name):
+    """
+    Deletes the tarballs of the course or library from `storage`, except for
+    `tarball_name` and those saved within the grace period.
+    """
+    tarball_dir = get_export_tarball_dir(courselike_key)
+    # Local filesystem storages return naive local times
+    kept_since = datetime.now() - timedelta(seconds=settings.COURSE_EXPORT_TARBALL_GRACE_PERIOD)
+    for filename in storage.listdir(tarball_dir)[1]:
+        old_tarball_name = u'{}/{}'.format(tarball_dir, filename)
+        if old_tarball_name == tarball_name:
+            continue
+        try:
+            if storage.modified_time(old_tarball_name) < kept_since:
+                storage.delete(old_tarball_name)
+        except (OSError, IOError):
+            # Deleted meanwhile by a concurrent export
+            pass
+
+
+def create_export_tarball(courselike_module, courselike_key, tarball):
+    """
+    Exports the course or library and writes it, as a gzipped tar stream, to
+    the file object `tarball`.
+
+    The XML exporter writes to the filesystem, so the course is exported to a
+    temporary directory first, which is removed once its tar stream is written.
+    """
+    name = courselike_module.url_name
+    root_dir = path(mkdtemp())
+    try:
+        if isinstance(courselike_key, LibraryLocator):
+            export_library_to_xml(modulestore(), contentstore(), courselike_key, root_dir, name)
+        else:
+            export_course_to_xml(modulestore(), contentstore(), courselike_module.id, root_dir, name)
+
+        LOGGER.debug(u'tar file being generated at %s', tarball.name)
+        with tarfile.open(fileobj=tarball, mode='w|gz') as tar_file:
+            tar_file.add(root_dir / name, arcname=name)
+    finally:
+        shutil.rmtree(root_dir)
+
+
 def deserialize_fields(json_fields):
     fields = json.loads(json_fields)
     for field_name, value in fields.iteritems():
@@ -3,18 +3,24 @@ Common utility functions useful throughout the contentstore
 """
 # pylint: disable=no-member
 
+import base64
+import hashlib
 import logging
 import re
 from datetime import datetime
 from pytz import UTC
+from uuid import uuid4
 
 from django.conf import settings
+from django.core.files.storage import get_storage_class
 from django.utils.translation import ugettext as _
 from django.core.urlresolvers import reverse
 from django_comment_common.models import assign_default_role
 from django_comment_common.utils import seed_permissions_roles
 
+from util.module_utils import get_course_version
 from xmodule.contentstore.content import StaticContent
+from xmodule.contentstore.django import contentstore
 from xmodule.modulestore import ModuleStoreEnum
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.exceptions import ItemNotFoundError
@@ -310,3 +316,76 @@ def reverse_usage_url(handler_name, usage_key, kwargs=None):
     Creates the URL for handlers that use usage_keys as URL parameters.
     """
     return reverse_url(handler_name, 'usage_key_string', usage_key, kwargs)
+
+
+def get_export_storage():
+    """
+    Configures and returns a django Storage instance that the tarballs of
+    exported courses and libraries are kept in.
+    """
+    config = settings.COURSE_EXPORT_BACKEND
+    storage_class = get_storage_class(config['class'])
+    return storage_class(**config['options'])
+
+
+def get_export_tarball_dir(courselike_key):
+    """
+    Returns the directory, in the export storage, that the tarballs of the
+    given course or library are kept in.
+    """
+    return base64.urlsafe_b64encode(unicode(courselike_key).encode('utf-8'))
+
+
+def get_export_tarball_name(courselike_module):
+    """
+    Returns the name, in the export storage, of the tarball of the current
+    content of the given course or library.
+
+    The name changes whenever the blocks of the course, or the metadata of
+    any of its assets, change, so that a stored tarball can be served for as
+    long as it is up to date. Returns None if the modulestore doesn't track
+    the version of the course, in which case no tarball can be reused.
+    """
+    courselike_key = courselike_module.location.course_key
+    content_version = get_course_version(courselike_module)
+    if not content_version:
+        return None
+    version = hashlib.sha1(content_version.encode('utf-8'))
+
+    assets, __ = contentstore().get_all_content_for_course(courselike_key)
+    for asset in sorted(assets, key=lambda asset: unicode(asset['asset_key'])):
+        version.update(u'{}:{}:{}:{}:{}\n'.format(
+            asset['asset_key'],
+            asset.get('md5'),
+            asset.get('contentType'),
+            asset.get('locked', False),
+            asset['uploadDate'].isoformat() if asset.get('uploadDate') else u'',
+        ).encode('utf-8'))
+    asset_metadata = modulestore().get_all_asset_metadata(courselike_key, None)
+    for asset_md in sorted(asset_metadata, key=lambda asset_md: unicode(asset_md.asset_id)):
+        version.update(u'{}:{}\n'.format(
+            asset_md.asset_id,
+            asset_md.edited_on.isoformat() if asset_md.edited_on else u'',
+        ).encode('utf-8'))
+
+    return _export_tarball_name(courselike_module, version.hexdigest())
+
+
+def get_unversioned_export_tarball_name(courselike_module):
+    """
+    Returns a new, unique name in the export storage for a tarball of the
+    given course or library, for courses whose version isn't tracked.
+    """
+    return _export_tarball_name(courselike_module, uuid4().hex)
+
+
+def _export_tarball_name(courselike_module, version):
+    """
+    Returns the name, in the export storage, of the tarball of the given
+    version of the course or library.
+    """
+    return u'{dir}/{name}.{version}.tar.gz'.format(
+        dir=get_export_tarball_dir(courselike_module.location.course_key),
+        name=courselike_module.url_name,
+        version=version,
+    )
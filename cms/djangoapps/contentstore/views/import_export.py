@@ -7,38 +7,37 @@ import logging
 import os
 import re
 import shutil
-import tarfile
+from datetime import datetime, timedelta
 from path import path
-from tempfile import mkdtemp
+from pytz import UTC
 
 from django.conf import settings
 from django.contrib.auth.decorators import login_required
-from django.core.exceptions import SuspiciousOperation, PermissionDenied
-from django.core.files.temp import NamedTemporaryFile
+from django.core.exceptions import PermissionDenied
+from django.core.files import File
+from django.core.files.storage import default_storage
 from django.core.servers.basehttp import FileWrapper
 from django.http import HttpResponse, HttpResponseNotFound
 from django.utils.translation import ugettext as _
 from django.views.decorators.csrf import ensure_csrf_cookie
 from django.views.decorators.http import require_http_methods, require_GET
 
-import dogstats_wrapper as dog_stats_api
 from edxmako.shortcuts import render_to_response
-from xmodule.contentstore.django import contentstore
-from xmodule.exceptions import SerializationError
 from xmodule.modulestore.django import modulestore
 from opaque_keys.edx.keys import CourseKey
 from opaque_keys.edx.locator import LibraryLocator
-from xmodule.modulestore.xml_importer import import_course_from_xml, import_library_from_xml
-from xmodule.modulestore.xml_exporter import export_course_to_xml, export_library_to_xml
-from xmodule.modulestore import COURSE_ROOT, LIBRARY_ROOT
 
 from student.auth import has_course_author_access
 
-from openedx.core.lib.extract_tar import safetar_extractall
+from course_action_state.managers import CourseActionStateItemNotFoundError
+from course_action_state.models import CourseImportState, CourseExportState
 from util.json_request import JsonResponse
 from util.views import ensure_valid_course_key
 
-from contentstore.utils import reverse_course_url, reverse_usage_url, reverse_library_url
+from contentstore.tasks import import_olx, export_olx
+from contentstore.utils import (
+    get_export_storage, get_export_tarball_name, get_unversioned_export_tarball_name, reverse_course_url, reverse_usage_url, reverse_library_url
+)
 
 
 __all__ = [
@@ -72,25 +71,24 @@ def import_handler(request, course_key_string):
     courselike_key = CourseKey.from_string(course_key_string)
     library = isinstance(courselike_key, LibraryLocator)
     if library:
-        root_name = LIBRARY_ROOT
         successful_url = reverse_library_url('library_handler', courselike_key)
         context_name = 'context_library'
         courselike_module = modulestore().get_library(courselike_key)
-        import_func = import_library_from_xml
     else:
-        root_name = COURSE_ROOT
         successful_url = reverse_course_url('course_handler', courselike_key)
         context_name = 'context_course'
         courselike_module = modulestore().get_course(courselike_key)
-        import_func = import_course_from_xml
-    return _import_handler(
-        request, courselike_key, root_name, successful_url, context_name, courselike_module, import_func
-    )
+    return _import_handler(request, courselike_key, successful_url, context_name, courselike_module)
 
 
-def _import_handler(request, courselike_key, root_name, successful_url, context_name, courselike_module, import_func):
+def _import_handler(request, courselike_key, successful_url, context_name, courselike_module):
     """
     Parameterized function containing the meat of import_handler.
+
+    The uploaded file is received here, in chunks. Once the last chunk is in,
+    the file is saved to the default storage, shared with the celery workers,
+    and extracted and imported by the import_olx task, whose progress is
+    reported by import_status_handler.
     """
     if not has_course_author_access(request.user, courselike_key):
         raise PermissionDenied()
@@ -106,12 +104,7 @@ def _import_handler(request, courselike_key, root_name, successful_url, context_
                 course_dir = data_root / subdir
                 filename = request.FILES['course-data'].name
 
-                # Use sessions to keep info about import progress
-                session_status = request.session.setdefault("import_status", {})
-                courselike_string = unicode(courselike_key) + filename
-                _save_request_status(request, courselike_string, 0)
                 if not filename.endswith('.tar.gz'):
-                    _save_request_status(request, courselike_string, -1)
                     return JsonResponse(
                         {
                             'ErrMsg': _('We only support uploading a .tar.gz file.'),
@@ -137,6 +130,7 @@ def _import_handler(request, courselike_key, root_name, successful_url, context_
                 # stream out the uploaded files in chunks to disk
                 if int(content_range['start']) == 0:
                     mode = "wb+"
+                    CourseImportState.objects.initiated(courselike_key, request.user, filename)
                 else:
                     mode = "ab+"
                     size = os.path.getsize(temp_filepath)
@@ -144,7 +138,7 @@ def _import_handler(request, courselike_key, root_name, successful_url, context_
                     # This shouldn't happen, even if different instances are handling
                     # the same session, but it's always better to catch errors earlier.
                     if size < int(content_range['start']):
-                        _save_request_status(request, courselike_string, -1)
+                        CourseImportState.objects.failed(courselike_key, 'File upload corrupted.')
                         log.warning(
                             "Reported range %s does not match size downloaded so far %s",
                             content_range['start'],
@@ -180,9 +174,18 @@ def _import_handler(request, courselike_key, root_name, successful_url, context_
                             "thumbnailUrl": ""
                         }]
                     })
+
+                # This was the last chunk.
+                log.info("Course import %s: Upload complete", courselike_key)
+                with open(temp_filepath, 'rb') as temp_file:
+                    storage_path = default_storage.save(u'olx_import/{}/{}'.format(subdir, filename), File(temp_file))
+                shutil.rmtree(course_dir)
+                CourseImportState.objects.advanced(courselike_key, CourseImportState.objects.State.EXTRACTING)
+                import_olx.delay(request.user.id, unicode(courselike_key), storage_path)
+
             # Send errors to client with stage at which error occurred.
             except Exception as exception:  # pylint: disable=broad-except
-                _save_request_status(request, courselike_string, -1)
+                CourseImportState.objects.failed(courselike_key)
                 if course_dir.isdir():
                     shutil.rmtree(course_dir)
                     log.info("Course import %s: Temp data cleared", courselike_key)
@@ -198,109 +201,7 @@ def _import_handler(request, courselike_key, root_name, successful_url, context_
                     status=400
                 )
 
-            # try-finally block for proper clean up after receiving last chunk.
-            try:
-                # This was the last chunk.
-                log.info("Course import %s: Upload complete", courselike_key)
-                _save_request_status(request, courselike_string, 1)
-
-                tar_file = tarfile.open(temp_filepath)
-                try:
-                    safetar_extractall(tar_file, (course_dir + '/').encode('utf-8'))
-                except SuspiciousOperation as exc:
-                    _save_request_status(request, courselike_string, -1)
-                    return JsonResponse(
-                        {
-                            'ErrMsg': 'Unsafe tar file. Aborting import.',
-                            'SuspiciousFileOperationMsg': exc.args[0],
-                            'Stage': -1
-                        },
-                        status=400
-                    )
-                finally:
-                    tar_file.close()
-
-                log.info("Course import %s: Uploaded file extracted", courselike_key)
-                _save_request_status(request, courselike_string, 2)
-
-                # find the 'course.xml' file
-                def get_all_files(directory):
-                    """
-                    For each file in the directory, yield a 2-tuple of (file-name,
-                    directory-path)
-                    """
-                    for dirpath, _dirnames, filenames in os.walk(directory):
-                        for filename in filenames:
-                            yield (filename, dirpath)
-
-                def get_dir_for_fname(directory, filename):
-                    """
-                    Returns the dirpath for the first file found in the directory
-                    with the given name.  If there is no file in the directory with
-                    the specified name, return None.
-                    """
-                    for fname, dirpath in get_all_files(directory):
-                        if fname == filename:
-                            return dirpath
-                    return None
-
-                dirpath = get_dir_for_fname(course_dir, root_name)
-                if not dirpath:
-                    _save_request_status(request, courselike_string, -2)
-                    return JsonResponse(
-                        {
-                            'ErrMsg': _('Could not find the {0} file in the package.').format(root_name),
-                            'Stage': -2
-                        },
-                        status=415
-                    )
-
-                dirpath = os.path.relpath(dirpath, data_root)
-                logging.debug('found %s at %s', root_name, dirpath)
-
-                log.info("Course import %s: Extracted file verified", courselike_key)
-                _save_request_status(request, courselike_string, 3)
-
-                with dog_stats_api.timer(
-                    'courselike_import.time',
-                    tags=[u"courselike:{}".format(courselike_key)]
-                ):
-                    courselike_items = import_func(
-                        modulestore(), request.user.id,
-                        settings.GITHUB_REPO_ROOT, [dirpath],
-                        load_error_modules=False,
-                        static_content_store=contentstore(),
-                        target_id=courselike_key
-                    )
-
-                new_location = courselike_items[0].location
-                logging.debug('new course at %s', new_location)
-
-                log.info("Course import %s: Course import successful", courselike_key)
-                _save_request_status(request, courselike_string, 4)
-
-            # Send errors to client with stage at which error occurred.
-            except Exception as exception:   # pylint: disable=broad-except
-                log.exception(
-                    "error importing course"
-                )
-                return JsonResponse(
-                    {
-                        'ErrMsg': str(exception),
-                        'Stage': -session_status[courselike_string]
-                    },
-                    status=400
-                )
-
-            finally:
-                if course_dir.isdir():
-                    shutil.rmtree(course_dir)
-                    log.info("Course import %s: Temp data cleared", courselike_key)
-                # set failed stage number with negative sign in case of unsuccessful import
-                if session_status[courselike_string] != 4:
-                    _save_request_status(request, courselike_string, -abs(session_status[courselike_string]))
-
-            return JsonResponse({'Status': 'OK'})
+            return JsonResponse({'ImportStatus': 1})
     elif request.method == 'GET':  # assume html
         status_url = reverse_course_url(
             "import_status_handler", courselike_key, kwargs={'filename': "fillerName"}
@@ -315,18 +216,6 @@ def _import_handler(request, courselike_key, root_name, successful_url, context_
         return HttpResponseNotFound()
 
 
-def _save_request_status(request, key, status):
-    """
-    Save import status for a course in request session
-    """
-    session_status = request.session.get('import_status')
-    if session_status is None:
-        session_status = request.session.setdefault("import_status", {})
-
-    session_status[key] = status
-    request.session.save()
-
-
 # pylint: disable=unused-argument
 @require_GET
 @ensure_csrf_cookie
@@ -343,47 +232,35 @@ def import_status_handler(request, course_key_string, filename=None):
         3 : Importing to mongo
         4 : Import successful
 
+    along with the message describing the error, if the import failed.
     """
     course_key = CourseKey.from_string(course_key_string)
     if not has_course_author_access(request.user, course_key):
         raise PermissionDenied()
 
     try:
-        session_status = request.session["import_status"]
-        status = session_status[course_key_string + filename]
-    except KeyError:
-        status = 0
+        import_state = CourseImportState.objects.find_first(course_key=course_key, filename=filename)
+    except CourseActionStateItemNotFoundError:
+        return JsonResponse({"ImportStatus": 0})
 
-    return JsonResponse({"ImportStatus": status})
+    status = import_state.import_status
+    response = {"ImportStatus": status}
+    if status < 0:
+        response["Message"] = import_state.message
+    return JsonResponse(response)
 
 
-def create_export_tarball(course_module, course_key, context):
+def _export_error_context(export_state):
     """
-    Generates the export tarball, or returns None if there was an error.
-
-    Updates the context with any error information if applicable.
+    Returns the context describing the failure of the given export to the
+    export page.
     """
-    name = course_module.url_name
-    export_file = NamedTemporaryFile(prefix=name + '.', suffix=".tar.gz")
-    root_dir = path(mkdtemp())
-
-    try:
-        if isinstance(course_key, LibraryLocator):
-            export_library_to_xml(modulestore(), contentstore(), course_key, root_dir, name)
-        else:
-            export_course_to_xml(modulestore(), contentstore(), course_module.id, root_dir, name)
-
-        logging.debug(u'tar file being generated at %s', export_file.name)
-        with tarfile.open(name=export_file.name, mode='w:gz') as tar_file:
-            tar_file.add(root_dir / name, arcname=name)
-
-    except SerializationError as exc:
-        log.exception(u'There was an error exporting %s', course_key)
-        unit = None
-        failed_item = None
-        parent = None
+    unit = None
+    failed_item = None
+    parent = None
+    if export_state.failed_location is not None:
         try:
-            failed_item = modulestore().get_item(exc.location)
+            failed_item = modulestore().get_item(export_state.failed_location)
             parent_loc = modulestore().get_parent_location(failed_item.location)
 
             if parent_loc is not None:
@@ -394,38 +271,91 @@ def create_export_tarball(course_module, course_key, context):
             # if we have a nested exception, then we'll show the more generic error message
             pass
 
-        context.update({
-            'in_err': True,
-            'raw_err_msg': str(exc),
-            'failed_module': failed_item,
-            'unit': unit,
-            'edit_unit_url': reverse_usage_url("container_handler", parent.location) if parent else "",
-        })
-        raise
-    except Exception as exc:
-        log.exception('There was an error exporting %s', course_key)
-        context.update({
-            'in_err': True,
-            'unit': None,
-            'raw_err_msg': str(exc)})
-        raise
-    finally:
-        shutil.rmtree(root_dir / name)
-
-    return export_file
+    return {
+        'in_err': True,
+        'raw_err_msg': export_state.message,
+        'failed_module': failed_item,
+        'unit': unit,
+        'edit_unit_url': reverse_usage_url("container_handler", parent.location) if parent else "",
+    }
 
 
-def send_tarball(tarball):
+def send_tarball(tarball, size):
     """
     Renders a tarball to response, for use when sending a tar.gz file to the user.
     """
     wrapper = FileWrapper(tarball)
     response = HttpResponse(wrapper, content_type='application/x-tgz')
     response['Content-Disposition'] = 'attachment; filename=%s' % os.path.basename(tarball.name.encode('utf-8'))
-    response['Content-Length'] = os.path.getsize(tarball.name)
+    response['Content-Length'] = size
     return response
 
 
+def _export_tarball(request, courselike_module, course_key, context):
+    """
+    Returns the response to a request for the tarball of the course or library.
+
+    Tarballs are exported by the export_olx task, and kept in the export
+    storage for as long as the course is unchanged. The tarball is sent if it
+    is there already. Otherwise, the export page is rendered, showing that the
+    export is in progress (starting it if needed) or that it failed. An export
+    still in progress after COURSE_EXPORT_TIMEOUT seconds is taken to have
+    died (e.g. with its worker), and is started again.
+
+    If the version of the course isn't tracked, a tarball can't be reused:
+    the page follows the latest export until its tarball is sent, once, and
+    the next request starts a new export.
+    """
+    storage = get_export_storage()
+    tarball_name = get_export_tarball_name(courselike_module)
+    versioned = tarball_name is not None
+    if versioned and storage.exists(tarball_name):
+        return send_tarball(storage.open(tarball_name), storage.size(tarball_name))
+
+    try:
+        export_state = CourseExportState.objects.find_first(course_key=course_key)
+    except CourseActionStateItemNotFoundError:
+        export_state = None
+
+    states = CourseExportState.objects.State
+    if not versioned:
+        if export_state is not None and export_state.should_display:
+            tarball_name = export_state.tarball_name
+            if export_state.state == states.SUCCEEDED and storage.exists(tarball_name):
+                CourseExportState.objects.update_should_display(export_state.id, request.user, False)
+                return send_tarball(storage.open(tarball_name), storage.size(tarball_name))
+        else:
+            tarball_name = get_unversioned_export_tarball_name(courselike_module)
+
+    timed_out_before = datetime.now(UTC) - timedelta(seconds=settings.COURSE_EXPORT_TIMEOUT)
+    if (
+            export_state is None or
+            export_state.tarball_name != tarball_name or
+            export_state.state == states.SUCCEEDED or
+            (export_state.state == states.FAILED and not export_state.should_display) or
+            (export_state.state == states.IN_PROGRESS and export_state.updated_time < timed_out_before)
+    ):
+        # No export of this version of the course is in progress, nor has
+        # failed since the user was last told so.
+        CourseExportState.objects.initiated(course_key, request.user, tarball_name)
+        export_olx.delay(request.user.id, unicode(course_key), tarball_name)
+
+        # The task may have run already, e.g. if celery tasks are run eagerly
+        export_state = CourseExportState.objects.find_first(course_key=course_key)
+        if storage.exists(tarball_name):
+            if not versioned:
+                CourseExportState.objects.update_should_display(export_state.id, request.user, False)
+            return send_tarball(storage.open(tarball_name), storage.size(tarball_name))
+
+    if export_state.state == states.FAILED:
+        # Start a new export when the user asks again
+        CourseExportState.objects.update_should_display(export_state.id, request.user, False)
+        context.update(_export_error_context(export_state))
+    else:
+        context['export_in_progress'] = True
+    return render_to_response('export.html', context)
+
+
 # pylint: disable=unused-argument
 @ensure_csrf_cookie
 @login_required
@@ -472,11 +402,7 @@ def export_handler(request, course_key_string):
     requested_format = request.REQUEST.get('_accept', request.META.get('HTTP_ACCEPT', 'text/html'))
 
     if 'application/x-tgz' in requested_format:
-        try:
-            tarball = create_export_tarball(courselike_module, course_key, context)
-        except SerializationError:
-            return render_to_response('export.html', context)
-        return send_tarball(tarball)
+        return _export_tarball(request, courselike_module, course_key, context)
 
     elif 'text/html' in requested_format:
         return render_to_response('export.html', context)
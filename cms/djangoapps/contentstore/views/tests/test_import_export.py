@@ -5,6 +5,7 @@ import copy
 import json
 import logging
 import lxml
+import mock
 import os
 import shutil
 import tarfile
@@ -18,7 +19,8 @@ from xmodule.contentstore.django import contentstore
 from xmodule.modulestore.xml_exporter import export_library_to_xml
 from xmodule.modulestore.xml_importer import import_library_from_xml
 from xmodule.modulestore import LIBRARY_ROOT
-from contentstore.utils import reverse_course_url
+from contentstore.tasks import export_olx
+from contentstore.utils import get_export_storage, get_export_tarball_name, reverse_course_url
 
 from xmodule.modulestore.tests.factories import ItemFactory, LibraryFactory
 
@@ -87,18 +89,13 @@ class ImportTestCase(CourseTestCase):
                     "name": self.bad_tar,
                     "course-data": [btar]
                 })
-        self.assertEquals(resp.status_code, 415)
+        # The import is run by a task once the upload is complete
+        self.assertEquals(resp.status_code, 200)
         # Check that `import_status` returns the appropriate stage (i.e., the
         # stage at which import failed).
-        resp_status = self.client.get(
-            reverse_course_url(
-                'import_status_handler',
-                self.course.id,
-                kwargs={'filename': os.path.split(self.bad_tar)[1]}
-            )
-        )
-
-        self.assertEquals(json.loads(resp_status.content)["ImportStatus"], -2)
+        status = self.get_import_status(self.bad_tar)
+        self.assertEquals(status["ImportStatus"], -2)
+        self.assertIn("course.xml", status["Message"])
 
     def test_with_coursexml(self):
         """
@@ -110,6 +107,32 @@ class ImportTestCase(CourseTestCase):
             resp = self.client.post(self.url, args)
 
         self.assertEquals(resp.status_code, 200)
+        self.assertEquals(self.get_import_status(self.good_tar), {"ImportStatus": 4})
+
+    def test_status_of_other_file(self):
+        """
+        Check that `import_status` reports no import of a file other than the
+        one last uploaded.
+        """
+        with open(self.good_tar) as gtar:
+            args = {"name": self.good_tar, "course-data": [gtar]}
+            self.client.post(self.url, args)
+
+        self.assertEquals(self.get_import_status(self.bad_tar), {"ImportStatus": 0})
+
+    def get_import_status(self, tarpath):
+        """
+        Returns the response of `import_status` for the import of the file at
+        `tarpath`.
+        """
+        resp_status = self.client.get(
+            reverse_course_url(
+                'import_status_handler',
+                self.course.id,
+                kwargs={'filename': os.path.split(tarpath)[1]}
+            )
+        )
+        return json.loads(resp_status.content)
 
     def test_import_in_existing_course(self):
         """
@@ -218,7 +241,7 @@ class ImportTestCase(CourseTestCase):
         outside or directly in the working directory,
             'special files' (character device, block device or FIFOs),
 
-        all raise exceptions/400s.
+        all fail the import at the extraction stage.
         """
 
         def try_tar(tarpath):
@@ -226,25 +249,17 @@ class ImportTestCase(CourseTestCase):
             with open(tarpath) as tar:
                 args = {"name": tarpath, "course-data": [tar]}
                 resp = self.client.post(self.url, args)
-            self.assertEquals(resp.status_code, 400)
-            self.assertTrue("SuspiciousFileOperation" in resp.content)
+            self.assertEquals(resp.status_code, 200)
+            # Check that `import_status` returns the appropriate stage (i.e.,
+            # a failure in extracting the file).
+            status = self.get_import_status(tarpath)
+            self.assertEquals(status["ImportStatus"], -1)
+            self.assertIn("Unsafe tar file", status["Message"])
 
         try_tar(self._fifo_tar())
         try_tar(self._symlink_tar())
         try_tar(self._outside_tar())
         try_tar(self._outside_tar2())
-        # Check that `import_status` returns the appropriate stage (i.e.,
-        # either 3, indicating all previous steps are completed, or 0,
-        # indicating no upload in progress)
-        resp_status = self.client.get(
-            reverse_course_url(
-                'import_status_handler',
-                self.course.id,
-                kwargs={'filename': os.path.split(self.good_tar)[1]}
-            )
-        )
-        import_status = json.loads(resp_status.content)["ImportStatus"]
-        self.assertIn(import_status, (0, 3))
 
     def test_library_import(self):
         """
@@ -333,6 +348,9 @@ class ExportTestCase(CourseTestCase):
         """
         super(ExportTestCase, self).setUp()
         self.url = reverse_course_url('export_handler', self.course.id)
+        self.addCleanup(
+            shutil.rmtree, settings.COURSE_EXPORT_BACKEND['options']['location'], ignore_errors=True
+        )
 
     def test_export_html(self):
         """
@@ -363,6 +381,92 @@ class ExportTestCase(CourseTestCase):
         resp = self.client.get(self.url + '?_accept=application/x-tgz')
         self._verify_export_succeeded(resp)
 
+    def test_export_targz_reused(self):
+        """
+        Check that the tarball of an unchanged course is exported only once.
+        """
+        with mock.patch('contentstore.views.import_export.export_olx', wraps=export_olx) as mock_export:
+            self._verify_export_succeeded(self.client.get(self.url, HTTP_ACCEPT='application/x-tgz'))
+            self._verify_export_succeeded(self.client.get(self.url, HTTP_ACCEPT='application/x-tgz'))
+        self.assertEquals(mock_export.delay.call_count, 1)
+
+    def test_export_targz_after_change(self):
+        """
+        Check that the course is exported again once it has changed.
+        """
+        first_resp = self.client.get(self.url, HTTP_ACCEPT='application/x-tgz')
+        self._verify_export_succeeded(first_resp)
+        ItemFactory.create(parent_location=self.course.location, category='chapter', display_name='new')
+
+        with mock.patch('contentstore.views.import_export.export_olx', wraps=export_olx) as mock_export:
+            second_resp = self.client.get(self.url, HTTP_ACCEPT='application/x-tgz')
+        self._verify_export_succeeded(second_resp)
+        self.assertEquals(mock_export.delay.call_count, 1)
+        self.assertNotEqual(first_resp.get('Content-Disposition'), second_resp.get('Content-Disposition'))
+
+    def test_export_in_progress(self):
+        """
+        Check that the export page is shown while the tarball is being exported.
+        """
+        with mock.patch('contentstore.views.import_export.export_olx') as mock_export:
+            resp = self.client.get(self.url, HTTP_ACCEPT='application/x-tgz')
+            self.assertEquals(resp.status_code, 200)
+            self.assertIsNone(resp.get('Content-Disposition'))
+            self.assertContains(resp, 'Your export is being prepared')
+
+            # An export in progress isn't started again
+            self.client.get(self.url, HTTP_ACCEPT='application/x-tgz')
+        self.assertEquals(mock_export.delay.call_count, 1)
+
+    @override_settings(COURSE_EXPORT_TIMEOUT=0)
+    def test_export_timed_out(self):
+        """
+        Check that an export still in progress after the timeout is started again.
+        """
+        with mock.patch('contentstore.views.import_export.export_olx') as mock_export:
+            self.client.get(self.url, HTTP_ACCEPT='application/x-tgz')
+            resp = self.client.get(self.url, HTTP_ACCEPT='application/x-tgz')
+        self.assertContains(resp, 'Your export is being prepared')
+        self.assertEquals(mock_export.delay.call_count, 2)
+
+    def test_export_unversioned_course(self):
+        """
+        Check that the export of a course whose version isn't tracked is
+        followed until its tarball is sent, when celery tasks aren't run eagerly.
+        """
+        with mock.patch('contentstore.utils.get_course_version', return_value=u''):
+            with mock.patch('contentstore.views.import_export.export_olx') as mock_export:
+                # Reloads of the page while the export runs don't start another one
+                for __ in range(2):
+                    resp = self.client.get(self.url, HTTP_ACCEPT='application/x-tgz')
+                    self.assertContains(resp, 'Your export is being prepared')
+                self.assertEquals(mock_export.delay.call_count, 1)
+
+                export_olx(*mock_export.delay.call_args[0])
+                self._verify_export_succeeded(self.client.get(self.url, HTTP_ACCEPT='application/x-tgz'))
+
+                # Asking again exports the course again
+                resp = self.client.get(self.url, HTTP_ACCEPT='application/x-tgz')
+                self.assertContains(resp, 'Your export is being prepared')
+            self.assertEquals(mock_export.delay.call_count, 2)
+
+    def test_previous_tarball_kept(self):
+        """
+        Check that the tarball of the previous version of the course is kept
+        for the grace period after a newer one is saved.
+        """
+        storage = get_export_storage()
+        first_name = get_export_tarball_name(self.store.get_course(self.course.id))
+        self._verify_export_succeeded(self.client.get(self.url, HTTP_ACCEPT='application/x-tgz'))
+        ItemFactory.create(parent_location=self.course.location, category='chapter', display_name='new')
+        self._verify_export_succeeded(self.client.get(self.url, HTTP_ACCEPT='application/x-tgz'))
+        self.assertTrue(storage.exists(first_name))
+
+        with override_settings(COURSE_EXPORT_TARBALL_GRACE_PERIOD=-1):
+            ItemFactory.create(parent_location=self.course.location, category='chapter', display_name='newer')
+            self._verify_export_succeeded(self.client.get(self.url, HTTP_ACCEPT='application/x-tgz'))
+        self.assertFalse(storage.exists(first_name))
+
     def _verify_export_succeeded(self, resp):
         """ Export success helper method. """
         self.assertEquals(resp.status_code, 200)
@@ -390,11 +494,13 @@ class ExportTestCase(CourseTestCase):
 
     def _verify_export_failure(self, expected_text):
         """ Export failure helper method. """
-        resp = self.client.get(self.url, HTTP_ACCEPT='application/x-tgz')
-        self.assertEquals(resp.status_code, 200)
-        self.assertIsNone(resp.get('Content-Disposition'))
-        self.assertContains(resp, 'Unable to create xml for module')
-        self.assertContains(resp, expected_text)
+        # A failed export is tried again when the tarball is asked for again
+        for __ in range(2):
+            resp = self.client.get(self.url, HTTP_ACCEPT='application/x-tgz')
+            self.assertEquals(resp.status_code, 200)
+            self.assertIsNone(resp.get('Content-Disposition'))
+            self.assertContains(resp, 'Unable to create xml for module')
+            self.assertContains(resp, expected_text)
 
     def test_library_export(self):
         """
@@ -261,6 +261,12 @@ DATABASES = AUTH_TOKENS['DATABASES']
 MODULESTORE = convert_module_store_setting_if_needed(AUTH_TOKENS.get('MODULESTORE', MODULESTORE))
 CONTENTSTORE = AUTH_TOKENS['CONTENTSTORE']
 DOC_STORE_CONFIG = AUTH_TOKENS['DOC_STORE_CONFIG']
+COURSE_STRUCTURE_CACHE_SIZE = ENV_TOKENS.get('COURSE_STRUCTURE_CACHE_SIZE', COURSE_STRUCTURE_CACHE_SIZE)
+STATIC_CONTENT_DISK_CACHE_DIR = ENV_TOKENS.get('STATIC_CONTENT_DISK_CACHE_DIR', STATIC_CONTENT_DISK_CACHE_DIR)
+STATIC_CONTENT_DISK_CACHE_MAX_SIZE = ENV_TOKENS.get(
+    'STATIC_CONTENT_DISK_CACHE_MAX_SIZE', STATIC_CONTENT_DISK_CACHE_MAX_SIZE
+)
+GEOIP_CACHE_SIZE = ENV_TOKENS.get('GEOIP_CACHE_SIZE', GEOIP_CACHE_SIZE)
 # Datadog for events!
 DATADOG = AUTH_TOKENS.get("DATADOG", {})
 DATADOG.update(ENV_TOKENS.get("DATADOG", {}))
@@ -327,6 +333,14 @@ DEPRECATED_ADVANCED_COMPONENT_TYPES = ENV_TOKENS.get(
 
 VIDEO_UPLOAD_PIPELINE = ENV_TOKENS.get('VIDEO_UPLOAD_PIPELINE', VIDEO_UPLOAD_PIPELINE)
 
+################ COURSE EXPORT ###############
+
+COURSE_EXPORT_BACKEND = ENV_TOKENS.get('COURSE_EXPORT_BACKEND', COURSE_EXPORT_BACKEND)
+COURSE_EXPORT_TIMEOUT = ENV_TOKENS.get('COURSE_EXPORT_TIMEOUT', COURSE_EXPORT_TIMEOUT)
+COURSE_EXPORT_TARBALL_GRACE_PERIOD = ENV_TOKENS.get(
+    'COURSE_EXPORT_TARBALL_GRACE_PERIOD', COURSE_EXPORT_TARBALL_GRACE_PERIOD
+)
+
 ################ PUSH NOTIFICATIONS ###############
 
 PARSE_KEYS = AUTH_TOKENS.get("PARSE_KEYS", {})
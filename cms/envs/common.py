@@ -199,6 +199,8 @@ sys.path.append(COMMON_ROOT / 'djangoapps')
 # For geolocation ip database
 GEOIP_PATH = REPO_ROOT / "common/static/data/geoip/GeoIP.dat"
 GEOIPV6_PATH = REPO_ROOT / "common/static/data/geoip/GeoIPv6.dat"
+# Number of IP address to country code lookups to remember in each process
+GEOIP_CACHE_SIZE = 10000
 
 ############################# WEB CONFIGURATION #############################
 # This is where we stick our compiled template files.
@@ -353,6 +355,18 @@ XBLOCK_SELECT_FUNCTION = prefer_xmodules
 ############################ Modulestore Configuration ################################
 MODULESTORE_BRANCH = 'draft-preferred'
 
+# The size, in bytes, of the cache of split modulestore course structures kept
+# in each process, in front of the 'course_structure_cache' cache (if it is
+# configured) and mongo; 0 disables it.
+COURSE_STRUCTURE_CACHE_SIZE = 50 * 1024 * 1024
+
+# Directory in which the contentserver keeps copies of large course assets
+# (those too big for the cache), so they needn't be read from GridFS every
+# time they are served; None disables it. It is limited to
+# STATIC_CONTENT_DISK_CACHE_MAX_SIZE bytes.
+STATIC_CONTENT_DISK_CACHE_DIR = None
+STATIC_CONTENT_DISK_CACHE_MAX_SIZE = 10 * 1024 * 1024 * 1024
+
 MODULESTORE = {
     'default': {
         'ENGINE': 'xmodule.modulestore.mixed.MixedModuleStore',
@@ -676,6 +690,26 @@ VIDEO_UPLOAD_PIPELINE = {
     'CONCURRENT_UPLOAD_LIMIT': 4,
 }
 
+############################# COURSE EXPORT #############################
+
+# Storage for the tarballs of exported courses and libraries. A tarball is
+# served again for as long as the content it was exported from is unchanged.
+COURSE_EXPORT_BACKEND = {
+    'class': 'django.core.files.storage.FileSystemStorage',
+    'options': {
+        'location': ENV_ROOT / "export_tarballs",
+    },
+}
+
+# Seconds after which an export that hasn't finished is taken to have died,
+# and is started again when the tarball is asked for.
+COURSE_EXPORT_TIMEOUT = 60 * 60
+
+# Seconds for which the tarballs of previous versions of a course are kept
+# after a newer one is saved, so that downloads of them already under way
+# can finish.
+COURSE_EXPORT_TARBALL_GRACE_PERIOD = 60 * 60
+
 ############################ APPS #####################################
 
 INSTALLED_APPS = (
@@ -753,6 +787,7 @@ INSTALLED_APPS = (
     'edx_jsme',    # Molecular Structure
 
     'openedx.core.djangoapps.content.course_structures',
+    'openedx.core.djangoapps.content.course_overviews',
 
     # Credit courses
     'openedx.core.djangoapps.credit',
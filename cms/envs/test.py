@@ -64,6 +64,13 @@ STATIC_ROOT = TEST_ROOT / "staticfiles"
 GITHUB_REPO_ROOT = TEST_ROOT / "data"
 COMMON_TEST_DATA_ROOT = COMMON_ROOT / "test" / "data"
 
+COURSE_EXPORT_BACKEND = {
+    'class': 'django.core.files.storage.FileSystemStorage',
+    'options': {
+        'location': TEST_ROOT / "export_tarballs",
+    },
+}
+
 # For testing "push to lms"
 FEATURES['ENABLE_EXPORT_GIT'] = True
 GIT_REPO_EXPORT_DIR = TEST_ROOT / "export_course_repos"
@@ -166,9 +173,15 @@ CACHES = {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
         'LOCATION': 'edx_location_mem_cache',
     },
+    'course_structure_cache': {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+    },
 
 }
 
+# Don't keep course structures between tests, which count the queries to mongo
+COURSE_STRUCTURE_CACHE_SIZE = 0
+
 # Add external_auth to Installed apps for testing
 INSTALLED_APPS += ('external_auth', )
 
@@ -214,6 +227,8 @@ FEATURES['ENABLE_SERVICE_STATUS'] = True
 
 # Toggles embargo on for testing
 FEATURES['EMBARGO'] = True
+# Tests mock GeoIP lookups, so their results mustn't be remembered between tests
+GEOIP_CACHE_SIZE = 0
 
 # set up some testing for microsites
 MICROSITE_CONFIGURATION = {
@@ -118,6 +118,22 @@ def get_cached_content(location):
     return cache.get(unicode(location).encode("utf-8"))
 
 
+def set_cached_content_variant(content_digest, encoding, data):
+    """
+    Cache the variant of the content with the given digest in the given
+    encoding (e.g. 'gzip').
+    """
+    cache.set(u"content-variant:{}.{}".format(content_digest, encoding).encode("utf-8"), data)
+
+
+def get_cached_content_variant(content_digest, encoding):
+    """
+    Return the cached variant of the content with the given digest in the
+    given encoding, or None.
+    """
+    return cache.get(u"content-variant:{}.{}".format(content_digest, encoding).encode("utf-8"))
+
+
 def del_cached_content(location):
     """
     delete content for the given location, as well as for content with run=None.
@@ -0,0 +1,159 @@
+"""
+On-disk cache of large course assets served by the contentserver.
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+from uuid import uuid4
+
+from django.conf import settings
+
+log = logging.getLogger(__name__)
+
+# The longest time, in seconds, between two scans of a cache directory by a
+# process which adds copies to it, to catch the copies added by other processes.
+CULL_INTERVAL = 300
+
+# Directory -> (estimated total size of its copies, time of its last scan), as
+# known by this process.
+_SIZE_ESTIMATES = {}
+_SIZE_ESTIMATES_LOCK = threading.Lock()
+
+
+class AssetDiskCache(object):
+    """
+    A directory of copies of course assets, keyed by their location and the
+    digest of their content, so that a modified asset is never served from a
+    stale copy. Being on disk, it survives process restarts.
+
+    When the total size of the copies goes over `max_size` bytes, the least
+    recently served ones are removed. Each process estimates the size from
+    the copies it adds since it last scanned the directory, and only scans it
+    again once the estimate goes over `max_size`, or after CULL_INTERVAL
+    seconds, since other processes add copies as well.
+    """
+    def __init__(self, directory, max_size):
+        self.directory = directory
+        self.max_size = max_size
+
+    @classmethod
+    def from_settings(cls):
+        """
+        Return the cache configured by STATIC_CONTENT_DISK_CACHE_DIR, or None
+        if there is none.
+        """
+        directory = getattr(settings, 'STATIC_CONTENT_DISK_CACHE_DIR', None)
+        if not directory:
+            return None
+        return cls(directory, settings.STATIC_CONTENT_DISK_CACHE_MAX_SIZE)
+
+    def _path(self, location, content_digest):
+        """
+        Return the path of the copy of the asset at `location`.
+        """
+        name = hashlib.sha1(u'{}:{}'.format(location, content_digest).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, name[:2], name)
+
+    def open(self, location, content_digest):
+        """
+        Return the copy of the asset at `location` opened for reading, or None
+        if there is none.
+        """
+        path = self._path(location, content_digest)
+        try:
+            cached_file = open(path, 'rb')
+        except IOError:
+            return None
+        try:
+            # The modification time tracks when the copy was last used.
+            os.utime(path, None)
+        except OSError:
+            pass
+        return cached_file
+
+    def cache_stream(self, location, content_digest, chunks):
+        """
+        Yield `chunks`, the data of the asset at `location`, while writing them
+        to the cache.
+
+        The copy is only added to the cache once all the data has been
+        written, so an interrupted download leaves nothing behind.
+        """
+        path = self._path(location, content_digest)
+        temp_path = u'{}.{}.tmp'.format(path, uuid4().hex)
+        try:
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            temp_file = open(temp_path, 'wb')
+        except (IOError, OSError):
+            log.exception(u"Could not cache asset %s in %s", location, self.directory)
+            for chunk in chunks:
+                yield chunk
+            return
+
+        complete = False
+        try:
+            for chunk in chunks:
+                temp_file.write(chunk)
+                yield chunk
+            complete = True
+        finally:
+            temp_file.close()
+            if complete:
+                size = os.path.getsize(temp_path)
+                os.rename(temp_path, path)
+                self._added(size)
+            else:
+                os.remove(temp_path)
+
+    def _added(self, size):
+        """
+        Account for a copy of `size` bytes added to the cache, culling it if it
+        may have grown over `max_size` bytes, or if it hasn't been scanned for
+        CULL_INTERVAL seconds.
+        """
+        with _SIZE_ESTIMATES_LOCK:
+            estimated_size, scanned_at = _SIZE_ESTIMATES.get(self.directory, (None, None))
+            if estimated_size is not None:
+                estimated_size += size
+                _SIZE_ESTIMATES[self.directory] = (estimated_size, scanned_at)
+        if (
+                estimated_size is None or
+                estimated_size > self.max_size or
+                time.time() - scanned_at > CULL_INTERVAL
+        ):
+            self.cull()
+
+    def cull(self):
+        """
+        Remove the least recently used copies until the cache fits in
+        `max_size` bytes.
+        """
+        scanned_at = time.time()
+        entries = []
+        total_size = 0
+        for dirpath, __, filenames in os.walk(self.directory):
+            for filename in filenames:
+                if filename.endswith('.tmp'):
+                    continue
+                path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total_size += stat.st_size
+
+        for __, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total_size -= size
+
+        with _SIZE_ESTIMATES_LOCK:
+            _SIZE_ESTIMATES[self.directory] = (total_size, scanned_at)
@@ -2,19 +2,29 @@
 Middleware to serve assets.
 """
 
+import calendar
 import logging
+import re
+from StringIO import StringIO
+from uuid import uuid4
 
 from django.http import (
     HttpResponse, HttpResponseNotModified, HttpResponseForbidden
 )
+from django.utils.http import http_date, parse_http_date_safe
+from django.utils.text import compress_string
 from student.models import CourseEnrollment
 
+from contentserver.disk_cache import AssetDiskCache
 from xmodule.assetstore.assetmgr import AssetManager
-from xmodule.contentstore.content import StaticContent, XASSET_LOCATION_TAG
+from xmodule.contentstore.content import StaticContent, StaticContentStream, XASSET_LOCATION_TAG
+from xmodule.contentstore.django import contentstore
 from xmodule.modulestore import InvalidLocationError
 from opaque_keys import InvalidKeyError
 from opaque_keys.edx.locator import AssetLocator
-from cache_toolbox.core import get_cached_content, set_cached_content
+from cache_toolbox.core import (
+    get_cached_content, set_cached_content, get_cached_content_variant, set_cached_content_variant
+)
 from xmodule.modulestore.exceptions import ItemNotFoundError
 from xmodule.exceptions import NotFoundError
 
@@ -23,6 +33,18 @@ from xmodule.exceptions import NotFoundError
 
 log = logging.getLogger(__name__)
 
+# Content smaller than this is kept in the cache; larger content may be kept
+# in the disk cache instead.
+MAX_CACHED_CONTENT_SIZE = 1048576
+
+# Content of these types, and smaller than MAX_COMPRESSED_CONTENT_SIZE, is
+# sent gzip'd to the clients which accept it.
+COMPRESSIBLE_CONTENT_TYPE_RE = re.compile(
+    r'^(text/|application/(x-)?javascript|application/json|application/xml|image/svg\+xml)'
+)
+MAX_COMPRESSED_CONTENT_SIZE = 10 * 1048576
+ACCEPTS_GZIP_RE = re.compile(r'\bgzip\b')
+
 
 class StaticContentServer(object):
     def process_request(self, request):
@@ -55,7 +77,7 @@ class StaticContentServer(object):
                 # since we fetched it from DB, let's cache it going forward, but only if it's < 1MB
                 # this is because I haven't been able to find a means to stream data out of memcached
                 if content.length is not None:
-                    if content.length < 1048576:
+                    if content.length < MAX_CACHED_CONTENT_SIZE:
                         # since we've queried as a stream, let's read in the stream into memory to set in cache
                         content = content.copy_to_in_mem()
                         set_cached_content(content)
@@ -77,16 +99,27 @@ class StaticContentServer(object):
                     ):
                         return HttpResponseForbidden('Unauthorized')
 
-            # convert over the DB persistent last modified timestamp to a HTTP compatible
-            # timestamp, so we can simply compare the strings
-            last_modified_at_str = content.last_modified_at.strftime("%a, %d-%b-%Y %H:%M:%S GMT")
+            # getattr b/c cached content may have been pickled before the digest existed
+            content_digest = getattr(content, 'content_digest', None)
+            compressible = (
+                content_digest is not None and
+                content.length is not None and content.length <= MAX_COMPRESSED_CONTENT_SIZE and
+                COMPRESSIBLE_CONTENT_TYPE_RE.match(content.content_type or '') is not None
+            )
+            send_gzip = (
+                compressible and
+                not request.META.get('HTTP_RANGE') and
+                ACCEPTS_GZIP_RE.search(request.META.get('HTTP_ACCEPT_ENCODING', '')) is not None
+            )
+            etag = make_etag(content_digest, 'gzip' if send_gzip else None)
+            last_modified = calendar.timegm(content.last_modified_at.utctimetuple())
 
-            # see if the client has cached this content, if so then compare the
-            # timestamps, if they are the same then just return a 304 (Not Modified)
-            if 'HTTP_IF_MODIFIED_SINCE' in request.META:
-                if_modified_since = request.META['HTTP_IF_MODIFIED_SINCE']
-                if if_modified_since == last_modified_at_str:
-                    return HttpResponseNotModified()
+            # see if the client has cached this content, if so then just return a 304 (Not Modified)
+            if is_not_modified(request, etag, last_modified):
+                response = HttpResponseNotModified()
+                if etag:
+                    response['ETag'] = etag
+                return response
 
             # *** File streaming within a byte range ***
             # If a Range is provided, parse Range attribute of the request
@@ -95,11 +128,8 @@ class StaticContentServer(object):
             # Response -> Content-Range attribute structure: "Content-Range: bytes first-last/totalLength"
             # http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html#sec14.35
             response = None
+            disk_cache = AssetDiskCache.from_settings()
             if request.META.get('HTTP_RANGE'):
-                # Data from cache (StaticContent) has no easy byte management, so we use the DB instead (StaticContentStream)
-                if type(content) == StaticContent:
-                    content = AssetManager.find(loc, as_stream=True)
-
                 header_value = request.META['HTTP_RANGE']
                 try:
                     unit, ranges = parse_range_header(header_value, content.length)
@@ -112,43 +142,197 @@ class StaticContentServer(object):
                     if unit != 'bytes':
                         # Only accept ranges in bytes
                         log.warning(u"Unknown unit in Range header: %s for content: %s", header_value, unicode(loc))
-                    elif len(ranges) > 1:
-                        # According to Http/1.1 spec content for multiple ranges should be sent as a multipart message.
-                        # http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html#sec14.16
-                        # But we send back the full content.
-                        log.warning(
-                            u"More than 1 ranges in Range header: %s for content: %s", header_value, unicode(loc)
-                        )
                     else:
-                        first, last = ranges[0]
+                        ranges = [(first, last) for first, last in ranges if 0 <= first <= last < content.length]
+                        if not ranges:
+                            log.warning(
+                                u"Cannot satisfy ranges in Range header: %s for content: %s", header_value, unicode(loc)
+                            )
+                            return HttpResponse(status=416)  # Requested Range Not Satisfiable
 
-                        if 0 <= first <= last < content.length:
+                        content = seekable_content(loc, content, disk_cache)
+                        if len(ranges) == 1:
                             # If the byte range is satisfiable
-                            response = HttpResponse(content.stream_data_in_range(first, last))
+                            first, last = ranges[0]
+                            response = HttpResponse(closing_stream(content.stream_data_in_range(first, last), content))
                             response['Content-Range'] = 'bytes {first}-{last}/{length}'.format(
                                 first=first, last=last, length=content.length
                             )
                             response['Content-Length'] = str(last - first + 1)
-                            response.status_code = 206  # Partial Content
                         else:
-                            log.warning(
-                                u"Cannot satisfy ranges in Range header: %s for content: %s", header_value, unicode(loc)
-                            )
-                            return HttpResponse(status=416)  # Requested Range Not Satisfiable
+                            # Content for multiple ranges is sent as a multipart message.
+                            # http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html#sec14.16
+                            response = multipart_byteranges_response(content, ranges)
+                        response.status_code = 206  # Partial Content
 
             # If Range header is absent or syntactically invalid return a full content response.
             if response is None:
-                response = HttpResponse(content.stream_data())
-                response['Content-Length'] = content.length
+                if send_gzip:
+                    data = gzipped_data(content)
+                    response = HttpResponse(data)
+                    response['Content-Length'] = len(data)
+                    response['Content-Encoding'] = 'gzip'
+                else:
+                    response = HttpResponse(stream_full_content(loc, content, disk_cache))
+                    response['Content-Length'] = content.length
 
             # "Accept-Ranges: bytes" tells the user that only "bytes" ranges are allowed
             response['Accept-Ranges'] = 'bytes'
-            response['Content-Type'] = content.content_type
-            response['Last-Modified'] = last_modified_at_str
+            if not response['Content-Type'].startswith('multipart/byteranges'):
+                response['Content-Type'] = content.content_type
+            response['Last-Modified'] = http_date(last_modified)
+            if etag:
+                response['ETag'] = etag
+            if compressible:
+                response['Vary'] = 'Accept-Encoding'
 
             return response
 
 
+def make_etag(content_digest, encoding=None):
+    """
+    Return the ETag of the content with the given digest, as sent in the given
+    encoding, or None if the digest is unknown.
+    """
+    if content_digest is None:
+        return None
+    if encoding:
+        return '"{}-{}"'.format(content_digest, encoding)
+    return '"{}"'.format(content_digest)
+
+
+def is_not_modified(request, etag, last_modified):
+    """
+    Return whether the client's copy of the content is still valid, given the
+    content's ETag and its last modification time (a timestamp).
+
+    If-None-Match takes precedence over If-Modified-Since when both are given.
+    """
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match:
+        if etag is None:
+            return False
+        client_etags = [client_etag.strip() for client_etag in if_none_match.split(',')]
+        return '*' in client_etags or etag in client_etags
+
+    if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+    return if_modified_since is not None and last_modified <= if_modified_since
+
+
+def seekable_content(loc, content, disk_cache):
+    """
+    Return a StaticContentStream for `content` which can stream byte ranges,
+    preferably without going to the DB.
+
+    When the copy in `disk_cache` (an AssetDiskCache, or None) is used
+    instead, the DB stream of `content` is closed.
+    """
+    if isinstance(content, StaticContentStream):
+        content_digest = getattr(content, 'content_digest', None)
+        cached_file = disk_cache.open(loc, content_digest) if disk_cache and content_digest else None
+        if cached_file is None:
+            return content
+        content.close()
+        stream = cached_file
+    elif isinstance(content.data, basestring):
+        stream = StringIO(content.data)
+    else:
+        # Data from cache (StaticContent) has no easy byte management, so we use the DB instead (StaticContentStream)
+        return AssetManager.find(loc, as_stream=True)
+
+    return StaticContentStream(
+        content.location, content.name, content.content_type, stream,
+        last_modified_at=content.last_modified_at, thumbnail_location=content.thumbnail_location,
+        import_path=content.import_path, length=content.length, locked=getattr(content, 'locked', False),
+        content_digest=getattr(content, 'content_digest', None)
+    )
+
+
+def closing_stream(chunks, content):
+    """
+    Yield `chunks`, the data of the StaticContentStream `content`, then close
+    its stream (e.g. a file of the disk cache), also when the response is
+    closed before all of it has been sent.
+    """
+    try:
+        for chunk in chunks:
+            yield chunk
+    finally:
+        content.close()
+
+
+def stream_full_content(loc, content, disk_cache):
+    """
+    Return an iterator over the data of `content`.
+
+    Large content is served from `disk_cache`, if there is one, and added to
+    it while it is being streamed from the DB if it isn't there yet.
+    """
+    content_digest = getattr(content, 'content_digest', None)
+    if not isinstance(content, StaticContentStream) or disk_cache is None or content_digest is None:
+        return content.stream_data()
+
+    cached_content = seekable_content(loc, content, disk_cache)
+    if cached_content is not content:
+        return closing_stream(cached_content.stream_data(), cached_content)
+    return disk_cache.cache_stream(loc, content_digest, content.stream_data())
+
+
+def gzipped_data(content):
+    """
+    Return the gzip'd data of `content`, compressing it (and saving it
+    alongside the content) only if it hasn't been done before.
+    """
+    content_digest = content.content_digest
+    data = get_cached_content_variant(content_digest, 'gzip')
+    if data is None:
+        data = contentstore().find_variant(content_digest, 'gzip')
+        if data is None:
+            data = compress_string(''.join(content.stream_data()))
+            contentstore().save_variant(content_digest, 'gzip', data)
+        if len(data) < MAX_CACHED_CONTENT_SIZE:
+            set_cached_content_variant(content_digest, 'gzip', data)
+    return data
+
+
+def multipart_byteranges_response(content, ranges):
+    """
+    Return a response with the given byte `ranges` of `content`, as a
+    multipart/byteranges message.
+    """
+    boundary = uuid4().hex
+    part_headers = [
+        (
+            '--{boundary}\r\n'
+            'Content-Type: {content_type}\r\n'
+            'Content-Range: bytes {first}-{last}/{length}\r\n'
+            '\r\n'
+        ).format(boundary=boundary, content_type=content.content_type, first=first, last=last, length=content.length)
+        for first, last in ranges
+    ]
+    closing = '--{boundary}--\r\n'.format(boundary=boundary)
+
+    def stream_parts():
+        """
+        Yield the parts of the message.
+        """
+        for part_header, (first, last) in zip(part_headers, ranges):
+            yield part_header
+            for chunk in content.stream_data_in_range(first, last):
+                yield chunk
+            yield '\r\n'
+        yield closing
+
+    response = HttpResponse(
+        closing_stream(stream_parts(), content), content_type='multipart/byteranges; boundary={}'.format(boundary)
+    )
+    response['Content-Length'] = str(
+        sum(len(part_header) + last - first + 1 + 2 for part_header, (first, last) in zip(part_headers, ranges)) +
+        len(closing)
+    )
+    return response
+
+
 def parse_range_header(header_value, content_length):
     """
     Returns the unit and a list of (start, end) tuples of ranges.
@@ -4,19 +4,28 @@ Tests for StaticContentServer
 import copy
 import ddt
 import logging
+import os
+import shutil
 import unittest
+from cStringIO import StringIO
+from gzip import GzipFile
+from mock import patch
+from tempfile import mkdtemp
 from uuid import uuid4
 
 from django.conf import settings
 from django.test.client import Client
 from django.test.utils import override_settings
+from django.utils.http import http_date, parse_http_date
 
+from xmodule.contentstore.content import StaticContent
 from xmodule.contentstore.django import contentstore
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 from xmodule.modulestore import ModuleStoreEnum
 from xmodule.modulestore.xml_importer import import_course_from_xml
 
+from contentserver.disk_cache import AssetDiskCache
 from contentserver.middleware import parse_range_header
 from student.models import CourseEnrollment
 
@@ -146,17 +155,130 @@ class ContentStoreToyCourseTest(ModuleStoreTestCase):
 
     def test_range_request_multiple_ranges(self):
         """
-        Test that multiple ranges in request outputs the full content.
+        Test that multiple ranges in request outputs a multipart/byteranges message.
         """
         first_byte = self.length_unlocked / 4
         last_byte = self.length_unlocked / 2
-        resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes={first}-{last}, -100'.format(
+        full_content = self.client.get(self.url_unlocked).content
+        resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes={first}-{last}, -10'.format(
             first=first_byte, last=last_byte)
         )
 
-        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.status_code, 206)
         self.assertNotIn('Content-Range', resp)
-        self.assertEqual(resp['Content-Length'], str(self.length_unlocked))
+        self.assertTrue(resp['Content-Type'].startswith('multipart/byteranges; boundary='))
+        self.assertEqual(resp['Content-Length'], str(len(resp.content)))
+
+        boundary = resp['Content-Type'].split('boundary=')[1]
+        parts = resp.content.split('--' + boundary)
+        self.assertEqual(parts[0], '')
+        self.assertEqual(parts[-1], '--\r\n')
+        self.assertEqual(len(parts), 4)
+        expected_ranges = [(first_byte, last_byte), (self.length_unlocked - 10, self.length_unlocked - 1)]
+        for part, (first, last) in zip(parts[1:3], expected_ranges):
+            headers, data = part.split('\r\n\r\n', 1)
+            self.assertIn('Content-Range: bytes {}-{}/{}'.format(first, last, self.length_unlocked), headers)
+            self.assertEqual(data, full_content[first:last + 1] + '\r\n')
+
+    def test_etag(self):
+        """
+        Test that the content is sent with an ETag, and that a request with a
+        matching If-None-Match gets a 304 Not Modified.
+        """
+        resp = self.client.get(self.url_unlocked)
+        self.assertEqual(resp.status_code, 200)
+        etag = resp['ETag']
+
+        resp = self.client.get(self.url_unlocked, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp['ETag'], etag)
+
+        resp = self.client.get(self.url_unlocked, HTTP_IF_NONE_MATCH='"other", ' + etag)
+        self.assertEqual(resp.status_code, 304)
+
+        resp = self.client.get(self.url_unlocked, HTTP_IF_NONE_MATCH='"other"')
+        self.assertEqual(resp.status_code, 200)
+
+    def test_if_modified_since(self):
+        """
+        Test that a request with an If-Modified-Since date no earlier than the
+        last modification of the content gets a 304 Not Modified.
+        """
+        resp = self.client.get(self.url_unlocked)
+        last_modified = resp['Last-Modified']
+
+        resp = self.client.get(self.url_unlocked, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(resp.status_code, 304)
+
+        resp = self.client.get(self.url_unlocked, HTTP_IF_MODIFIED_SINCE=http_date(parse_http_date(last_modified) + 60))
+        self.assertEqual(resp.status_code, 304)
+
+        resp = self.client.get(self.url_unlocked, HTTP_IF_MODIFIED_SINCE=http_date(parse_http_date(last_modified) - 60))
+        self.assertEqual(resp.status_code, 200)
+
+    def test_gzip(self):
+        """
+        Test that text content is sent gzip'd to clients that accept it.
+        """
+        resp = self.client.get(self.url_unlocked)
+        self.assertNotIn('Content-Encoding', resp)
+        self.assertEqual(resp['Vary'], 'Accept-Encoding')
+        content = resp.content
+
+        for __ in range(2):
+            # The second time, the compressed content comes from the cache.
+            resp = self.client.get(self.url_unlocked, HTTP_ACCEPT_ENCODING='gzip, deflate')
+            self.assertEqual(resp.status_code, 200)
+            self.assertEqual(resp['Content-Encoding'], 'gzip')
+            self.assertEqual(resp['Content-Length'], str(len(resp.content)))
+            self.assertEqual(GzipFile(fileobj=StringIO(resp.content)).read(), content)
+
+        # The gzip'd content has its own ETag.
+        resp = self.client.get(self.url_unlocked, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=resp['ETag'])
+        self.assertEqual(resp.status_code, 304)
+        resp = self.client.get(self.url_unlocked, HTTP_IF_NONE_MATCH=resp['ETag'])
+        self.assertEqual(resp.status_code, 200)
+
+    def test_gzip_variant_deleted_with_asset(self):
+        """
+        Test that the gzip'd variant of an asset is deleted along with it.
+        """
+        self.client.get(self.url_unlocked, HTTP_ACCEPT_ENCODING='gzip')
+        content_digest = self.contentstore.find(self.unlocked_asset).content_digest
+        self.assertIsNotNone(self.contentstore.find_variant(content_digest, 'gzip'))
+
+        self.contentstore.delete(self.unlocked_asset)
+        self.assertIsNone(self.contentstore.find_variant(content_digest, 'gzip'))
+
+    def test_disk_cache(self):
+        """
+        Test that large content is served from the disk cache.
+        """
+        cache_dir = mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        data = ''.join(chr(index % 256) for index in range(2 * 1048576))
+        large_asset = self.course_key.make_asset_key('asset', 'large.bin')
+        self.contentstore.save(StaticContent(large_asset, 'large.bin', 'application/octet-stream', data))
+        url = unicode(large_asset)
+
+        with override_settings(STATIC_CONTENT_DISK_CACHE_DIR=cache_dir):
+            resp = self.client.get(url)
+            self.assertEqual(resp.status_code, 200)
+            self.assertEqual(resp.content, data)
+
+            disk_cache = AssetDiskCache.from_settings()
+            content_digest = self.contentstore.find(large_asset).content_digest
+            cached_file = disk_cache.open(large_asset, content_digest)
+            self.assertIsNotNone(cached_file)
+            cached_file.close()
+
+            with patch('contentserver.disk_cache.AssetDiskCache.cache_stream') as mock_cache_stream:
+                resp = self.client.get(url)
+                self.assertEqual(resp.content, data)
+                resp = self.client.get(url, HTTP_RANGE='bytes=1048570-1048580')
+                self.assertEqual(resp.status_code, 206)
+                self.assertEqual(resp.content, data[1048570:1048581])
+            self.assertFalse(mock_cache_stream.called)
 
     @ddt.data(
         'bytes 0-',
@@ -237,3 +359,71 @@ class ParseRangeHeaderTestCase(unittest.TestCase):
         self.assertRaisesRegexp(
             exception_class, exception_message_regex, parse_range_header, header_value, self.content_length
         )
+
+
+class AssetDiskCacheTestCase(unittest.TestCase):
+    """
+    Tests for AssetDiskCache.
+    """
+    def setUp(self):
+        super(AssetDiskCacheTestCase, self).setUp()
+        self.directory = mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.disk_cache = AssetDiskCache(self.directory, max_size=25)
+
+    def cache(self, location, content_digest, data):
+        """
+        Cache `data` by streaming it through the cache.
+        """
+        chunks = [data[index:index + 4] for index in range(0, len(data), 4)]
+        self.assertEqual(''.join(self.disk_cache.cache_stream(location, content_digest, iter(chunks))), data)
+
+    def read(self, location, content_digest):
+        """
+        Return the cached data, or None.
+        """
+        cached_file = self.disk_cache.open(location, content_digest)
+        if cached_file is None:
+            return None
+        with cached_file:
+            return cached_file.read()
+
+    def test_cache_stream(self):
+        self.assertIsNone(self.read('loc', 'digest'))
+        self.cache('loc', 'digest', 'some data')
+        self.assertEqual(self.read('loc', 'digest'), 'some data')
+        # The digest is part of the key.
+        self.assertIsNone(self.read('loc', 'other digest'))
+
+    def test_interrupted_stream(self):
+        stream = self.disk_cache.cache_stream('loc', 'digest', iter(['some ', 'data']))
+        next(stream)
+        stream.close()
+        self.assertIsNone(self.read('loc', 'digest'))
+        self.assertEqual([filenames for __, __, filenames in os.walk(self.directory) if filenames], [])
+
+    def test_cull(self):
+        self.cache('loc1', 'digest', '0123456789')
+        self.cache('loc2', 'digest', '0123456789')
+        # Make loc1 the least recently used.
+        os.utime(self.disk_cache._path('loc1', 'digest'), (0, 0))  # pylint: disable=protected-access
+        self.cache('loc3', 'digest', '0123456789')
+
+        self.assertIsNone(self.read('loc1', 'digest'))
+        self.assertEqual(self.read('loc2', 'digest'), '0123456789')
+        self.assertEqual(self.read('loc3', 'digest'), '0123456789')
+
+    def test_cull_only_when_over_max_size(self):
+        self.cache('loc1', 'digest', '0123456789')
+        with patch.object(self.disk_cache, 'cull') as mock_cull:
+            self.cache('loc2', 'digest', '0123456789')
+            self.assertFalse(mock_cull.called)
+            self.cache('loc3', 'digest', '0123456789')
+            self.assertTrue(mock_cull.called)
+
+    def test_cull_after_interval(self):
+        self.cache('loc1', 'digest', '0123456789')
+        with patch('contentserver.disk_cache.CULL_INTERVAL', -1):
+            with patch.object(self.disk_cache, 'cull') as mock_cull:
+                self.cache('loc2', 'digest', '0123456789')
+        self.assertTrue(mock_cull.called)
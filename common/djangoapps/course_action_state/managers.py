@@ -147,6 +147,128 @@ class CourseRerunUIStateManager(CourseActionUIStateManager):
         )
 
 
+class CourseImportUIStateManager(CourseActionUIStateManager):
+    """
+    A concrete model Manager for the Import Action.
+    """
+    ACTION = "import"
+
+    class State(object):
+        """
+        An Enum class for maintaining the list of possible states for Imports.
+        """
+        UPLOADING = "uploading"
+        EXTRACTING = "extracting"
+        VALIDATING = "validating"
+        IMPORTING = "importing"
+        SUCCEEDED = "succeeded"
+        FAILED = "failed"
+
+    # The stage of the Studio import page (see cms/static/js/views/import.js)
+    # that each state is displayed as.
+    STAGES = {
+        State.UPLOADING: 0,
+        State.EXTRACTING: 1,
+        State.VALIDATING: 2,
+        State.IMPORTING: 3,
+        State.SUCCEEDED: 4,
+    }
+
+    def initiated(self, course_key, user, filename):
+        """
+        To be called when the upload of the file `filename` to import into the given course is started.
+        """
+        self.update_state(
+            course_key=course_key,
+            new_state=self.State.UPLOADING,
+            user=user,
+            allow_not_found=True,
+            filename=filename,
+            stage=self.STAGES[self.State.UPLOADING],
+        )
+
+    def advanced(self, course_key, new_state):
+        """
+        To be called when an existing import into the given course moves on to the given state.
+        """
+        self.update_state(
+            course_key=course_key,
+            new_state=new_state,
+            stage=self.STAGES[new_state],
+        )
+
+    def succeeded(self, course_key):
+        """
+        To be called when an existing import into the given course has successfully completed.
+        """
+        self.advanced(course_key, self.State.SUCCEEDED)
+
+    def failed(self, course_key, message=None):
+        """
+        To be called when an existing import into the given course has failed, with a message
+        describing the failure. Defaults to the traceback of the exception being handled.
+
+        Uploads may fail before they are initiated, so the entry is created if it doesn't exist.
+        """
+        if message is None:
+            message = traceback.format_exc()
+        self.update_state(
+            course_key=course_key,
+            new_state=self.State.FAILED,
+            message=message[-self.model.MAX_MESSAGE_LENGTH:],  # truncate to fit
+            allow_not_found=True,
+        )
+
+
+class CourseExportUIStateManager(CourseActionUIStateManager):
+    """
+    A concrete model Manager for the Export Action.
+    """
+    ACTION = "export"
+
+    class State(object):
+        """
+        An Enum class for maintaining the list of possible states for Exports.
+        """
+        IN_PROGRESS = "in_progress"
+        FAILED = "failed"
+        SUCCEEDED = "succeeded"
+
+    def initiated(self, course_key, user, tarball_name):
+        """
+        To be called when a new export of the given course to the tarball `tarball_name` is initiated.
+        """
+        self.update_state(
+            course_key=course_key,
+            new_state=self.State.IN_PROGRESS,
+            user=user,
+            allow_not_found=True,
+            tarball_name=tarball_name,
+            failed_location=None,
+        )
+
+    def succeeded(self, course_key):
+        """
+        To be called when an existing export of the given course has successfully completed.
+        """
+        self.update_state(
+            course_key=course_key,
+            new_state=self.State.SUCCEEDED,
+        )
+
+    def failed(self, course_key, message, failed_location=None):
+        """
+        To be called when an existing export of the given course has failed, with a message
+        describing the failure and the location of the block that could not be exported, if known.
+        """
+        self.update_state(
+            course_key=course_key,
+            new_state=self.State.FAILED,
+            message=message[-self.model.MAX_MESSAGE_LENGTH:],  # truncate to fit
+            failed_location=failed_location,
+        )
+
+
 class CourseActionStateItemNotFoundError(Exception):
     """An exception class for errors specific to Course Action states."""
     pass
@@ -11,8 +11,10 @@ file and check it in at the same time as your model changes. To do that,
 """
 from django.contrib.auth.models import User
 from django.db import models
-from xmodule_django.models import CourseKeyField
-from course_action_state.managers import CourseActionStateManager, CourseRerunUIStateManager
+from xmodule_django.models import CourseKeyField, UsageKeyField
+from course_action_state.managers import (
+    CourseActionStateManager, CourseRerunUIStateManager, CourseImportUIStateManager, CourseExportUIStateManager
+)
 
 
 class CourseActionState(models.Model):
@@ -119,3 +121,60 @@ class CourseRerunState(CourseActionUIState):
     # MANAGERS
     # Override the abstract class' manager with a Rerun-specific manager that inherits from the base class' manager.
     objects = CourseRerunUIStateManager()
+
+
+class CourseImportState(CourseActionUIState):
+    """
+    A concrete django model for maintaining state specifically for the Action Course Imports.
+
+    Kept in the database rather than in the session of the importing user, so that the
+    progress of an import is known to all Studio processes, including the celery worker
+    that runs it.
+    """
+    class Meta:
+        """
+        Only a single import can be in progress for a course_key.
+        """
+        unique_together = ("course_key", "action")
+
+    # FIELDS
+    # Name of the file being imported
+    filename = models.CharField(max_length=255, default="", blank=True)
+
+    # Stage of the Studio import page the import has reached (see CourseImportUIStateManager.STAGES)
+    stage = models.IntegerField(default=0)
+
+    # MANAGERS
+    objects = CourseImportUIStateManager()
+
+    @property
+    def import_status(self):
+        """
+        Returns the status of the import as reported to the Studio import page: the stage the
+        import has reached, or its negative if the import failed at that stage.
+        """
+        if self.state == CourseImportUIStateManager.State.FAILED:
+            # A failure while uploading is reported as a failure of the first stage
+            return -max(self.stage, 1)
+        return self.stage
+
+
+class CourseExportState(CourseActionUIState):
+    """
+    A concrete django model for maintaining state specifically for the Action Course Exports.
+    """
+    class Meta:
+        """
+        Only a single export can be in progress for a course_key.
+        """
+        unique_together = ("course_key", "action")
+
+    # FIELDS
+    # Name of the tarball being exported to, in the export storage
+    tarball_name = models.CharField(max_length=255, default="", blank=True)
+
+    # Block that could not be exported, if the export failed because of one
+    failed_location = UsageKeyField(max_length=255, blank=True)
+
+    # MANAGERS
+    objects = CourseExportUIStateManager()
@@ -0,0 +1,68 @@
+"""
+Tests specific to the CourseImportState Model and Manager.
+"""
+
+from django.test import TestCase
+from opaque_keys.edx.locations import CourseLocator
+from course_action_state.models import CourseImportState
+from course_action_state.managers import CourseImportUIStateManager
+from student.tests.factories import UserFactory
+
+
+class TestCourseImportStateManager(TestCase):
+    """
+    Test class for testing the CourseImportUIStateManager.
+    """
+    def setUp(self):
+        super(TestCourseImportStateManager, self).setUp()
+        self.course_key = CourseLocator("test_org", "test_course_num", "test_run")
+        self.created_user = UserFactory()
+        self.filename = "course.tar.gz"
+        CourseImportState.objects.initiated(self.course_key, self.created_user, self.filename)
+
+    def get_import_state(self):
+        """
+        Returns the import state object for self.course_key.
+        """
+        return CourseImportState.objects.find_first(course_key=self.course_key)
+
+    def test_import_initiated(self):
+        import_state = self.get_import_state()
+        self.assertEqual(import_state.state, CourseImportUIStateManager.State.UPLOADING)
+        self.assertEqual(import_state.created_user, self.created_user)
+        self.assertEqual(import_state.filename, self.filename)
+        self.assertEqual(import_state.import_status, 0)
+
+    def test_import_advanced(self):
+        CourseImportState.objects.advanced(self.course_key, CourseImportUIStateManager.State.VALIDATING)
+        import_state = self.get_import_state()
+        self.assertEqual(import_state.state, CourseImportUIStateManager.State.VALIDATING)
+        self.assertEqual(import_state.import_status, 2)
+
+    def test_import_succeeded(self):
+        CourseImportState.objects.advanced(self.course_key, CourseImportUIStateManager.State.IMPORTING)
+        CourseImportState.objects.succeeded(self.course_key)
+        import_state = self.get_import_state()
+        self.assertEqual(import_state.state, CourseImportUIStateManager.State.SUCCEEDED)
+        self.assertEqual(import_state.import_status, 4)
+
+    def test_import_failed(self):
+        CourseImportState.objects.advanced(self.course_key, CourseImportUIStateManager.State.IMPORTING)
+        CourseImportState.objects.failed(self.course_key, "failure in importing")
+        import_state = self.get_import_state()
+        self.assertEqual(import_state.state, CourseImportUIStateManager.State.FAILED)
+        self.assertEqual(import_state.message, "failure in importing")
+        # the stage at which the import failed is kept
+        self.assertEqual(import_state.import_status, -3)
+
+    def test_upload_failed(self):
+        CourseImportState.objects.failed(self.course_key, "failure in uploading")
+        self.assertEqual(self.get_import_state().import_status, -1)
+
+    def test_reinitiated(self):
+        CourseImportState.objects.failed(self.course_key, "failure in uploading")
+        CourseImportState.objects.initiated(self.course_key, self.created_user, "other.tar.gz")
+        import_state = self.get_import_state()
+        self.assertEqual(import_state.filename, "other.tar.gz")
+        self.assertEqual(import_state.message, "")
+        self.assertEqual(import_state.import_status, 0)
@@ -0,0 +1,84 @@
+"""
+Process-wide GeoIP lookups.
+
+The GeoIP databases are opened (memory-mapped) once per process and shared,
+rather than re-opened and re-parsed for every lookup, and the countries of
+recently seen IP addresses are kept in a bounded LRU cache of
+`settings.GEOIP_CACHE_SIZE` entries.
+
+Usage:
+
+    from geoinfo.api import country_code_from_ip
+    country_code = country_code_from_ip(ip_address)
+"""
+import threading
+
+import pygeoip
+
+from django.conf import settings
+
+from lru_cache import LRUCache
+
+
+_LOCK = threading.Lock()
+
+# Maps database paths to their (shared) pygeoip.GeoIP instances.
+_DATABASES = {}
+
+# Maps IP addresses to country codes, sized by settings.GEOIP_CACHE_SIZE.
+_COUNTRY_CODES = LRUCache(0)
+
+
+def _get_database(path):
+    """
+    Return the pygeoip.GeoIP instance for the database at `path`, opening it
+    on first use.
+    """
+    database = _DATABASES.get(path)
+    if database is None:
+        with _LOCK:
+            database = _DATABASES.get(path)
+            if database is None:
+                database = pygeoip.GeoIP(path, pygeoip.MMAP_CACHE)
+                _DATABASES[path] = database
+    return database
+
+
+def country_code_from_ip(ip_addr):
+    """
+    Return the country code associated with an IP address.
+    Handles both IPv4 and IPv6 addresses.
+
+    Args:
+        ip_addr (str): The IP address to look up.
+
+    Returns:
+        str: A 2-letter country code.
+
+    """
+    cache_size = getattr(settings, 'GEOIP_CACHE_SIZE', 0)
+    if cache_size:
+        country_code = _COUNTRY_CODES.get(ip_addr)
+        if country_code is not None:
+            return country_code
+
+    if ip_addr.find(':') >= 0:
+        country_code = _get_database(settings.GEOIPV6_PATH).country_code_by_addr(ip_addr)
+    else:
+        country_code = _get_database(settings.GEOIP_PATH).country_code_by_addr(ip_addr)
+
+    if cache_size:
+        _COUNTRY_CODES.max_size = cache_size
+        _COUNTRY_CODES.set(ip_addr, country_code)
+
+    return country_code
+
+
+def clear_cache():
+    """
+    Forget the cached country codes and the shared database handles, so that
+    the databases are reopened on next use, e.g. after they have been updated.
+    """
+    _COUNTRY_CODES.clear()
+    with _LOCK:
+        _DATABASES.clear()
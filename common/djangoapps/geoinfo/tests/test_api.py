@@ -0,0 +1,62 @@
+"""
+Tests for the shared GeoIP lookups.
+"""
+from mock import patch
+import pygeoip
+
+from django.conf import settings
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from geoinfo import api as geoinfo_api
+
+
+class CountryCodeFromIpTests(TestCase):
+    """
+    Tests of geoinfo.api.country_code_from_ip.
+    """
+    def setUp(self):
+        super(CountryCodeFromIpTests, self).setUp()
+        geoinfo_api.clear_cache()
+        self.addCleanup(geoinfo_api.clear_cache)
+
+        self.patcher = patch.object(pygeoip.GeoIP, 'country_code_by_addr', return_value='CN')
+        self.mock_country_code_by_addr = self.patcher.start()
+        self.addCleanup(self.patcher.stop)
+
+    def test_databases_are_opened_once(self):
+        with patch('geoinfo.api.pygeoip.GeoIP', wraps=pygeoip.GeoIP) as mock_geoip:
+            for __ in range(3):
+                geoinfo_api.country_code_from_ip('117.79.83.1')
+                geoinfo_api.country_code_from_ip('2001:da8:20f:1502:edcf:550b:4a9c:207d')
+
+        self.assertEqual(
+            sorted(call[0][0] for call in mock_geoip.call_args_list),
+            sorted([settings.GEOIP_PATH, settings.GEOIPV6_PATH])
+        )
+
+    @override_settings(GEOIP_CACHE_SIZE=0)
+    def test_uncached(self):
+        for __ in range(2):
+            self.assertEqual(geoinfo_api.country_code_from_ip('117.79.83.1'), 'CN')
+        self.assertEqual(self.mock_country_code_by_addr.call_count, 2)
+
+    @override_settings(GEOIP_CACHE_SIZE=2)
+    def test_cached(self):
+        for __ in range(2):
+            self.assertEqual(geoinfo_api.country_code_from_ip('117.79.83.1'), 'CN')
+        self.assertEqual(self.mock_country_code_by_addr.call_count, 1)
+
+    @override_settings(GEOIP_CACHE_SIZE=2)
+    def test_least_recently_used_is_evicted(self):
+        geoinfo_api.country_code_from_ip('1.0.0.1')
+        geoinfo_api.country_code_from_ip('1.0.0.2')
+        # Use 1.0.0.1 again, so that 1.0.0.2 is evicted in its place
+        geoinfo_api.country_code_from_ip('1.0.0.1')
+        geoinfo_api.country_code_from_ip('1.0.0.3')
+        self.assertEqual(self.mock_country_code_by_addr.call_count, 3)
+
+        geoinfo_api.country_code_from_ip('1.0.0.1')
+        self.assertEqual(self.mock_country_code_by_addr.call_count, 3)
+        geoinfo_api.country_code_from_ip('1.0.0.2')
+        self.assertEqual(self.mock_country_code_by_addr.call_count, 4)
@@ -1,5 +1,7 @@
 import threading
 
+from celery.signals import task_prerun, task_postrun
+
 _request_cache_threadlocal = threading.local()
 _request_cache_threadlocal.data = {}
 _request_cache_threadlocal.request = None
@@ -34,3 +36,13 @@ class RequestCache(object):
     def process_response(self, request, response):
         self.clear_request_cache()
         return response
+
+
+@task_prerun.connect
+@task_postrun.connect
+def clear_request_cache_for_task(**kwargs):  # pylint: disable=unused-argument
+    """
+    Empty the request cache before and after each celery task, since no
+    request middleware clears it in workers.
+    """
+    RequestCache.clear_request_cache()
@@ -53,6 +53,7 @@ from functools import total_ordering
 
 from certificates.models import GeneratedCertificate
 from course_modes.models import CourseMode
+from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
 
 import analytics
 
@@ -1315,6 +1316,16 @@ class CourseEnrollment(models.Model):
     def course(self):
         return modulestore().get_course(self.course_id)
 
+    @property
+    def course_overview(self):
+        """
+        Returns the CourseOverview of this enrollment's course, or None if the
+        course does not exist.
+        """
+        if not hasattr(self, '_course_overview'):
+            self._course_overview = CourseOverview.get_from_id(self.course_id)  # pylint: disable=attribute-defined-outside-init
+        return self._course_overview
+
     def is_verified_enrollment(self):
         """
         Check the course enrollment mode is verified or not
@@ -59,7 +59,7 @@ from student.forms import AccountCreationForm, PasswordResetFormNoActive
 
 from verify_student.models import SoftwareSecurePhotoVerification  # pylint: disable=import-error
 from certificates.models import CertificateStatuses, certificate_status_for_student
-from certificates.api import get_certificate_url, get_active_web_certificate  # pylint: disable=import-error
+from certificates.api import get_certificate_url  # pylint: disable=import-error
 from dark_lang.models import DarkLangConfig
 
 from xmodule.modulestore.django import modulestore
@@ -110,7 +110,6 @@ from student.helpers import (
     check_verify_status_by_course
 )
 from student.models import anonymous_id_for_user
-from xmodule.error_module import ErrorDescriptor
 from shoppingcart.models import DonationConfiguration, CourseRegistrationCode
 
 from embargo import api as embargo_api
@@ -123,6 +122,7 @@ from notification_prefs.views import enable_notifications
 
 # Note that this lives in openedx, so this dependency should be refactored.
 from openedx.core.djangoapps.user_api.preferences import api as preferences_api
+from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
 
 
 log = logging.getLogger("edx.student")
@@ -228,32 +228,31 @@ def reverification_info(course_enrollment_pairs, user, statuses):
 
 def get_course_enrollment_pairs(user, course_org_filter, org_filter_out_set):
     """
-    Get the relevant set of (Course, CourseEnrollment) pairs to be displayed on
-    a student's dashboard.
+    Get the relevant set of (CourseOverview, CourseEnrollment) pairs to be
+    displayed on a student's dashboard.
     """
-    for enrollment in CourseEnrollment.enrollments_for_user(user):
-        store = modulestore()
-        with store.bulk_operations(enrollment.course_id):
-            course = store.get_course(enrollment.course_id)
-            if course and not isinstance(course, ErrorDescriptor):
-
-                # if we are in a Microsite, then filter out anything that is not
-                # attributed (by ORG) to that Microsite
-                if course_org_filter and course_org_filter != course.location.org:
-                    continue
-                # Conversely, if we are not in a Microsite, then let's filter out any enrollments
-                # with courses attributed (by ORG) to Microsites
-                elif course.location.org in org_filter_out_set:
-                    continue
-
-                yield (course, enrollment)
-            else:
-                log.error(
-                    u"User %s enrolled in %s course %s",
-                    user.username,
-                    "broken" if course else "non-existent",
-                    enrollment.course_id
-                )
+    enrollments = list(CourseEnrollment.enrollments_for_user(user))
+    course_overviews = CourseOverview.get_from_ids(enrollment.course_id for enrollment in enrollments)
+    for enrollment in enrollments:
+        course_overview = course_overviews[enrollment.course_id]
+        if course_overview:
+
+            # if we are in a Microsite, then filter out anything that is not
+            # attributed (by ORG) to that Microsite
+            if course_org_filter and course_org_filter != course_overview.location.org:
+                continue
+            # Conversely, if we are not in a Microsite, then let's filter out any enrollments
+            # with courses attributed (by ORG) to Microsites
+            elif course_overview.location.org in org_filter_out_set:
+                continue
+
+            yield (course_overview, enrollment)
+        else:
+            log.error(
+                u"User %s enrolled in broken or non-existent course %s",
+                user.username,
+                enrollment.course_id
+            )
 
 
 def _cert_info(user, course, cert_status, course_mode):
@@ -306,7 +305,7 @@ def _cert_info(user, course, cert_status, course_mode):
     if status == 'ready':
         # showing the certificate web view button if certificate is ready state and feature flags are enabled.
         if settings.FEATURES.get('CERTIFICATES_HTML_VIEW', False):
-            if get_active_web_certificate(course) is not None:
+            if course.has_any_active_web_certificate:
                 status_dict.update({
                     'show_cert_web_view': True,
                     'cert_web_view_url': u'{url}'.format(
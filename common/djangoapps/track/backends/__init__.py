@@ -26,3 +26,14 @@ class BaseBackend(object):
     def send(self, event):
         """Send event to tracker."""
         pass
+
+    def send_many(self, events):
+        """
+        Send several events to tracker.
+
+        Backends that can store several events at once more cheaply than
+        one by one should override this.
+
+        """
+        for event in events:
+            self.send(event)
@@ -0,0 +1,93 @@
+"""
+Event tracker backend that hands events over to another backend in batches,
+from a background thread, so that tracking an event doesn't wait for the
+other backend's I/O.
+
+The other backend is configured within the options of this one::
+
+  TRACKING_BACKENDS = {
+      'mongo': {
+          'ENGINE': 'track.backends.buffered.BufferedBackend',
+          'OPTIONS': {
+              'backend': {
+                  'ENGINE': 'track.backends.mongodb.MongoBackend',
+                  'OPTIONS': {
+                      'database': 'track',
+                      ...
+                  }
+              },
+              'max_queue_size': 10000,
+              'batch_size': 100,
+              'block_timeout': 0,
+          }
+      }
+  }
+
+"""
+
+from __future__ import absolute_import
+
+from Queue import Full
+
+from dogapi import dog_stats_api
+
+from openedx.core.lib.background_batcher import BackgroundBatcher
+from track.backends import BaseBackend
+
+
+class BufferedBackend(BaseBackend):
+    """
+    Event tracker backend that queues events in memory, and sends them to
+    another backend from a background thread, with that backend's
+    `send_many`.
+
+    The queue holds at most `max_queue_size` events. When it is full, events
+    are dropped, after waiting up to `block_timeout` seconds for room in the
+    queue. The events that are waiting in the queue when the process exits
+    are sent then, waiting up to `exit_timeout` seconds for them.
+
+    """
+
+    def __init__(self, backend, max_queue_size=10000, batch_size=100, block_timeout=0, exit_timeout=5, **kwargs):
+        """
+        :Parameters:
+
+          - `backend`: the configuration of the backend to send events to,
+            as in TRACKING_BACKENDS.
+          - `max_queue_size`: the most events that may wait to be sent.
+          - `batch_size`: the most events sent to the backend at once.
+          - `block_timeout`: how many seconds to wait for room in a full
+            queue before dropping an event.
+          - `exit_timeout`: how many seconds to wait for the queued events
+            to be sent when the process exits.
+
+        """
+        super(BufferedBackend, self).__init__(**kwargs)
+
+        # Imported here as the tracker imports the backends
+        from track.tracker import _instantiate_backend_from_name
+        self.backend = _instantiate_backend_from_name(backend['ENGINE'], backend.get('OPTIONS', {}))
+
+        self.block_timeout = block_timeout
+        self._batcher = BackgroundBatcher(
+            self._send_many, max_queue_size, batch_size, exit_timeout, 'track.backends.buffered'
+        )
+
+    def send(self, event):
+        """Queue the event to be sent to the backend."""
+        try:
+            self._batcher.put(event, self.block_timeout)
+        except Full:
+            dog_stats_api.increment('track.backends.buffered.dropped')
+
+    def flush(self, timeout=None):
+        """
+        Wait until the events queued so far have been sent to the backend, or
+        for `timeout` seconds. Returns whether all the events were sent.
+        """
+        return self._batcher.flush(timeout)
+
+    def _send_many(self, events):
+        """Send a batch of queued events to the backend."""
+        with dog_stats_api.timer('track.backends.buffered.send_many'):
+            self.backend.send_many(events)
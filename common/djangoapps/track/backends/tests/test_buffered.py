@@ -0,0 +1,98 @@
+from __future__ import absolute_import
+
+import threading
+import time
+
+from django.test import TestCase
+from mock import patch
+
+from track.backends import BaseBackend
+from track.backends.buffered import BufferedBackend
+
+
+class RecordingBackend(BaseBackend):
+    """Backend that records the batches of events it is sent."""
+    def __init__(self, **options):
+        super(RecordingBackend, self).__init__(**options)
+        self.batches = []
+        # Cleared to hold up the sending of events
+        self.can_send = threading.Event()
+        self.can_send.set()
+
+    def send(self, event):
+        self.send_many([event])
+
+    def send_many(self, events):
+        self.can_send.wait()
+        self.batches.append(list(events))
+
+
+class TestBufferedBackend(TestCase):
+    def make_backend(self, **options):
+        backend = BufferedBackend(
+            backend={'ENGINE': 'track.backends.tests.test_buffered.RecordingBackend'},
+            **options
+        )
+        self.addCleanup(backend.backend.can_send.set)
+        return backend
+
+    def wait_until_taken(self, backend):
+        """Waits until the backend's thread has taken all the queued events."""
+        for __ in range(500):
+            if backend._batcher._queue.empty():  # pylint: disable=protected-access
+                return
+            time.sleep(0.01)
+        self.fail("The queued events weren't taken")
+
+    def test_events_sent(self):
+        backend = self.make_backend()
+        events = [{'test': 1}, {'test': 2}, {'test': 3}]
+        for event in events:
+            backend.send(event)
+
+        self.assertTrue(backend.flush(timeout=5))
+        self.assertEqual(sum(backend.backend.batches, []), events)
+
+    def test_events_sent_in_batches(self):
+        backend = self.make_backend(batch_size=2)
+        backend.backend.can_send.clear()
+        # The first event is taken off the queue while the backend is held up
+        backend.send({'test': 0})
+        self.wait_until_taken(backend)
+        for i in range(1, 6):
+            backend.send({'test': i})
+
+        backend.backend.can_send.set()
+        self.assertTrue(backend.flush(timeout=5))
+        self.assertEqual(
+            [[event['test'] for event in batch] for batch in backend.backend.batches],
+            [[0], [1, 2], [3, 4], [5]]
+        )
+
+    @patch('track.backends.buffered.dog_stats_api')
+    def test_events_dropped_when_full(self, mock_dog_stats_api):
+        backend = self.make_backend(max_queue_size=2)
+        backend.backend.can_send.clear()
+        backend.send({'test': 0})
+        self.wait_until_taken(backend)
+        self.assertFalse(backend.flush(timeout=0.1))
+        for i in range(1, 5):
+            backend.send({'test': i})
+
+        backend.backend.can_send.set()
+        self.assertTrue(backend.flush(timeout=5))
+        self.assertEqual(
+            [event['test'] for event in sum(backend.backend.batches, [])],
+            [0, 1, 2]
+        )
+        mock_dog_stats_api.increment.assert_called_with('track.backends.buffered.dropped')
+        self.assertEqual(mock_dog_stats_api.increment.call_count, 2)
+
+    def test_backend_errors(self):
+        backend = self.make_backend()
+        with patch.object(backend.backend, 'send_many', side_effect=[Exception, None]) as mock_send_many:
+            backend.send({'test': 1})
+            self.assertTrue(backend.flush(timeout=5))
+            backend.send({'test': 2})
+            self.assertTrue(backend.flush(timeout=5))
+        self.assertEqual(mock_send_many.call_count, 2)
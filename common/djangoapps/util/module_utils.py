@@ -33,3 +33,19 @@ def get_dynamic_descriptor_children(descriptor, user_id, module_creator=None, us
     else:
         module_children = descriptor.get_children(usage_key_filter)
     return module_children
+
+
+def get_course_version(course):
+    """
+    Returns a unicode string identifying the current version of the course's
+    content, suitable for keying data derived from the course structure.
+
+    The version is derived from the last time anything in the course was
+    edited, so it changes whenever the content (or its publication) changes.
+    Returns an empty string if the modulestore does not track edit info.
+    """
+    try:
+        edited_on = course.subtree_edited_on
+    except (AttributeError, NotImplementedError):
+        edited_on = None
+    return unicode(edited_on.isoformat()) if edited_on else u''
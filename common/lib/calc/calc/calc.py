@@ -1,12 +1,16 @@
 """
 Parser and evaluator for FormulaResponse and NumericalResponse
 
-Uses pyparsing to parse. Main function as of now is evaluator().
+Uses pyparsing to parse. Main function as of now is evaluator(); use
+compile_expression() to evaluate an expression many times.
 """
 
 import math
 import operator
 import numbers
+import threading
+from collections import OrderedDict
+
 import numpy
 import scipy.constants
 import functions
@@ -224,38 +228,228 @@ def evaluator(variables, functions, math_expr, case_sensitive=False):
      python numbers.
     -Unary functions are passed as a dictionary from string to function.
     """
-    # No need to go further.
-    if math_expr.strip() == "":
-        return float('nan')
+    return compile_expression(math_expr, case_sensitive).evaluate(variables, functions)
 
-    # Parse the tree.
-    math_interpreter = ParseAugmenter(math_expr, case_sensitive)
-    math_interpreter.parse_algebra()
 
-    # Get our variables together.
-    all_variables, all_functions = add_defaults(variables, functions, case_sensitive)
+# Parsing an expression is much more expensive than evaluating it, and the same
+# few expressions (the instructor's answer and the common student answers) get
+# evaluated over and over. Keep the most recently used ones around.
+PARSE_CACHE_SIZE = 1000
+_PARSE_CACHE = OrderedDict()
+_PARSE_CACHE_LOCK = threading.Lock()
 
-    # ...and check them
-    math_interpreter.check_variables(all_variables, all_functions)
 
-    # Create a recursion to evaluate the tree.
-    if case_sensitive:
-        casify = lambda x: x
-    else:
-        casify = lambda x: x.lower()  # Lowercase for case insens.
-
-    evaluate_actions = {
-        'number': eval_number,
-        'variable': lambda x: all_variables[casify(x[0])],
-        'function': lambda x: all_functions[casify(x[0])](x[1]),
-        'atom': eval_atom,
-        'power': eval_power,
-        'parallel': eval_parallel,
-        'product': eval_product,
-        'sum': eval_sum
-    }
-
-    return math_interpreter.reduce_tree(evaluate_actions)
+def compile_expression(math_expr, case_sensitive=False):
+    """
+    Parse `math_expr` and return it as a `CompiledExpression`, which may be
+    evaluated any number of times.
+
+    The last `PARSE_CACHE_SIZE` expressions compiled are cached, keyed by
+    `(math_expr, case_sensitive)`. Raise a `ParseException` if the expression
+    cannot be parsed (such expressions are not cached).
+    """
+    key = (math_expr, case_sensitive)
+    with _PARSE_CACHE_LOCK:
+        compiled = _PARSE_CACHE.pop(key, None)
+        if compiled is not None:
+            # Move it to the end; it is now the most recently used.
+            _PARSE_CACHE[key] = compiled
+            return compiled
+
+    compiled = CompiledExpression(math_expr, case_sensitive)
+
+    with _PARSE_CACHE_LOCK:
+        _PARSE_CACHE[key] = compiled
+        while len(_PARSE_CACHE) > PARSE_CACHE_SIZE:
+            _PARSE_CACHE.popitem(last=False)
+    return compiled
+
+
+# Functions which operate elementwise on numpy arrays, so an expression using
+# only these may be evaluated over a whole batch of samples at once.
+VECTORIZED_FUNCTIONS = frozenset(
+    func for func in DEFAULT_FUNCTIONS.itervalues() if func is not math.factorial
+)
+
+
+# Evaluation actions for numpy arrays. Unlike their counterparts above, these
+# can't tell values from operators by checking for numbers (or by comparing
+# them to strings).
+
+def _eval_array_atom(parse_result):
+    """
+    Return the value wrapped by the atom, ignoring parenthesis.
+    """
+    return next(k for k in parse_result if not isinstance(k, basestring))
+
+
+def _eval_array_power(parse_result):
+    """
+    Exponentiate the values, right to left.
+    """
+    parse_result = reversed([k for k in parse_result if not isinstance(k, basestring)])
+    return reduce(lambda a, b: b ** a, parse_result)
+
+
+def _eval_array_parallel(parse_result):
+    """
+    Compute the values according to the parallel resistors operator.
+
+    Zero inputs trigger a division error rather than a NaN.
+    """
+    values = [k for k in parse_result if not isinstance(k, basestring)]
+    if len(values) == 1:
+        return values[0]
+    return 1. / sum(1. / value for value in values)
+
+
+def _eval_array_sum(parse_result):
+    """
+    Add the values, keeping in mind their sign.
+    """
+    total = 0.0
+    current_op = operator.add
+    for token in parse_result:
+        if isinstance(token, basestring):
+            current_op = operator.sub if token == '-' else operator.add
+        else:
+            total = current_op(total, token)
+    return total
+
+
+def _eval_array_product(parse_result):
+    """
+    Multiply the values.
+    """
+    prod = 1.0
+    current_op = operator.mul
+    for token in parse_result:
+        if isinstance(token, basestring):
+            current_op = operator.truediv if token == '/' else operator.mul
+        else:
+            prod = current_op(prod, token)
+    return prod
+
+
+class CompiledExpression(object):
+    """
+    A parsed math expression, ready to be evaluated with different variables.
+
+    Use `compile_expression()` rather than creating these directly, so that
+    the parse is cached.
+    """
+    def __init__(self, math_expr, case_sensitive=False):
+        self.math_expr = math_expr
+        self.case_sensitive = case_sensitive
+        if math_expr.strip() == "":
+            self.parsed = None
+        else:
+            self.parsed = ParseAugmenter(math_expr, case_sensitive)
+            self.parsed.parse_algebra()
+
+    def _casify(self, name):
+        """
+        Normalize the case of a variable or function name.
+        """
+        return name if self.case_sensitive else name.lower()
+
+    def _evaluate_tree(self, all_variables, all_functions, array_actions=False):
+        """
+        Reduce the parse tree to its value, given the variables and functions
+        (as returned by `add_defaults`).
+        """
+        evaluate_actions = {
+            'number': eval_number,
+            'variable': lambda x: all_variables[self._casify(x[0])],
+            'function': lambda x: all_functions[self._casify(x[0])](x[1]),
+            'atom': eval_atom,
+            'power': eval_power,
+            'parallel': eval_parallel,
+            'product': eval_product,
+            'sum': eval_sum
+        }
+        if array_actions:
+            evaluate_actions.update({
+                'atom': _eval_array_atom,
+                'power': _eval_array_power,
+                'parallel': _eval_array_parallel,
+                'product': _eval_array_product,
+                'sum': _eval_array_sum,
+            })
+        return self.parsed.reduce_tree(evaluate_actions)
+
+    def evaluate(self, variables, functions):
+        """
+        Evaluate the expression; see `evaluator()`.
+        """
+        # No need to go further.
+        if self.parsed is None:
+            return float('nan')
+
+        # Get our variables together, and check them.
+        all_variables, all_functions = add_defaults(variables, functions, self.case_sensitive)
+        self.parsed.check_variables(all_variables, all_functions)
+
+        return self._evaluate_tree(all_variables, all_functions)
+
+    def evaluate_many(self, variables_list, functions):
+        """
+        Evaluate the expression once for each dictionary of variables in
+        `variables_list`, and return the list of results.
+
+        When possible, all the samples are evaluated at once using numpy
+        arrays. If the expression uses functions which might not work on
+        arrays, or anything goes wrong along the way (including floating
+        point errors such as a division by zero), fall back to evaluating the
+        samples one at a time, so the results (and errors) are exactly those
+        of `evaluate()`.
+        """
+        variables_list = list(variables_list)
+        if self.parsed is None:
+            return [float('nan')] * len(variables_list)
+        if not variables_list:
+            return []
+
+        arrays = self._sample_arrays(variables_list)
+        if arrays is not None:
+            all_variables, all_functions = add_defaults(arrays, functions, self.case_sensitive)
+            self.parsed.check_variables(all_variables, all_functions)
+            used_functions = [all_functions[self._casify(name)] for name in self.parsed.functions_used]
+            if all(func in VECTORIZED_FUNCTIONS for func in used_functions):
+                try:
+                    with numpy.errstate(all='raise'):
+                        result = self._evaluate_tree(all_variables, all_functions, array_actions=True)
+                    result = numpy.asarray(result) + numpy.zeros(len(variables_list))
+                    if result.shape == (len(variables_list),):
+                        return result.tolist()
+                except Exception:  # pylint: disable=broad-except
+                    # Let the one at a time evaluation have its say.
+                    pass
+
+        return [self.evaluate(variables, functions) for variables in variables_list]
+
+    @staticmethod
+    def _sample_arrays(variables_list):
+        """
+        Turn a list of dictionaries of variables into a dictionary of arrays
+        of samples, one per variable.
+
+        Return None if the dictionaries don't all define the same variables,
+        or if some values are not floating point or complex numbers.
+        """
+        names = set(variables_list[0])
+        if any(set(variables) != names for variables in variables_list):
+            return None
+        arrays = {}
+        for name in names:
+            try:
+                array = numpy.array([variables[name] for variables in variables_list])
+            except (TypeError, ValueError):
+                return None
+            if array.ndim != 1 or array.dtype.kind not in 'fc':
+                return None
+            arrays[name] = array
+        return arrays
 
 
 class ParseAugmenter(object):
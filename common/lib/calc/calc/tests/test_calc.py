@@ -3,6 +3,7 @@ Unit tests for calc.py
 """
 
 import unittest
+import mock
 import numpy
 import calc
 from pyparsing import ParseException
@@ -559,3 +560,87 @@ class EvaluatorTest(unittest.TestCase):
             calc.evaluator({'r1': 5}, {}, "r1+r2")
         with self.assertRaisesRegexp(calc.UndefinedVariable, 'r1 r3'):
             calc.evaluator(variables, {}, "r1*r3", case_sensitive=True)
+
+
+class CompiledExpressionTest(unittest.TestCase):
+    """
+    Run tests for calc.compile_expression and evaluating the same expression
+    over many samples.
+    """
+    def setUp(self):
+        super(CompiledExpressionTest, self).setUp()
+        self.samples = [{'x': 0.5 + index, 'y': 2.0 - index / 10.0} for index in range(10)]
+
+    def assert_evaluates_like_evaluator(self, math_expr, functions=None, case_sensitive=False):
+        """
+        Check that evaluating `math_expr` over `self.samples` at once gives
+        the same results as calling `evaluator` for each sample.
+        """
+        functions = functions or {}
+        expected = [calc.evaluator(sample, functions, math_expr, case_sensitive) for sample in self.samples]
+        results = calc.compile_expression(math_expr, case_sensitive).evaluate_many(self.samples, functions)
+        self.assertEqual(len(results), len(expected))
+        for result, expected_result in zip(results, expected):
+            if numpy.isnan(expected_result):
+                self.assertTrue(numpy.isnan(result))
+            else:
+                self.assertAlmostEqual(result, expected_result)
+
+    def test_cache(self):
+        """
+        The same expression is only parsed once, but case sensitivity counts.
+        """
+        compiled = calc.compile_expression('x^2 + y', case_sensitive=False)
+        self.assertIs(compiled, calc.compile_expression('x^2 + y', case_sensitive=False))
+        self.assertIsNot(compiled, calc.compile_expression('x^2 + y', case_sensitive=True))
+
+    def test_cache_size(self):
+        """
+        The least recently used expressions are dropped from the cache.
+        """
+        with mock.patch('calc.calc.PARSE_CACHE_SIZE', 2):
+            first = calc.compile_expression('x + 1')
+            second = calc.compile_expression('x + 2')
+            self.assertIs(first, calc.compile_expression('x + 1'))
+            calc.compile_expression('x + 3')
+            self.assertIs(first, calc.compile_expression('x + 1'))
+            self.assertIsNot(second, calc.compile_expression('x + 2'))
+
+    def test_evaluate_many(self):
+        """
+        Test that evaluating many samples at once matches `evaluator`.
+        """
+        self.assert_evaluates_like_evaluator('x^2 - 3*y')
+        self.assert_evaluates_like_evaluator('-x/y + 2^3^0.5')
+        self.assert_evaluates_like_evaluator('x || y || 4k')
+        self.assert_evaluates_like_evaluator('sin(x)*cos(y) + sqrt(x) + ln(x) - sec(y)')
+        self.assert_evaluates_like_evaluator('X*Y + Pi', case_sensitive=False)
+        self.assert_evaluates_like_evaluator('x + i*y')
+        self.assert_evaluates_like_evaluator('42')
+
+    def test_evaluate_many_fallback(self):
+        """
+        Functions that may not work on arrays, and floating point errors,
+        lead to evaluating the samples one at a time.
+        """
+        self.assert_evaluates_like_evaluator('fact(3) + x')
+        self.assert_evaluates_like_evaluator('f(x) + y', functions={'f': lambda x: x if x > 1 else -x})
+        self.assert_evaluates_like_evaluator('arccot(x - 3)')
+        self.assert_evaluates_like_evaluator('x || 0')
+        self.assert_evaluates_like_evaluator('sqrt(y - 1.5)')
+
+        with self.assertRaises(ZeroDivisionError):
+            calc.compile_expression('1/(x - 2.5)').evaluate_many(self.samples, {})
+
+    def test_evaluate_many_errors(self):
+        """
+        Test edge cases and errors of `evaluate_many`.
+        """
+        self.assertEqual(calc.compile_expression('x').evaluate_many([], {}), [])
+        results = calc.compile_expression(' ').evaluate_many(self.samples, {})
+        self.assertEqual(len(results), len(self.samples))
+        self.assertTrue(all(numpy.isnan(result) for result in results))
+        with self.assertRaisesRegexp(calc.UndefinedVariable, 'z'):
+            calc.compile_expression('x + z').evaluate_many(self.samples, {})
+        with self.assertRaises(ParseException):
+            calc.compile_expression('x +* y')
@@ -30,6 +30,7 @@ import capa.responsetypes as responsetypes
 from capa.util import contextualize_text, convert_files_to_filenames
 import capa.xqueue_interface as xqueue_interface
 from capa.safe_exec import safe_exec
+from lru_cache import LRUCache
 
 
 # extra things displayed after "show answers" is pressed
@@ -58,6 +59,12 @@ html_problem_semantics = [
 
 log = logging.getLogger(__name__)
 
+# Maximum number of ProblemTemplates kept in each process
+PROBLEM_TEMPLATE_CACHE_SIZE = 1000
+
+# Maps (problem id, problem text, filestore root, DEBUG) to ProblemTemplates
+_TEMPLATE_CACHE = LRUCache(PROBLEM_TEMPLATE_CACHE_SIZE)
+
 #-----------------------------------------------------------------------------
 # main class for this module
 
@@ -110,6 +117,36 @@ class LoncapaSystem(object):
         self.matlab_api_key = matlab_api_key
 
 
+class ProblemTemplate(object):
+    """
+    The parts of a capa Problem that don't depend on its seed or state, which
+    are computed once and shared by all the LoncapaProblems of the same
+    problem, in each process.
+
+    Attributes:
+        tree: the parsed XML of the problem, with its includes resolved. It
+            is never modified: each LoncapaProblem works on a copy of it.
+        script_code (string): the Python code of the problem's scripts.
+        python_path (list): the directories the script code imports from.
+        responses (list): a (response index, Response class, input indices)
+            tuple for each response of the problem, in document order, where
+            the indices are those of the elements of the response and of its
+            inputs and solutions in `tree.iter()`.
+    """
+    def __init__(self, tree, script_code, python_path, responses):
+        self.tree = tree
+        self.script_code = script_code
+        self.python_path = python_path
+        self.responses = responses
+
+
+def clear_template_cache():
+    """
+    Forget the ProblemTemplates of all problems.
+    """
+    _TEMPLATE_CACHE.clear()
+
+
 class LoncapaProblem(object):
     """
     Main class for capa Problems.
@@ -159,20 +196,19 @@ class LoncapaProblem(object):
         problem_text = re.sub(r"endouttext\s*/", "/text", problem_text)
         self.problem_text = problem_text
 
-        # parse problem XML file into an element tree
-        self.tree = etree.XML(problem_text)
-
-        # handle any <include file="foo"> tags
-        self._process_includes()
+        # parse the problem XML into an element tree and find its script code and
+        # responses, or reuse the result of doing so for an earlier instance
+        template = self._get_template()
+        self.tree = deepcopy(template.tree)
 
         # construct script processor context (eg for customresponse problems)
-        self.context = self._extract_context(self.tree)
+        self.context = self._exec_script(template.script_code, template.python_path)
 
         # Pre-parse the XML tree: modifies it to add ID's and perform some in-place
         # transformations.  This also creates the dict (self.responders) of Response
         # instances for each question in the problem. The dict has keys = xml subtree of
         # Response, values = Response instance
-        self._preprocess_problem(self.tree)
+        self._preprocess_problem(self.tree, template.responses)
 
         if not self.student_answers:  # True when student_answers is an empty dict
             self.set_initial_display()
@@ -536,6 +572,45 @@ class LoncapaProblem(object):
 
     # ======= Private Methods Below ========
 
+    def _get_template(self):
+        """
+        Returns the ProblemTemplate of this problem, creating it if it isn't
+        cached already.
+        """
+        # <include>d files and the python_path are read from the filestore, which
+        # differs between courses whose problems can have the same problem_id
+        # (e.g. reruns in old mongo, whose ids leave out the run)
+        filestore_root = getattr(self.capa_system.filestore, 'root_path', None)
+        key = (self.problem_id, self.problem_text, filestore_root, bool(self.capa_system.DEBUG))
+        template = _TEMPLATE_CACHE.get(key)
+        if template is not None:
+            return template
+
+        # parse problem XML file into an element tree
+        self.tree = etree.XML(self.problem_text)
+
+        # handle any <include file="foo"> tags
+        self._process_includes()
+
+        script_code, python_path = self._extract_script(self.tree)
+        template = ProblemTemplate(self.tree, script_code, python_path, self._find_responses(self.tree))
+        _TEMPLATE_CACHE.set(key, template)
+        return template
+
+    def _find_responses(self, tree):
+        """
+        Returns the responses of the problem, as described in
+        ProblemTemplate.responses.
+        """
+        positions = dict((element, index) for index, element in enumerate(tree.iter()))
+        input_tags = inputtypes.registry.registered_tags() + solution_tags
+        responses = []
+        for response in tree.xpath('//' + "|//".join(responsetypes.registry.registered_tags())):
+            responsetype_cls = responsetypes.registry.get_class_for_tag(response.tag)
+            inputfields = [positions[entry] for entry in response.iterdescendants(*input_tags)]
+            responses.append((positions[response], responsetype_cls, inputfields))
+        return responses
+
     def _process_includes(self):
         """
         Handle any <include file="foo"> tags by reading in the specified file and inserting it
@@ -628,9 +703,14 @@ class LoncapaProblem(object):
 
         Problem XML goes to Python execution context. Runs everything in script tags.
         """
-        context = {}
-        context['seed'] = self.seed
-        context['anonymous_student_id'] = self.capa_system.anonymous_student_id
+        all_code, python_path = self._extract_script(tree)
+        return self._exec_script(all_code, python_path)
+
+    def _extract_script(self, tree):
+        """
+        Returns the Python code of the <script>...</script>s of the problem, and the
+        directories it imports from.
+        """
         all_code = ''
 
         python_path = []
@@ -653,6 +733,19 @@ class LoncapaProblem(object):
             code = unescape(script.text, XMLESC)
             all_code += code
 
+        return all_code, python_path
+
+    def _exec_script(self, all_code, python_path):
+        """
+        Execs the script code of the problem in the context of this problem, and
+        returns that context.
+        """
+        context = {}
+        context['seed'] = self.seed
+        context['anonymous_student_id'] = self.capa_system.anonymous_student_id
+        # the template's path is shared, so is extended on a copy
+        python_path = list(python_path)
+
         extra_files = []
         if all_code:
             # An asset named python_lib.zip can be imported by Python code.
@@ -784,7 +877,7 @@ class LoncapaProblem(object):
 
         return tree
 
-    def _preprocess_problem(self, tree):  # private
+    def _preprocess_problem(self, tree, responses=None):  # private
         """
         Assign IDs to all the responses
         Assign sub-IDs to all entries (textline, schematic, etc.)
@@ -794,21 +887,25 @@ class LoncapaProblem(object):
         Also create capa Response instances for each responsetype and save as self.responders
 
         Obtain all responder answers and save as self.responder_answers dict (key = response)
+
+        `responses` are those of the template of the problem (see ProblemTemplate.responses),
+        found in `tree` if not given.
         """
+        if responses is None:
+            responses = self._find_responses(tree)
+        elements = list(tree.iter())
+
         response_id = 1
         self.responders = {}
-        for response in tree.xpath('//' + "|//".join(responsetypes.registry.registered_tags())):
+        for response_index, responsetype_cls, input_indices in responses:
+            response = elements[response_index]
             response_id_str = self.problem_id + "_" + str(response_id)
             # create and save ID for this response
             response.set('id', response_id_str)
             response_id += 1
 
             answer_id = 1
-            input_tags = inputtypes.registry.registered_tags()
-            inputfields = tree.xpath(
-                "|".join(['//' + response.tag + '[@id=$id]//' + x for x in (input_tags + solution_tags)]),
-                id=response_id_str
-            )
+            inputfields = [elements[index] for index in input_indices]
 
             # assign one answer_id for each input type or solution type
             for entry in inputfields:
@@ -818,7 +915,6 @@ class LoncapaProblem(object):
                 answer_id = answer_id + 1
 
             # instantiate capa Response
-            responsetype_cls = responsetypes.registry.get_class_for_tag(response.tag)
             responder = responsetype_cls(response, inputfields, self.context, self.capa_system)
             # save in list in self
             self.responders[response] = responder
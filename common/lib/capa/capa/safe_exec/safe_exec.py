@@ -6,7 +6,11 @@ from codejail.safe_exec import json_safe, SafeExecException
 from . import lazymod
 from dogapi import dog_stats_api
 
+import copy
 import hashlib
+import time
+
+from lru_cache import LRUCache
 
 # Establish the Python environment for Capa.
 # Capa assumes float-friendly division always.
@@ -46,6 +50,21 @@ for name, modname in ASSUMED_IMPORTS:
 
 LAZY_IMPORTS = "".join(LAZY_IMPORTS)
 
+# The results of safe_exec kept in this process, in front of the `cache`
+# passed to safe_exec: cache keys to (emsg, cleaned_results) pairs.  Empty
+# until `configure_local_cache` sizes it.
+_LOCAL_CACHE = LRUCache(0)
+
+
+def configure_local_cache(size):
+    """
+    Keep the results of the `size` most recently used executions in this
+    process, so that they needn't be fetched from the shared cache.  0
+    disables this.
+    """
+    _LOCAL_CACHE.max_size = size
+    _LOCAL_CACHE.clear()
+
 
 def update_hash(hasher, obj):
     """
@@ -99,7 +118,8 @@ def safe_exec(
 
     `cache` is an object with .get(key) and .set(key, value) methods.  It will be used
     to cache the execution, taking into account the code, the values of the globals,
-    and the random seed.
+    and the random seed.  If `configure_local_cache` was called, recent results
+    are also kept in this process and looked up before `cache`.
 
     `slug` is an arbitrary string, a description that's meaningful to the
     caller, that will be used in log messages.
@@ -114,12 +134,22 @@ def safe_exec(
         md5er.update(repr(code))
         update_hash(md5er, safe_globals)
         key = "safe_exec.%r.%s" % (random_seed, md5er.hexdigest())
-        cached = cache.get(key)
+        cached = _LOCAL_CACHE.get(key)
+        if cached is not None:
+            dog_stats_api.increment('capa.safe_exec.cache', tags=['result:local_hit'])
+        else:
+            cached = cache.get(key)
+            if cached is not None:
+                dog_stats_api.increment('capa.safe_exec.cache', tags=['result:hit'])
+                _LOCAL_CACHE.set(key, cached)
+            else:
+                dog_stats_api.increment('capa.safe_exec.cache', tags=['result:miss'])
         if cached is not None:
             # We have a cached result.  The result is a pair: the exception
             # message, if any, else None; and the resulting globals dictionary.
+            # The locally cached results are shared, so the caller gets a copy.
             emsg, cleaned_results = cached
-            globals_dict.update(cleaned_results)
+            globals_dict.update(copy.deepcopy(cleaned_results))
             if emsg:
                 raise SafeExecException(emsg)
             return
@@ -134,6 +164,7 @@ def safe_exec(
         exec_fn = codejail_safe_exec
 
     # Run the code!  Results are side effects in globals_dict.
+    start_time = time.time()
     try:
         exec_fn(
             code_prolog + LAZY_IMPORTS + code, globals_dict,
@@ -143,12 +174,14 @@ def safe_exec(
         emsg = e.message
     else:
         emsg = None
+    dog_stats_api.histogram('capa.safe_exec.exec_time', time.time() - start_time)
 
     # Put the result back in the cache.  This is complicated by the fact that
     # the globals dict might not be entirely serializable.
     if cache:
         cleaned_results = json_safe(globals_dict)
         cache.set(key, (emsg, cleaned_results))
+        _LOCAL_CACHE.set(key, (emsg, copy.deepcopy(cleaned_results)))
 
     # If an exception happened, raise it now.
     if emsg:
@@ -9,7 +9,7 @@ import unittest
 
 from nose.plugins.skip import SkipTest
 
-from capa.safe_exec import safe_exec, update_hash
+from capa.safe_exec import safe_exec, update_hash, configure_local_cache
 from codejail.safe_exec import SafeExecException
 from codejail.jail_code import is_configured
 
@@ -177,6 +177,67 @@ class TestSafeExecCaching(unittest.TestCase):
                 self.fail("Tried executing code with non-ASCII unicode: {0}".format(code))
 
 
+class TestSafeExecLocalCaching(unittest.TestCase):
+    """Test the cache of safe_exec's results kept in the process."""
+
+    def setUp(self):
+        super(TestSafeExecLocalCaching, self).setUp()
+        configure_local_cache(2)
+        self.addCleanup(configure_local_cache, 0)
+
+    def test_local_hit(self):
+        cache = {}
+        g = {}
+        safe_exec("a = [int(math.pi)]", g, cache=DictCache(cache))
+        self.assertEqual(g['a'], [3])
+
+        # The shared cache isn't consulted for results kept in the process
+        cache[cache.keys()[0]] = (None, {'a': [17]})
+        g = {}
+        safe_exec("a = [int(math.pi)]", g, cache=DictCache(cache))
+        self.assertEqual(g['a'], [3])
+
+        # Callers can't change the results kept in the process
+        g['a'].append(4)
+        g = {}
+        safe_exec("a = [int(math.pi)]", g, cache=DictCache(cache))
+        self.assertEqual(g['a'], [3])
+
+    def test_shared_hit_kept_locally(self):
+        cache = {}
+        safe_exec("a = int(math.pi)", {}, cache=DictCache(cache))
+        configure_local_cache(2)
+        cache[cache.keys()[0]] = (None, {'a': 17})
+
+        g = {}
+        safe_exec("a = int(math.pi)", g, cache=DictCache(cache))
+        self.assertEqual(g['a'], 17)
+        cache.clear()
+        g = {}
+        safe_exec("a = int(math.pi)", g, cache=DictCache(cache))
+        self.assertEqual(g['a'], 17)
+
+    def test_exceptions_kept_locally(self):
+        cache = {}
+        with self.assertRaises(SafeExecException):
+            safe_exec("1/0", {}, cache=DictCache(cache))
+        cache.clear()
+        with self.assertRaisesRegexp(SafeExecException, "ZeroDivisionError"):
+            safe_exec("1/0", {}, cache=DictCache(cache))
+        self.assertEqual(cache, {})
+
+    def test_least_recently_used_evicted(self):
+        cache = {}
+        for code in ("a = 1", "a = 2", "a = 1", "a = 3"):
+            safe_exec(code, {}, cache=DictCache(cache))
+        cache.clear()
+
+        # "a = 2" was evicted, so it is run again, and cached in the shared cache
+        for code in ("a = 1", "a = 3", "a = 2"):
+            safe_exec(code, {}, cache=DictCache(cache))
+        self.assertEqual(len(cache), 1)
+
+
 class TestUpdateHash(unittest.TestCase):
     """Test the safe_exec.update_hash function to be sure it canonicalizes properly."""
 
@@ -0,0 +1,90 @@
+"""Tests the sharing of ProblemTemplates between capa problems."""
+
+import textwrap
+import unittest
+
+import fs.osfs
+from lxml import etree
+import mock
+
+from . import new_loncapa_problem, test_capa_system, TEST_DIR
+from capa import capa_problem
+
+
+class CapaProblemTemplateTest(unittest.TestCase):
+    """Capa problem tests for the ProblemTemplate cache."""
+
+    xml_str = textwrap.dedent("""
+        <problem>
+        <script type="loncapa/python">
+        answer = "Donut"
+        </script>
+        <multiplechoiceresponse>
+          <choicegroup type="MultipleChoice" shuffle="true">
+            <choice correct="false">Apple</choice>
+            <choice correct="false">Banana</choice>
+            <choice correct="false">Chocolate</choice>
+            <choice correct ="true">Donut</choice>
+          </choicegroup>
+        </multiplechoiceresponse>
+        <stringresponse answer="$answer">
+          <textline size="20"/>
+        </stringresponse>
+        </problem>
+    """)
+
+    def setUp(self):
+        super(CapaProblemTemplateTest, self).setUp()
+        capa_problem.clear_template_cache()
+        self.addCleanup(capa_problem.clear_template_cache)
+
+    def test_template_shared(self):
+        with mock.patch('capa.capa_problem.etree.XML', wraps=etree.XML) as mock_xml:
+            first_problem = new_loncapa_problem(self.xml_str, seed=0)
+            second_problem = new_loncapa_problem(self.xml_str, seed=1)
+        self.assertEqual(mock_xml.call_count, 1)
+        self.assertIsNot(first_problem.tree, second_problem.tree)
+
+        # Each problem still gets its own responders, with their own ids
+        for problem in (first_problem, second_problem):
+            self.assertEqual(
+                sorted(responder.id for responder in problem.responders.values()),
+                ['1_1', '1_2']
+            )
+            self.assertEqual(problem.context['answer'], 'Donut')
+
+    def test_template_per_filestore(self):
+        # The same problem in another course may include other files
+        other_capa_system = test_capa_system()
+        other_capa_system.filestore = fs.osfs.OSFS(TEST_DIR)
+        with mock.patch('capa.capa_problem.etree.XML', wraps=etree.XML) as mock_xml:
+            new_loncapa_problem(self.xml_str)
+            new_loncapa_problem(self.xml_str, capa_system=other_capa_system)
+        self.assertEqual(mock_xml.call_count, 2)
+
+    def test_seed_specific_parts(self):
+        # The first problem creates the template, the second one reuses it
+        new_loncapa_problem(self.xml_str, seed=0)
+        cached_problem = new_loncapa_problem(self.xml_str, seed=1)
+        capa_problem.clear_template_cache()
+        uncached_problem = new_loncapa_problem(self.xml_str, seed=1)
+
+        self.assertEqual(cached_problem.context['seed'], 1)
+        self.assertEqual(cached_problem.get_html(), uncached_problem.get_html())
+        # shuffling with a seed of 0 yields: B A C D
+        shuffled_problem = new_loncapa_problem(self.xml_str, seed=0)
+        response = [response for response in shuffled_problem.responders.values() if response.has_shuffle()][0]
+        self.assertEqual(response.unmask_order(), ['choice_1', 'choice_0', 'choice_2', 'choice_3'])
+
+    def test_template_not_modified(self):
+        new_loncapa_problem(self.xml_str, seed=0)
+        template = capa_problem._TEMPLATE_CACHE.values()[0]  # pylint: disable=protected-access
+        self.assertEqual(template.tree.xpath('//*[@id]'), [])
+
+    def test_cache_bounded(self):
+        with mock.patch.object(capa_problem._TEMPLATE_CACHE, 'max_size', 1):  # pylint: disable=protected-access
+            new_loncapa_problem(self.xml_str)
+            new_loncapa_problem("<problem> </problem>")
+            with mock.patch('capa.capa_problem.etree.XML', wraps=etree.XML) as mock_xml:
+                new_loncapa_problem(self.xml_str)
+        self.assertEqual(mock_xml.call_count, 1)
@@ -0,0 +1,78 @@
+"""
+A bounded cache kept in the memory of the process.
+"""
+from collections import OrderedDict
+import threading
+
+
+class LRUCache(object):
+    """
+    A thread-safe, bounded cache kept in the memory of the process, which evicts
+    the least recently used values once it holds more than `max_size`.
+
+    By default each value counts as 1 towards `max_size`; pass `get_size` to
+    weigh values otherwise (e.g. by their length, to bound the bytes held).
+    Values larger than `max_size` aren't cached, so a `max_size` of 0 disables
+    the cache. `max_size` can be changed at any time, and applies from the next
+    value cached.
+    """
+    def __init__(self, max_size, get_size=None):
+        self.max_size = max_size
+        self._get_size = get_size or (lambda value: 1)
+        self._values = OrderedDict()  # least recently used first
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Returns the value cached for `key`, or `default` if there is none.
+        """
+        with self._lock:
+            if key not in self._values:
+                return default
+            # It is now the most recently used.
+            value = self._values.pop(key)
+            self._values[key] = value
+            return value
+
+    def set(self, key, value):
+        """
+        Caches `value` for `key`, evicting the least recently used values to make
+        room for it.
+        """
+        size = self._get_size(value)
+        with self._lock:
+            if key in self._values:
+                self._size -= self._get_size(self._values.pop(key))
+            if size > self.max_size:
+                return
+            self._values[key] = value
+            self._size += size
+            while self._size > self.max_size:
+                __, evicted = self._values.popitem(last=False)
+                self._size -= self._get_size(evicted)
+
+    def clear(self):
+        """
+        Empties the cache.
+        """
+        with self._lock:
+            self._values.clear()
+            self._size = 0
+
+    @property
+    def size(self):
+        """
+        The total size of the cached values.
+        """
+        return self._size
+
+    def __len__(self):
+        return len(self._values)
+
+    def values(self):
+        """
+        Returns the cached values, least recently used first.
+        """
+        with self._lock:
+            return self._values.values()
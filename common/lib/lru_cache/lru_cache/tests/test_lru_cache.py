@@ -0,0 +1,55 @@
+"""
+Tests for lru_cache
+"""
+from unittest import TestCase
+
+from lru_cache import LRUCache
+
+
+class TestLRUCache(TestCase):
+    """
+    Test the LRUCache.
+    """
+    def test_get_and_set(self):
+        cache = LRUCache(2)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.get('a', 'default'), 'default')
+        cache.set('a', 1)
+        self.assertEqual(cache.get('a'), 1)
+        cache.set('a', 2)
+        self.assertEqual(cache.get('a'), 2)
+        self.assertEqual(len(cache), 1)
+
+    def test_least_recently_used_is_evicted(self):
+        cache = LRUCache(2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        # Use 'a' again, so that 'b' is evicted in its place
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertEqual(cache.values(), [1, 3])
+
+    def test_get_size(self):
+        cache = LRUCache(5, get_size=len)
+        cache.set('a', 'xx')
+        cache.set('b', 'xxx')
+        self.assertEqual(cache.size, 5)
+        cache.set('c', 'x')
+        self.assertEqual(cache.values(), ['xxx', 'x'])
+        self.assertEqual(cache.size, 4)
+        # Too big to be cached at all
+        cache.set('d', 'xxxxxx')
+        self.assertIsNone(cache.get('d'))
+        self.assertEqual(cache.size, 4)
+
+    def test_disabled(self):
+        cache = LRUCache(0)
+        cache.set('a', 1)
+        self.assertIsNone(cache.get('a'))
+
+    def test_clear(self):
+        cache = LRUCache(2, get_size=len)
+        cache.set('a', 'x')
+        cache.clear()
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.size, 0)
@@ -21,7 +21,7 @@ from PIL import Image
 
 class StaticContent(object):
     def __init__(self, loc, name, content_type, data, last_modified_at=None, thumbnail_location=None, import_path=None,
-                 length=None, locked=False):
+                 length=None, locked=False, content_digest=None):
         self.location = loc
         self.name = name  # a display string which can be edited, and thus not part of the location which needs to be fixed
         self.content_type = content_type
@@ -33,6 +33,8 @@ class StaticContent(object):
         # cycles
         self.import_path = import_path
         self.locked = locked
+        # a hash of the data (e.g. its md5), if known
+        self.content_digest = content_digest
 
     @property
     def is_thumbnail(self):
@@ -171,10 +173,10 @@ class StaticContent(object):
 
 class StaticContentStream(StaticContent):
     def __init__(self, loc, name, content_type, stream, last_modified_at=None, thumbnail_location=None, import_path=None,
-                 length=None, locked=False):
+                 length=None, locked=False, content_digest=None):
         super(StaticContentStream, self).__init__(loc, name, content_type, None, last_modified_at=last_modified_at,
                                                   thumbnail_location=thumbnail_location, import_path=import_path,
-                                                  length=length, locked=locked)
+                                                  length=length, locked=locked, content_digest=content_digest)
         self._stream = stream
 
     def stream_data(self):
@@ -206,7 +208,8 @@ class StaticContentStream(StaticContent):
         self._stream.seek(0)
         content = StaticContent(self.location, self.name, self.content_type, self._stream.read(),
                                 last_modified_at=self.last_modified_at, thumbnail_location=self.thumbnail_location,
-                                import_path=self.import_path, length=self.length, locked=self.locked)
+                                import_path=self.import_path, length=self.length, locked=self.locked,
+                                content_digest=self.content_digest)
         return content
 
 
@@ -242,6 +245,21 @@ class ContentStore(object):
         """
         raise NotImplementedError
 
+    def find_variant(self, content_digest, encoding):
+        """
+        Return the data of the variant of the content with the given digest
+        in the given encoding (e.g. 'gzip'), as saved with `save_variant`, or
+        None if there isn't one.
+        """
+        return None
+
+    def save_variant(self, content_digest, encoding, data):
+        """
+        Save `data` as the variant of the content with the given digest in the
+        given encoding. Stores which don't keep variants ignore them.
+        """
+        pass
+
     def copy_all_course_assets(self, source_course_key, dest_course_key):
         """
         Copy all the course assets from source_course_key to dest_course_key
@@ -47,6 +47,10 @@ class MongoContentStore(ContentStore):
 
         self.fs_files = _db[bucket + ".files"]  # the underlying collection GridFS uses
 
+        # encoded (e.g. gzip'd) variants of the content, identified by the digest of the original
+        self.fs_variants = gridfs.GridFS(_db, bucket + "_variants")
+        self.fs_variants_files = _db[bucket + "_variants.files"]
+
     def close_connections(self):
         """
         Closes any open connections to the underlying databases
@@ -67,7 +71,8 @@ class MongoContentStore(ContentStore):
         # The way to version files in gridFS is to not use the file id as the _id but just as the filename.
         # Then you can upload as many versions as you like and access by date or version. Because we use
         # the location as the _id, we must delete before adding (there's no replace method in gridFS)
-        self.delete(content_id)  # delete is a noop if the entry doesn't exist; so, don't waste time checking
+        previous_digest = self._content_digest(content_id)
+        self.fs.delete(content_id)  # delete is a noop if the entry doesn't exist; so, don't waste time checking
 
         thumbnail_location = content.thumbnail_location.to_deprecated_list_repr() if content.thumbnail_location else None
         with self.fs.new_file(_id=content_id, filename=unicode(content.location), content_type=content.content_type,
@@ -82,13 +87,39 @@ class MongoContentStore(ContentStore):
             else:
                 fp.write(content.data)
 
+        if previous_digest != fp.md5:
+            self._delete_variants([previous_digest])
         return content
 
     def delete(self, location_or_id):
         if isinstance(location_or_id, AssetKey):
             location_or_id, _ = self.asset_db_key(location_or_id)
+        content_digest = self._content_digest(location_or_id)
         # Deletes of non-existent files are considered successful
         self.fs.delete(location_or_id)
+        self._delete_variants([content_digest])
+
+    def _content_digest(self, content_id):
+        """
+        Return the digest of the content stored with the given id, or None if
+        there is none.
+        """
+        asset = self.fs_files.find_one({'_id': content_id}, fields=['md5'])
+        return asset.get('md5') if asset else None
+
+    def _delete_variants(self, content_digests):
+        """
+        Delete the variants of the content with the given digests.
+
+        Identical assets share their variants, so another asset may lose its
+        variants too, which are then made again when next needed.
+        """
+        for content_digest in set(content_digests):
+            if content_digest is None:
+                continue
+            variants = self.fs_variants_files.find({'_id': {'$regex': u'^{}\\.'.format(content_digest)}}, fields=[])
+            for variant in variants:
+                self.fs_variants.delete(variant['_id'])
 
     def find(self, location, throw_on_not_found=True, as_stream=False):
         content_id, __ = self.asset_db_key(location)
@@ -106,7 +137,8 @@ class MongoContentStore(ContentStore):
                     location, fp.displayname, fp.content_type, fp, last_modified_at=fp.uploadDate,
                     thumbnail_location=thumbnail_location,
                     import_path=getattr(fp, 'import_path', None),
-                    length=fp.length, locked=getattr(fp, 'locked', False)
+                    length=fp.length, locked=getattr(fp, 'locked', False),
+                    content_digest=getattr(fp, 'md5', None)
                 )
             else:
                 with self.fs.get(content_id) as fp:
@@ -120,7 +152,8 @@ class MongoContentStore(ContentStore):
                         location, fp.displayname, fp.content_type, fp.read(), last_modified_at=fp.uploadDate,
                         thumbnail_location=thumbnail_location,
                         import_path=getattr(fp, 'import_path', None),
-                        length=fp.length, locked=getattr(fp, 'locked', False)
+                        length=fp.length, locked=getattr(fp, 'locked', False),
+                        content_digest=getattr(fp, 'md5', None)
                     )
         except NoFile:
             if throw_on_not_found:
@@ -128,6 +161,29 @@ class MongoContentStore(ContentStore):
             else:
                 return None
 
+    def find_variant(self, content_digest, encoding):
+        """
+        Return the data of the variant of the content with the given digest
+        in the given encoding, or None if there isn't one.
+
+        Variants are keyed by the digest of the original content, so they
+        never go stale and are shared by identical assets.
+        """
+        try:
+            with self.fs_variants.get(u'{}.{}'.format(content_digest, encoding)) as fp:
+                return fp.read()
+        except NoFile:
+            return None
+
+    def save_variant(self, content_digest, encoding, data):
+        """
+        Save `data` as the variant of the content with the given digest in
+        the given encoding.
+        """
+        variant_id = u'{}.{}'.format(content_digest, encoding)
+        self.fs_variants.delete(variant_id)
+        self.fs_variants.put(data, _id=variant_id, variant_encoding=encoding)
+
     def export(self, location, output_directory):
         content = self.find(location)
 
@@ -346,9 +402,12 @@ class MongoContentStore(ContentStore):
         """
         course_query = query_for_course(course_key)
         matching_assets = self.fs_files.find(course_query)
+        content_digests = []
         for asset in matching_assets:
             asset_key = self.make_id_son(asset)
             self.fs.delete(asset_key)
+            content_digests.append(asset.get('md5'))
+        self._delete_variants(content_digests)
 
     # codifying the original order which pymongo used for the dicts coming out of location_to_dict
     # stability of order is more important than sanity of order as any changes to order make things
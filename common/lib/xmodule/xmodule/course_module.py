@@ -36,6 +36,135 @@ CATALOG_VISIBILITY_ABOUT = "about"
 CATALOG_VISIBILITY_NONE = "none"
 
 
+# The functions below hold course metadata logic that is shared between
+# CourseDescriptor and denormalized copies of it (e.g. CourseOverview), which
+# have the same fields but no runtime.
+
+def course_has_ended(end):
+    """
+    Returns True if the current time is after `end`, and False if `end` is None.
+    """
+    if end is None:
+        return False
+    return datetime.now(UTC()) > end
+
+
+def course_may_certify(certificates_display_behavior, certificates_show_before_end, has_ended):
+    """
+    Return True if it is acceptable to show the student a certificate download link.
+    """
+    show_early = (
+        certificates_display_behavior in ('early_with_info', 'early_no_info') or
+        certificates_show_before_end
+    )
+    return show_early or has_ended
+
+
+def course_start_date_is_still_default(start, advertised_start):
+    """
+    Returns whether a course's start date is still the default, i.e. .start has
+    not been modified and .advertised_start has not been set.
+    """
+    return advertised_start is None and start == DEFAULT_START_DATE
+
+
+def course_sorting_dates(start, advertised_start, announcement):
+    """
+    Returns the (announcement, start, now) datetimes used to compute how "new"
+    a course is. A parseable advertised_start takes precedence over start.
+    """
+    try:
+        start = dateutil.parser.parse(advertised_start)
+        if start.tzinfo is None:
+            start = start.replace(tzinfo=UTC())
+    except (ValueError, AttributeError):
+        pass
+
+    return announcement, start, datetime.now(UTC())
+
+
+def course_sorting_score(start, advertised_start, announcement):
+    """
+    Returns a number that can be used to sort courses by how "new" they are.
+    Courses with an announcement date score lower than those without, and
+    older courses score higher. The lower the number, the "newer" the course.
+    """
+    announcement, start, now = course_sorting_dates(start, advertised_start, announcement)
+    scale = 300.0  # about a year
+    if announcement:
+        days = (now - announcement).days
+        score = -exp(-days / scale)
+    else:
+        days = (now - start).days
+        score = exp(days / scale)
+    return score
+
+
+def _add_timezone_string(date_time):
+    """
+    Adds 'UTC' string to the end of start/end date and time texts.
+    """
+    return date_time + u" UTC"
+
+
+def course_start_datetime_text(start, advertised_start, format_string, ugettext, strftime):
+    """
+    Returns the text for a course's start date and time in UTC. Prefers
+    advertised_start, then falls back to start.
+
+    `ugettext` and `strftime` are the translation and date formatting functions
+    of the caller's i18n service.
+    """
+    def try_parse_iso_8601(text):
+        try:
+            result = Date().from_json(text)
+            if result is None:
+                result = text.title()
+            else:
+                result = strftime(result, format_string)
+                if format_string == "DATE_TIME":
+                    result = _add_timezone_string(result)
+        except ValueError:
+            result = text.title()
+
+        return result
+
+    if isinstance(advertised_start, basestring):
+        return try_parse_iso_8601(advertised_start)
+    elif course_start_date_is_still_default(start, advertised_start):
+        # Translators: TBD stands for 'To Be Determined' and is used when a course
+        # does not yet have an announced start date.
+        return ugettext('TBD')
+    else:
+        when = advertised_start or start
+
+        if format_string == "DATE_TIME":
+            return _add_timezone_string(strftime(when, format_string))
+
+        return strftime(when, format_string)
+
+
+def course_end_datetime_text(end, format_string, strftime):
+    """
+    Returns the end date or date_time of a course formatted as a string, or an
+    empty string if the course has no end date.
+    """
+    if end is None:
+        return ''
+    date_time = strftime(end, format_string)
+    return date_time if format_string == "SHORT_DATE" else _add_timezone_string(date_time)
+
+
+def clean_course_id(course_key, padding_char='='):
+    """
+    Returns a unique deterministic base32-encoded ID for the course.
+    The optional padding_char parameter allows you to override the "=" character used for padding.
+    """
+    return "course_{}".format(
+        b32encode(unicode(course_key)).replace('=', padding_char)
+    )
+
+
 class StringOrDate(Date):
     def from_json(self, value):
         """
@@ -1089,17 +1218,17 @@ class CourseDescriptor(CourseFields, LicenseMixin, SequenceDescriptor):
         Returns True if the current time is after the specified course end date.
         Returns False if there is no end date specified.
         """
-        if self.end is None:
-            return False
-
-        return datetime.now(UTC()) > self.end
+        return course_has_ended(self.end)
 
     def may_certify(self):
         """
         Return True if it is acceptable to show the student a certificate download link
         """
-        show_early = self.certificates_display_behavior in ('early_with_info', 'early_no_info') or self.certificates_show_before_end
-        return show_early or self.has_ended()
+        return course_may_certify(
+            self.certificates_display_behavior,
+            self.certificates_show_before_end,
+            self.has_ended()
+        )
 
     def has_started(self):
         return datetime.now(UTC()) > self.start
@@ -1253,34 +1382,12 @@ class CourseDescriptor(CourseFields, LicenseMixin, SequenceDescriptor):
         # Make courses that have an announcement date shave a lower
         # score than courses than don't, older courses should have a
         # higher score.
-        announcement, start, now = self._sorting_dates()
-        scale = 300.0  # about a year
-        if announcement:
-            days = (now - announcement).days
-            score = -exp(-days / scale)
-        else:
-            days = (now - start).days
-            score = exp(days / scale)
-        return score
+        return course_sorting_score(self.start, self.advertised_start, self.announcement)
 
     def _sorting_dates(self):
         # utility function to get datetime objects for dates used to
         # compute the is_new flag and the sorting_score
-
-        announcement = self.announcement
-        if announcement is not None:
-            announcement = announcement
-
-        try:
-            start = dateutil.parser.parse(self.advertised_start)
-            if start.tzinfo is None:
-                start = start.replace(tzinfo=UTC())
-        except (ValueError, AttributeError):
-            start = self.start
-
-        now = datetime.now(UTC())
-
-        return announcement, start, now
+        return course_sorting_dates(self.start, self.advertised_start, self.announcement)
 
     @lazy
     def grading_context(self):
@@ -1361,36 +1468,13 @@ class CourseDescriptor(CourseFields, LicenseMixin, SequenceDescriptor):
         then falls back to .start
         """
         i18n = self.runtime.service(self, "i18n")
-        _ = i18n.ugettext
-        strftime = i18n.strftime
-
-        def try_parse_iso_8601(text):
-            try:
-                result = Date().from_json(text)
-                if result is None:
-                    result = text.title()
-                else:
-                    result = strftime(result, format_string)
-                    if format_string == "DATE_TIME":
-                        result = self._add_timezone_string(result)
-            except ValueError:
-                result = text.title()
-
-            return result
-
-        if isinstance(self.advertised_start, basestring):
-            return try_parse_iso_8601(self.advertised_start)
-        elif self.start_date_is_still_default:
-            # Translators: TBD stands for 'To Be Determined' and is used when a course
-            # does not yet have an announced start date.
-            return _('TBD')
-        else:
-            when = self.advertised_start or self.start
-
-            if format_string == "DATE_TIME":
-                return self._add_timezone_string(strftime(when, format_string))
-
-            return strftime(when, format_string)
+        return course_start_datetime_text(
+            self.start,
+            self.advertised_start,
+            format_string,
+            i18n.ugettext,
+            i18n.strftime
+        )
 
     @property
     def start_date_is_still_default(self):
@@ -1398,7 +1482,7 @@ class CourseDescriptor(CourseFields, LicenseMixin, SequenceDescriptor):
         Checks if the start date set for the course is still default, i.e. .start has not been modified,
         and .advertised_start has not been set.
         """
-        return self.advertised_start is None and self.start == CourseFields.start.default
+        return course_start_date_is_still_default(self.start, self.advertised_start)
 
     def end_datetime_text(self, format_string="SHORT_DATE"):
         """
@@ -1406,18 +1490,11 @@ class CourseDescriptor(CourseFields, LicenseMixin, SequenceDescriptor):
 
         If the course does not have an end date set (course.end is None), an empty string will be returned.
         """
-        if self.end is None:
-            return ''
-        else:
-            strftime = self.runtime.service(self, "i18n").strftime
-            date_time = strftime(self.end, format_string)
-            return date_time if format_string == "SHORT_DATE" else self._add_timezone_string(date_time)
-
-    def _add_timezone_string(self, date_time):
-        """
-        Adds 'UTC' string to the end of start/end date and time texts.
-        """
-        return date_time + u" UTC"
+        return course_end_datetime_text(
+            self.end,
+            format_string,
+            self.runtime.service(self, "i18n").strftime
+        )
 
     def get_discussion_blackout_datetimes(self):
         """
@@ -1499,9 +1576,7 @@ class CourseDescriptor(CourseFields, LicenseMixin, SequenceDescriptor):
         Returns a unique deterministic base32-encoded ID for the course.
         The optional padding_char parameter allows you to override the "=" character used for padding.
         """
-        return "course_{}".format(
-            b32encode(unicode(self.location.course_key)).replace('=', padding_char)
-        )
+        return clean_course_id(self.location.course_key, padding_char)
 
     @property
     def teams_enabled(self):
@@ -865,6 +865,14 @@ class ModuleStoreRead(ModuleStoreAssetBase):
         '''
         pass
 
+    def get_course_keys(self, **kwargs):
+        '''
+        Returns a list of the CourseKeys of the courses in this modulestore,
+        accepting the same optional 'org' filter as get_courses. Modulestores
+        that can list their courses without loading them should override this.
+        '''
+        return [course.id for course in self.get_courses(**kwargs)]
+
     @abstractmethod
     def get_course(self, course_id, depth=0, **kwargs):
         '''
@@ -1328,6 +1336,14 @@ class ModuleStoreWriteBase(ModuleStoreReadBase, ModuleStoreWrite):
             else:
                 signal_handler.send("library_updated", library_key=library_key)
 
+    def _emit_course_deleted_signal(self, course_key):
+        """
+        Helper method used to emit the course_deleted signal.
+        """
+        signal_handler = getattr(self, 'signal_handler', None)
+        if signal_handler:
+            signal_handler.send("course_deleted", course_key=course_key)
+
 
 def only_xmodules(identifier, entry_points):
     """Only use entry_points that are supplied by the xmodule package"""
@@ -82,10 +82,12 @@ class SignalHandler(object):
 
     """
     course_published = django.dispatch.Signal(providing_args=["course_key"])
+    course_deleted = django.dispatch.Signal(providing_args=["course_key"])
     library_updated = django.dispatch.Signal(providing_args=["library_key"])
 
     _mapping = {
         "course_published": course_published,
+        "course_deleted": course_deleted,
         "library_updated": library_updated
     }
 
@@ -147,6 +149,14 @@ def create_modulestore_instance(
     except InvalidCacheBackendError:
         metadata_inheritance_cache = get_cache('default')
 
+    # Course structures are too big for the default cache, so they are only
+    # shared between processes if a cache is configured for them
+    try:
+        course_structure_cache = get_cache('course_structure_cache')
+    except InvalidCacheBackendError:
+        course_structure_cache = None
+    _options.setdefault('structure_cache_size', getattr(settings, 'COURSE_STRUCTURE_CACHE_SIZE', 0))
+
     if issubclass(class_, MixedModuleStore):
         _options['create_modulestore_instance'] = create_modulestore_instance
 
@@ -164,6 +174,7 @@ def create_modulestore_instance(
     return class_(
         contentstore=content_store,
         metadata_inheritance_cache_subsystem=metadata_inheritance_cache,
+        course_structure_cache=course_structure_cache,
         request_cache=request_cache,
         xblock_mixins=getattr(settings, 'XBLOCK_MIXINS', ()),
         xblock_select=getattr(settings, 'XBLOCK_SELECT_FUNCTION', None),
@@ -280,6 +280,16 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
                     courses[course_id] = course
         return courses.values()
 
+    def get_course_keys(self, **kwargs):
+        '''
+        Returns a list containing the keys of the courses in this modulestore, without branch or version.
+        '''
+        course_keys = set()
+        for store in self.modulestores:
+            for course_key in store.get_course_keys(**kwargs):
+                course_keys.add(self._clean_locator_for_mapping(course_key))
+        return list(course_keys)
+
     @strip_key
     def get_libraries(self, **kwargs):
         """
@@ -15,7 +15,6 @@ structure:
 import pymongo
 import sys
 import logging
-import copy
 import re
 from uuid import uuid4
 
@@ -75,6 +74,12 @@ BLOCK_TYPES_WITH_CHILDREN = list(set(
 # at module level, cache one instance of OSFS per filesystem root.
 _OSFS_INSTANCE = {}
 
+# Values of the lock taken in the metadata_inheritance_cache_subsystem while a cached metadata
+# inheritance tree is updated, and the number of seconds after which the lock expires.
+METADATA_INHERITANCE_LOCKED = 'locked'
+METADATA_INHERITANCE_INVALIDATED = 'invalidated'
+METADATA_INHERITANCE_LOCK_TIMEOUT = 10
+
 _DETACHED_CATEGORIES = [name for name, __ in XBlock.load_tagged_classes("detached")]
 
 
@@ -526,6 +531,104 @@ class ParentLocationCache(dict):
             del self[key]
 
 
+class MetadataInheritanceTree(object):
+    """
+    The inheritable metadata of the blocks of a course, as cached by the MongoModuleStore.
+
+    Only the parent of each block and the inheritable metadata set on each container
+    are stored; the metadata a block inherits is merged from its ancestors when it's
+    looked up. This keeps the tree small, and lets an edit of a container be applied
+    by replacing that container's entries rather than recomputing the whole tree.
+
+    Lookups are keyed by the (published) url of a block, and return the metadata it
+    inherits along with its 'parent' url keyed by the branch the tree was computed for.
+    """
+    def __init__(self, branch=None, root=None):
+        self.branch = branch
+        self.root = root
+        # url of each block -> url of its parent
+        self.parents = {}
+        # url of each container -> the inheritable metadata set on it (if any)
+        self.metadata = {}
+
+    def __contains__(self, url):
+        return self.get(url) is not None
+
+    def __getitem__(self, url):
+        inherited = self.get(url)
+        if inherited is None:
+            raise KeyError(url)
+        return inherited
+
+    def keys(self):
+        return self.parents.keys()
+
+    def get(self, url, default=None):
+        """
+        Returns the metadata the block at `url` inherits, or `default` if the block
+        isn't in the course's tree (e.g. the root of the course, or an orphan).
+        """
+        parent_url = self.parents.get(url)
+        if parent_url is None:
+            return default
+
+        ancestors = [url, parent_url]
+        while True:
+            ancestor = self.parents.get(ancestors[-1])
+            if ancestor is None or ancestor in ancestors:
+                break
+            ancestors.append(ancestor)
+        if ancestors[-1] != self.root:
+            return default
+
+        inherited = {}
+        for ancestor in reversed(ancestors):
+            inherited.update(self.metadata.get(ancestor, {}))
+        # 'parent' is not part of inherited metadata, but CachingDescriptorSystem.load_item
+        # uses it to avoid looking up the parent of the block
+        inherited['parent'] = {self.branch: parent_url}
+        return inherited
+
+    def update(self, other):
+        """
+        Adds the entries of `other`, another tree of the same course, to this tree.
+        """
+        if other is self:
+            return
+        self.parents.update(other.parents)
+        self.metadata.update(other.metadata)
+        if other.root is not None:
+            self.branch = other.branch
+            self.root = other.root
+
+    def update_container(self, url, metadata, children):
+        """
+        Replaces the inheritable `metadata` and the `children` urls recorded for the
+        container at `url`. Returns whether the tree changed.
+        """
+        changed = False
+        if self.metadata.get(url, {}) != metadata:
+            if metadata:
+                self.metadata[url] = metadata
+            else:
+                del self.metadata[url]
+            changed = True
+
+        children = set(children)
+        removed_children = [
+            child for child, parent_url in self.parents.iteritems()
+            if parent_url == url and child not in children
+        ]
+        for child in removed_children:
+            del self.parents[child]
+            changed = True
+        for child in children:
+            if self.parents.get(child) != url:
+                self.parents[child] = url
+                changed = True
+        return changed
+
+
 class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, MongoBulkOpsMixin):
     """
     A Mongodb backed ModuleStore
@@ -727,92 +830,151 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
             if location.category == 'course':
                 root = location_url
 
-        # now traverse the tree and compute down the inherited metadata
-        metadata_to_inherit = {}
+        # now walk down the tree from the root, recording the parent of each block and the metadata of each
+        # container. Remember results will not contain leaf nodes
+        tree = MetadataInheritanceTree(self.get_branch_setting(), root)
+        if root is not None:
+            visited = set([root])
+            stack = [root]
+            while stack:
+                url = stack.pop()
+                metadata = results_by_url[url].get('metadata')
+                if metadata:
+                    tree.metadata[url] = metadata
+                for child in results_by_url[url].get('definition', {}).get('children', []):
+                    tree.parents[child] = url
+                    if child in results_by_url and child not in visited:
+                        visited.add(child)
+                        stack.append(child)
 
-        def _compute_inherited_metadata(url):
-            """
-            Helper method for computing inherited metadata for a specific location url
-            """
-            my_metadata = results_by_url[url].get('metadata', {})
-
-            # go through all the children and recurse, but only if we have
-            # in the result set. Remember results will not contain leaf nodes
-            for child in results_by_url[url].get('definition', {}).get('children', []):
-                if child in results_by_url:
-                    new_child_metadata = copy.deepcopy(my_metadata)
-                    new_child_metadata.update(results_by_url[child].get('metadata', {}))
-                    results_by_url[child]['metadata'] = new_child_metadata
-                    metadata_to_inherit[child] = new_child_metadata
-                    _compute_inherited_metadata(child)
-                else:
-                    # this is likely a leaf node, so let's record what metadata we need to inherit
-                    metadata_to_inherit[child] = my_metadata.copy()
-                # WARNING: 'parent' is not part of inherited metadata, but
-                # we're piggybacking on this recursive traversal to grab
-                # and cache the child's parent, as a performance optimization.
-                # The 'parent' key will be popped out of the dictionary during
-                # CachingDescriptorSystem.load_item
-                metadata_to_inherit[child].setdefault('parent', {})[self.get_branch_setting()] = url
+        return tree
 
-        if root is not None:
-            _compute_inherited_metadata(root)
+    def _metadata_inheritance_cache_key(self, course_id):
+        """
+        Returns the key of the metadata inheritance tree of the course in the caching subsystem.
+        """
+        return u'metadata_inheritance_tree.{}'.format(course_id)
 
-        return metadata_to_inherit
+    def _get_stored_metadata_inheritance_tree(self, course_id):
+        """
+        Returns the metadata inheritance tree of the course from the request cache or the caching
+        subsystem (e.g. memcached), or None if neither has it.
+        """
+        # see if we are first in the request cache (if present)
+        if self.request_cache is not None and unicode(course_id) in self.request_cache.data.get('metadata_inheritance', {}):
+            return self.request_cache.data['metadata_inheritance'][unicode(course_id)]
+
+        tree = None
+        # then look in any caching subsystem (e.g. memcached)
+        if self.metadata_inheritance_cache_subsystem is not None:
+            tree = self.metadata_inheritance_cache_subsystem.get(self._metadata_inheritance_cache_key(course_id))
+        else:
+            logging.warning(
+                'Running MongoModuleStore without a metadata_inheritance_cache_subsystem. This is \
+                OK in localdev and testing environment. Not OK in production.'
+            )
+
+        # after a memcache hit, put it into the request_cache
+        if tree is not None:
+            self._store_metadata_inheritance_tree(course_id, tree, in_subsystem=False)
+        return tree
+
+    def _store_metadata_inheritance_tree(self, course_id, tree, in_subsystem=True):
+        """
+        Stores the metadata inheritance tree of the course in the request cache, and in the caching subsystem
+        (e.g. memcached) unless `in_subsystem` is False.
+        """
+        if in_subsystem and self.metadata_inheritance_cache_subsystem is not None:
+            self.metadata_inheritance_cache_subsystem.set(self._metadata_inheritance_cache_key(course_id), tree)
+
+        if self.request_cache is not None:
+            # we can't assume the 'metadata_inheritance' part of the request cache dict has been
+            # defined
+            self.request_cache.data.setdefault('metadata_inheritance', {})[unicode(course_id)] = tree
 
     def _get_cached_metadata_inheritance_tree(self, course_id, force_refresh=False):
         '''
         Compute the metadata inheritance for the course.
         '''
-        tree = {}
-
         course_id = self.fill_in_run(course_id)
+        tree = None
         if not force_refresh:
-            # see if we are first in the request cache (if present)
-            if self.request_cache is not None and unicode(course_id) in self.request_cache.data.get('metadata_inheritance', {}):
-                return self.request_cache.data['metadata_inheritance'][unicode(course_id)]
+            tree = self._get_stored_metadata_inheritance_tree(course_id)
 
-            # then look in any caching subsystem (e.g. memcached)
-            if self.metadata_inheritance_cache_subsystem is not None:
-                tree = self.metadata_inheritance_cache_subsystem.get(unicode(course_id), {})
-            else:
-                logging.warning(
-                    'Running MongoModuleStore without a metadata_inheritance_cache_subsystem. This is \
-                    OK in localdev and testing environment. Not OK in production.'
-                )
-
-        if not tree:
-            # if not in subsystem, or we are on force refresh, then we have to compute
+        if tree is None:
+            # if not cached, or we are on force refresh, then we have to compute
             tree = self._compute_metadata_inheritance_tree(course_id)
+            self._store_metadata_inheritance_tree(course_id, tree)
 
-            # now write out computed tree to caching subsystem (e.g. memcached), if available
-            if self.metadata_inheritance_cache_subsystem is not None:
-                self.metadata_inheritance_cache_subsystem.set(unicode(course_id), tree)
+        return tree
 
-        # now populate a request_cache, if available. NOTE, we are outside of the
-        # scope of the above if: statement so that after a memcache hit, it'll get
-        # put into the request_cache
-        if self.request_cache is not None:
-            # we can't assume the 'metadatat_inheritance' part of the request cache dict has been
-            # defined
-            if 'metadata_inheritance' not in self.request_cache.data:
-                self.request_cache.data['metadata_inheritance'] = {}
-            self.request_cache.data['metadata_inheritance'][unicode(course_id)] = tree
+    def _update_cached_metadata_inheritance_tree(self, course_id, xblock):
+        """
+        Applies the update of `xblock` to the cached metadata inheritance tree of the course.
 
-        return tree
+        Only the entries of `xblock` itself change, if it's a container: its descendants get
+        the metadata they inherit from the tree's entries of their ancestors when they're looked up.
+
+        The tree is read from the caching subsystem rather than the request cache, and updated
+        while holding a lock there, so that concurrent updates of the course don't overwrite each
+        other's entries. If the lock is held, the cached tree is invalidated instead.
+        Returns the updated tree, or None if the caller must recompute the whole tree.
+        """
+        cache = self.metadata_inheritance_cache_subsystem
+        if cache is None:
+            return None
+
+        course_id = self.fill_in_run(course_id)
+        cache_key = self._metadata_inheritance_cache_key(course_id)
+        lock_key = u'{}.lock'.format(cache_key)
+        if not cache.add(lock_key, METADATA_INHERITANCE_LOCKED, METADATA_INHERITANCE_LOCK_TIMEOUT):
+            # Tell the holder of the lock not to store its tree, which lacks this update.
+            cache.set(lock_key, METADATA_INHERITANCE_INVALIDATED, METADATA_INHERITANCE_LOCK_TIMEOUT)
+            cache.delete(cache_key)
+            return None
+
+        try:
+            tree = cache.get(cache_key)
+            if tree is None or tree.branch != self.get_branch_setting():
+                return None
 
-    def refresh_cached_metadata_inheritance_tree(self, course_id, runtime=None):
+            changed = False
+            if xblock.has_children:
+                metadata = {
+                    field_name: value
+                    for field_name, value in self._serialize_scope(xblock, Scope.settings).iteritems()
+                    if field_name in InheritanceMixin.fields
+                }
+                children = self._serialize_scope(xblock, Scope.children).get('children', [])
+                changed = tree.update_container(unicode(as_published(xblock.location)), metadata, children)
+
+            if changed and cache.get(lock_key) == METADATA_INHERITANCE_INVALIDATED:
+                cache.delete(cache_key)
+                return None
+            self._store_metadata_inheritance_tree(course_id, tree, in_subsystem=changed)
+            return tree
+        finally:
+            cache.delete(lock_key)
+
+    def refresh_cached_metadata_inheritance_tree(self, course_id, runtime=None, updated_xblock=None):
         """
         Refresh the cached metadata inheritance tree for the org/course combination
         for location
 
         If given a runtime, it replaces the cached_metadata in that runtime. NOTE: failure to provide
         a runtime may mean that some objects report old values for inherited data.
+
+        If given the xblock whose update requires the refresh, only its entries are updated in the
+        cached tree rather than recomputing the whole tree, when a tree is cached.
         """
         course_id = course_id.for_branch(None)
         if not self._is_in_bulk_operation(course_id):
-            # below is done for side effects when runtime is None
-            cached_metadata = self._get_cached_metadata_inheritance_tree(course_id, force_refresh=True)
+            cached_metadata = None
+            if updated_xblock is not None:
+                cached_metadata = self._update_cached_metadata_inheritance_tree(course_id, updated_xblock)
+            if cached_metadata is None:
+                # below is done for side effects when runtime is None
+                cached_metadata = self._get_cached_metadata_inheritance_tree(course_id, force_refresh=True)
             if runtime:
                 runtime.cached_metadata = cached_metadata
 
@@ -905,7 +1067,7 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
         root = self.fs_root / data_dir
         resource_fs = _OSFS_INSTANCE.setdefault(root, OSFS(root, create=True))
 
-        cached_metadata = {}
+        cached_metadata = MetadataInheritanceTree()
         if apply_cached_metadata:
             cached_metadata = self._get_cached_metadata_inheritance_tree(course_key)
 
@@ -975,34 +1137,41 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
             not (category == 'course' and depth == 0)
         return apply_cached_metadata
 
+    def _find_course_records(self, fields=None, **kwargs):
+        """
+        Returns the course records in this modulestore, restricted to the given
+        `fields` if any. This accepts an optional parameter of 'org' which
+        will apply an efficient filter to only get courses with the specified ORG
+        """
+        query = {'_id.category': 'course'}
+        course_org_filter = kwargs.get('org')
+        if course_org_filter:
+            query['_id.org'] = course_org_filter
+
+        return [
+            course
+            # I tried to add '$and': [{'_id.org': {'$ne': 'edx'}}, {'_id.course': {'$ne': 'templates'}}]
+            # but it didn't do the right thing (it filtered all edx and all templates out)
+            for course in self.collection.find(query, fields)
+            if not (  # TODO kill this
+                course['_id']['org'] == 'edx' and
+                course['_id']['course'] == 'templates'
+            )
+        ]
+
     @autoretry_read()
     def get_courses(self, **kwargs):
         '''
         Returns a list of course descriptors. This accepts an optional parameter of 'org' which
         will apply an efficient filter to only get courses with the specified ORG
         '''
-
-        course_org_filter = kwargs.get('org')
-
-        if course_org_filter:
-            course_records = self.collection.find({'_id.category': 'course', '_id.org': course_org_filter})
-        else:
-            course_records = self.collection.find({'_id.category': 'course'})
-
         base_list = sum(
             [
                 self._load_items(
                     SlashSeparatedCourseKey(course['_id']['org'], course['_id']['course'], course['_id']['name']),
                     [course]
                 )
-                for course
-                # I tried to add '$and': [{'_id.org': {'$ne': 'edx'}}, {'_id.course': {'$ne': 'templates'}}]
-                # but it didn't do the right thing (it filtered all edx and all templates out)
-                in course_records
-                if not (  # TODO kill this
-                    course['_id']['org'] == 'edx' and
-                    course['_id']['course'] == 'templates'
-                )
+                for course in self._find_course_records(**kwargs)
             ],
             []
         )
@@ -1278,7 +1447,7 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
                 resources_fs=None,
                 error_tracker=self.error_tracker,
                 render_template=self.render_template,
-                cached_metadata={},
+                cached_metadata=MetadataInheritanceTree(),
                 mixins=self.xblock_mixins,
                 select=self.xblock_select,
                 services=services,
@@ -1462,8 +1631,10 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
             # update the edit info of the instantiated xblock
             xblock._edit_info = payload['edit_info']
 
-            # recompute (and update) the metadata inheritance tree which is cached
-            self.refresh_cached_metadata_inheritance_tree(xblock.scope_ids.usage_id.course_key, xblock.runtime)
+            # update the metadata inheritance tree which is cached
+            self.refresh_cached_metadata_inheritance_tree(
+                xblock.scope_ids.usage_id.course_key, xblock.runtime, updated_xblock=xblock
+            )
             # fire signal that we've written to DB
         except ItemNotFoundError:
             if not allow_not_found:
@@ -1653,6 +1824,17 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
         item_locs -= all_reachable
         return [course_key.make_usage_key_from_deprecated_string(item_loc) for item_loc in item_locs]
 
+    @autoretry_read()
+    def get_course_keys(self, **kwargs):
+        """
+        Returns the keys of the courses in this modulestore without loading the
+        courses. Accepts the same 'org' filter as get_courses.
+        """
+        return [
+            SlashSeparatedCourseKey(course['_id']['org'], course['_id']['course'], course['_id']['name'])
+            for course in self._find_course_records({'_id': True}, **kwargs)
+        ]
+
     def get_courses_for_wiki(self, wiki_slug, **kwargs):
         """
         Return the list of courses which use this wiki_slug
@@ -6,7 +6,7 @@ from .exceptions import (ItemNotFoundError, NoPathToItem)
 LOGGER = getLogger(__name__)
 
 
-def path_to_location(modulestore, usage_key):
+def path_to_location(modulestore, usage_key, get_navigation_path=None):
     '''
     Try to find a course_id/chapter/section[/position] path to location in
     modulestore.  The courseware insists that the first level in the course is
@@ -15,6 +15,9 @@ def path_to_location(modulestore, usage_key):
     Args:
         modulestore: which store holds the relevant objects
         usage_key: :class:`UsageKey` the id of the location to which to generate the path
+        get_navigation_path: optional function returning the precomputed
+            (chapter, section, position) of a usage key, or None if it has none,
+            in which case the path is found in the modulestore
 
     Raises
         ItemNotFoundError if the location doesn't exist.
@@ -28,6 +31,10 @@ def path_to_location(modulestore, usage_key):
     If the section is a sequential or vertical, position will be the children index
     of this location under that sequence.
     '''
+    if get_navigation_path is not None:
+        navigation_path = get_navigation_path(usage_key)
+        if navigation_path is not None:
+            return (usage_key.course_key,) + tuple(navigation_path)
 
     def flatten(xs):
         '''Convert lisp-style (a, (b, (c, ()))) list into a python list.
@@ -1,11 +1,13 @@
 """
 Segregation of pymongo functions from the data modeling mechanisms for split modulestore.
 """
+import cPickle as pickle
 import datetime
 import math
 import pymongo
 import pytz
 import re
+import zlib
 from contextlib import contextmanager
 from time import time
 
@@ -14,6 +16,7 @@ from pymongo.errors import DuplicateKeyError  # pylint: disable=unused-import
 
 from contracts import check, new_contract
 from mongodb_proxy import autoretry_read, MongoProxy
+from lru_cache import LRUCache
 from xmodule.exceptions import HeartbeatFailure
 from xmodule.modulestore import BlockData
 from xmodule.modulestore.split_mongo import BlockKey
@@ -203,16 +206,110 @@ def structure_to_mongo(structure, course_context=None):
         return new_structure
 
 
+class CourseStructureCache(object):
+    """
+    A cache of structures, which are immutable once written and so never
+    need to be invalidated.
+
+    Structures are pickled and compressed when cached. They are kept in a
+    process-local LRU cache of at most `local_cache_size` bytes, backed by the
+    `shared_cache` when one is given, so that processes can share them. Every `get` returns a new copy of the structure,
+    which callers are free to modify.
+    """
+    def __init__(self, namespace, local_cache_size=0, shared_cache=None):
+        """
+        Arguments:
+            namespace: A prefix for the cache keys, identifying the
+                collection the structures come from.
+            local_cache_size: The maximum total size of the (compressed)
+                structures to keep in this process, in bytes. 0 disables the
+                local cache.
+            shared_cache: The cache (with django's cache API) to share the
+                structures through, if any.
+        """
+        self.namespace = namespace
+        self._local_cache = LRUCache(local_cache_size, get_size=len)
+        self.shared_cache = shared_cache
+
+    @property
+    def local_cache_size(self):
+        """
+        The maximum total size of the structures kept in this process, in bytes.
+        """
+        return self._local_cache.max_size
+
+    @local_cache_size.setter
+    def local_cache_size(self, size):  # pylint: disable=missing-docstring
+        self._local_cache.max_size = size
+
+    def _cache_key(self, key):
+        """
+        Return the key under which to cache the structure with id `key`.
+        """
+        return u'{}:{}'.format(self.namespace, key)
+
+    def get(self, key, course_context=None):
+        """
+        Return the structure with id `key`, or None if it isn't cached.
+        """
+        with TIMER.timer("CourseStructureCache.get", course_context) as tagger:
+            cache_key = self._cache_key(key)
+            data = self._local_cache.get(cache_key)
+            tagger.tag(from_local_cache=str(data is not None).lower())
+
+            if data is None and self.shared_cache is not None:
+                data = self.shared_cache.get(cache_key)
+                tagger.tag(from_shared_cache=str(data is not None).lower())
+                if data is not None:
+                    self._local_cache.set(cache_key, data)
+
+            if data is None:
+                return None
+
+            tagger.measure('compressed_size', len(data))
+            return pickle.loads(zlib.decompress(data))
+
+    def set(self, key, structure, course_context=None):
+        """
+        Cache `structure` under its id `key`.
+        """
+        with TIMER.timer("CourseStructureCache.set", course_context) as tagger:
+            pickled_data = pickle.dumps(structure, pickle.HIGHEST_PROTOCOL)
+            tagger.measure('uncompressed_size', len(pickled_data))
+
+            # 1 = fastest compression, with slightly larger results.
+            data = zlib.compress(pickled_data, 1)
+            tagger.measure('compressed_size', len(data))
+
+            cache_key = self._cache_key(key)
+            self._local_cache.set(cache_key, data)
+            if self.shared_cache is not None:
+                # Structures are immutable, so the cache's TIMEOUT can be as
+                # long as its backend allows.
+                self.shared_cache.set(cache_key, data)
+
+    def clear(self):
+        """
+        Empty the local cache.
+        """
+        self._local_cache.clear()
+
+
 class MongoConnection(object):
     """
     Segregation of pymongo functions from the data modeling mechanisms for split modulestore.
     """
     def __init__(
         self, db, collection, host, port=27017, tz_aware=True, user=None, password=None,
-        asset_collection=None, retry_wait_time=0.1, **kwargs
+        asset_collection=None, retry_wait_time=0.1, structure_cache_size=0, shared_structure_cache=None,
+        **kwargs
     ):
         """
         Create & open the connection, authenticate, and provide pointers to the collections
+
+        Structures are looked up in a :class:`CourseStructureCache` before the
+        database; `structure_cache_size` is the size of its local cache, in bytes,
+        and `shared_structure_cache` the cache it shares structures through.
         """
         if kwargs.get('replicaSet') is None:
             kwargs.pop('replicaSet', None)
@@ -245,6 +342,10 @@ class MongoConnection(object):
         self.structures.write_concern = {'w': 1}
         self.definitions.write_concern = {'w': 1}
 
+        self.structure_cache = CourseStructureCache(
+            u'{}.{}'.format(db, collection), structure_cache_size, shared_structure_cache
+        )
+
     def heartbeat(self):
         """
         Check that the db is reachable.
@@ -259,12 +360,17 @@ class MongoConnection(object):
         Get the structure from the persistence mechanism whose id is the given key
         """
         with TIMER.timer("get_structure", course_context) as tagger_get_structure:
-            with TIMER.timer("get_structure.find_one", course_context) as tagger_find_one:
-                doc = self.structures.find_one({'_id': key})
-                tagger_find_one.measure("blocks", len(doc['blocks']))
-            tagger_get_structure.measure("blocks", len(doc['blocks']))
-
-            return structure_from_mongo(doc, course_context)
+            structure = self.structure_cache.get(key, course_context)
+            tagger_get_structure.tag(from_cache=str(structure is not None).lower())
+            if structure is None:
+                with TIMER.timer("get_structure.find_one", course_context) as tagger_find_one:
+                    doc = self.structures.find_one({'_id': key})
+                    tagger_find_one.measure("blocks", len(doc['blocks']))
+                structure = structure_from_mongo(doc, course_context)
+                self.structure_cache.set(key, structure, course_context)
+            tagger_get_structure.measure("blocks", len(structure['blocks']))
+
+            return structure
 
     @autoretry_read()
     def find_structures_by_id(self, ids, course_context=None):
@@ -276,10 +382,21 @@ class MongoConnection(object):
         """
         with TIMER.timer("find_structures_by_id", course_context) as tagger:
             tagger.measure("requested_ids", len(ids))
-            docs = [
-                structure_from_mongo(structure, course_context)
-                for structure in self.structures.find({'_id': {'$in': ids}})
-            ]
+            docs = []
+            missing_ids = []
+            for structure_id in ids:
+                structure = self.structure_cache.get(structure_id, course_context)
+                if structure is None:
+                    missing_ids.append(structure_id)
+                else:
+                    docs.append(structure)
+            tagger.measure("cached_structures", len(docs))
+
+            if missing_ids:
+                for doc in self.structures.find({'_id': {'$in': missing_ids}}):
+                    structure = structure_from_mongo(doc, course_context)
+                    self.structure_cache.set(structure['_id'], structure, course_context)
+                    docs.append(structure)
             tagger.measure("structures", len(docs))
             return docs
 
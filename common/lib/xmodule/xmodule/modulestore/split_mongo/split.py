@@ -640,14 +640,21 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
                  default_class=None,
                  error_tracker=null_error_tracker,
                  i18n_service=None, fs_service=None, user_service=None,
-                 services=None, signal_handler=None, **kwargs):
+                 services=None, signal_handler=None, structure_cache_size=0, course_structure_cache=None,
+                 **kwargs):
         """
         :param doc_store_config: must have a host, db, and collection entries. Other common entries: port, tz_aware.
+        :param structure_cache_size: the size, in bytes, of the in process cache of structures.
+        :param course_structure_cache: the cache shared between processes to keep structures in, if any.
         """
 
         super(SplitMongoModuleStore, self).__init__(contentstore, **kwargs)
 
-        self.db_connection = MongoConnection(**doc_store_config)
+        self.db_connection = MongoConnection(
+            structure_cache_size=structure_cache_size,
+            shared_structure_cache=course_structure_cache,
+            **doc_store_config
+        )
         self.db = self.db_connection.database
 
         if default_class is not None:
@@ -697,6 +704,7 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         connection = self.db.connection
         connection.drop_database(self.db.name)
         connection.close()
+        self.db_connection.structure_cache.clear()
 
     def cache_items(self, system, base_block_ids, course_key, depth=0, lazy=True):
         """
@@ -931,6 +939,18 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         # get the blocks for each course index (s/b the root)
         return self._get_structures_for_branch_and_locator(branch, self._create_course_locator, **kwargs)
 
+    def get_course_keys(self, branch, **kwargs):
+        """
+        Returns the keys of the courses that have the given branch, reading
+        only their course indexes. Accepts the same 'org' filter as get_courses.
+
+        :param branch: the branch for which to return course keys.
+        """
+        return [
+            self._create_course_locator(course_index, branch=None)
+            for course_index in self.find_matching_course_indexes(branch, org_target=kwargs.get('org'))
+        ]
+
     def get_libraries(self, branch="library", **kwargs):
         """
         Returns a list of "library" root blocks matching any given qualifiers.
@@ -2431,6 +2451,7 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         # this is the only real delete in the system. should it do something else?
         log.info(u"deleting course from split-mongo: %s", course_key)
         self.delete_course_index(course_key)
+        self._emit_course_deleted_signal(course_key)
 
         # We do NOT call the super class here since we need to keep the assets
         # in case the course is later restored.
@@ -74,18 +74,31 @@ class DraftVersioningModuleStore(SplitMongoModuleStore, ModuleStoreDraftAndPubli
             source_course_id, dest_course_id, user_id, fields=fields, **kwargs
         )
 
-    def get_courses(self, **kwargs):
+    def _get_listing_branch(self):
         """
-        Returns all the courses on the Draft or Published branch depending on the branch setting.
+        Returns the name of the branch whose courses get_courses and
+        get_course_keys list, depending on the branch setting.
         """
         branch_setting = self.get_branch_setting()
         if branch_setting == ModuleStoreEnum.Branch.draft_preferred:
-            return super(DraftVersioningModuleStore, self).get_courses(ModuleStoreEnum.BranchName.draft, **kwargs)
+            return ModuleStoreEnum.BranchName.draft
         elif branch_setting == ModuleStoreEnum.Branch.published_only:
-            return super(DraftVersioningModuleStore, self).get_courses(ModuleStoreEnum.BranchName.published, **kwargs)
+            return ModuleStoreEnum.BranchName.published
         else:
             raise InsufficientSpecificationError()
 
+    def get_courses(self, **kwargs):
+        """
+        Returns all the courses on the Draft or Published branch depending on the branch setting.
+        """
+        return super(DraftVersioningModuleStore, self).get_courses(self._get_listing_branch(), **kwargs)
+
+    def get_course_keys(self, **kwargs):
+        """
+        Returns the keys of all the courses on the Draft or Published branch depending on the branch setting.
+        """
+        return super(DraftVersioningModuleStore, self).get_course_keys(self._get_listing_branch(), **kwargs)
+
     def _auto_publish_no_children(self, location, category, user_id, **kwargs):
         """
         Publishes item if the category is DIRECT_ONLY. This assumes another method has checked that
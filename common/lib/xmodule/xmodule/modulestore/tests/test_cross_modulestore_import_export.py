@@ -68,16 +68,40 @@ class MemoryCache(object):
         """
         return self._data.get(key, default)
 
-    def set(self, key, value):
+    def set(self, key, value, timeout=None):  # pylint: disable=unused-argument
         """
         Set a key in the cache.
 
         Args:
             key: The key to update.
             value: The value change the key to.
+            timeout: Ignored.
         """
         self._data[key] = value
 
+    def add(self, key, value, timeout=None):  # pylint: disable=unused-argument
+        """
+        Set a key in the cache, unless it has been set already. Returns whether the key was set.
+
+        Args:
+            key: The key to add.
+            value: The value to set the key to.
+            timeout: Ignored.
+        """
+        if key in self._data:
+            return False
+        self._data[key] = value
+        return True
+
+    def delete(self, key):
+        """
+        Remove a key from the cache, if it's there.
+
+        Args:
+            key: The key to remove.
+        """
+        self._data.pop(key, None)
+
 
 class MongoContentstoreBuilder(object):
     """
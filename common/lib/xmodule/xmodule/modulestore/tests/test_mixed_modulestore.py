@@ -858,6 +858,18 @@ class TestMixedModuleStore(CommonMixedModuleStoreSetup):
             published_courses = self.store.get_courses(remove_branch=True)
         self.assertEquals([c.id for c in draft_courses], [c.id for c in published_courses])
 
+    @ddt.data('draft', 'split')
+    def test_get_course_keys(self, default_ms):
+        self.initdb(default_ms)
+        self.assertItemsEqual(
+            self.store.get_course_keys(),
+            [course.id for course in self.store.get_courses(remove_branch=True)]
+        )
+        self.assertItemsEqual(
+            self.store.get_course_keys(org=self.course_locations[self.MONGO_COURSEID].org),
+            [self.course_locations[self.MONGO_COURSEID].course_key.replace(branch=None)]
+        )
+
     @ddt.data('draft', 'split')
     def test_create_child_detached_tabs(self, default_ms):
         """
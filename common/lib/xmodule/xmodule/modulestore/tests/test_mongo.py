@@ -43,6 +43,7 @@ from xmodule.x_module import XModuleMixin
 from xmodule.modulestore.mongo.base import as_draft
 from xmodule.modulestore.tests.mongo_connection import MONGO_PORT_NUM, MONGO_HOST
 from xmodule.modulestore.tests.utils import LocationMixin, mock_tab_from_json
+from xmodule.modulestore.tests.test_cross_modulestore_import_export import MemoryCache
 from xmodule.modulestore.edit_info import EditInfoMixin
 from xmodule.modulestore.exceptions import ItemNotFoundError
 from xmodule.modulestore.inheritance import InheritanceMixin
@@ -767,6 +768,54 @@ class TestMongoModuleStore(TestMongoModuleStoreBase):
         # Clean up the data so we don't break other tests which apparently expect a particular state
         self.draft_store.delete_course(course.id, self.dummy_user)
 
+    def test_metadata_inheritance_tree_updated_incrementally(self):
+        """
+        Updating a container applies its inheritable metadata to the cached metadata
+        inheritance tree without recomputing the tree.
+        """
+        course = self.draft_store.create_course("TestX", "InheritanceTest", "2015_T1", self.dummy_user)
+        chapter = self.draft_store.create_child(self.dummy_user, course.location, "chapter")
+        sequential = self.draft_store.create_child(self.dummy_user, chapter.location, "sequential")
+        problem = self.draft_store.create_child(self.dummy_user, sequential.location, "problem")
+
+        with patch.object(self.draft_store, 'metadata_inheritance_cache_subsystem', MemoryCache()):
+            # computes and caches the tree
+            self.assertFalse(self.draft_store.get_item(problem.location).visible_to_staff_only)
+
+            chapter = self.draft_store.get_item(chapter.location)
+            chapter.visible_to_staff_only = True
+            with patch.object(self.draft_store, '_compute_metadata_inheritance_tree') as mock_compute:
+                self.draft_store.update_item(chapter, self.dummy_user)
+                self.assertTrue(self.draft_store.get_item(problem.location).visible_to_staff_only)
+            self.assertFalse(mock_compute.called)
+
+        self.draft_store.delete_course(course.id, self.dummy_user)
+
+    def test_metadata_inheritance_tree_recomputed_when_locked(self):
+        """
+        If another process is updating the cached metadata inheritance tree, updating a
+        container invalidates the cached tree and recomputes it instead.
+        """
+        course = self.draft_store.create_course("TestX", "InheritanceLockTest", "2015_T1", self.dummy_user)
+        chapter = self.draft_store.create_child(self.dummy_user, course.location, "chapter")
+        problem = self.draft_store.create_child(self.dummy_user, chapter.location, "problem")
+
+        cache = MemoryCache()
+        with patch.object(self.draft_store, 'metadata_inheritance_cache_subsystem', cache):
+            self.assertFalse(self.draft_store.get_item(problem.location).visible_to_staff_only)
+            cache_key = self.draft_store._metadata_inheritance_cache_key(  # pylint: disable=protected-access
+                self.draft_store.fill_in_run(course.id)
+            )
+            cache.add(u'{}.lock'.format(cache_key), 'locked')
+
+            chapter = self.draft_store.get_item(chapter.location)
+            chapter.visible_to_staff_only = True
+            self.draft_store.update_item(chapter, self.dummy_user)
+            self.assertEqual(cache.get(u'{}.lock'.format(cache_key)), 'invalidated')
+            self.assertTrue(self.draft_store.get_item(problem.location).visible_to_staff_only)
+
+        self.draft_store.delete_course(course.id, self.dummy_user)
+
 
 class TestMongoModuleStoreWithNoAssetCollection(TestMongoModuleStore):
     '''
@@ -0,0 +1,119 @@
+"""
+Tests for the cache of split modulestore structures.
+"""
+import unittest
+
+from bson.objectid import ObjectId
+
+from xmodule.modulestore import BlockData
+from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.mongo_connection import CourseStructureCache
+
+
+class DictCache(object):
+    """
+    A minimal stand-in for a django cache.
+    """
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        """ Expected method on a django cache. """
+        return self.data.get(key)
+
+    def set(self, key, value):
+        """ Expected method on a django cache. """
+        self.data[key] = value
+
+
+def make_structure(num_blocks=1):
+    """
+    Return a structure with `num_blocks` html blocks.
+    """
+    structure_id = ObjectId()
+    blocks = {
+        BlockKey('html', 'block{}'.format(index)): BlockData(
+            block_type='html',
+            fields={'display_name': 'Block {}'.format(index)},
+            definition=ObjectId(),
+            edit_info={'update_version': structure_id},
+        )
+        for index in range(num_blocks)
+    }
+    return {'_id': structure_id, 'root': BlockKey('html', 'block0'), 'blocks': blocks}
+
+
+class TestCourseStructureCache(unittest.TestCase):
+    """
+    Tests for CourseStructureCache.
+    """
+    def setUp(self):
+        super(TestCourseStructureCache, self).setUp()
+        self.shared_cache = DictCache()
+
+    def assertSameStructure(self, structure, cached_structure):
+        """
+        Check that `cached_structure` is a copy of `structure`.
+        """
+        self.assertIsNot(structure, cached_structure)
+        self.assertEqual(structure['_id'], cached_structure['_id'])
+        self.assertEqual(structure['root'], cached_structure['root'])
+        self.assertEqual(
+            {key: block.to_storable() for key, block in structure['blocks'].iteritems()},
+            {key: block.to_storable() for key, block in cached_structure['blocks'].iteritems()},
+        )
+
+    def test_get_set(self):
+        cache = CourseStructureCache('db.collection', 1024 * 1024, self.shared_cache)
+        structure = make_structure(3)
+        self.assertIsNone(cache.get(structure['_id']))
+
+        cache.set(structure['_id'], structure)
+        cached_structure = cache.get(structure['_id'])
+        self.assertSameStructure(structure, cached_structure)
+
+        # Callers may modify what they get without affecting the cache.
+        cached_structure['blocks'].clear()
+        self.assertSameStructure(structure, cache.get(structure['_id']))
+
+    def test_shared_cache(self):
+        structure = make_structure()
+        CourseStructureCache('db.collection', 1024 * 1024, self.shared_cache).set(structure['_id'], structure)
+
+        # Another process, without a local cache.
+        other_cache = CourseStructureCache('db.collection', shared_cache=self.shared_cache)
+        self.assertSameStructure(structure, other_cache.get(structure['_id']))
+        # The namespace is part of the key.
+        other_collection_cache = CourseStructureCache('db.other_collection', shared_cache=self.shared_cache)
+        self.assertIsNone(other_collection_cache.get(structure['_id']))
+
+    def test_no_shared_cache(self):
+        structure = make_structure()
+        cache = CourseStructureCache('db.collection')
+        cache.set(structure['_id'], structure)
+        self.assertIsNone(cache.get(structure['_id']))
+        self.assertEqual(self.shared_cache.data, {})
+
+    def test_local_cache_eviction(self):
+        structures = [make_structure(10) for __ in range(3)]
+        cache = CourseStructureCache('db.collection', local_cache_size=1)
+        cache.set(structures[0]['_id'], structures[0])
+        # Too big to be cached locally.
+        self.assertIsNone(cache.get(structures[0]['_id']))
+
+        cache.local_cache_size = 1024 * 1024
+        cache.set(structures[0]['_id'], structures[0])
+        size = cache._local_cache.size  # pylint: disable=protected-access
+        cache.local_cache_size = size * 5 / 2
+
+        cache.set(structures[1]['_id'], structures[1])
+        # Use the first structure, so the second one is the least recently used.
+        self.assertIsNotNone(cache.get(structures[0]['_id']))
+        cache.set(structures[2]['_id'], structures[2])
+
+        self.assertIsNotNone(cache.get(structures[0]['_id']))
+        self.assertIsNone(cache.get(structures[1]['_id']))
+        self.assertIsNotNone(cache.get(structures[2]['_id']))
+
+        cache.clear()
+        self.assertIsNone(cache.get(structures[0]['_id']))
@@ -399,7 +399,10 @@ class XMLModuleStore(ModuleStoreReadBase):
         errorlog = make_error_tracker()
         course_descriptor = None
         try:
-            course_descriptor = self.load_course(course_dir, course_ids, errorlog.tracker, target_course_id)
+            # Loading the XML courses is most of the startup time of the processes which
+            # use them, so keep track of which courses take long to load
+            with dog_stats_api.timer('xmlmodulestore.load_course', tags=[u'course_dir:{}'.format(course_dir)]):
+                course_descriptor = self.load_course(course_dir, course_ids, errorlog.tracker, target_course_id)
         except Exception as exc:  # pylint: disable=broad-except
             msg = "ERROR: Failed to load courselike '{0}': {1}".format(
                 course_dir.encode("utf-8"), unicode(exc)
@@ -828,6 +831,14 @@ class XMLModuleStore(ModuleStoreReadBase):
         """
         return self.courses.values()
 
+    def get_course_keys(self, **kwargs):
+        """
+        Returns the keys of the courses in this modulestore, optionally only
+        those of the given 'org'.
+        """
+        org = kwargs.get('org')
+        return [course.id for course in self.courses.itervalues() if not org or course.id.org == org]
+
     def get_errored_courses(self):
         """
         Return a dictionary of course_dir -> [(msg, exception_str)], for each
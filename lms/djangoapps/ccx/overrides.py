@@ -5,11 +5,14 @@ by the individual custom courses feature.
 import json
 import logging
 
+from django.conf import settings
+from django.core.cache import cache
 from django.db import transaction, IntegrityError
 
 from courseware.field_overrides import FieldOverrideProvider  # pylint: disable=import-error
 from opaque_keys.edx.keys import CourseKey, UsageKey
-from ccx_keys.locator import CCXLocator, CCXBlockUsageLocator
+from ccx_keys.locator import CCXLocator
+from request_cache.middleware import RequestCache
 
 from .models import CcxFieldOverride, CustomCourseForEdX
 
@@ -54,6 +57,8 @@ def get_current_ccx(course_key):
 
     course_key is expected to be an instance of an opaque CourseKey, a
     ValueError is raised if this expectation is not met.
+
+    The ccx is looked up once per request.
     """
     if not isinstance(course_key, CourseKey):
         raise ValueError("get_current_ccx requires a CourseKey instance")
@@ -61,7 +66,11 @@ def get_current_ccx(course_key):
     if not isinstance(course_key, CCXLocator):
         return None
 
-    return CustomCourseForEdX.objects.get(pk=course_key.ccx)
+    request_cache = RequestCache.get_request_cache()
+    cache_key = u"ccx.get_current_ccx.{}".format(course_key.ccx)
+    if cache_key not in request_cache.data:
+        request_cache.data[cache_key] = CustomCourseForEdX.objects.get(pk=course_key.ccx)
+    return request_cache.data[cache_key]
 
 
 def get_override_for_ccx(ccx, block, name, default=None):
@@ -70,44 +79,86 @@ def get_override_for_ccx(ccx, block, name, default=None):
     specify the block and the name of the field.  If the field is not
     overridden for the given ccx, returns `default`.
     """
-    if not hasattr(block, '_ccx_overrides'):
-        block._ccx_overrides = {}  # pylint: disable=protected-access
-    overrides = block._ccx_overrides.get(ccx.id)  # pylint: disable=protected-access
+    overrides = _get_overrides_for_ccx(ccx).get(_block_override_key(block.location))
+    if overrides is None or name not in overrides:
+        return default
+    return block.fields[name].from_json(overrides[name])
+
+
+def _block_override_key(location):
+    """
+    Returns the key of the block at `location` in the overrides of a ccx.
+
+    Blocks are identified by their type and id only, so that the key doesn't
+    depend on whether `location` is specific to the ccx, nor on the branch or
+    version of the course it refers to.
+    """
+    return (location.block_type, location.block_id)
+
+
+def _ccx_overrides_cache_key(ccx):
+    """
+    Returns the key of the overrides of `ccx` in the request and shared caches.
+    """
+    return u"ccx.overrides.{}".format(ccx.id)
+
+
+def _get_overrides_for_ccx(ccx):
+    """
+    Returns a dictionary mapping the override keys of blocks (see
+    _block_override_key) to dictionaries of field names and the JSON values
+    they are overridden with, for all the overrides of this CCX.
+
+    All of the overrides of the CCX are loaded at once, and kept for the rest
+    of the request as well as, for settings.CCX_OVERRIDES_CACHE_TIMEOUT
+    seconds, in the shared cache, from which they are removed whenever an
+    override of the CCX changes.
+    """
+    cache_key = _ccx_overrides_cache_key(ccx)
+    request_cache = RequestCache.get_request_cache()
+    if cache_key in request_cache.data:
+        return request_cache.data[cache_key]
+
+    timeout = settings.CCX_OVERRIDES_CACHE_TIMEOUT
+    overrides = cache.get(cache_key) if timeout else None
     if overrides is None:
-        overrides = _get_overrides_for_ccx(ccx, block)
-        block._ccx_overrides[ccx.id] = overrides  # pylint: disable=protected-access
-    return overrides.get(name, default)
-
-
-def _get_overrides_for_ccx(ccx, block):
-    """
-    Returns a dictionary mapping field name to overriden value for any
-    overrides set on this block for this CCX.
-    """
-    overrides = {}
-    # block as passed in may have a location specific to a CCX, we must strip
-    # that for this query
-    location = block.location
-    if isinstance(block.location, CCXBlockUsageLocator):
-        location = block.location.to_block_locator()
-    query = CcxFieldOverride.objects.filter(
-        ccx=ccx,
-        location=location
-    )
-    for override in query:
-        field = block.fields[override.field]
-        value = field.from_json(json.loads(override.value))
-        overrides[override.field] = value
+        overrides = {}
+        for override in CcxFieldOverride.objects.filter(ccx=ccx):
+            block_overrides = overrides.setdefault(_block_override_key(override.location), {})
+            block_overrides[override.field] = json.loads(override.value)
+        if timeout:
+            cache.set(cache_key, overrides, timeout)
+
+    request_cache.data[cache_key] = overrides
     return overrides
 
 
-@transaction.commit_on_success
+def _clear_overrides_cache(ccx):
+    """
+    Forgets the overrides of `ccx` loaded by _get_overrides_for_ccx.
+    """
+    cache_key = _ccx_overrides_cache_key(ccx)
+    cache.delete(cache_key)
+    RequestCache.get_request_cache().data.pop(cache_key, None)
+
+
 def override_field_for_ccx(ccx, block, name, value):
     """
     Overrides a field for the `ccx`.  `block` and `name` specify the block
     and the name of the field on that block to override.  `value` is the
     value to set for the given field.
     """
+    _save_override_for_ccx(ccx, block, name, value)
+    # Only evicted once the override is committed, so that a concurrent
+    # request can't cache the previous overrides again
+    _clear_overrides_cache(ccx)
+
+
+@transaction.commit_on_success
+def _save_override_for_ccx(ccx, block, name, value):
+    """
+    Saves the override of a field for the `ccx`, see override_field_for_ccx.
+    """
     field = block.fields[name]
     value = json.dumps(field.to_json(value))
     try:
@@ -124,8 +175,6 @@ def override_field_for_ccx(ccx, block, name, value):
             field=name)
         override.value = value
     override.save()
-    if hasattr(block, '_ccx_overrides'):
-        del block._ccx_overrides[ccx.id]  # pylint: disable=protected-access
 
 
 def clear_override_for_ccx(ccx, block, name):
@@ -141,8 +190,7 @@ def clear_override_for_ccx(ccx, block, name):
             location=block.location,
             field=name).delete()
 
-        if hasattr(block, '_ccx_overrides'):
-            del block._ccx_overrides[ccx.id]  # pylint: disable=protected-access
+        _clear_overrides_cache(ccx)
 
     except CcxFieldOverride.DoesNotExist:
         pass
@@ -167,10 +167,10 @@ class TestFieldOverrideMongoPerformance(FieldOverridePerformanceTestCase):
 
     TEST_DATA = {
         'no_overrides': [
-            (27, 7, 19), (135, 7, 131), (595, 7, 537)
+            (27, 7, 19), (117, 7, 131), (507, 7, 537)
         ],
         'ccx': [
-            (27, 7, 47), (135, 7, 455), (595, 7, 2037)
+            (27, 7, 47), (117, 7, 455), (507, 7, 2037)
         ],
     }
 
@@ -184,9 +184,9 @@ class TestFieldOverrideSplitPerformance(FieldOverridePerformanceTestCase):
 
     TEST_DATA = {
         'no_overrides': [
-            (27, 4, 9), (135, 19, 54), (595, 84, 215)
+            (27, 4, 9), (117, 19, 54), (507, 84, 215)
         ],
         'ccx': [
-            (27, 4, 9), (135, 19, 54), (595, 84, 215)
+            (27, 4, 9), (117, 19, 54), (507, 84, 215)
         ]
     }
@@ -8,7 +8,9 @@ import pytz
 from nose.plugins.attrib import attr
 
 from courseware.field_overrides import OverrideFieldData  # pylint: disable=import-error
+from django.core.cache import cache
 from django.test.utils import override_settings
+from request_cache.middleware import RequestCache
 from student.tests.factories import AdminFactory  # pylint: disable=import-error
 from xmodule.modulestore.tests.django_utils import (
     ModuleStoreTestCase,
@@ -16,7 +18,7 @@ from xmodule.modulestore.tests.django_utils import (
 from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
 
 from ..models import CustomCourseForEdX
-from ..overrides import override_field_for_ccx
+from ..overrides import get_override_for_ccx, override_field_for_ccx
 
 from .test_views import flatten, iter_blocks
 
@@ -134,3 +136,40 @@ class TestFieldOverrides(ModuleStoreTestCase):
         override_field_for_ccx(self.ccx, chapter, 'due', ccx_due)
         vertical = chapter.get_children()[0].get_children()[0]
         self.assertEqual(vertical.due, ccx_due)
+
+    def test_overrides_of_all_blocks_loaded_at_once(self):
+        """
+        Test that the overrides of all blocks of the ccx are read with a
+        single query.
+        """
+        ccx_start = datetime.datetime(2014, 12, 25, 00, 00, tzinfo=pytz.UTC)
+        ccx_due = datetime.datetime(2015, 1, 1, 00, 00, tzinfo=pytz.UTC)
+        chapters = self.ccx.course.get_children()
+        override_field_for_ccx(self.ccx, chapters[0], 'start', ccx_start)
+        override_field_for_ccx(self.ccx, chapters[1], 'due', ccx_due)
+        with self.assertNumQueries(1):
+            self.assertEqual(chapters[0].start, ccx_start)
+            self.assertEqual(chapters[1].due, ccx_due)
+            self.assertEqual(chapters[1].get_children()[0].due, ccx_due)
+
+    @override_settings(CCX_OVERRIDES_CACHE_TIMEOUT=60)
+    def test_overrides_kept_in_shared_cache(self):
+        """
+        Test that the overrides of the ccx are read from the shared cache in
+        later requests, until one of them changes.
+        """
+        cache.clear()
+        self.addCleanup(cache.clear)
+        ccx_start = datetime.datetime(2014, 12, 25, 00, 00, tzinfo=pytz.UTC)
+        new_start = datetime.datetime(2014, 12, 26, 00, 00, tzinfo=pytz.UTC)
+        chapter = self.ccx.course.get_children()[0]
+        override_field_for_ccx(self.ccx, chapter, 'start', ccx_start)
+        self.assertEqual(get_override_for_ccx(self.ccx, chapter, 'start'), ccx_start)
+
+        RequestCache.clear_request_cache()
+        with self.assertNumQueries(0):
+            self.assertEqual(get_override_for_ccx(self.ccx, chapter, 'start'), ccx_start)
+
+        override_field_for_ccx(self.ccx, chapter, 'start', new_start)
+        RequestCache.clear_request_cache()
+        self.assertEqual(get_override_for_ccx(self.ccx, chapter, 'start'), new_start)
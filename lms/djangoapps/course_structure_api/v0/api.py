@@ -61,12 +61,15 @@ def course_structure(course_key):
     Raises:
         CourseStructureNotAvailableError, CourseNotFoundError
     """
-    course = _retrieve_course(course_key)
     try:
-        requested_course_structure = models.CourseStructure.objects.get(course_id=course.id)
+        # The stored structure is read without loading the course; structures
+        # of deleted courses are removed along with them.
+        requested_course_structure = models.CourseStructure.objects.get(course_id=course_key)
         return serializers.CourseStructureSerializer(requested_course_structure.structure).data
     except models.CourseStructure.DoesNotExist:
-        # If we don't have data stored, generate it and return an error.
+        # If we don't have data stored, make sure the course exists, generate
+        # its structure and return an error.
+        _retrieve_course(course_key)
         tasks.update_course_structure.delay(unicode(course_key))
         raise CourseStructureNotAvailableError
 
@@ -44,6 +44,8 @@ from util.milestones_helpers import (
     any_unfulfilled_milestones,
 )
 from ccx_keys.locator import CCXLocator
+from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
+from openedx.core.djangoapps.content.course_structures.block_structure import BlockData
 
 import dogstats_wrapper as dog_stats_api
 
@@ -97,7 +99,7 @@ def has_access(user, action, obj, course_key=None):
 
     # delegate the work to type-specific functions.
     # (start with more specific types, then get more general)
-    if isinstance(obj, CourseDescriptor):
+    if isinstance(obj, (CourseDescriptor, CourseOverview)):
         return _has_access_course_desc(user, action, obj)
 
     if isinstance(obj, ErrorDescriptor):
@@ -110,6 +112,9 @@ def has_access(user, action, obj, course_key=None):
     if isinstance(obj, XBlock):
         return _has_access_descriptor(user, action, obj, course_key)
 
+    if isinstance(obj, BlockData):
+        return _has_access_block_data(user, action, obj, course_key)
+
     if isinstance(obj, CCXLocator):
         return _has_access_ccx_key(user, action, obj)
 
@@ -131,7 +136,8 @@ def has_access(user, action, obj, course_key=None):
 # ================ Implementation helpers ================================
 def _has_access_course_desc(user, action, course):
     """
-    Check if user has access to a course descriptor.
+    Check if user has access to a course descriptor, or to the CourseOverview
+    of one.
 
     Valid actions:
 
@@ -151,6 +157,9 @@ def _has_access_course_desc(user, action, course):
 
         NOTE: this is not checking whether user is actually enrolled in the course.
         """
+        if isinstance(course, CourseOverview):
+            return _can_load_course_overview(user, course)
+
         # delegate to generic descriptor check to check start dates
         return _has_access_descriptor(user, 'load', course, course.id)
 
@@ -417,29 +426,12 @@ def _has_access_descriptor(user, action, descriptor, course_key=None):
             # in which case immediately grant access.
             return _has_staff_access_to_descriptor(user, descriptor, course_key)
 
-        # If start dates are off, can always load
-        if settings.FEATURES['DISABLE_START_DATES'] and not is_masquerading_as_student(user, course_key):
-            debug("Allow: DISABLE_START_DATES")
+        # Detached blocks have no start date.
+        if 'detached' in descriptor._class_tags:
+            debug("Allow: detached block")
             return True
 
-        # Check start date
-        if 'detached' not in descriptor._class_tags and descriptor.start is not None:
-            now = datetime.now(UTC())
-            effective_start = _adjust_start_date_for_beta_testers(
-                user,
-                descriptor,
-                course_key=course_key
-            )
-            if in_preview_mode() or now > effective_start:
-                # after start date, everyone can see it
-                debug("Allow: now > effective start date")
-                return True
-            # otherwise, need staff access
-            return _has_staff_access_to_descriptor(user, descriptor, course_key)
-
-        # No start date, so can always load.
-        debug("Allow: no start date")
-        return True
+        return _can_access_descriptor_with_start_date(user, descriptor, course_key)
 
     checkers = {
         'load': can_load,
@@ -450,6 +442,97 @@ def _has_access_descriptor(user, action, descriptor, course_key=None):
     return _dispatch(checkers, action, user, descriptor)
 
 
+def _has_access_block_data(user, action, block, course_key):
+    """
+    Check if user has access to a block of a course's BlockStructure.
+
+    This performs the same checks as _has_access_descriptor, using the
+    collected fields of the block instead of loading its descriptor.
+
+    Valid actions:
+    'load' -- load this block, showing it to the user.
+    'staff' -- staff access to the block.
+    """
+    def can_load():
+        """
+        Checks visible_to_staff_only, group access and start dates, as the
+        'load' check of _has_access_descriptor does.
+        """
+        if block.visible_to_staff_only and not _has_staff_access_to_descriptor(user, block, course_key):
+            return False
+
+        if not _has_group_access(block, user, course_key):
+            return _has_staff_access_to_descriptor(user, block, course_key)
+
+        return _can_access_descriptor_with_start_date(user, block, course_key)
+
+    checkers = {
+        'load': can_load,
+        'staff': lambda: _has_staff_access_to_descriptor(user, block, course_key),
+    }
+
+    return _dispatch(checkers, action, user, block)
+
+
+def _can_access_descriptor_with_start_date(user, descriptor, course_key):  # pylint: disable=invalid-name
+    """
+    Checks if a user has access to a descriptor based on its start date.
+
+    If there is no start date specified, grant access.
+    Else, check if we're past the start date.
+
+    Note:
+        We do NOT check whether the user is staff or if the descriptor
+        is detached... it is assumed both of these are checked by the caller.
+
+    Arguments:
+        user (User): the user whose descriptor access we are checking.
+        descriptor (AType): the descriptor for which we are checking access,
+            where AType is CourseDescriptor, CourseOverview, BlockData, or any
+            other class that has a start and days_early_for_beta attribute.
+        course_key (CourseKey): the course the descriptor is in.
+    """
+    # If start dates are off, can always load
+    if settings.FEATURES['DISABLE_START_DATES'] and not is_masquerading_as_student(user, course_key):
+        debug("Allow: DISABLE_START_DATES")
+        return True
+
+    # Check start date
+    if descriptor.start is not None:
+        now = datetime.now(UTC())
+        effective_start = _adjust_start_date_for_beta_testers(
+            user,
+            descriptor,
+            course_key=course_key
+        )
+        if in_preview_mode() or now > effective_start:
+            # after start date, everyone can see it
+            debug("Allow: now > effective start date")
+            return True
+        # otherwise, need staff access
+        return _has_staff_access_to_descriptor(user, descriptor, course_key)
+
+    # No start date, so can always load.
+    debug("Allow: no start date")
+    return True
+
+
+def _can_load_course_overview(user, course_overview):
+    """
+    Check if a user can load a course, given its CourseOverview.
+
+    This is the CourseOverview equivalent of the 'load' check that
+    _has_access_descriptor performs on a CourseDescriptor, except that group
+    access is not checked, since it is set on content within a course rather
+    than on the course itself.
+    """
+    if course_overview.visible_to_staff_only and not _has_staff_access_to_descriptor(
+            user, course_overview, course_overview.id
+    ):
+        return False
+    return _can_access_descriptor_with_start_date(user, course_overview, course_overview.id)
+
+
 def _has_access_xmodule(user, action, xmodule, course_key):
     """
     Check if user has access to this xmodule.
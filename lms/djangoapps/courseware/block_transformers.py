@@ -0,0 +1,72 @@
+"""
+Access to the cached structure of a course from the courseware, and
+BlockStructureTransformers that apply the courseware's access rules to it.
+"""
+from django.conf import settings
+
+from openedx.core.djangoapps.content.course_structures.block_structure import BlockStructureTransformer
+from openedx.core.djangoapps.content.course_structures.models import CourseStructure
+from util.module_utils import get_course_version
+
+from .access import has_access
+
+
+def can_use_course_block_structure(course):
+    """
+    Returns whether the structure stored for `course` may be read instead of
+    its blocks: the feature must be enabled, no field override providers may
+    change the blocks' fields per user, and the modulestore must track the
+    version of the course.
+    """
+    if not settings.FEATURES.get('ENABLE_COURSE_BLOCK_STRUCTURE', False):
+        return False
+
+    # Field override providers (e.g. for CCX or individual due dates) can
+    # change the start and due dates of blocks per user.
+    if settings.FIELD_OVERRIDE_PROVIDERS:
+        return False
+
+    return bool(get_course_version(course))
+
+
+def get_course_block_structure(course):
+    """
+    Returns the BlockStructure stored for the current version of `course`, for
+    reading its blocks without loading them.
+
+    Returns None if the blocks have to be loaded instead: if the structure
+    may not be used (see can_use_course_block_structure) or if no structure of
+    the current version of the course is stored yet.
+    """
+    if not can_use_course_block_structure(course):
+        return None
+    return CourseStructure.get_block_structure(course.id, get_course_version(course))
+
+
+class AccessTransformer(BlockStructureTransformer):
+    """
+    Removes the blocks a user may not load (see courseware.access.has_access)
+    from a BlockStructure, along with their descendants.
+
+    Only the blocks up to `max_depth` levels below the root are checked, so
+    that readers which only look at the top of a course (e.g. the table of
+    contents) don't pay for checking all of it. The root itself is expected
+    to have been checked by the caller.
+    """
+    def __init__(self, max_depth=None):
+        self.max_depth = max_depth
+
+    def transform(self, user, block_structure):
+        stack = [(child, 1) for child in reversed(block_structure.get_children(block_structure.root))]
+        while stack:
+            usage_key, depth = stack.pop()
+            if usage_key not in block_structure:
+                continue
+            block = block_structure.get_block(usage_key)
+            if not has_access(user, 'load', block, block_structure.course_key):
+                block_structure.remove_block(usage_key)
+                continue
+            if self.max_depth is None or depth < self.max_depth:
+                stack.extend(
+                    (child, depth + 1) for child in reversed(block_structure.get_children(usage_key))
+                )
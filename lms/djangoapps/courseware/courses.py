@@ -23,6 +23,7 @@ from courseware.model_data import FieldDataCache
 from courseware.module_render import get_module
 from student.models import CourseEnrollment
 import branding
+from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
 
 from opaque_keys.edx.keys import UsageKey
 
@@ -116,6 +117,9 @@ def get_course_with_access(user, action, course_key, depth=0, check_if_enrolled=
 def course_image_url(course):
     """Try to look up the image url for the course.  If it's not found,
     log an error and return the dead link"""
+    if isinstance(course, CourseOverview):
+        # Overviews store the url computed from their course descriptor.
+        return course.course_image_url
     if course.static_asset_path or modulestore().get_modulestore_type(course.id) == ModuleStoreEnum.Type.xml:
         # If we are a static course with the course_image attribute
         # set different than the default, return that path so that
@@ -344,7 +348,7 @@ def get_courses_by_university(user, domain=None):
 
 def get_courses(user, domain=None):
     '''
-    Returns a list of courses available, sorted by course.number
+    Returns a list of CourseOverviews of the courses available, sorted by course.number
     '''
     courses = branding.get_visible_courses()
 
@@ -1,7 +1,7 @@
 # Compute grades using real division, with no integer truncation
 from __future__ import division
 from collections import defaultdict
-import json
+from datetime import datetime
 import random
 import logging
 
@@ -9,22 +9,24 @@ from contextlib import contextmanager
 from django.conf import settings
 from django.db import transaction
 from django.test.client import RequestFactory
+from pytz import UTC
 
 import dogstats_wrapper as dog_stats_api
 
 from courseware import courses
 from courseware.model_data import FieldDataCache
+from courseware.user_state_client import DjangoXBlockUserStateClient
 from student.models import anonymous_id_for_user
-from util.module_utils import yield_dynamic_descriptor_descendants
+from util.module_utils import get_course_version, yield_dynamic_descriptor_descendants
 from xmodule import graders
 from xmodule.graders import Score
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.exceptions import ItemNotFoundError
-from .models import StudentModule
+from .models import PersistentSubsectionGrade, StudentModule
 from .module_render import get_module_for_descriptor
 from submissions import api as sub_api  # installed from the edx-submissions repository
 from opaque_keys import InvalidKeyError
-from opaque_keys.edx.keys import CourseKey
+from opaque_keys.edx.keys import CourseKey, UsageKey
 
 
 log = logging.getLogger("edx.courseware")
@@ -37,14 +39,13 @@ def answer_distributions(course_key):
 
       (problem url_name, problem display_name, problem_id) -> {dict: answer -> count}
 
-    Answer distributions are found by iterating through all StudentModule
-    entries for a given course with type="problem" and a grade that is not null.
-    This means that we only count LoncapaProblems that people have submitted.
-    Other types of items like ORA or sequences will not be collected. Empty
-    Loncapa problem state that gets created from runnig the progress page is
-    also not counted.
+    Answer distributions are found by iterating through the user state of all
+    problems of the course which have a grade that is not null. This means that
+    we only count LoncapaProblems that people have submitted. Other types of
+    items like ORA or sequences will not be collected. Empty Loncapa problem
+    state that gets created from runnig the progress page is also not counted.
 
-    This method accesses the StudentModule table directly instead of using the
+    This method reads the stored user state directly instead of using the
     CapaModule abstraction. The main reason for this is so that we can generate
     the report without any side-effects -- we don't have to worry about answer
     distribution potentially causing re-evaluation of the student answer. This
@@ -57,7 +58,9 @@ def answer_distributions(course_key):
     not be aware of problems that are not visible to the user being used to
     generate the report.
 
-    This method will try to use a read-replica database if one is available.
+    The records are fetched in batches (see
+    DjangoXBlockUserStateClient.iter_all_for_course), from a read-replica
+    database if one is available.
     """
     # dict: { module.module_state_key : (url_name, display_name) }
     state_keys_to_problem_info = {}  # For caching, used by url_and_display_name
@@ -83,20 +86,14 @@ def answer_distributions(course_key):
     # Iterate through all problems submitted for this course in no particular
     # order, and build up our answer_counts dict that we will eventually return
     answer_counts = defaultdict(lambda: defaultdict(int))
-    for module in StudentModule.all_submitted_problems_read_only(course_key):
-        try:
-            state_dict = json.loads(module.state) if module.state else {}
-            raw_answers = state_dict.get("student_answers", {})
-        except ValueError:
-            log.error(
-                u"Answer Distribution: Could not parse module state for StudentModule id=%s, course=%s",
-                module.id,
-                course_key,
-            )
+    user_states = DjangoXBlockUserStateClient().iter_all_graded_for_course(course_key, block_type='problem')
+    for user_state in user_states:
+        raw_answers = user_state.state.get("student_answers", {})
+        if not raw_answers:
             continue
 
         try:
-            url, display_name = url_and_display_name(module.module_state_key.map_into_course(course_key))
+            url, display_name = url_and_display_name(user_state.block_key)
             # Each problem part has an ID that is derived from the
             # module.module_state_key (with some suffix appended)
             for problem_part_id, raw_answer in raw_answers.items():
@@ -108,30 +105,104 @@ def answer_distributions(course_key):
                 answer_counts[(url, display_name, problem_part_id)][answer] += 1
 
         except (ItemNotFoundError, InvalidKeyError):
-            msg = "Answer Distribution: Item {} referenced in StudentModule {} " + \
-                  "for user {} in course {} not found; " + \
+            msg = "Answer Distribution: Item {} referenced in the state of user {} " + \
+                  "in course {} not found; " + \
                   "This can happen if a student answered a question that " + \
                   "was later deleted from the course. This answer will be " + \
                   "omitted from the answer distribution CSV."
             log.warning(
-                msg.format(module.module_state_key, module.id, module.student_id, course_key)
+                msg.format(user_state.block_key, user_state.username, course_key)
             )
             continue
 
     return answer_counts
 
 
+def persistent_grades_enabled():
+    """
+    Returns whether subsection grades are persisted and served from the
+    PersistentSubsectionGrade table.
+    """
+    return settings.FEATURES.get('ENABLE_PERSISTENT_GRADES', False) and not settings.GENERATE_PROFILE_SCORES
+
+
+class ScoresCache(object):
+    """
+    The scores of a single student in a course, fetched up front so that
+    grading a course (or rendering its progress page) takes a constant number
+    of queries rather than one or more per section and problem.
+
+    This holds the grade, max_grade and modification time of every
+    StudentModule of the student in the course, loaded with a single query,
+    and the scores that were registered with the submissions API, which for
+    the moment means only openassessment (edx-ora2), loaded with a single call.
+    """
+    def __init__(self, student, course_key):
+        # Dict of item_ids -> (earned, possible) point tuples
+        self.submissions_scores = sub_api.get_scores(
+            course_key.to_deprecated_string(), anonymous_id_for_user(student, course_key)
+        )
+
+        # Dicts of usage keys -> (grade, max_grade) tuples and modification
+        # times. Only the fields needed for grading are loaded, not the
+        # (potentially large) state.
+        self.module_scores = {}
+        self.module_modified = {}
+        if student.is_authenticated():
+            student_modules = StudentModule.objects.filter(
+                student=student, course_id=course_key
+            ).only('module_state_key', 'grade', 'max_grade', 'modified')
+            for student_module in student_modules:
+                usage_key = student_module.module_state_key.map_into_course(course_key)
+                self.module_scores[usage_key] = (student_module.grade, student_module.max_grade)
+                self.module_modified[usage_key] = student_module.modified
+
+    def submissions_score(self, usage_key):
+        """
+        Returns the (earned, possible) tuple registered with the submissions
+        API for the block, or None.
+        """
+        return self.submissions_scores.get(usage_key.to_deprecated_string())
+
+    def module_score(self, usage_key):
+        """
+        Returns the (grade, max_grade) tuple of the student's StudentModule
+        for the block, or None if the student has no state for it.
+        """
+        return self.module_scores.get(usage_key)
+
+    def modified_since(self, usage_keys, since):
+        """
+        Returns whether the student's StudentModule for any of the blocks was
+        modified at or after the datetime `since`.
+        """
+        return any(
+            self.module_modified[usage_key] >= since
+            for usage_key in usage_keys if usage_key in self.module_modified
+        )
+
+    def has_state(self, usage_keys):
+        """
+        Returns whether the student has a StudentModule or a submissions API
+        score for any of the blocks.
+        """
+        return any(
+            usage_key in self.module_scores or usage_key.to_deprecated_string() in self.submissions_scores
+            for usage_key in usage_keys
+        )
+
+
 @transaction.commit_manually
-def grade(student, request, course, keep_raw_scores=False):
+def grade(student, request, course, keep_raw_scores=False, use_persisted=True):
     """
     Wraps "_grade" with the manual_transaction context manager just in case
     there are unanticipated errors.
     """
     with manual_transaction():
-        return _grade(student, request, course, keep_raw_scores)
+        return _grade(student, request, course, keep_raw_scores, use_persisted)
 
 
-def _grade(student, request, course, keep_raw_scores):
+def _grade(student, request, course, keep_raw_scores, use_persisted=True):
     """
     Unwrapped version of "grade"
 
@@ -150,17 +221,31 @@ def _grade(student, request, course, keep_raw_scores):
     - keep_raw_scores : if True, then value for key 'raw_scores' contains scores
       for every graded module
 
+    If persistent grades are enabled and `use_persisted` is True, the scores of
+    subsections that already have a PersistentSubsectionGrade for the current
+    version of the course, computed from the current state of the student,
+    are read from it instead of being recomputed, and newly computed
+    subsection scores are persisted. Courses whose modulestore doesn't track
+    their version (e.g. XML courses) are never persisted.
+
     More information on the format is in the docstring for CourseGrader.
     """
     grading_context = course.grading_context
     raw_scores = []
 
-    # Dict of item_ids -> (earned, possible) point tuples. This *only* grabs
-    # scores that were registered with the submissions API, which for the moment
-    # means only openassessment (edx-ora2)
-    submissions_scores = sub_api.get_scores(
-        course.id.to_deprecated_string(), anonymous_id_for_user(student, course.id)
-    )
+    use_persisted = use_persisted and persistent_grades_enabled()
+    if use_persisted:
+        course_version = get_course_version(course)
+        use_persisted = bool(course_version)
+    if use_persisted:
+        with manual_transaction():
+            persisted_grades = PersistentSubsectionGrade.scores_for_course(student, course.id, course_version)
+
+    # Taken before the student's state is read, so that scores computed from
+    # it are known to be stale if the state is saved meanwhile
+    scores_as_of = datetime.now(UTC)
+    with manual_transaction():
+        scores_cache = ScoresCache(student, course.id)
 
     totaled_scores = {}
     # This next complicated loop is just to collect the totaled_scores, which is
@@ -178,28 +263,36 @@ def _grade(student, request, course, keep_raw_scores):
                 descriptor.always_recalculate_grades for descriptor in section['xmoduledescriptors']
             )
 
-            # If there are no problems that always have to be regraded, check to
-            # see if any of our locations are in the scores from the submissions
-            # API. If scores exist, we have to calculate grades for this section.
-            if not should_grade_section:
-                should_grade_section = any(
-                    descriptor.location.to_deprecated_string() in submissions_scores
-                    for descriptor in section['xmoduledescriptors']
+            # Sections with blocks that always need to be recalculated are
+            # never persisted, since their scores can change without a
+            # SCORE_CHANGED signal being sent.
+            persist_section = use_persisted and not should_grade_section
+            scores = None
+            if persist_section and section_descriptor.location in persisted_grades:
+                scores = _scores_from_persisted_grade(
+                    persisted_grades[section_descriptor.location], course.id, scores_cache
                 )
+            if scores is not None:
+                _, graded_total = graders.aggregate_scores(scores, section_name)
+                if keep_raw_scores:
+                    raw_scores += scores
+                if graded_total.possible > 0:
+                    format_scores.append(graded_total)
+                continue
 
+            # If there are no problems that always have to be regraded, check to
+            # see if the student has state or submissions API scores for any of
+            # our locations. If so, we have to calculate grades for this section.
             if not should_grade_section:
-                with manual_transaction():
-                    should_grade_section = StudentModule.objects.filter(
-                        student=student,
-                        module_state_key__in=[
-                            descriptor.location for descriptor in section['xmoduledescriptors']
-                        ]
-                    ).exists()
+                should_grade_section = scores_cache.has_state(
+                    descriptor.location for descriptor in section['xmoduledescriptors']
+                )
 
             # If we haven't seen a single problem in the section, we don't have
             # to grade it at all! We can assume 0%
             if should_grade_section:
                 scores = []
+                persisted_entries = []
 
                 def create_module(descriptor):
                     '''creates an XModule instance given a descriptor'''
@@ -214,7 +307,7 @@ def _grade(student, request, course, keep_raw_scores):
                 ):
 
                     (correct, total) = get_score(
-                        course.id, student, module_descriptor, create_module, scores_cache=submissions_scores
+                        course.id, student, module_descriptor, create_module, scores_cache=scores_cache
                     )
                     if correct is None and total is None:
                         continue
@@ -239,6 +332,20 @@ def _grade(student, request, course, keep_raw_scores):
                             module_descriptor.location
                         )
                     )
+                    persisted_entries.append({
+                        'usage_key': unicode(module_descriptor.location),
+                        'display_name': module_descriptor.display_name_with_default,
+                        'graded': module_descriptor.graded,
+                        'earned': correct,
+                        'possible': total,
+                    })
+
+                if persist_section:
+                    with manual_transaction():
+                        PersistentSubsectionGrade.save_scores(
+                            student, course.id, section_descriptor.location, course_version, scores_as_of,
+                            persisted_entries
+                        )
 
                 _, graded_total = graders.aggregate_scores(scores, section_name)
                 if keep_raw_scores:
@@ -275,6 +382,31 @@ def _grade(student, request, course, keep_raw_scores):
     return grade_summary
 
 
+def _scores_from_persisted_grade(persisted_grade, course_key, scores_cache):
+    """
+    Converts the score entries of a PersistentSubsectionGrade into Scores.
+    Returns None if the student's state for any of the blocks has been saved
+    since the scores were computed, or if a block that was scored has no
+    state anymore (e.g. because the student's attempts were reset).
+    """
+    scores = []
+    for entry in persisted_grade.scores:
+        # We simply cannot grade a problem that is 12/0, because we might need it as a percentage
+        graded = entry['graded'] and entry['possible'] > 0
+        scores.append(Score(
+            entry['earned'],
+            entry['possible'],
+            graded,
+            entry['display_name'],
+            UsageKey.from_string(entry['usage_key']).map_into_course(course_key),
+        ))
+    if scores_cache.modified_since([score.module_id for score in scores], persisted_grade.scores_as_of):
+        return None
+    if any(score.earned and not scores_cache.has_state([score.module_id]) for score in scores):
+        return None
+    return scores
+
+
 def grade_for_percentage(grade_cutoffs, percentage):
     """
     Returns a letter grade as defined in grading_policy (e.g. 'A' 'B' 'C' for 6.002x) or None.
@@ -344,7 +476,7 @@ def _progress_summary(student, request, course):
 
         course_module = getattr(course_module, '_x_module', course_module)
 
-    submissions_scores = sub_api.get_scores(course.id.to_deprecated_string(), anonymous_id_for_user(student, course.id))
+        scores_cache = ScoresCache(student, course.id)
 
     chapters = []
     # Don't include chapters that aren't displayable (e.g. due to error)
@@ -371,7 +503,7 @@ def _progress_summary(student, request, course):
                 ):
                     course_id = course.id
                     (correct, total) = get_score(
-                        course_id, student, module_descriptor, module_creator, scores_cache=submissions_scores
+                        course_id, student, module_descriptor, module_creator, scores_cache=scores_cache
                     )
                     if correct is None and total is None:
                         continue
@@ -423,17 +555,17 @@ def get_score(course_id, user, problem_descriptor, module_creator, scores_cache=
     problem_descriptor: an XModuleDescriptor
     module_creator: a function that takes a descriptor, and returns the corresponding XModule for this user.
            Can return None if user doesn't have access, or if something else went wrong.
-    scores_cache: A dict of location names to (earned, possible) point tuples.
-           If an entry is found in this cache, it takes precedence.
+    scores_cache: A ScoresCache of the user in the course. If it holds a
+           submissions API score for the problem, that takes precedence. If it
+           is not given, the user's StudentModule for the problem is queried.
     """
-    scores_cache = scores_cache or {}
-
     if not user.is_authenticated():
         return (None, None)
 
-    location_url = problem_descriptor.location.to_deprecated_string()
-    if location_url in scores_cache:
-        return scores_cache[location_url]
+    if scores_cache is not None:
+        submissions_score = scores_cache.submissions_score(problem_descriptor.location)
+        if submissions_score is not None:
+            return submissions_score
 
     # some problems have state that is updated independently of interaction
     # with the LMS, so they need to always be scored. (E.g. foldit.)
@@ -451,18 +583,22 @@ def get_score(course_id, user, problem_descriptor, module_creator, scores_cache=
         # These are not problems, and do not have a score
         return (None, None)
 
-    try:
-        student_module = StudentModule.objects.get(
-            student=user,
-            course_id=course_id,
-            module_state_key=problem_descriptor.location
-        )
-    except StudentModule.DoesNotExist:
-        student_module = None
+    if scores_cache is not None:
+        module_score = scores_cache.module_score(problem_descriptor.location)
+    else:
+        try:
+            student_module = StudentModule.objects.get(
+                student=user,
+                course_id=course_id,
+                module_state_key=problem_descriptor.location
+            )
+            module_score = (student_module.grade, student_module.max_grade)
+        except StudentModule.DoesNotExist:
+            module_score = None
 
-    if student_module is not None and student_module.max_grade is not None:
-        correct = student_module.grade if student_module.grade is not None else 0
-        total = student_module.max_grade
+    if module_score is not None and module_score[1] is not None:
+        correct = module_score[0] if module_score[0] is not None else 0
+        total = module_score[1]
     else:
         # If the problem was not in the cache, or hasn't been graded yet,
         # we need to instantiate the problem.
@@ -483,7 +619,11 @@ def get_score(course_id, user, problem_descriptor, module_creator, scores_cache=
     weight = problem_descriptor.weight
     if weight is not None:
         if total == 0:
-            log.exception("Cannot reweight a problem with zero total points. Problem: " + str(student_module))
+            log.exception(
+                "Cannot reweight a problem with zero total points. Problem: %s, user: %s",
+                problem_descriptor.location,
+                user.id
+            )
             return (correct, total)
         correct = correct * weight / total
         total = weight
@@ -0,0 +1,303 @@
+"""
+Recording of the history of the states of problems (StudentModuleHistory).
+
+By default, an entry is inserted along with each save of a problem's StudentModule,
+in the request which saved it, with a full copy of the state. Two settings change that:
+
+STUDENT_MODULE_HISTORY_DEFERRED_WRITES
+    The entries are put on an in-memory queue of the process instead, and a background
+    thread inserts them in bulk, up to STUDENT_MODULE_HISTORY_BATCH_SIZE at a time.
+
+    * Ordering: a process writes its entries in the order in which the StudentModules
+      were saved, so the entries of a problem saved by a single process keep their order.
+      Entries of the same problem saved by different processes (e.g. two submissions
+      racing each other) may be written in either order.
+    * Durability: an entry is only written once the background thread gets to it, which
+      is usually within a fraction of a second but may be after the request returned.
+      Entries still queued when the process exits are written then, waiting up to
+      STUDENT_MODULE_HISTORY_EXIT_TIMEOUT seconds for them; entries queued in a process
+      which is killed are lost. Entries are never dropped when the queue is full
+      (STUDENT_MODULE_HISTORY_QUEUE_SIZE entries): they are written by the request
+      instead. An entry whose StudentModule was rolled back (or deleted) fails to be
+      written, which is logged.
+
+STUDENT_MODULE_HISTORY_COMPACT_STATES
+    Instead of a full copy of the state, an entry stores the fields which changed since
+    the latest stored entry of the same problem, as a JSON list `[changed fields, names
+    of removed fields, id of that entry]` rather than a JSON object, whenever that is
+    shorter. The state is rebuilt from the entry whose id is stored, so entries written
+    concurrently by different processes, which may be based on the same entry, are
+    rebuilt correctly. A full copy is stored again when rebuilding a state would take
+    more than COMPACT_SNAPSHOT_INTERVAL entries. Finding the latest state costs one
+    query per problem whose history is written, which the deferred writes take off the
+    request.
+
+    `full_history_states` rebuilds the full states of entries read back, which
+    `DjangoXBlockUserStateClient.get_history` does, so readers of the history get the
+    same data either way. Entries stored before the setting was enabled, or after it is
+    disabled again, are full copies and need no rebuilding.
+"""
+import itertools
+import json
+import logging
+from Queue import Full
+
+from django.conf import settings
+from django.db import close_connection
+from dogapi import dog_stats_api
+
+from courseware.models import StudentModuleHistory
+from openedx.core.lib.background_batcher import BackgroundBatcher
+
+
+log = logging.getLogger(__name__)
+
+# The most compact entries that rebuilding the state of a history entry may go through
+COMPACT_SNAPSHOT_INTERVAL = 20
+
+
+def record_history(student_modules):
+    """
+    Records the current states of the `student_modules` whose history is kept (see
+    StudentModuleHistory.HISTORY_SAVING_TYPES) as new StudentModuleHistory entries.
+    """
+    entries = [
+        StudentModuleHistory.for_student_module(student_module)
+        for student_module in student_modules
+        if student_module.module_type in StudentModuleHistory.HISTORY_SAVING_TYPES
+    ]
+    if not entries:
+        return
+
+    if settings.STUDENT_MODULE_HISTORY_DEFERRED_WRITES:
+        for entry in entries:
+            try:
+                _deferred_writer.put(entry)
+            except Full:
+                dog_stats_api.increment('courseware.history.deferred.queue_full')
+                write_history([entry])
+    else:
+        write_history(entries)
+
+
+def flush_history(timeout=None):
+    """
+    Waits until the history entries queued by this process so far have been written, or
+    for `timeout` seconds. Returns whether all of them were written.
+    """
+    return _deferred_writer.flush(timeout)
+
+
+def write_history(entries):
+    """
+    Inserts the new StudentModuleHistory `entries`, in order, storing compact states
+    if STUDENT_MODULE_HISTORY_COMPACT_STATES is enabled.
+    """
+    if settings.STUDENT_MODULE_HISTORY_COMPACT_STATES:
+        _compact_states(entries)
+
+    if len(entries) == 1:
+        entries[0].save()
+    else:
+        StudentModuleHistory.objects.bulk_create(entries)
+
+
+def full_history_states(entries):
+    """
+    Replaces the compact states of the StudentModuleHistory `entries` with the full states
+    they stand for, and returns `entries`.
+
+    `entries` must hold all of the history of their StudentModules, in any order.
+    """
+    by_student_module = itertools.groupby(
+        sorted(entries, key=lambda entry: (entry.student_module_id, entry.id)),
+        lambda entry: entry.student_module_id,
+    )
+    for _student_module_id, student_module_entries in by_student_module:
+        states = {}
+        for entry in student_module_entries:
+            diff = _decode_diff(entry.state)
+            if diff is None:
+                state = _decode_state(entry.state)
+            else:
+                changed, removed, base_id = diff
+                state = _apply_diff(states.get(base_id, {}), (changed, removed))
+                entry.state = json.dumps(state)
+            states[entry.id] = state
+    return entries
+
+
+def store_full_states_based_on(entry_ids):
+    """
+    Stores the full state in the compact entries which are based on the
+    StudentModuleHistory entries with ids `entry_ids`, so that those can be deleted.
+    """
+    entry_ids = set(entry_ids)
+    student_module_ids = set(
+        StudentModuleHistory.objects.filter(id__in=entry_ids).values_list('student_module', flat=True)
+    )
+    for student_module_id in student_module_ids:
+        entries = list(StudentModuleHistory.objects.filter(student_module=student_module_id).order_by('id'))
+        based_on_deleted_entry = [
+            entry for entry in entries
+            if entry.id not in entry_ids and (_decode_diff(entry.state) or (None, None, None))[2] in entry_ids
+        ]
+        if not based_on_deleted_entry:
+            continue
+
+        full_history_states(entries)
+        for entry in based_on_deleted_entry:
+            entry.save()
+
+
+def _decode_state(state):
+    """
+    Returns the full `state` of a history entry decoded from JSON, or an empty state
+    if it is missing or can't be decoded.
+    """
+    try:
+        state = json.loads(state) if state else {}
+    except ValueError:
+        return {}
+    return state if isinstance(state, dict) else {}
+
+
+def _decode_diff(state):
+    """
+    Returns the (changed fields, names of removed fields, id of the entry they apply to)
+    stored as the `state` of a compact history entry, or None if `state` is a full state.
+    """
+    if not state or not state.startswith('['):
+        return None
+    try:
+        changed, removed, base_id = json.loads(state)
+    except ValueError:
+        return None
+    return changed, removed, base_id
+
+
+def _diff(previous_state, state):
+    """
+    Returns the (changed fields, names of removed fields) which turn `previous_state` into `state`.
+    """
+    changed = {
+        field: value
+        for field, value in state.items()
+        if field not in previous_state or previous_state[field] != value
+    }
+    removed = sorted(field for field in previous_state if field not in state)
+    return changed, removed
+
+
+def _apply_diff(previous_state, diff):
+    """
+    Returns the state obtained by applying the changes `diff` to `previous_state`.
+    """
+    changed, removed = diff
+    state = dict(previous_state)
+    for field in removed:
+        state.pop(field, None)
+    state.update(changed)
+    return state
+
+
+def _latest_stored_state(student_module_id):
+    """
+    Returns the full state of the latest stored history entry of the StudentModule with
+    id `student_module_id`, the number of compact entries rebuilding it goes through, and
+    the id of the entry.
+
+    Returns (None, 0, None) if there is no entry, or if rebuilding its state goes through
+    too many entries for the next entry to be based on it.
+    """
+    stored_states = list(StudentModuleHistory.objects.filter(
+        student_module=student_module_id
+    ).order_by('-id').values_list('id', 'state')[:COMPACT_SNAPSHOT_INTERVAL])
+    if not stored_states:
+        return None, 0, None
+
+    latest_id = stored_states[0][0]
+    states_by_id = dict(stored_states)
+    diffs = []
+    entry_id = latest_id
+    while True:
+        if entry_id not in states_by_id:
+            return None, 0, None
+        diff = _decode_diff(states_by_id[entry_id])
+        if diff is None:
+            break
+        diffs.append(diff)
+        entry_id = diff[2]
+
+    state = _decode_state(states_by_id[entry_id])
+    for changed, removed, __ in reversed(diffs):
+        state = _apply_diff(state, (changed, removed))
+    return state, len(diffs), latest_id
+
+
+def _compact_states(entries):
+    """
+    Replaces the states of the new history `entries` with the changes since the latest
+    stored entry of their StudentModule, wherever that is shorter and rebuilding the state
+    of that entry doesn't go through too many entries.
+    """
+    latest_states = {}
+    for entry in entries:
+        student_module_id = entry.student_module_id
+        if student_module_id not in latest_states:
+            latest_states[student_module_id] = _latest_stored_state(student_module_id)
+        base_state, compact_count, base_id = latest_states[student_module_id]
+        if base_state is None or compact_count + 1 >= COMPACT_SNAPSHOT_INTERVAL:
+            continue
+
+        try:
+            state = json.loads(entry.state) if entry.state else None
+        except ValueError:
+            state = None
+        if not isinstance(state, dict):
+            continue
+
+        changed, removed = _diff(base_state, state)
+        compact_state = json.dumps([changed, removed, base_id])
+        if len(compact_state) < len(entry.state):
+            entry.state = compact_state
+
+
+def _write_deferred_entries(entries):
+    """
+    Writes a batch of the history `entries` queued by `record_history`.
+    """
+    states = [entry.state for entry in entries]
+    try:
+        with dog_stats_api.timer('courseware.history.deferred.write'):
+            write_history(entries)
+    except Exception:  # pylint: disable=broad-except
+        # Write the entries that can be written one by one, compacting
+        # their states again relative to the entries actually written
+        for entry, state in zip(entries, states):
+            entry.state = state
+            try:
+                write_history([entry])
+            except Exception:  # pylint: disable=broad-except
+                log.exception(
+                    u"Could not write the history of the StudentModule with id %s", entry.student_module_id
+                )
+    finally:
+        # Don't hold on to a database connection between batches
+        close_connection()
+
+
+def _make_deferred_writer():
+    """
+    Returns a BackgroundBatcher which writes history entries as configured in the settings.
+    """
+    return BackgroundBatcher(
+        _write_deferred_entries,
+        settings.STUDENT_MODULE_HISTORY_QUEUE_SIZE,
+        settings.STUDENT_MODULE_HISTORY_BATCH_SIZE,
+        settings.STUDENT_MODULE_HISTORY_EXIT_TIMEOUT,
+        'courseware.history.deferred',
+    )
+
+
+_deferred_writer = _make_deferred_writer()
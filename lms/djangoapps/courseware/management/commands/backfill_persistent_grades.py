@@ -0,0 +1,89 @@
+"""
+Command to compute and store persistent subsection grades for the students
+enrolled in a course, or to verify that the stored grades agree with grades
+computed from scratch.
+"""
+from optparse import make_option
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.client import RequestFactory
+from opaque_keys import InvalidKeyError
+from opaque_keys.edx.keys import CourseKey
+
+from courseware.courses import get_course_by_id
+from courseware.grades import grade
+from courseware.models import PersistentSubsectionGrade
+from student.models import CourseEnrollment
+
+
+class Command(BaseCommand):
+    """
+    Backfill (or verify) persistent subsection grades for a course.
+
+    Without options, the persisted grades of every enrolled student are
+    discarded and recomputed. With --verify, the grades served from the
+    persisted scores are compared to freshly computed grades and mismatches
+    are reported; with --verify --fix, mismatched students are recomputed.
+    """
+    args = "<course_id>"
+    help = "Compute and store persistent subsection grades for all students enrolled in a course."
+
+    option_list = BaseCommand.option_list + (
+        make_option('--verify',
+                    action='store_true',
+                    dest='verify',
+                    default=False,
+                    help='Compare persisted grades with freshly computed grades instead of recomputing them.'),
+        make_option('--fix',
+                    action='store_true',
+                    dest='fix',
+                    default=False,
+                    help='With --verify, recompute the persisted grades of students that do not match.'),
+    )
+
+    def handle(self, *args, **options):
+        if len(args) != 1:
+            raise CommandError("backfill_persistent_grades requires one argument: <course_id>")
+
+        if not settings.FEATURES.get('ENABLE_PERSISTENT_GRADES', False):
+            raise CommandError("Persistent grades are not enabled (FEATURES['ENABLE_PERSISTENT_GRADES']).")
+
+        try:
+            course_key = CourseKey.from_string(args[0])
+        except InvalidKeyError:
+            raise CommandError("Invalid course_id: {}".format(args[0]))
+
+        course = get_course_by_id(course_key, depth=None)
+
+        # Grading code expects a request with a user and a session.
+        request = RequestFactory().get('/')
+        request.session = {}
+
+        num_students = num_mismatched = 0
+        for student in CourseEnrollment.objects.users_enrolled_in(course_key):
+            num_students += 1
+            request.user = student
+            if options['verify']:
+                persisted = grade(student, request, course)
+                computed = grade(student, request, course, use_persisted=False)
+                if (persisted['percent'], persisted['grade']) == (computed['percent'], computed['grade']):
+                    continue
+                num_mismatched += 1
+                self.stdout.write(
+                    u"Mismatch for user {} ({}): persisted {} ({}), computed {} ({})\n".format(
+                        student.username, student.id,
+                        persisted['percent'], persisted['grade'],
+                        computed['percent'], computed['grade'],
+                    ).encode('utf-8')
+                )
+                if not options['fix']:
+                    continue
+
+            PersistentSubsectionGrade.objects.filter(user=student, course_id=course_key).delete()
+            grade(student, request, course)
+
+        if options['verify']:
+            self.stdout.write("Verified {} students, {} mismatched.\n".format(num_students, num_mismatched))
+        else:
+            self.stdout.write("Backfilled persistent grades for {} students.\n".format(num_students))
@@ -18,6 +18,7 @@ import traceback
 from django.core.management.base import NoArgsCommand
 from django.db import transaction
 from django.db.models import Max
+from courseware.history import store_full_states_based_on
 from courseware.models import StudentModuleHistory
 
 
@@ -189,6 +190,9 @@ class StudentModuleHistoryCleaner(object):
 
         """
         assert ids_to_delete
+        # Compact rows which only store the changes since the rows being deleted
+        # need to store their full state instead.
+        store_full_states_based_on(ids_to_delete)
         StudentModuleHistory.objects.filter(id__in=ids_to_delete).delete()
 
     def clean_one_student_module(self, student_module_id):
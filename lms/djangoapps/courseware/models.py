@@ -12,6 +12,7 @@ file and check it in at the same time as your model changes. To do that,
 ASSUMPTIONS: modules have unique IDs, even across different module_types
 
 """
+import json
 import logging
 import itertools
 
@@ -22,6 +23,8 @@ from django.db.models.signals import post_save
 from django.dispatch import receiver, Signal
 
 from model_utils.models import TimeStampedModel
+from opaque_keys import InvalidKeyError
+from opaque_keys.edx.keys import CourseKey
 from student.models import user_by_anonymous_id
 from submissions.models import score_set, score_reset
 
@@ -112,23 +115,6 @@ class StudentModule(models.Model):
     created = models.DateTimeField(auto_now_add=True, db_index=True)
     modified = models.DateTimeField(auto_now=True, db_index=True)
 
-    @classmethod
-    def all_submitted_problems_read_only(cls, course_id):
-        """
-        Return all model instances that correspond to problems that have been
-        submitted for a given course. So module_type='problem' and a non-null
-        grade. Use a read replica if one exists for this environment.
-        """
-        queryset = cls.objects.filter(
-            course_id=course_id,
-            module_type='problem',
-            grade__isnull=False
-        )
-        if "read_replica" in settings.DATABASES:
-            return queryset.using("read_replica")
-        else:
-            return queryset
-
     def __repr__(self):
         return 'StudentModule<%r>' % ({
             'course_id': self.course_id,
@@ -161,21 +147,29 @@ class StudentModuleHistory(models.Model):
     grade = models.FloatField(null=True, blank=True)
     max_grade = models.FloatField(null=True, blank=True)
 
+    @classmethod
+    def for_student_module(cls, student_module):
+        """
+        Returns a new (unsaved) StudentModuleHistory entry recording the
+        current state and grade of `student_module`.
+        """
+        return cls(student_module=student_module,
+                   version=None,
+                   created=student_module.modified,
+                   state=student_module.state,
+                   grade=student_module.grade,
+                   max_grade=student_module.max_grade)
+
     @receiver(post_save, sender=StudentModule)
     def save_history(sender, instance, **kwargs):  # pylint: disable=no-self-argument, unused-argument
         """
-        Checks the instance's module_type, and creates & saves a
+        Checks the instance's module_type, and records a
         StudentModuleHistory entry if the module_type is one that
         we save.
         """
-        if instance.module_type in StudentModuleHistory.HISTORY_SAVING_TYPES:
-            history_entry = StudentModuleHistory(student_module=instance,
-                                                 version=None,
-                                                 created=instance.modified,
-                                                 state=instance.state,
-                                                 grade=instance.grade,
-                                                 max_grade=instance.max_grade)
-            history_entry.save()
+        # Imported here as courseware.history imports this module
+        from courseware.history import record_history
+        record_history([instance])
 
 
 class XBlockFieldBase(models.Model):
@@ -298,6 +292,102 @@ class StudentFieldOverride(TimeStampedModel):
     value = models.TextField(default='null')
 
 
+class PersistentSubsectionGrade(TimeStampedModel):
+    """
+    Holds the scores a student earned within a single graded subsection of a
+    course, so that `courseware.grades` can compute a grade summary without
+    instantiating every problem in the course.
+
+    Rows are written when a subsection is graded, and are deleted when the
+    submissions API score of any of the blocks they contain changes, so that
+    only that subsection is graded again. Rows computed against a different
+    version of the course content, or from student state that has changed
+    since, are ignored (and eventually overwritten) by the grading code.
+    """
+    user = models.ForeignKey(User, db_index=True)
+    course_id = CourseKeyField(max_length=255, db_index=True)
+
+    # The usage key of the graded subsection
+    usage_key = LocationKeyField(max_length=255, db_index=True)
+
+    # Version of the course content that the scores were computed against
+    course_version = models.CharField(max_length=255, blank=True, default='')
+
+    # When the student state that the scores were computed from was read
+    scores_as_of = models.DateTimeField()
+
+    # JSON list with an entry for every scored block in the subsection. Each
+    # entry is a dict with the keys 'usage_key', 'display_name', 'graded',
+    # 'earned' and 'possible', as returned by `courseware.grades.get_score`
+    # (i.e. after the block's weight has been applied).
+    scores_json = models.TextField(default='[]')
+
+    class Meta(object):  # pylint: disable=missing-docstring
+        unique_together = (('user', 'course_id', 'usage_key'),)
+
+    @property
+    def scores(self):
+        """
+        The list of score entries stored for this subsection.
+        """
+        return json.loads(self.scores_json)
+
+    @scores.setter
+    def scores(self, value):
+        """
+        Serializes and stores the list of score entries for this subsection.
+        """
+        self.scores_json = json.dumps(value)
+
+    @classmethod
+    def scores_for_course(cls, user, course_key, course_version):
+        """
+        Returns a dict mapping subsection usage keys to their PersistentSubsectionGrade,
+        for every subsection of the course that has a persisted grade for `user`
+        computed against `course_version`.
+        """
+        return {
+            row.usage_key.map_into_course(course_key): row
+            for row in cls.objects.filter(user=user, course_id=course_key, course_version=course_version)
+        }
+
+    @classmethod
+    def save_scores(cls, user, course_key, usage_key, course_version, scores_as_of, scores):
+        """
+        Creates or replaces the persisted grade of the subsection `usage_key`.
+        """
+        scores_json = json.dumps(scores)
+        row, created = cls.objects.get_or_create(
+            user=user,
+            course_id=course_key,
+            usage_key=usage_key,
+            defaults={'course_version': course_version, 'scores_as_of': scores_as_of, 'scores_json': scores_json},
+        )
+        if not created:
+            row.course_version = course_version
+            row.scores_as_of = scores_as_of
+            row.scores_json = scores_json
+            row.save()
+
+    @classmethod
+    def invalidate(cls, user_id, course_key, block_usage_id):
+        """
+        Deletes the persisted grades of the user that contain the block
+        identified by the unicode string `block_usage_id`, so that they are
+        computed again the next time the user is graded.
+        """
+        row_ids = [
+            row.id
+            for row in cls.objects.filter(user__id=user_id, course_id=course_key).only('id', 'scores_json')
+            if any(entry['usage_key'] == block_usage_id for entry in row.scores)
+        ]
+        if row_ids:
+            cls.objects.filter(id__in=row_ids).delete()
+
+    def __unicode__(self):
+        return u"[PersistentSubsectionGrade] {}: {} {}".format(self.user_id, self.course_id, self.usage_key)
+
+
 # Signal that indicates that a user's score for a problem has been updated.
 # This signal is generated when a scoring event occurs either within the core
 # platform or in the Submissions module. Note that this signal will be triggered
@@ -394,3 +484,34 @@ def submissions_score_reset_handler(sender, **kwargs):  # pylint: disable=unused
             u"Failed to process score_reset signal from Submissions API. "
             "user: %s, course_id: %s, usage_id: %s", user, course_id, usage_id
         )
+
+
+@receiver(score_set)
+@receiver(score_reset)
+def persistent_grade_submissions_score_handler(sender, **kwargs):  # pylint: disable=unused-argument
+    """
+    Consume the score_set and score_reset signals defined in the Submissions
+    API, and invalidate any persisted subsection grades that contain the
+    scored block.
+
+    Changes to StudentModule scores don't need to invalidate anything: the
+    grading code ignores persisted grades of blocks whose StudentModule was
+    saved or deleted since.
+    """
+    if not settings.FEATURES.get('ENABLE_PERSISTENT_GRADES', False):
+        return
+    course_id = kwargs.get('course_id', None)
+    usage_id = kwargs.get('item_id', None)
+    user = user_by_anonymous_id(kwargs.get('anonymous_user_id', None))
+    if not all((user, course_id, usage_id)):
+        log.exception(
+            u"Failed to invalidate persistent grades for a Submissions API signal. "
+            "user: %s, course_id: %s, usage_id: %s", user, course_id, usage_id
+        )
+        return
+    try:
+        course_key = CourseKey.from_string(course_id)
+    except InvalidKeyError:
+        log.exception(u"Failed to invalidate persistent grades for course_id: %s", course_id)
+        return
+    PersistentSubsectionGrade.invalidate(user.id, course_key, usage_id)
@@ -28,6 +28,7 @@ import newrelic.agent
 
 from capa.xqueue_interface import XQueueInterface
 from courseware.access import has_access, get_user_role
+from courseware.block_transformers import AccessTransformer, get_course_block_structure
 from courseware.masquerade import setup_masquerade
 from courseware.model_data import FieldDataCache, DjangoKeyValueStore
 from courseware.models import SCORE_CHANGED
@@ -138,12 +139,37 @@ def toc_for_course(request, course, active_chapter, active_section, field_data_c
     '''
 
     with modulestore().bulk_operations(course.id):
-        course_module = get_module_for_descriptor(request.user, request, course, field_data_cache, course.id)
-        if course_module is None:
-            return None
+        block_structure = _get_toc_block_structure(request.user, course)
+        if block_structure is not None:
+            if not has_access(request.user, 'load', course, course.id):
+                return None
+
+            def get_display_items(block):
+                """
+                Returns the children of the block that the user may see.
+                """
+                return [
+                    block_structure.get_block(usage_key)
+                    for usage_key in block_structure.get_children(block.location)
+                ]
+
+            chapters = get_display_items(course)
+        else:
+            course_module = get_module_for_descriptor(
+                request.user, request, course, field_data_cache, course.id
+            )
+            if course_module is None:
+                return None
+
+            def get_display_items(block):  # pylint: disable=function-redefined
+                """
+                Returns the displayable children of the module.
+                """
+                return block.get_display_items()
+
+            chapters = get_display_items(course_module)
 
         toc_chapters = list()
-        chapters = course_module.get_display_items()
 
         # See if the course is gated by one or more content milestones
         required_content = milestones_helpers.get_required_content(course, request.user)
@@ -165,7 +191,7 @@ def toc_for_course(request, course, active_chapter, active_section, field_data_c
                 continue
 
             sections = list()
-            for section in chapter.get_display_items():
+            for section in get_display_items(chapter):
 
                 active = (chapter.url_name == active_chapter and
                           section.url_name == active_section)
@@ -187,6 +213,35 @@ def toc_for_course(request, course, active_chapter, active_section, field_data_c
         return toc_chapters
 
 
+# Blocks whose children (and thus whose place in the table of contents) can
+# differ per user in ways a BlockStructure doesn't capture.
+TOC_DYNAMIC_BLOCK_TYPES = ('abtest', 'conditional', 'library_content', 'split_test')
+
+
+def _get_toc_block_structure(user, course):
+    """
+    Returns the BlockStructure of `course`, with the chapters and sections
+    that `user` may not load removed, for building the table of contents
+    without loading the course's blocks.
+
+    Returns None if the table of contents has to be built from the blocks
+    themselves instead: if no structure can be used (see
+    get_course_block_structure), or if the course contents can vary per user
+    in ways the structure doesn't capture.
+    """
+    block_structure = get_course_block_structure(course)
+    if block_structure is None:
+        return None
+
+    for chapter_key in block_structure.get_children(block_structure.root):
+        toc_keys = [chapter_key] + block_structure.get_children(chapter_key)
+        if any(block_structure.get_block(key).category in TOC_DYNAMIC_BLOCK_TYPES for key in toc_keys):
+            return None
+
+    block_structure.transform(user, [AccessTransformer(max_depth=2)])
+    return block_structure
+
+
 def get_module(user, request, usage_key, field_data_cache,
                position=None, log_if_not_found=True, wrap_xmodule_display=True,
                grade_bucket_type=None, depth=0,
@@ -4,6 +4,8 @@ by the individual due dates feature.
 """
 import json
 
+from request_cache.middleware import RequestCache
+
 from .field_overrides import FieldOverrideProvider
 from .models import StudentFieldOverride
 
@@ -24,30 +26,47 @@ def get_override_for_user(user, block, name, default=None):
     specify the block and the name of the field.  If the field is not
     overridden for the given user, returns `default`.
     """
-    if not hasattr(block, '_student_overrides'):
-        block._student_overrides = {}  # pylint: disable=protected-access
-    overrides = block._student_overrides.get(user.id)  # pylint: disable=protected-access
-    if overrides is None:
-        overrides = _get_overrides_for_user(user, block)
-        block._student_overrides[user.id] = overrides  # pylint: disable=protected-access
-    return overrides.get(name, default)
+    location = block.location
+    overrides = _get_overrides_for_user(user, block.runtime.course_id).get((location.block_type, location.block_id))
+    if overrides is None or name not in overrides:
+        return default
+    return block.fields[name].from_json(overrides[name])
 
 
-def _get_overrides_for_user(user, block):
+def _overrides_cache_key(course_key):
     """
-    Gets all of the individual student overrides for given user and block.
-    Returns a dictionary of field override values keyed by field name.
+    Returns the key of the overrides of a user in the course in the request
+    cache.
     """
-    query = StudentFieldOverride.objects.filter(
-        course_id=block.runtime.course_id,
-        location=block.location,
-        student_id=user.id,
-    )
-    overrides = {}
-    for override in query:
-        field = block.fields[override.field]
-        value = field.from_json(json.loads(override.value))
-        overrides[override.field] = value
+    return u"student_field_overrides.{}".format(course_key)
+
+
+def _get_overrides_for_user(user, course_key):
+    """
+    Gets all of the individual student overrides for given user and course.
+    Returns a dictionary mapping the (block type, block id) tuples of blocks
+    to dictionaries of field names and the JSON values they are overridden
+    with.
+
+    The overrides of the user in the course are loaded with a single query,
+    once per request. Only the overrides of the last user looked up are kept
+    for each course, so that code grading many students in one request (or
+    celery task) doesn't keep all of their overrides.
+    """
+    request_cache = RequestCache.get_request_cache()
+    cache_key = _overrides_cache_key(course_key)
+    cached_user_id, overrides = request_cache.data.get(cache_key, (None, None))
+    if overrides is None or cached_user_id != user.id:
+        query = StudentFieldOverride.objects.filter(
+            course_id=course_key,
+            student_id=user.id,
+        )
+        overrides = {}
+        for override in query:
+            location = override.location
+            block_overrides = overrides.setdefault((location.block_type, location.block_id), {})
+            block_overrides[override.field] = json.loads(override.value)
+        request_cache.data[cache_key] = (user.id, overrides)
     return overrides
 
 
@@ -65,6 +84,7 @@ def override_field_for_user(user, block, name, value):
     field = block.fields[name]
     override.value = json.dumps(field.to_json(value))
     override.save()
+    RequestCache.get_request_cache().data.pop(_overrides_cache_key(block.runtime.course_id), None)
 
 
 def clear_override_for_user(user, block, name):
@@ -80,5 +100,6 @@ def clear_override_for_user(user, block, name):
             student_id=user.id,
             location=block.location,
             field=name).delete()
+        RequestCache.get_request_cache().data.pop(_overrides_cache_key(block.runtime.course_id), None)
     except StudentFieldOverride.DoesNotExist:
         pass
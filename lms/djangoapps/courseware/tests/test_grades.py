@@ -1,14 +1,19 @@
 """
 Test grade calculation.
 """
+from django.conf import settings
 from django.http import Http404
+from django.test.client import RequestFactory
 from mock import patch
 from nose.plugins.attrib import attr
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
 
-from courseware.grades import grade, iterate_grades_for
+from courseware.grades import grade, iterate_grades_for, ScoresCache
+from courseware.models import PersistentSubsectionGrade, StudentModule
+from courseware.tests.factories import StudentModuleFactory
 from student.tests.factories import UserFactory
-from xmodule.modulestore.tests.factories import CourseFactory
+from submissions.models import score_set
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 
 
@@ -121,3 +126,158 @@ class TestGradeIteration(ModuleStoreTestCase):
                 students_to_errors[student] = err_msg
 
         return students_to_gradesets, students_to_errors
+
+
+@attr('shard_1')
+@patch.dict(settings.FEATURES, {'ENABLE_PERSISTENT_GRADES': True})
+class TestPersistentGrades(ModuleStoreTestCase):
+    """
+    Test that subsection grades are persisted and kept up to date.
+    """
+    def setUp(self):
+        super(TestPersistentGrades, self).setUp()
+        self.course = CourseFactory.create()
+        chapter = ItemFactory.create(parent=self.course, category='chapter')
+        self.sequential = ItemFactory.create(
+            parent=chapter, category='sequential', metadata={'graded': True, 'format': 'Homework'}
+        )
+        self.problem = ItemFactory.create(parent=self.sequential, category='problem', display_name='Problem')
+        self.student = UserFactory.create()
+        self.request = RequestFactory().get('/')
+        self.request.user = self.student
+        self.request.session = {}
+        self.student_module = StudentModuleFactory.create(
+            student=self.student,
+            course_id=self.course.id,
+            module_state_key=self.problem.location,
+            grade=1,
+            max_grade=2,
+        )
+        self.course = self.store.get_course(self.course.id, depth=None)
+
+    def _persisted_scores(self):
+        """
+        Returns the (earned, possible) pairs persisted for the sequential.
+        """
+        row = PersistentSubsectionGrade.objects.get(user=self.student, usage_key=self.sequential.location)
+        return [(entry['earned'], entry['possible']) for entry in row.scores]
+
+    def _raw_scores(self, **kwargs):
+        """
+        Returns the (earned, possible) pairs of the raw scores of a grade computation.
+        """
+        gradeset = grade(self.student, self.request, self.course, keep_raw_scores=True, **kwargs)
+        return [(score.earned, score.possible) for score in gradeset['raw_scores']]
+
+    def test_grade_is_persisted(self):
+        self.assertEqual(self._raw_scores(), [(1, 2)])
+        self.assertEqual(self._persisted_scores(), [(1, 2)])
+
+    def test_grade_served_from_persisted_scores(self):
+        self._raw_scores()
+        # Change the score without sending a signal; the persisted score is used.
+        StudentModule.objects.filter(id=self.student_module.id).update(grade=2)
+        self.assertEqual(self._raw_scores(), [(1, 2)])
+        self.assertEqual(self._raw_scores(use_persisted=False), [(2, 2)])
+
+    def test_submissions_score_invalidates_persisted_scores(self):
+        self._raw_scores()
+        with patch('courseware.models.user_by_anonymous_id', return_value=self.student):
+            score_set.send(
+                sender=None,
+                points_possible=2,
+                points_earned=2,
+                anonymous_user_id='anonymous',
+                course_id=unicode(self.course.id),
+                item_id=unicode(self.problem.location),
+            )
+        self.assertFalse(PersistentSubsectionGrade.objects.exists())
+
+    def test_saved_state_is_recomputed(self):
+        self._raw_scores()
+        self.student_module.grade = 2
+        self.student_module.save()
+        self.assertEqual(self._raw_scores(), [(2, 2)])
+        self.assertEqual(self._persisted_scores(), [(2, 2)])
+
+    def test_deleted_state_is_recomputed(self):
+        self._raw_scores()
+        self.student_module.delete()
+        self.assertEqual(self._raw_scores(), [])
+
+    def test_state_saved_after_scores_read_is_recomputed(self):
+        self._raw_scores()
+        # The state was saved, without a signal, after the scores were computed from it
+        StudentModule.objects.filter(id=self.student_module.id).update(grade=2)
+        PersistentSubsectionGrade.objects.update(
+            scores_as_of=StudentModule.objects.get(id=self.student_module.id).modified
+        )
+        self.assertEqual(self._raw_scores(), [(2, 2)])
+        self.assertEqual(self._persisted_scores(), [(2, 2)])
+
+    def test_unversioned_course_not_persisted(self):
+        with patch('courseware.grades.get_course_version', return_value=u''):
+            self.assertEqual(self._raw_scores(), [(1, 2)])
+        self.assertFalse(PersistentSubsectionGrade.objects.exists())
+
+    def test_stale_course_version_is_recomputed(self):
+        self._raw_scores()
+        PersistentSubsectionGrade.objects.update(course_version='stale', scores_json='[]')
+        self.assertEqual(self._raw_scores(), [(1, 2)])
+        self.assertEqual(self._persisted_scores(), [(1, 2)])
+
+    @patch.dict(settings.FEATURES, {'ENABLE_PERSISTENT_GRADES': False})
+    def test_disabled(self):
+        self.assertEqual(self._raw_scores(), [(1, 2)])
+        self.assertFalse(PersistentSubsectionGrade.objects.exists())
+
+
+@attr('shard_1')
+class TestScoresCache(ModuleStoreTestCase):
+    """
+    Test that the scores of a student are prefetched for grading.
+    """
+    def setUp(self):
+        super(TestScoresCache, self).setUp()
+        self.course = CourseFactory.create()
+        chapter = ItemFactory.create(parent=self.course, category='chapter')
+        self.problems = []
+        for __ in range(3):
+            sequential = ItemFactory.create(
+                parent=chapter, category='sequential', metadata={'graded': True, 'format': 'Homework'}
+            )
+            self.problems.append(ItemFactory.create(parent=sequential, category='problem'))
+        self.student = UserFactory.create()
+        self.request = RequestFactory().get('/')
+        self.request.user = self.student
+        self.request.session = {}
+        self.course = self.store.get_course(self.course.id, depth=None)
+
+    def test_module_scores(self):
+        StudentModuleFactory.create(
+            student=self.student,
+            course_id=self.course.id,
+            module_state_key=self.problems[0].location,
+            grade=1,
+            max_grade=2,
+        )
+        scores_cache = ScoresCache(self.student, self.course.id)
+        self.assertEqual(scores_cache.module_score(self.problems[0].location), (1, 2))
+        self.assertIsNone(scores_cache.module_score(self.problems[1].location))
+        self.assertTrue(scores_cache.has_state([problem.location for problem in self.problems]))
+        self.assertFalse(scores_cache.has_state([problem.location for problem in self.problems[1:]]))
+
+    def test_submissions_scores(self):
+        location_url = self.problems[1].location.to_deprecated_string()
+        with patch('courseware.grades.sub_api.get_scores', return_value={location_url: (3, 4)}):
+            scores_cache = ScoresCache(self.student, self.course.id)
+        self.assertEqual(scores_cache.submissions_score(self.problems[1].location), (3, 4))
+        self.assertIsNone(scores_cache.submissions_score(self.problems[0].location))
+        self.assertTrue(scores_cache.has_state([self.problems[1].location]))
+
+    def test_unattempted_sections_are_not_queried(self):
+        with patch.object(StudentModule.objects, 'filter', wraps=StudentModule.objects.filter) as mock_filter:
+            gradeset = grade(self.student, self.request, self.course)
+        # Only the ScoresCache queries the student's state
+        self.assertEqual(mock_filter.call_count, 1)
+        self.assertEqual(gradeset['percent'], 0.0)
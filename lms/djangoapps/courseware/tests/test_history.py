@@ -0,0 +1,215 @@
+"""
+Tests for the recording of the history of problems' states.
+"""
+import json
+
+from django.db import DatabaseError
+from django.test import TestCase
+from django.test.utils import override_settings
+from mock import patch
+from nose.plugins.attrib import attr
+
+from courseware import history
+from courseware.models import StudentModuleHistory
+from courseware.tests.factories import StudentModuleFactory, location
+from courseware.user_state_client import DjangoXBlockUserStateClient
+
+
+STATES = [
+    {'attempts': 1, 'student_answers': {'1_2_1': 'a'}, 'seed': 1},
+    {'attempts': 2, 'student_answers': {'1_2_1': 'b'}, 'seed': 1},
+    {'attempts': 2, 'student_answers': {'1_2_1': 'b'}, 'seed': 1, 'done': True},
+    {'attempts': 3, 'seed': 1, 'done': True},
+]
+
+
+@attr('shard_1')
+class TestCompactHistory(TestCase):
+    """
+    Tests storing the changes of problems' states rather than full copies.
+    """
+    def setUp(self):
+        super(TestCompactHistory, self).setUp()
+        self.student_module = StudentModuleFactory(module_state_key=location('problem'), state=json.dumps({}))
+
+    def save_states(self, states):
+        """
+        Saves each of `states` in turn as the state of self.student_module.
+        """
+        for state in states:
+            self.student_module.state = json.dumps(state)
+            self.student_module.save()
+
+    def get_history_states(self):
+        """
+        Returns the states of the history of self.student_module, as returned by get_history.
+        """
+        entries = DjangoXBlockUserStateClient().get_history(
+            self.student_module.student.username, self.student_module.module_state_key
+        )
+        return [json.loads(entry.state) for entry in entries]
+
+    def stored_entries(self):
+        """
+        Returns the (id, state) of the entries stored in the history of self.student_module, from the oldest.
+        """
+        return [
+            (entry.id, json.loads(entry.state))
+            for entry in StudentModuleHistory.objects.filter(student_module=self.student_module).order_by('id')
+        ]
+
+    def stored_states(self):
+        """
+        Returns the states stored in the history of self.student_module, from the oldest.
+        """
+        return [state for __, state in self.stored_entries()]
+
+    @override_settings(STUDENT_MODULE_HISTORY_COMPACT_STATES=True)
+    def test_compact_states(self):
+        self.save_states(STATES)
+        entry_ids = [entry_id for entry_id, __ in self.stored_entries()]
+        self.assertEqual(
+            self.stored_states()[1:],
+            [
+                {'attempts': 1, 'student_answers': {'1_2_1': 'a'}, 'seed': 1},
+                [{'attempts': 2, 'student_answers': {'1_2_1': 'b'}}, [], entry_ids[1]],
+                [{'done': True}, [], entry_ids[2]],
+                [{'attempts': 3}, ['student_answers'], entry_ids[3]],
+            ]
+        )
+        self.assertEqual(self.get_history_states(), list(reversed(STATES)) + [{}])
+
+    @override_settings(STUDENT_MODULE_HISTORY_COMPACT_STATES=True)
+    def test_entries_based_on_same_entry(self):
+        # Entries written together (e.g. by concurrent processes) are all based on the latest stored entry
+        self.save_states(STATES[:1])
+        base_id = self.stored_entries()[-1][0]
+        entries = []
+        for state in STATES[1:3]:
+            self.student_module.state = json.dumps(state)
+            entries.append(StudentModuleHistory.for_student_module(self.student_module))
+        history.write_history(entries)
+
+        self.assertEqual([state[2] for state in self.stored_states()[2:]], [base_id] * 2)
+        self.assertEqual(self.get_history_states(), list(reversed(STATES[:3])) + [{}])
+
+    def test_same_history_as_full_states(self):
+        self.save_states(STATES[:2])
+        with override_settings(STUDENT_MODULE_HISTORY_COMPACT_STATES=True):
+            self.save_states(STATES[2:])
+        self.assertEqual(self.get_history_states(), list(reversed(STATES)) + [{}])
+
+    @override_settings(STUDENT_MODULE_HISTORY_COMPACT_STATES=True)
+    def test_full_copies_stored_regularly(self):
+        with patch('courseware.history.COMPACT_SNAPSHOT_INTERVAL', 2):
+            self.save_states(STATES)
+        self.assertEqual(
+            [isinstance(state, dict) for state in self.stored_states()],
+            [True, True, False, True, False]
+        )
+        self.assertEqual(self.get_history_states(), list(reversed(STATES)) + [{}])
+
+    @override_settings(STUDENT_MODULE_HISTORY_COMPACT_STATES=True)
+    def test_delete_entries(self):
+        self.save_states(STATES)
+        entry_ids = list(
+            StudentModuleHistory.objects.filter(student_module=self.student_module).order_by('id').values_list(
+                'id', flat=True
+            )
+        )
+        history.store_full_states_based_on(entry_ids[1:3])
+        StudentModuleHistory.objects.filter(id__in=entry_ids[1:3]).delete()
+
+        self.assertEqual(self.get_history_states(), [STATES[3], STATES[2], {}])
+
+
+@attr('shard_1')
+class TestDeferredHistory(TestCase):
+    """
+    Tests writing the history of problems' states in the background.
+    """
+    def setUp(self):
+        super(TestDeferredHistory, self).setUp()
+        self.student_module = StudentModuleFactory(module_state_key=location('problem'), state=json.dumps({}))
+        self.writer = None
+        # The queued entries are written by calling write_batch instead
+        patcher = patch('openedx.core.lib.background_batcher.threading.Thread')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def start_writer(self):
+        """
+        Replaces the deferred writer with one configured with the current settings.
+        """
+        self.writer = history._make_deferred_writer()  # pylint: disable=protected-access
+        patcher = patch('courseware.history._deferred_writer', self.writer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def save_states(self, states):
+        """
+        Saves each of `states` in turn as the state of self.student_module.
+        """
+        for state in states:
+            self.student_module.state = json.dumps(state)
+            self.student_module.save()
+
+    def write_batch(self):
+        """
+        Writes a batch of the queued entries, as the background thread would.
+        """
+        self.writer._process_next_batch(self.writer._queue)  # pylint: disable=protected-access
+
+    def stored_states(self):
+        """
+        Returns the states written in the history of self.student_module since the setUp, from the oldest.
+        """
+        return [
+            json.loads(entry.state)
+            for entry in StudentModuleHistory.objects.filter(student_module=self.student_module).order_by('id')[1:]
+        ]
+
+    @override_settings(STUDENT_MODULE_HISTORY_DEFERRED_WRITES=True, STUDENT_MODULE_HISTORY_BATCH_SIZE=3)
+    def test_entries_written_in_batches(self):
+        self.start_writer()
+        self.save_states(STATES)
+        self.assertEqual(self.stored_states(), [])
+
+        with self.assertNumQueries(1):
+            self.write_batch()
+        self.assertEqual(self.stored_states(), STATES[:3])
+        self.write_batch()
+        self.assertEqual(self.stored_states(), STATES)
+        self.assertTrue(self.writer.flush(timeout=0))
+
+    @override_settings(STUDENT_MODULE_HISTORY_DEFERRED_WRITES=True, STUDENT_MODULE_HISTORY_QUEUE_SIZE=1)
+    def test_written_right_away_when_queue_full(self):
+        self.start_writer()
+        self.save_states(STATES[:2])
+        self.assertEqual(self.stored_states(), [STATES[1]])
+        self.assertFalse(self.writer.flush(timeout=0))
+
+        self.write_batch()
+        self.assertEqual(self.stored_states(), [STATES[1], STATES[0]])
+
+    @override_settings(STUDENT_MODULE_HISTORY_DEFERRED_WRITES=True)
+    def test_failed_entries_skipped(self):
+        self.start_writer()
+        self.save_states(STATES[:2])
+
+        write_history = history.write_history
+
+        def fail_first_state(entries):
+            """
+            Fails to write the entries of the first state.
+            """
+            if json.loads(entries[0].state) == STATES[0]:
+                raise DatabaseError()
+            write_history(entries)
+
+        with patch('courseware.history.write_history', side_effect=fail_first_state):
+            with patch('courseware.history.log') as mock_log:
+                self.write_batch()
+        self.assertTrue(mock_log.exception.called)
+        self.assertEqual(self.stored_states(), [STATES[1]])
+        self.assertTrue(self.writer.flush(timeout=0))
@@ -5,6 +5,8 @@ Test for lms courseware app, module render unit
 import ddt
 import itertools
 import json
+import pytz
+from datetime import datetime, timedelta
 from nose.plugins.attrib import attr
 from functools import partial
 
@@ -35,6 +37,8 @@ from courseware.module_render import hash_resource, get_module_for_descriptor
 from courseware.models import StudentModule
 from courseware.tests.factories import StudentModuleFactory, UserFactory, GlobalStaffFactory
 from courseware.tests.tests import LoginEnrollmentTestCase
+from openedx.core.djangoapps.content.course_structures.models import CourseStructure
+from openedx.core.djangoapps.content.course_structures.tasks import update_course_structure
 from courseware.tests.test_submitting_problems import TestSubmittingProblems
 from lms.djangoapps.lms_xblock.runtime import quote_slashes
 from lms.djangoapps.lms_xblock.field_data import LmsFieldData
@@ -645,6 +649,70 @@ class TestTOC(ModuleStoreTestCase):
                 self.assertIn(toc_section, actual)
 
 
+@attr('shard_1')
+@ddt.ddt
+@patch.dict(settings.FEATURES, {'ENABLE_COURSE_BLOCK_STRUCTURE': True})
+class TestTOCFromBlockStructure(ModuleStoreTestCase):
+    """
+    Check that the Table of Contents built from the stored course structure
+    matches the one built from the course's blocks.
+    """
+    def setUp(self):
+        super(TestTOCFromBlockStructure, self).setUp()
+        self.course = CourseFactory.create()
+        self.chapter = ItemFactory.create(parent=self.course, category='chapter', display_name='Chapter')
+        self.section = ItemFactory.create(
+            parent=self.chapter,
+            category='sequential',
+            display_name='Section',
+            metadata={'graded': True, 'format': 'Homework', 'due': datetime(2015, 1, 1, tzinfo=pytz.UTC)},
+        )
+        ItemFactory.create(
+            parent=self.chapter,
+            category='sequential',
+            display_name='Future Section',
+            metadata={'start': datetime.now(pytz.UTC) + timedelta(days=7)},
+        )
+        ItemFactory.create(parent=self.chapter, category='sequential', metadata={'hide_from_toc': True})
+        ItemFactory.create(
+            parent=self.course, category='chapter', display_name='Staff Chapter', metadata={'visible_to_staff_only': True}
+        )
+        self.request = RequestFactory().get('/')
+        self.request.session = {}
+
+    def _toc_for_course(self, user):
+        """
+        Returns the Table of Contents of the course for `user`.
+        """
+        self.request.user = user
+        course = self.store.get_course(self.course.id, depth=2)
+        field_data_cache = FieldDataCache.cache_for_descriptor_descendents(course.id, user, course, depth=2)
+        return render.toc_for_course(
+            self.request, course, self.chapter.url_name, self.section.url_name, field_data_cache
+        )
+
+    @ddt.data(UserFactory, GlobalStaffFactory)
+    def test_toc_from_block_structure(self, user_factory):
+        user = user_factory.create()
+        with patch.dict(settings.FEATURES, {'ENABLE_COURSE_BLOCK_STRUCTURE': False}):
+            expected = self._toc_for_course(user)
+
+        update_course_structure(unicode(self.course.id))
+        with patch('courseware.module_render.get_module_for_descriptor') as mock_get_module:
+            actual = self._toc_for_course(user)
+        self.assertFalse(mock_get_module.called)
+        self.assertEqual(actual, expected)
+
+    def test_missing_block_structure(self):
+        CourseStructure.objects.all().delete()
+        with patch(
+            'courseware.module_render.get_module_for_descriptor', wraps=get_module_for_descriptor
+        ) as mock_get_module:
+            toc = self._toc_for_course(UserFactory.create())
+        self.assertTrue(mock_get_module.called)
+        self.assertEqual([chapter['display_name'] for chapter in toc], ['Chapter'])
+
+
 @attr('shard_1')
 @ddt.ddt
 class TestHtmlModifiers(ModuleStoreTestCase):
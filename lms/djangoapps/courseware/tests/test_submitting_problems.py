@@ -1022,6 +1022,24 @@ class TestAnswerDistributions(TestSubmittingProblems):
         empty_distribution = grades.answer_distributions(self.course.id)
         self.assertFalse(empty_distribution)  # should be empty
 
+    def test_ungraded_problem_skipped(self):
+        # Only problems with a grade count as submitted
+        self.submit_question_answer('p1', {'2_1': u'Correct'})
+        self.submit_question_answer('p2', {'2_1': u'Incorrect'})
+        StudentModule.objects.filter(
+            course_id=self.course.id,
+            module_state_key=self.problem_location('p1'),
+        ).update(grade=None)
+
+        self.assertEqual(
+            grades.answer_distributions(self.course.id),
+            {
+                ('p2', 'p2', '{}_2_1'.format(self.p2_html_id)): {
+                    'Incorrect': 1
+                },
+            }
+        )
+
     def test_broken_state(self):
         # Missing or broken state for a problem should be skipped without
         # causing the whole answer_distribution call to explode.
@@ -0,0 +1,186 @@
+"""
+Tests for the DjangoXBlockUserStateClient.
+"""
+import json
+
+import ddt
+from django.db import IntegrityError
+from django.test import TestCase
+from mock import patch
+from nose.plugins.attrib import attr
+
+from courseware.models import StudentModule, StudentModuleHistory
+from courseware.tests.factories import StudentModuleFactory, UserFactory, location, course_id
+from courseware.user_state_client import DjangoXBlockUserStateClient
+
+
+@attr('shard_1')
+@ddt.ddt
+class TestDjangoUserStateClientIteration(TestCase):
+    """
+    Tests iterating over the states of all users with the DjangoXBlockUserStateClient.
+    """
+    def setUp(self):
+        super(TestDjangoUserStateClientIteration, self).setUp()
+        self.client = DjangoXBlockUserStateClient()
+        self.problem_key = location('problem1')
+        self.other_problem_key = location('problem2')
+        self.sequential_key = course_id.make_usage_key('sequential', 'sequential1')
+
+        self.problem_modules = [
+            StudentModuleFactory(course_id=course_id, module_state_key=self.problem_key, state=json.dumps({'n': n}))
+            for n in range(5)
+        ]
+        self.other_problem_module = StudentModuleFactory(
+            course_id=course_id, module_state_key=self.other_problem_key, state=None
+        )
+        StudentModuleFactory(
+            course_id=course_id,
+            module_type='sequential',
+            module_state_key=self.sequential_key,
+            state=json.dumps({'position': 1}),
+        )
+
+    @ddt.data(None, 1, 2, 5, 6)
+    def test_iter_all_for_block(self, batch_size):
+        user_states = list(self.client.iter_all_for_block(self.problem_key, batch_size=batch_size))
+        self.assertItemsEqual(
+            [(user_state.username, user_state.block_key, user_state.state) for user_state in user_states],
+            [(module.student.username, self.problem_key, {'n': n}) for n, module in enumerate(self.problem_modules)]
+        )
+
+    def test_iter_all_for_block_in_batches(self):
+        # batches of 2, 2 and 1 states
+        with self.assertNumQueries(3):
+            self.assertEqual(len(list(self.client.iter_all_for_block(self.problem_key, batch_size=2))), 5)
+
+    @ddt.data(None, 2)
+    def test_iter_all_for_course(self, batch_size):
+        user_states = list(self.client.iter_all_for_course(course_id, batch_size=batch_size))
+        self.assertItemsEqual(
+            [user_state.block_key for user_state in user_states],
+            [self.problem_key] * 5 + [self.other_problem_key, self.sequential_key]
+        )
+        self.assertIn(
+            (self.other_problem_module.student.username, self.other_problem_key, {}),
+            [(user_state.username, user_state.block_key, user_state.state) for user_state in user_states]
+        )
+
+    def test_iter_all_for_course_of_type(self):
+        user_states = list(self.client.iter_all_for_course(course_id, block_type='sequential'))
+        self.assertEqual(
+            [(user_state.block_key, user_state.state) for user_state in user_states],
+            [(self.sequential_key, {'position': 1})]
+        )
+
+    def test_iter_all_graded_for_course(self):
+        StudentModule.objects.filter(id__in=[module.id for module in self.problem_modules[:2]]).update(grade=1)
+        user_states = list(self.client.iter_all_graded_for_course(course_id, block_type='problem'))
+        self.assertItemsEqual([user_state.state['n'] for user_state in user_states], [0, 1])
+
+    def test_broken_state_skipped(self):
+        self.problem_modules[0].state = "invalid json!"
+        self.problem_modules[0].save()
+        user_states = list(self.client.iter_all_for_block(self.problem_key))
+        self.assertItemsEqual([user_state.state['n'] for user_state in user_states], [1, 2, 3, 4])
+
+
+@attr('shard_1')
+class TestDjangoUserStateClientSetMany(TestCase):
+    """
+    Tests storing the states of many blocks at once with the DjangoXBlockUserStateClient.
+    """
+    def setUp(self):
+        super(TestDjangoUserStateClientSetMany, self).setUp()
+        self.user = UserFactory.create()
+        self.client = DjangoXBlockUserStateClient(self.user)
+        self.existing_modules = [
+            StudentModuleFactory(
+                student=self.user,
+                course_id=course_id,
+                module_state_key=location('existing{}'.format(n)),
+                state=json.dumps({'a_field': n, 'b_field': n}),
+            )
+            for n in range(2)
+        ]
+        self.sequential_key = course_id.make_usage_key('sequential', 'sequential1')
+        # creating the existing problems recorded their history
+        self.last_history_id = StudentModuleHistory.objects.latest('id').id
+
+    def new_history_entries(self):
+        """
+        Returns the StudentModuleHistory entries of self.user recorded since the setUp.
+        """
+        return StudentModuleHistory.objects.filter(student_module__student=self.user, id__gt=self.last_history_id)
+
+    def assertStates(self, expected_states):  # pylint: disable=invalid-name
+        """
+        Asserts that the states stored for self.user are `expected_states`.
+        """
+        self.assertEqual(
+            {
+                student_module.module_state_key.map_into_course(course_id): json.loads(student_module.state)
+                for student_module in StudentModule.objects.filter(student=self.user)
+            },
+            expected_states
+        )
+
+    def test_set_many(self):
+        new_problem_keys = [location('new{}'.format(n)) for n in range(3)]
+        block_keys_to_state = {location('existing0'): {'a_field': 'new value'}, self.sequential_key: {'position': 2}}
+        block_keys_to_state.update((usage_key, {'a_field': 'new'}) for usage_key in new_problem_keys)
+
+        # load the existing modules, update them, insert the new ones, query the ids
+        # of the new problems and record the history of all of the problems
+        with self.assertNumQueries(5):
+            self.client.set_many(self.user.username, block_keys_to_state)
+
+        expected_states = {
+            location('existing0'): {'a_field': 'new value', 'b_field': 0},
+            location('existing1'): {'a_field': 1, 'b_field': 1},
+            self.sequential_key: {'position': 2},
+        }
+        expected_states.update((usage_key, {'a_field': 'new'}) for usage_key in new_problem_keys)
+        self.assertStates(expected_states)
+
+        self.assertItemsEqual(
+            [
+                (entry.student_module.module_state_key, json.loads(entry.state))
+                for entry in self.new_history_entries()
+            ],
+            [(location('existing0'), {'a_field': 'new value', 'b_field': 0})] +
+            [(usage_key, {'a_field': 'new'}) for usage_key in new_problem_keys]
+        )
+
+    def test_existing_grade_kept(self):
+        StudentModule.objects.filter(id=self.existing_modules[0].id).update(grade=1, max_grade=2)
+        self.client.set_many(self.user.username, {location('existing0'): {'a_field': 'new value'}})
+        student_module = StudentModule.objects.get(id=self.existing_modules[0].id)
+        self.assertEqual((student_module.grade, student_module.max_grade), (1, 2))
+        self.assertGreaterEqual(student_module.modified, self.existing_modules[0].modified)
+        self.assertEqual([entry.grade for entry in self.new_history_entries()], [1])
+
+    def test_concurrently_created_modules(self):
+        # Another request stores the state of one of the new blocks first
+        other_request_module = StudentModuleFactory(
+            student=self.user,
+            course_id=course_id,
+            module_state_key=location('new0'),
+            state=json.dumps({'b_field': 'other'}),
+        )
+
+        with patch.object(StudentModule.objects, 'chunked_filter', return_value=[]):
+            with patch.object(StudentModule.objects, 'bulk_create', side_effect=IntegrityError):
+                self.client.set_many(
+                    self.user.username,
+                    {location('new0'): {'a_field': 'new'}, location('new1'): {'a_field': 'new'}},
+                )
+
+        self.assertEqual(
+            json.loads(StudentModule.objects.get(id=other_request_module.id).state),
+            {'a_field': 'new', 'b_field': 'other'}
+        )
+        self.assertEqual(
+            json.loads(StudentModule.objects.get(student=self.user, module_state_key=location('new1')).state),
+            {'a_field': 'new'}
+        )
@@ -4,6 +4,7 @@ Module to define url helpers functions
 from xmodule.modulestore.search import path_to_location, navigation_index
 from xmodule.modulestore.django import modulestore
 from django.core.urlresolvers import reverse
+from openedx.core.djangoapps.content.course_structures.models import CourseNavigationPath
 
 
 def get_redirect_url(course_key, usage_key):
@@ -20,7 +21,9 @@ def get_redirect_url(course_key, usage_key):
         Redirect url string
     """
 
-    (course_key, chapter, section, position) = path_to_location(modulestore(), usage_key)
+    (course_key, chapter, section, position) = path_to_location(
+        modulestore(), usage_key, get_navigation_path=CourseNavigationPath.get_path
+    )
 
     # choose the appropriate view (and provide the necessary args) based on the
     # args provided by the redirect.
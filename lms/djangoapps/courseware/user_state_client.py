@@ -4,6 +4,7 @@ data in a Django ORM model.
 """
 
 import itertools
+import logging
 from operator import attrgetter
 
 try:
@@ -12,11 +13,17 @@ except ImportError:
     import json
 
 from django.contrib.auth.models import User
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
 from xblock.fields import Scope, ScopeBase
-from xblock_user_state.interface import XBlockUserStateClient
-from courseware.models import StudentModule, StudentModuleHistory
+from xblock_user_state.interface import XBlockUserState, XBlockUserStateClient
+from courseware.history import flush_history, full_history_states, record_history
+from courseware.models import StudentModule, StudentModuleHistory, chunks
 from contracts import contract, new_contract
 from opaque_keys.edx.keys import UsageKey
+from util.query import use_read_replica_if_available
+
+log = logging.getLogger(__name__)
 
 new_contract('UsageKey', UsageKey)
 
@@ -44,6 +51,13 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
         """
         pass
 
+    # The number of StudentModules fetched at a time by iter_all_for_block and iter_all_for_course
+    DEFAULT_ITER_BATCH_SIZE = 1000
+
+    # The number of StudentModules updated by each statement of set_many. Each of them
+    # takes three parameters, and sqlite allows no more than 999 per statement.
+    SET_MANY_BATCH_SIZE = 300
+
     def __init__(self, user=None):
         """
         Arguments:
@@ -213,7 +227,7 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
         if scope != Scope.user_state:
             raise ValueError("Only Scope.user_state is supported")
 
-        # We do a find_or_create for every block (rather than re-using field objects
+        # We load the stored StudentModules again (rather than re-using field objects
         # that were queried in get_many) so that if the score has
         # been changed by some other piece of the code, we don't overwrite
         # that score.
@@ -222,26 +236,175 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
         else:
             user = User.objects.get(username=username)
 
-        for usage_key, state in block_keys_to_state.items():
-            student_module, created = StudentModule.objects.get_or_create(
+        course_key_func = attrgetter('course_key')
+        by_course = itertools.groupby(
+            sorted(block_keys_to_state, key=course_key_func),
+            course_key_func,
+        )
+
+        for course_key, usage_keys in by_course:
+            self._set_many_in_course(
+                user,
+                course_key,
+                {usage_key: block_keys_to_state[usage_key] for usage_key in usage_keys},
+            )
+
+    def _set_many_in_course(self, user, course_key, block_keys_to_state):
+        """
+        Overlays the states in `block_keys_to_state`, whose blocks all belong to the
+        course `course_key`, over the ones stored for `user`.
+
+        Rather than saving each :class:`~StudentModule` on its own, this loads the existing
+        ones in one query, inserts the missing ones in another, updates the existing ones
+        with one statement per SET_MANY_BATCH_SIZE of them and records the history of the
+        problems in a last one.
+        """
+        existing_modules = {
+            student_module.module_state_key.map_into_course(course_key): student_module
+            for student_module in StudentModule.objects.chunked_filter(
+                'module_state_key__in',
+                block_keys_to_state.keys(),
+                student=user,
+                course_id=course_key,
+            )
+        }
+
+        modified = timezone.now()
+        for usage_key, student_module in existing_modules.items():
+            if student_module.state is None:
+                current_state = {}
+            else:
+                current_state = json.loads(student_module.state)
+            current_state.update(block_keys_to_state[usage_key])
+            student_module.state = json.dumps(current_state)
+            student_module.modified = modified
+        self._update_student_modules(existing_modules.values(), modified)
+
+        new_modules = self._create_student_modules(
+            user,
+            course_key,
+            {
+                usage_key: state
+                for usage_key, state in block_keys_to_state.items()
+                if usage_key not in existing_modules
+            },
+        )
+
+        record_history(itertools.chain(existing_modules.values(), new_modules))
+
+    def _update_student_modules(self, student_modules, modified):
+        """
+        Stores the states of the already-saved `student_modules` and sets their modification
+        dates to `modified`, without touching any of their other fields. Each statement sets
+        the states of up to SET_MANY_BATCH_SIZE StudentModules, picking them by id.
+        """
+        if not student_modules:
+            return
+
+        def column(field_name):
+            """
+            Returns the quoted name of the column of the StudentModule field `field_name`.
+            """
+            return connection.ops.quote_name(StudentModule._meta.get_field(field_name).column)
+
+        modified = StudentModule._meta.get_field('modified').get_db_prep_save(modified, connection=connection)
+        cursor = connection.cursor()
+        for batch in chunks(student_modules, self.SET_MANY_BATCH_SIZE):
+            cursor.execute(
+                "UPDATE {table} SET {state} = CASE {id} {cases} END, {modified} = %s WHERE {id} IN ({ids})".format(
+                    table=connection.ops.quote_name(StudentModule._meta.db_table),
+                    state=column('state'),
+                    modified=column('modified'),
+                    id=column('id'),
+                    cases=" ".join(["WHEN %s THEN %s"] * len(batch)),
+                    ids=", ".join(["%s"] * len(batch)),
+                ),
+                list(itertools.chain.from_iterable(
+                    (student_module.id, student_module.state) for student_module in batch
+                )) + [modified] + [student_module.id for student_module in batch],
+            )
+        transaction.commit_unless_managed()
+
+    def _create_student_modules(self, user, course_key, block_keys_to_state):
+        """
+        Stores the states in `block_keys_to_state` for `user` in new StudentModules.
+
+        Returns the StudentModules which were inserted in bulk, and so whose history has
+        yet to be recorded. If any of them were created by another request in the meantime,
+        the states are saved one block at a time instead, and none are returned.
+        """
+        if not block_keys_to_state:
+            return []
+
+        new_modules = [
+            StudentModule(
                 student=user,
-                course_id=usage_key.course_key,
+                course_id=course_key,
                 module_state_key=usage_key,
-                defaults={
-                    'state': json.dumps(state),
-                    'module_type': usage_key.block_type,
-                },
+                module_type=usage_key.block_type,
+                state=json.dumps(state),
             )
+            for usage_key, state in block_keys_to_state.items()
+        ]
 
-            if not created:
-                if student_module.state is None:
-                    current_state = {}
-                else:
-                    current_state = json.loads(student_module.state)
-                current_state.update(state)
-                student_module.state = json.dumps(current_state)
-                # We just read this object, so we know that we can do an update
-                student_module.save(force_update=True)
+        savepoint = transaction.savepoint()
+        try:
+            if len(new_modules) == 1:
+                # Saving a single StudentModule gets its id back without querying
+                # for it, and the post_save handler records its history.
+                new_modules[0].save(force_insert=True)
+                new_modules = []
+            else:
+                StudentModule.objects.bulk_create(new_modules)
+        except IntegrityError:
+            transaction.savepoint_rollback(savepoint)
+            for usage_key, state in block_keys_to_state.items():
+                self._set_one(user, usage_key, state)
+            return []
+        transaction.savepoint_commit(savepoint)
+
+        # bulk_create doesn't set the ids of the new StudentModules, which their history refers to
+        new_modules = [
+            student_module
+            for student_module in new_modules
+            if student_module.module_type in StudentModuleHistory.HISTORY_SAVING_TYPES
+        ]
+        if new_modules:
+            new_modules_by_key = {student_module.module_state_key: student_module for student_module in new_modules}
+            for student_module in StudentModule.objects.chunked_filter(
+                    'module_state_key__in',
+                    new_modules_by_key.keys(),
+                    student=user,
+                    course_id=course_key,
+            ):
+                usage_key = student_module.module_state_key.map_into_course(course_key)
+                new_modules_by_key[usage_key].id = student_module.id
+        return new_modules
+
+    def _set_one(self, user, usage_key, state):
+        """
+        Overlays `state` over the one stored for `user` and the block `usage_key`,
+        creating its StudentModule if needed.
+        """
+        student_module, created = StudentModule.objects.get_or_create(
+            student=user,
+            course_id=usage_key.course_key,
+            module_state_key=usage_key,
+            defaults={
+                'state': json.dumps(state),
+                'module_type': usage_key.block_type,
+            },
+        )
+
+        if not created:
+            if student_module.state is None:
+                current_state = {}
+            else:
+                current_state = json.loads(student_module.state)
+            current_state.update(state)
+            student_module.state = json.dumps(current_state)
+            # We just read this object, so we know that we can do an update
+            student_module.save(force_update=True)
 
     @contract(
         username="basestring",
@@ -330,36 +493,118 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
         if len(student_modules) == 0:
             raise self.DoesNotExist()
 
-        history_entries = StudentModuleHistory.objects.filter(
+        history_entries = list(StudentModuleHistory.objects.filter(
             student_module__in=student_modules
-        ).order_by('-id')
+        ).order_by('-id'))
 
         # If no history records exist, let's force a save to get history started.
         if not history_entries:
             for student_module in student_modules:
                 student_module.save()
-            history_entries = StudentModuleHistory.objects.filter(
+            # The history of the saves may have been queued to be written in the background
+            flush_history()
+            history_entries = list(StudentModuleHistory.objects.filter(
                 student_module__in=student_modules
-            ).order_by('-id')
+            ).order_by('-id'))
+
+        return full_history_states(history_entries)
 
-        return history_entries
+    def _iter_student_modules(self, batch_size, **filters):
+        """
+        Yields (username, module_state_key, state, modified) for each :class:`~StudentModule`
+        matching `filters`, using the read replica if one is available.
+
+        The StudentModules are fetched `batch_size` at a time, in order of their ids, each batch
+        starting after the last id of the previous one, so that neither the database nor Django
+        has to hold all of them at once. `module_state_key` is the serialized key, and `state`
+        the JSON-encoded state.
+        """
+        queryset = use_read_replica_if_available(StudentModule.objects.filter(**filters))
+        last_id = 0
+        while True:
+            batch = list(
+                queryset.filter(id__gt=last_id).order_by('id').values_list(
+                    'id', 'student__username', 'module_state_key', 'state', 'modified'
+                )[:batch_size]
+            )
+            for row in batch:
+                yield row[1:]
+            if len(batch) < batch_size:
+                return
+            last_id = batch[-1][0]
 
+    def _decode_state(self, username, block_key, state):
+        """
+        Returns the state of `block_key` stored by `username` decoded from JSON, or None (after
+        logging) if it can't be decoded.
+        """
+        if state is None:
+            return {}
+        try:
+            return json.loads(state)
+        except ValueError:
+            log.error(u"Could not decode the state of %s for user %s", block_key, username)
+            return None
+
+    @contract(block_key=UsageKey, scope=ScopeBase, batch_size="int|None")
     def iter_all_for_block(self, block_key, scope=Scope.user_state, batch_size=None):
         """
         You get no ordering guarantees. Fetching will happen in batch_size
         increments. If you're using this method, you should be running in an
         async task.
+
+        Yields: an XBlockUserState for each user who stored state for the block.
+            States which can't be decoded are logged and skipped.
         """
         if scope != Scope.user_state:
             raise ValueError("Only Scope.user_state is supported")
-        raise NotImplementedError()
 
+        student_modules = self._iter_student_modules(
+            batch_size or self.DEFAULT_ITER_BATCH_SIZE,
+            course_id=block_key.course_key,
+            module_state_key=block_key,
+        )
+        for username, _module_state_key, state, modified in student_modules:
+            state = self._decode_state(username, block_key, state)
+            if state is not None:
+                yield XBlockUserState(username, block_key, state, modified, scope)
+
+    @contract(block_type="basestring|None", scope=ScopeBase, batch_size="int|None")
     def iter_all_for_course(self, course_key, block_type=None, scope=Scope.user_state, batch_size=None):
         """
         You get no ordering guarantees. Fetching will happen in batch_size
         increments. If you're using this method, you should be running in an
         async task.
+
+        Yields: an XBlockUserState for each user and block (of `block_type`,
+            if given) of the course for which state was stored.
+            States which can't be decoded are logged and skipped.
         """
         if scope != Scope.user_state:
             raise ValueError("Only Scope.user_state is supported")
-        raise NotImplementedError()
+
+        return self._iter_all_for_course(course_key, block_type, batch_size)
+
+    @contract(block_type="basestring|None", batch_size="int|None")
+    def iter_all_graded_for_course(self, course_key, block_type=None, batch_size=None):
+        """
+        Like iter_all_for_course, but only yields the user state of the blocks which
+        have been graded (e.g. problems which have been submitted), that is whose
+        StudentModule has a grade.
+        """
+        return self._iter_all_for_course(course_key, block_type, batch_size, grade__isnull=False)
+
+    def _iter_all_for_course(self, course_key, block_type, batch_size, **filters):
+        """
+        Yields an XBlockUserState for each :class:`~StudentModule` of the course (of
+        `block_type`, if given) matching `filters`.
+        """
+        filters['course_id'] = course_key
+        if block_type is not None:
+            filters['module_type'] = block_type
+        student_modules = self._iter_student_modules(batch_size or self.DEFAULT_ITER_BATCH_SIZE, **filters)
+        for username, module_state_key, state, modified in student_modules:
+            block_key = course_key.make_usage_key_from_deprecated_string(module_state_key)
+            state = self._decode_state(username, block_key, state)
+            if state is not None:
+                yield XBlockUserState(username, block_key, state, modified, Scope.user_state)
@@ -6,6 +6,7 @@ from nose.plugins.attrib import attr
 from pytz import UTC
 from django.utils.timezone import UTC as django_utc
 
+from django.conf import settings
 from django.core.urlresolvers import reverse
 from django.test import TestCase, RequestFactory
 from edxmako import add_lookup
@@ -16,6 +17,7 @@ import django_comment_client.utils as utils
 
 from courseware.tests.factories import InstructorFactory
 from courseware.tabs import get_course_tab_list
+from openedx.core.djangoapps.content.course_structures.tasks import update_course_structure
 from openedx.core.djangoapps.course_groups.cohorts import set_course_cohort_settings
 from student.tests.factories import UserFactory, AdminFactory, CourseEnrollmentFactory
 from openedx.core.djangoapps.util.testing import ContentGroupTestCase
@@ -929,6 +931,34 @@ class ContentGroupCategoryMapTestCase(CategoryMapTestMixin, ContentGroupTestCase
         )
 
 
+@attr('shard_1')
+@mock.patch.dict(settings.FEATURES, {'ENABLE_COURSE_BLOCK_STRUCTURE': True})
+class ContentGroupCategoryMapFromBlockStructureTestCase(ContentGroupCategoryMapTestCase):
+    """
+    Tests `get_discussion_category_map` built from the stored structure of
+    the course rather than from its discussion modules.
+    """
+    def setUp(self):
+        super(ContentGroupCategoryMapFromBlockStructureTestCase, self).setUp()
+        utils.clear_discussion_blocks_cache()
+        self.addCleanup(utils.clear_discussion_blocks_cache)
+        update_course_structure(unicode(self.course.id))
+        self.course = self.store.get_course(self.course.id)
+
+    def assert_category_map_equals(self, expected, requesting_user=None):
+        with mock.patch('django_comment_client.utils.modulestore') as mock_modulestore:
+            super(ContentGroupCategoryMapFromBlockStructureTestCase, self).assert_category_map_equals(
+                expected, requesting_user
+            )
+        self.assertFalse(mock_modulestore.called)
+
+    def test_discussion_blocks_cached(self):
+        discussion_ids = utils.get_discussion_categories_ids(self.course, self.staff_user)
+        with mock.patch('django_comment_client.utils.get_course_block_structure') as mock_get_block_structure:
+            self.assertEqual(utils.get_discussion_categories_ids(self.course, self.staff_user), discussion_ids)
+        self.assertFalse(mock_get_block_structure.called)
+
+
 class JsonResponseTestCase(TestCase, UnicodeTestMixin):
     def _test_unicode_data(self, text):
         response = utils.JsonResponse(text)
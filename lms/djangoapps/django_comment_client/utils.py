@@ -12,6 +12,7 @@ from django.utils.timezone import UTC
 import pystache_custom as pystache
 from opaque_keys.edx.locations import i4xEncoder
 from opaque_keys.edx.keys import CourseKey
+from util.module_utils import get_course_version
 from xmodule.modulestore.django import modulestore
 
 from django_comment_common.models import Role, FORUM_ROLE_STUDENT
@@ -19,10 +20,12 @@ from django_comment_client.permissions import check_permissions_by_view, cached_
 from edxmako import lookup_template
 
 from courseware.access import has_access
+from courseware.block_transformers import can_use_course_block_structure, get_course_block_structure
 from openedx.core.djangoapps.course_groups.cohorts import (
     get_course_cohort_settings, get_cohort_by_id, get_cohort_id, is_commentable_cohorted, is_course_cohorted
 )
 from openedx.core.djangoapps.course_groups.models import CourseUserGroup
+from lru_cache import LRUCache
 
 
 log = logging.getLogger(__name__)
@@ -61,23 +64,69 @@ def has_forum_access(uname, course_id, rolename):
     return role.users.filter(username=uname).exists()
 
 
+# How many courses' discussion blocks (see _get_discussion_modules) are kept
+# in memory, per process.
+DISCUSSION_BLOCKS_CACHE_SIZE = 100
+
+# (course key, course version) to the BlockData of the course's discussion
+# blocks.
+_DISCUSSION_BLOCKS_CACHE = LRUCache(DISCUSSION_BLOCKS_CACHE_SIZE)
+
+
+def clear_discussion_blocks_cache():
+    """
+    Empties the cache of courses' discussion blocks.
+    """
+    _DISCUSSION_BLOCKS_CACHE.clear()
+
+
+def _has_required_keys(module):
+    """
+    Returns whether the discussion module has the settings needed to place it
+    in the category map.
+    """
+    for key in ('discussion_id', 'discussion_category', 'discussion_target'):
+        if getattr(module, key, None) is None:
+            log.warning("Required key '%s' not in discussion %s, leaving out of category map" % (key, module.location))
+            return False
+    return True
+
+
+def _get_discussion_modules(course):
+    """
+    Returns the discussion modules of the course that have the required keys.
+
+    If the stored structure of the current version of the course can be used
+    (see get_course_block_structure), their BlockData is returned instead,
+    which provides the attributes of the modules used here and which
+    has_access understands. These are kept per course version, so that the
+    course's modules needn't be loaded as long as it isn't published again.
+    """
+    block_structure = None
+    if can_use_course_block_structure(course):
+        cache_key = (course.id, get_course_version(course))
+        blocks = _DISCUSSION_BLOCKS_CACHE.get(cache_key)
+        if blocks is not None:
+            return blocks
+        block_structure = get_course_block_structure(course)
+
+    if block_structure is None:
+        all_modules = modulestore().get_items(course.id, qualifiers={'category': 'discussion'})
+        return [module for module in all_modules if _has_required_keys(module)]
+
+    blocks = [block for block in block_structure.get_blocks_of_type('discussion') if _has_required_keys(block)]
+    _DISCUSSION_BLOCKS_CACHE.set(cache_key, blocks)
+    return blocks
+
+
 def get_accessible_discussion_modules(course, user, include_all=False):  # pylint: disable=invalid-name
     """
     Return a list of all valid discussion modules in this course that
     are accessible to the given user.
     """
-    all_modules = modulestore().get_items(course.id, qualifiers={'category': 'discussion'})
-
-    def has_required_keys(module):
-        for key in ('discussion_id', 'discussion_category', 'discussion_target'):
-            if getattr(module, key, None) is None:
-                log.warning("Required key '%s' not in discussion %s, leaving out of category map" % (key, module.location))
-                return False
-        return True
-
     return [
-        module for module in all_modules
-        if has_required_keys(module) and (include_all or has_access(user, 'load', module, course.id))
+        module for module in _get_discussion_modules(course)
+        if include_all or has_access(user, 'load', module, course.id)
     ]
 
 
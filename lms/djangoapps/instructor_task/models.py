@@ -20,6 +20,7 @@ import json
 import hashlib
 import os.path
 import urllib
+import zlib
 
 from boto.s3.connection import S3Connection
 from boto.s3.key import Key
@@ -193,10 +194,22 @@ class InstructorTask(models.Model):
 class ReportStore(object):
     """
     Simple abstraction layer that can fetch and store CSV files for reports
-    download. Should probably refactor later to create a ReportFile object that
-    can simply be appended to for the sake of memory efficiency, rather than
-    passing in the whole dataset. Doing that for now just because it's simpler.
+    download. Rows passed to `store_rows` may be any iterable (typically a
+    generator); they are written out as they are produced, so memory use is
+    bounded by the chunk size rather than by the size of the report.
     """
+    # Reports that are generated in several parts (see
+    # `instructor_task.tasks_helper.upload_grades_csv`) store each part under
+    # the final filename with a part number and this suffix appended. Files
+    # that are still being written also carry this suffix. Neither is listed
+    # by `links_for`.
+    PARTIAL_REPORT_SUFFIX = '.part'
+
+    # Number of bytes of a report that are buffered before being written out.
+    # S3 requires every part of a multipart upload but the last to be at
+    # least 5 MB.
+    DEFAULT_CHUNK_SIZE = 5 * 1024 * 1024
+
     @classmethod
     def from_config(cls, config_name):
         """
@@ -218,6 +231,37 @@ class ReportStore(object):
         for row in rows:
             yield [unicode(item).encode('utf-8') for item in row]
 
+    def _get_utf8_decoded_rows(self, lines):
+        """
+        Given an iterable of utf-8 encoded CSV `lines`, return an iterator
+        over the rows they contain, with every value decoded to unicode.
+        """
+        for row in csv.reader(lines):
+            yield [item.decode('utf-8') for item in row]
+
+    @classmethod
+    def is_partial_report(cls, filename):
+        """
+        Return True if `filename` names one part of a report that is generated
+        in several parts.
+        """
+        return filename.endswith(cls.PARTIAL_REPORT_SUFFIX)
+
+
+def _iter_lines(chunks):
+    """
+    Given an iterable of string `chunks`, return an iterator over the lines
+    they contain, keeping line endings.
+    """
+    pending = ''
+    for chunk in chunks:
+        lines = (pending + chunk).splitlines(True)
+        pending = lines.pop() if lines and not lines[-1].endswith('\n') else ''
+        for line in lines:
+            yield line
+    if pending:
+        yield pending
+
 
 class S3ReportStore(ReportStore):
     """
@@ -231,8 +275,9 @@ class S3ReportStore(ReportStore):
     conventions on where files are stored to know what to display. Clients using
     this class can name the final file whatever they want.
     """
-    def __init__(self, bucket_name, root_path):
+    def __init__(self, bucket_name, root_path, chunk_size=ReportStore.DEFAULT_CHUNK_SIZE):
         self.root_path = root_path
+        self.chunk_size = chunk_size
 
         conn = S3Connection(
             settings.AWS_ACCESS_KEY_ID,
@@ -252,13 +297,16 @@ class S3ReportStore(ReportStore):
             ROOT_PATH : The path you want to store all course files under. Do not
                         use a leading or trailing slash. e.g. "staging" or
                         "staging/2013", not "/staging", or "/staging/"
+            CHUNK_SIZE : (optional) Size in bytes of the parts in which large
+                         reports are uploaded. Must be at least 5 MB.
 
         Since S3 access relies on boto, you must also define `AWS_ACCESS_KEY_ID`
         and `AWS_SECRET_ACCESS_KEY` in settings.
         """
         return cls(
             getattr(settings, config_name).get("BUCKET"),
-            getattr(settings, config_name).get("ROOT_PATH")
+            getattr(settings, config_name).get("ROOT_PATH"),
+            getattr(settings, config_name).get("CHUNK_SIZE", cls.DEFAULT_CHUNK_SIZE),
         )
 
     def key_for(self, course_id, filename):
@@ -312,9 +360,13 @@ class S3ReportStore(ReportStore):
 
     def store_rows(self, course_id, filename, rows):
         """
-        Given a `course_id`, `filename`, and `rows` (each row is an iterable of
-        strings), create a buffer that is a gzip'd csv file, and then `store()`
-        that buffer.
+        Given a `course_id`, `filename`, and `rows` (an iterable of rows, each
+        an iterable of strings), write a gzip'd csv file to S3.
+
+        The compressed file is buffered in memory up to `self.chunk_size`
+        bytes. Reports that fit in a single chunk are `store()`d as is; larger
+        reports are sent as a multipart upload, one chunk at a time, so the
+        file only becomes visible once it is complete.
 
         Even though we store it in gzip format, browsers will transparently
         download and decompress it. Filenames should end in `.csv`, not `.gz`.
@@ -322,10 +374,56 @@ class S3ReportStore(ReportStore):
         output_buffer = StringIO()
         gzip_file = GzipFile(fileobj=output_buffer, mode="wb")
         csvwriter = csv.writer(gzip_file)
-        csvwriter.writerows(self._get_utf8_encoded_rows(rows))
-        gzip_file.close()
+        multipart_upload = None
+        num_parts = 0
+        try:
+            for row in self._get_utf8_encoded_rows(rows):
+                csvwriter.writerow(row)
+                if output_buffer.tell() >= self.chunk_size:
+                    if multipart_upload is None:
+                        multipart_upload = self.bucket.initiate_multipart_upload(
+                            self.key_for(course_id, filename).key,
+                            headers={"Content-Encoding": "gzip", "Content-Type": "text/csv"},
+                        )
+                    num_parts += 1
+                    self._upload_part(multipart_upload, num_parts, output_buffer)
+            gzip_file.close()
+
+            if multipart_upload is None:
+                self.store(course_id, filename, output_buffer)
+            else:
+                self._upload_part(multipart_upload, num_parts + 1, output_buffer)
+                multipart_upload.complete_upload()
+        except Exception:
+            if multipart_upload is not None:
+                multipart_upload.cancel_upload()
+            raise
+
+    def _upload_part(self, multipart_upload, part_number, output_buffer):
+        """
+        Upload the contents of `output_buffer` as part `part_number` of
+        `multipart_upload`, and empty the buffer.
+        """
+        multipart_upload.upload_part_from_file(StringIO(output_buffer.getvalue()), part_number)
+        output_buffer.seek(0)
+        output_buffer.truncate()
+
+    def read_rows(self, course_id, filename):
+        """
+        Return an iterator over the rows of the CSV file `filename` previously
+        stored with `store_rows()`. The file is downloaded and decompressed a
+        chunk at a time, so it is never held in memory in full.
+        """
+        key = self.key_for(course_id, filename)
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        chunks = (decompressor.decompress(chunk) for chunk in key)
+        return self._get_utf8_decoded_rows(_iter_lines(chunks))
 
-        self.store(course_id, filename, output_buffer)
+    def delete(self, course_id, filename):
+        """
+        Delete the file `filename` stored for `course_id`, if it exists.
+        """
+        self.key_for(course_id, filename).delete()
 
     def links_for(self, course_id):
         """
@@ -336,6 +434,7 @@ class S3ReportStore(ReportStore):
         return [
             (key.key.split("/")[-1], key.generate_url(expires_in=300))
             for key in sorted(self.bucket.list(prefix=course_dir.key), reverse=True, key=lambda k: k.last_modified)
+            if not self.is_partial_report(key.key)
         ]
 
 
@@ -383,24 +482,53 @@ class LocalFSReportStore(ReportStore):
         assumed to be a StringIO objecd (or anything that can flush its contents
         to string using `.getvalue()`).
         """
+        full_path = self._make_course_dir(course_id, filename)
+        with open(full_path, "wb") as f:
+            f.write(buff.getvalue())
+
+    def store_rows(self, course_id, filename, rows):
+        """
+        Given a course_id, filename, and rows (an iterable of rows, each an
+        iterable of strings), write this data out.
+
+        Rows are appended to the file as they are produced. The file is
+        written under a partial name and renamed once complete, so it is never
+        listed by `links_for` while it is being written.
+        """
+        full_path = self._make_course_dir(course_id, filename)
+        partial_path = full_path + self.PARTIAL_REPORT_SUFFIX
+        with open(partial_path, "wb") as f:
+            csvwriter = csv.writer(f)
+            csvwriter.writerows(self._get_utf8_encoded_rows(rows))
+        os.rename(partial_path, full_path)
+
+    def _make_course_dir(self, course_id, filename):
+        """
+        Create the directory in which files for `course_id` are stored, if
+        needed, and return the full path to `filename` in it.
+        """
         full_path = self.path_to(course_id, filename)
         directory = os.path.dirname(full_path)
         if not os.path.exists(directory):
             os.mkdir(directory)
+        return full_path
 
-        with open(full_path, "wb") as f:
-            f.write(buff.getvalue())
-
-    def store_rows(self, course_id, filename, rows):
+    def read_rows(self, course_id, filename):
         """
-        Given a course_id, filename, and rows (each row is an iterable of strings),
-        write this data out.
+        Return an iterator over the rows of the CSV file `filename` previously
+        stored with `store_rows()`.
         """
-        output_buffer = StringIO()
-        csvwriter = csv.writer(output_buffer)
-        csvwriter.writerows(self._get_utf8_encoded_rows(rows))
+        with open(self.path_to(course_id, filename), "rb") as csv_file:
+            for row in self._get_utf8_decoded_rows(csv_file):
+                yield row
 
-        self.store(course_id, filename, output_buffer)
+    def delete(self, course_id, filename):
+        """
+        Delete the file `filename` stored for `course_id`, if it exists.
+        """
+        path = self.path_to(course_id, filename)
+        if os.path.exists(path):
+            os.remove(path)
 
     def links_for(self, course_id):
         """
@@ -413,7 +541,11 @@ class LocalFSReportStore(ReportStore):
         course_dir = self.path_to(course_id, '')
         if not os.path.exists(course_dir):
             return []
-        files = [(filename, os.path.join(course_dir, filename)) for filename in os.listdir(course_dir)]
+        files = [
+            (filename, os.path.join(course_dir, filename))
+            for filename in os.listdir(course_dir)
+            if not self.is_partial_report(filename)
+        ]
         files.sort(key=lambda (filename, full_path): os.path.getmtime(full_path), reverse=True)
 
         return [
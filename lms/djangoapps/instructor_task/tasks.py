@@ -35,6 +35,7 @@ from instructor_task.tasks_helper import (
     reset_attempts_module_state,
     delete_problem_module_state,
     upload_grades_csv,
+    upload_grades_csv_shard,
     upload_problem_grade_report,
     upload_students_csv,
     cohort_students_and_upload,
@@ -159,6 +160,20 @@ def calculate_grades_csv(entry_id, xmodule_instance_args):
     return run_main_task(entry_id, task_fn, action_name)
 
 
+@task(routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY)  # pylint: disable=not-callable
+def calculate_grades_csv_shard(entry_id, xmodule_instance_args, part_index, student_ids, start_time, subtask_status_dict):
+    """
+    Grade one shard of the students of a course as a subtask of
+    `calculate_grades_csv`, and store their rows as a part of the grade report.
+
+    `subtask_status_dict` is a dict representation of the subtask's initial
+    SubtaskStatus (see `instructor_task.subtasks`).
+    """
+    return upload_grades_csv_shard(
+        entry_id, xmodule_instance_args, part_index, student_ids, start_time, subtask_status_dict
+    )
+
+
 @task(base=BaseInstructorTask, routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY)  # pylint: disable=not-callable
 def calculate_problem_grade_report(entry_id, xmodule_instance_args):
     """
@@ -8,7 +8,7 @@ from collections import OrderedDict
 from datetime import datetime
 from django.conf import settings
 from eventtracking import tracker
-from itertools import chain
+from itertools import chain, count, islice
 from time import time
 import unicodecsv
 import logging
@@ -16,6 +16,7 @@ import logging
 from celery import Task, current_task
 from celery.states import SUCCESS, FAILURE
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.core.files.storage import DefaultStorage
 from django.db import transaction, reset_queries
 import dogstats_wrapper as dog_stats_api
@@ -42,6 +43,12 @@ from courseware.module_render import get_module_for_descriptor_internal
 from instructor_analytics.basic import enrolled_students_features, list_may_enroll
 from instructor_analytics.csvs import format_dictlist
 from instructor_task.models import ReportStore, InstructorTask, PROGRESS
+from instructor_task.subtasks import (
+    SubtaskStatus,
+    queue_subtasks_for_query,
+    check_subtask_is_valid,
+    update_subtask_status,
+)
 from lms.djangoapps.lms_xblock.runtime import LmsPartitionService
 from openedx.core.djangoapps.course_groups.cohorts import get_cohort
 from openedx.core.djangoapps.course_groups.models import CourseUserGroup
@@ -63,6 +70,13 @@ UPDATE_STATUS_SUCCEEDED = 'succeeded'
 UPDATE_STATUS_FAILED = 'failed'
 UPDATE_STATUS_SKIPPED = 'skipped'
 
+# Header of the CSV listing students that could not be graded
+GRADE_REPORT_ERR_HEADER = ["id", "username", "error_msg"]
+
+# Number of seconds for which the count of completed grade report parts is
+# kept in the cache. Every part must complete within this time.
+GRADE_REPORT_PARTS_TIMEOUT = 24 * 60 * 60
+
 # The setting name used for events when "settings" (account settings, preferences, profile information) change.
 REPORT_REQUESTED_EVENT_NAME = u'edx.instructor.report.requested'
 
@@ -540,13 +554,25 @@ def delete_problem_module_state(xmodule_instance_args, _module_descriptor, stude
     return UPDATE_STATUS_SUCCEEDED
 
 
+def _report_csv_filename(csv_name, course_id, timestamp):
+    """
+    Return the filename under which the CSV report `csv_name` generated at
+    `timestamp` is stored.
+    """
+    return u"{course_prefix}_{csv_name}_{timestamp_str}.csv".format(
+        course_prefix=course_filename_prefix_generator(course_id),
+        csv_name=csv_name,
+        timestamp_str=timestamp.strftime("%Y-%m-%d-%H%M")
+    )
+
+
 def upload_csv_to_report_store(rows, csv_name, course_id, timestamp, config_name='GRADES_DOWNLOAD'):
     """
     Upload data as a CSV using ReportStore.
 
     Arguments:
-        rows: CSV data in the following format (first column may be a
-            header):
+        rows: CSV data as any iterable (e.g. a generator) of rows in the
+            following format (first row may be a header):
             [
                 [row1_colum1, row1_colum2, ...],
                 ...
@@ -557,11 +583,7 @@ def upload_csv_to_report_store(rows, csv_name, course_id, timestamp, config_name
     report_store = ReportStore.from_config(config_name)
     report_store.store_rows(
         course_id,
-        u"{course_prefix}_{csv_name}_{timestamp_str}.csv".format(
-            course_prefix=course_filename_prefix_generator(course_id),
-            csv_name=csv_name,
-            timestamp_str=timestamp.strftime("%Y-%m-%d-%H%M")
-        ),
+        _report_csv_filename(csv_name, course_id, timestamp),
         rows
     )
     tracker.emit(REPORT_REQUESTED_EVENT_NAME, {"report_type": csv_name, })
@@ -597,7 +619,7 @@ def upload_exec_summary_to_store(data_dict, report_name, course_id, generated_at
     tracker.emit(REPORT_REQUESTED_EVENT_NAME, {"report_type": report_name})
 
 
-def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input, action_name):  # pylint: disable=too-many-statements
+def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input, action_name):
     """
     For a given `course_id`, generate a grades CSV file for all students that
     are enrolled, and store using a `ReportStore`. Once created, the files can
@@ -606,15 +628,20 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
     buffered, so we'll never write part of a CSV file to S3 -- i.e. any files
     that are visible in ReportStore will be complete ones.
 
+    If `settings.GRADES_DOWNLOAD_STUDENTS_PER_TASK` is set and more students
+    than that are enrolled, the students are split by id range into shards
+    which are graded by subtasks (see `upload_grades_csv_shard`), and the
+    parts they write are merged into the final report once all of them have
+    completed.
+
     As we start to add more CSV downloads, it will probably be worthwhile to
     make a more general CSVDoc class instead of building out the rows like we
     do here.
     """
     start_time = time()
     start_date = datetime.now(UTC)
-    status_interval = 100
     enrolled_students = CourseEnrollment.objects.users_enrolled_in(course_id)
-    task_progress = TaskProgress(action_name, enrolled_students.count(), start_time)
+    total_enrolled_students = enrolled_students.count()
 
     fmt = u'Task: {task_id}, InstructorTask ID: {entry_id}, Course: {course_id}, Input: {task_input}'
     task_info_string = fmt.format(
@@ -625,7 +652,56 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
     )
     TASK_LOG.info(u'%s, Task type: %s, Starting task execution', task_info_string, action_name)
 
+    students_per_task = settings.GRADES_DOWNLOAD_STUDENTS_PER_TASK
+    if students_per_task and total_enrolled_students > students_per_task:
+        return _queue_grade_report_shards(
+            _xmodule_instance_args,
+            _entry_id,
+            action_name,
+            enrolled_students.order_by('id'),
+            total_enrolled_students,
+            students_per_task,
+            start_time,
+        )
+
+    task_progress = TaskProgress(action_name, total_enrolled_students, start_time)
     course = get_course_by_id(course_id)
+
+    # Rows are uploaded as students are graded
+    err_rows = []
+    upload_csv_to_report_store(
+        _grade_report_rows(
+            course, enrolled_students, total_enrolled_students, task_progress, err_rows, task_info_string, action_name
+        ),
+        'grade_report',
+        course_id,
+        start_date
+    )
+
+    current_step = {'step': 'Uploading CSVs'}
+    task_progress.update_task_state(extra_meta=current_step)
+    TASK_LOG.info(u'%s, Task type: %s, Current step: %s', task_info_string, action_name, current_step)
+
+    # If there are any error rows, write them out as well
+    if err_rows:
+        upload_csv_to_report_store([GRADE_REPORT_ERR_HEADER] + err_rows, 'grade_report_err', course_id, start_date)
+
+    # One last update before we close out...
+    TASK_LOG.info(u'%s, Task type: %s, Finalizing grade task', task_info_string, action_name)
+    return task_progress.update_task_state(extra_meta=current_step)
+
+
+def _grade_report_rows(course, students, total_students, task_progress, err_rows, task_info_string, action_name):  # pylint: disable=too-many-statements
+    """
+    Grade `students` in `course`, yielding the rows of the grade report for
+    them as they are graded and recording progress in `task_progress`.
+
+    The header row is yielded before the first student row, and only if at
+    least one student could be graded. A row for each student that could not
+    be graded is appended to `err_rows` (see GRADE_REPORT_ERR_HEADER).
+    """
+    status_interval = 100
+    course_id = course.id
     course_is_cohorted = is_course_cohorted(course.id)
     cohorts_header = ['Cohort Name'] if course_is_cohorted else []
 
@@ -636,22 +712,18 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
     certificate_whitelist = CertificateWhitelist.objects.filter(course_id=course_id, whitelist=True)
     whitelisted_user_ids = [entry.user_id for entry in certificate_whitelist]
 
-    # Loop over all our students and build our CSV lists in memory
     header = None
-    rows = []
-    err_rows = [["id", "username", "error_msg"]]
     current_step = {'step': 'Calculating Grades'}
 
-    total_enrolled_students = enrolled_students.count()
     student_counter = 0
     TASK_LOG.info(
         u'%s, Task type: %s, Current step: %s, Starting grade calculation for total students: %s',
         task_info_string,
         action_name,
         current_step,
-        total_enrolled_students
+        total_students
     )
-    for student, gradeset, err_msg in iterate_grades_for(course_id, enrolled_students):
+    for student, gradeset, err_msg in iterate_grades_for(course, students):
         # Periodically update task status (this is a cache write)
         if task_progress.attempted % status_interval == 0:
             task_progress.update_task_state(extra_meta=current_step)
@@ -666,7 +738,7 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
             action_name,
             current_step,
             student_counter,
-            total_enrolled_students
+            total_students
         )
 
         if gradeset:
@@ -674,7 +746,7 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
             task_progress.succeeded += 1
             if not header:
                 header = [section['label'] for section in gradeset[u'section_breakdown']]
-                rows.append(
+                yield (
                     ["id", "email", "username", "grade"] + header + cohorts_header +
                     group_configs_header + ['Enrollment Track', 'Verification Status'] + certificate_info_header
                 )
@@ -715,7 +787,7 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
             # possible for a student to have a 0.0 show up in their row but
             # still have 100% for the course.
             row_percents = [percents.get(label, 0.0) for label in header]
-            rows.append(
+            yield (
                 [student.id, student.email, student.username, gradeset['percent']] +
                 row_percents + cohorts_group_name + group_configs_group_names +
                 [enrollment_mode] + [verification_status] + certificate_info
@@ -731,24 +803,224 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
         action_name,
         current_step,
         student_counter,
-        total_enrolled_students
+        total_students
     )
 
-    # By this point, we've got the rows we're going to stuff into our CSV files.
-    current_step = {'step': 'Uploading CSVs'}
-    task_progress.update_task_state(extra_meta=current_step)
-    TASK_LOG.info(u'%s, Task type: %s, Current step: %s', task_info_string, action_name, current_step)
 
-    # Perform the actual upload
-    upload_csv_to_report_store(rows, 'grade_report', course_id, start_date)
+def _grade_report_part_filename(csv_name, course_id, timestamp, part_index):
+    """
+    Return the filename under which part `part_index` of the CSV report
+    `csv_name` generated at `timestamp` is stored.
+    """
+    return u"{}.{:05d}{}".format(
+        _report_csv_filename(csv_name, course_id, timestamp),
+        part_index,
+        ReportStore.PARTIAL_REPORT_SUFFIX
+    )
 
-    # If there are any error rows (don't count the header), write them out as well
-    if len(err_rows) > 1:
-        upload_csv_to_report_store(err_rows, 'grade_report_err', course_id, start_date)
 
-    # One last update before we close out...
-    TASK_LOG.info(u'%s, Task type: %s, Finalizing grade task', task_info_string, action_name)
-    return task_progress.update_task_state(extra_meta=current_step)
+def _queue_grade_report_shards(
+        xmodule_instance_args, entry_id, action_name, students, total_num_students, students_per_task, start_time
+):
+    """
+    Queue `upload_grades_csv_shard` subtasks grading `students` in shards of
+    at most `students_per_task` students each, ordered by id.
+    """
+    # Import here to avoid a circular import.
+    from instructor_task.tasks import calculate_grades_csv_shard
+
+    entry = InstructorTask.objects.get(pk=entry_id)
+    part_indexes = count()
+
+    def _create_grade_report_subtask(student_list, initial_subtask_status):
+        """Creates a subtask to grade the students in `student_list`."""
+        return calculate_grades_csv_shard.subtask(
+            (
+                entry_id,
+                xmodule_instance_args,
+                next(part_indexes),
+                [student['pk'] for student in student_list],
+                start_time,
+                initial_subtask_status.to_dict(),
+            ),
+            task_id=initial_subtask_status.task_id,
+            routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY,
+        )
+
+    return queue_subtasks_for_query(
+        entry,
+        action_name,
+        _create_grade_report_subtask,
+        [students],
+        [],
+        students_per_task,
+        total_num_students,
+    )
+
+
+def upload_grades_csv_shard(entry_id, xmodule_instance_args, part_index, student_ids, start_time, subtask_status_dict):
+    """
+    Grade the students with ids `student_ids` and store their rows of the
+    grade report (and of the error report) as part `part_index` of the
+    reports generated at `start_time`. The first row of a non-empty part is
+    the report header.
+
+    The subtask that completes last merges all the parts into the final
+    reports (see `merge_grade_report_parts`).
+    """
+    subtask_status = SubtaskStatus.from_dict(subtask_status_dict)
+    current_task_id = subtask_status.task_id
+    check_subtask_is_valid(entry_id, current_task_id, subtask_status)
+
+    entry = InstructorTask.objects.get(pk=entry_id)
+    course_id = entry.course_id
+    timestamp = datetime.fromtimestamp(start_time, UTC)
+    task_info_string = u'Task: {task_id}, InstructorTask ID: {entry_id}, Course: {course_id}, Part: {part}'.format(
+        task_id=current_task_id,
+        entry_id=entry_id,
+        course_id=course_id,
+        part=part_index,
+    )
+    action_name = json.loads(entry.task_output)['action_name']
+
+    try:
+        task_progress = TaskProgress(action_name, len(student_ids), time())
+        course = get_course_by_id(course_id)
+        students = User.objects.filter(id__in=student_ids).order_by('id')
+        err_rows = []
+        report_store = ReportStore.from_config('GRADES_DOWNLOAD')
+        report_store.store_rows(
+            course_id,
+            _grade_report_part_filename('grade_report', course_id, timestamp, part_index),
+            _grade_report_rows(
+                course, students, len(student_ids), task_progress, err_rows, task_info_string, action_name
+            )
+        )
+        report_store.store_rows(
+            course_id,
+            _grade_report_part_filename('grade_report_err', course_id, timestamp, part_index),
+            err_rows
+        )
+    except Exception:
+        TASK_LOG.exception(u'%s, Grade report part failed unexpectedly', task_info_string)
+        subtask_status.increment(failed=len(student_ids), state=FAILURE)
+        update_subtask_status(entry_id, current_task_id, subtask_status)
+        # The failure is recorded before this part is counted as done, so the
+        # last part to complete always sees it.
+        if _count_grade_report_part_done(entry_id):
+            _discard_grade_report_parts(entry_id, course_id, timestamp, task_info_string)
+        raise
+
+    # The last part to complete puts the report together before recording
+    # its status, so that the task is not reported as complete before the
+    # report can be downloaded.
+    merged = True
+    if _count_grade_report_part_done(entry_id):
+        merged = _merge_grade_report(entry_id, course_id, timestamp, task_info_string)
+
+    subtask_status.increment(succeeded=task_progress.succeeded, failed=task_progress.failed, state=SUCCESS)
+    update_subtask_status(entry_id, current_task_id, subtask_status)
+    if not merged:
+        _discard_grade_report_parts(entry_id, course_id, timestamp, task_info_string)
+
+    return subtask_status.to_dict()
+
+
+def _count_grade_report_part_done(entry_id):
+    """
+    Count one more part of the grade report of InstructorTask `entry_id` as
+    done (whether it succeeded or failed), and return True if it was the last
+    one.
+    """
+    entry = InstructorTask.objects.get(pk=entry_id)
+    total = json.loads(entry.subtasks)['total']
+    counter_key = u'grade-report-parts-done-{}'.format(entry.task_id)
+    # cache.add does nothing if the key already exists, and cache.incr is
+    # atomic, so exactly one part sees the final count.
+    cache.add(counter_key, 0, GRADE_REPORT_PARTS_TIMEOUT)
+    return cache.incr(counter_key) >= total
+
+
+def _merge_grade_report(entry_id, course_id, timestamp, task_info_string):
+    """
+    Merge the parts of the grade report of InstructorTask `entry_id`, unless
+    any of them failed. Return True if the report was merged.
+    """
+    subtask_dict = json.loads(InstructorTask.objects.get(pk=entry_id).subtasks)
+    if subtask_dict['failed']:
+        TASK_LOG.error(
+            u'%s, %s of %s grade report parts failed; not merging the report',
+            task_info_string, subtask_dict['failed'], subtask_dict['total']
+        )
+        return False
+    try:
+        merge_grade_report_parts(course_id, subtask_dict['total'], timestamp)
+    except Exception:  # pylint: disable=broad-except
+        TASK_LOG.exception(u'%s, Merging the grade report parts failed', task_info_string)
+        return False
+    return True
+
+
+def _discard_grade_report_parts(entry_id, course_id, timestamp, task_info_string):
+    """
+    Delete the parts of a grade report that could not be put together, and
+    mark InstructorTask `entry_id` as failed.
+    """
+    entry = InstructorTask.objects.get(pk=entry_id)
+    delete_grade_report_parts(course_id, json.loads(entry.subtasks)['total'], timestamp)
+    TASK_LOG.error(u'%s, Marking the grade report task as failed', task_info_string)
+    InstructorTask.objects.filter(pk=entry_id).update(task_state=FAILURE)
+
+
+def merge_grade_report_parts(course_id, num_parts, timestamp):
+    """
+    Merge the `num_parts` parts of the grade report (and of the error
+    report) generated at `timestamp` into the final reports, streaming the
+    rows from one part at a time, and delete the parts.
+    """
+    report_store = ReportStore.from_config('GRADES_DOWNLOAD')
+
+    def _merged_rows(csv_name, header):
+        """
+        Yield `header` (if given) followed by the rows of all parts of the
+        report `csv_name`, in order, skipping the header row of each part.
+        """
+        if header:
+            yield header
+        for part_index in xrange(num_parts):
+            part_filename = _grade_report_part_filename(csv_name, course_id, timestamp, part_index)
+            part_rows = report_store.read_rows(course_id, part_filename)
+            if header:
+                next(part_rows, None)
+            for row in part_rows:
+                yield row
+
+    # The header is the first row of the first non-empty part.
+    header = None
+    for part_index in xrange(num_parts):
+        part_filename = _grade_report_part_filename('grade_report', course_id, timestamp, part_index)
+        header = next(iter(report_store.read_rows(course_id, part_filename)), None)
+        if header:
+            break
+
+    upload_csv_to_report_store(_merged_rows('grade_report', header), 'grade_report', course_id, timestamp)
+
+    err_rows = list(_merged_rows('grade_report_err', None))
+    if err_rows:
+        upload_csv_to_report_store([GRADE_REPORT_ERR_HEADER] + err_rows, 'grade_report_err', course_id, timestamp)
+
+    delete_grade_report_parts(course_id, num_parts, timestamp)
+
+
+def delete_grade_report_parts(course_id, num_parts, timestamp):
+    """
+    Delete the `num_parts` parts of the grade report (and of the error
+    report) generated at `timestamp`, if they exist.
+    """
+    report_store = ReportStore.from_config('GRADES_DOWNLOAD')
+    for part_index in xrange(num_parts):
+        for csv_name in ('grade_report', 'grade_report_err'):
+            report_store.delete(course_id, _grade_report_part_filename(csv_name, course_id, timestamp, part_index))
 
 
 def _order_problems(blocks):
@@ -808,7 +1080,6 @@ def upload_problem_grade_report(_xmodule_instance_args, _entry_id, course_id, _t
     """
     start_time = time()
     start_date = datetime.now(UTC)
-    status_interval = 100
     enrolled_students = CourseEnrollment.objects.users_enrolled_in(course_id)
     task_progress = TaskProgress(action_name, enrolled_students.count(), start_time)
 
@@ -826,12 +1097,36 @@ def upload_problem_grade_report(_xmodule_instance_args, _entry_id, course_id, _t
             extra_meta={'step': 'Generating course structure. Please refresh and try again.'}
         )
 
-    # Just generate the static fields for now.
-    rows = [list(header_row.values()) + ['Final Grade'] + list(chain.from_iterable(problems.values()))]
     error_rows = [list(header_row.values()) + ['error_msg']]
+    rows = _problem_grade_report_rows(course_id, enrolled_students, header_row, problems, task_progress, error_rows)
+
+    # Perform the upload if any students have been successfully graded, that
+    # is if there is a row after the header. Rows are uploaded as they are
+    # generated.
+    first_rows = list(islice(rows, 2))
+    if len(first_rows) > 1:
+        upload_csv_to_report_store(chain(first_rows, rows), 'problem_grade_report', course_id, start_date)
+    # If there are any error rows, write them out as well
+    if len(error_rows) > 1:
+        upload_csv_to_report_store(error_rows, 'problem_grade_report_err', course_id, start_date)
+
+    return task_progress.update_task_state(extra_meta={'step': 'Uploading CSV'})
+
+
+def _problem_grade_report_rows(course_id, students, header_row, problems, task_progress, error_rows):
+    """
+    Grade `students`, yielding the header row of the problem grade report
+    followed by a row of problem scores per student that could be graded.
+    A row for each student that could not be graded is appended to
+    `error_rows`.
+    """
+    status_interval = 100
     current_step = {'step': 'Calculating Grades'}
 
-    for student, gradeset, err_msg in iterate_grades_for(course_id, enrolled_students, keep_raw_scores=True):
+    # Just generate the static fields for now.
+    yield list(header_row.values()) + ['Final Grade'] + list(chain.from_iterable(problems.values()))
+
+    for student, gradeset, err_msg in iterate_grades_for(course_id, students, keep_raw_scores=True):
         student_fields = [getattr(student, field_name) for field_name in header_row]
         task_progress.attempted += 1
 
@@ -859,21 +1154,12 @@ def upload_problem_grade_report(_xmodule_instance_args, _entry_id, course_id, _t
                 # the case that the student does not have access to it (e.g. A/B
                 # test or cohorted courseware).
                 earned_possible_values.append(['N/A', 'N/A'])
-        rows.append(student_fields + [final_grade] + list(chain.from_iterable(earned_possible_values)))
+        yield student_fields + [final_grade] + list(chain.from_iterable(earned_possible_values))
 
         task_progress.succeeded += 1
         if task_progress.attempted % status_interval == 0:
             task_progress.update_task_state(extra_meta=current_step)
 
-    # Perform the upload if any students have been successfully graded
-    if len(rows) > 1:
-        upload_csv_to_report_store(rows, 'problem_grade_report', course_id, start_date)
-    # If there are any error rows, write them out as well
-    if len(error_rows) > 1:
-        upload_csv_to_report_store(error_rows, 'problem_grade_report_err', course_id, start_date)
-
-    return task_progress.update_task_state(extra_meta={'step': 'Uploading CSV'})
-
 
 def upload_students_csv(_xmodule_instance_args, _entry_id, course_id, task_input, action_name):
     """
@@ -916,7 +1202,6 @@ def upload_enrollment_report(_xmodule_instance_args, _entry_id, course_id, _task
     """
     start_time = time()
     start_date = datetime.now(UTC)
-    status_interval = 100
     students_in_course = CourseEnrollment.objects.enrolled_and_dropped_out_users(course_id)
     task_progress = TaskProgress(action_name, students_in_course.count(), start_time)
 
@@ -929,13 +1214,8 @@ def upload_enrollment_report(_xmodule_instance_args, _entry_id, course_id, _task
     )
     TASK_LOG.info(u'%s, Task type: %s, Starting task execution', task_info_string, action_name)
 
-    # Loop over all our students and build our CSV lists in memory
-    rows = []
-    header = None
     current_step = {'step': 'Gathering Profile Information'}
-    enrollment_report_provider = PaidCourseEnrollmentReportProvider()
     total_students = students_in_course.count()
-    student_counter = 0
     TASK_LOG.info(
         u'%s, Task type: %s, Current step: %s, generating detailed enrollment report for total students: %s',
         task_info_string,
@@ -944,7 +1224,36 @@ def upload_enrollment_report(_xmodule_instance_args, _entry_id, course_id, _task
         total_students
     )
 
-    for student in students_in_course:
+    # Perform the actual upload; rows are uploaded as they are generated.
+    upload_csv_to_report_store(
+        _enrollment_report_rows(course_id, students_in_course, total_students, task_progress, task_info_string, action_name),
+        'enrollment_report',
+        course_id,
+        start_date,
+        config_name='FINANCIAL_REPORTS'
+    )
+
+    current_step = {'step': 'Uploading CSVs'}
+    task_progress.update_task_state(extra_meta=current_step)
+    TASK_LOG.info(u'%s, Task type: %s, Current step: %s', task_info_string, action_name, current_step)
+
+    # One last update before we close out...
+    TASK_LOG.info(u'%s, Task type: %s, Finalizing detailed enrollment task', task_info_string, action_name)
+    return task_progress.update_task_state(extra_meta=current_step)
+
+
+def _enrollment_report_rows(course_id, students, total_students, task_progress, task_info_string, action_name):
+    """
+    Yield the header row of the detailed enrollment report followed by a row
+    of profile, enrollment and payment information per student in `students`.
+    """
+    status_interval = 100
+    header = None
+    current_step = {'step': 'Gathering Profile Information'}
+    enrollment_report_provider = PaidCourseEnrollmentReportProvider()
+    student_counter = 0
+
+    for student in students:
         # Periodically update task status (this is a cache write)
         if task_progress.attempted % status_interval == 0:
             task_progress.update_task_state(extra_meta=current_step)
@@ -1001,9 +1310,9 @@ def upload_enrollment_report(_xmodule_instance_args, _entry_id, course_id, _task
             for header_element in header:
                 # translate header into a localizable display string
                 display_headers.append(enrollment_report_headers.get(header_element, header_element))
-            rows.append(display_headers)
+            yield display_headers
 
-        rows.append(user_data.values() + course_enrollment_data.values() + payment_data.values())
+        yield user_data.values() + course_enrollment_data.values() + payment_data.values()
         task_progress.succeeded += 1
 
     TASK_LOG.info(
@@ -1015,18 +1324,6 @@ def upload_enrollment_report(_xmodule_instance_args, _entry_id, course_id, _task
         total_students
     )
 
-    # By this point, we've got the rows we're going to stuff into our CSV files.
-    current_step = {'step': 'Uploading CSVs'}
-    task_progress.update_task_state(extra_meta=current_step)
-    TASK_LOG.info(u'%s, Task type: %s, Current step: %s', task_info_string, action_name, current_step)
-
-    # Perform the actual upload
-    upload_csv_to_report_store(rows, 'enrollment_report', course_id, start_date, config_name='FINANCIAL_REPORTS')
-
-    # One last update before we close out...
-    TASK_LOG.info(u'%s, Task type: %s, Finalizing detailed enrollment task', task_info_string, action_name)
-    return task_progress.update_task_state(extra_meta=current_step)
-
 
 def upload_may_enroll_csv(_xmodule_instance_args, _entry_id, course_id, task_input, action_name):
     """
@@ -23,8 +23,18 @@ class MockKey(object):
 
     def set_contents_from_string(self, contents, headers):  # pylint: disable=unused-argument
         """ Expected method on a Key object. """
+        self.contents = contents
         self.bucket.store_key(self)
 
+    def __iter__(self):
+        """ Expected method on a Key object; yields the stored contents in small chunks. """
+        contents = self.bucket.get_key(self.key).contents
+        return (contents[index:index + 16] for index in xrange(0, len(contents), 16))
+
+    def delete(self):
+        """ Expected method on a Key object. """
+        self.bucket.keys = [key for key in self.bucket.keys if key.key != self.key]
+
     def generate_url(self, expires_in):  # pylint: disable=unused-argument
         """ Expected method on a Key object. """
         return "http://fake-edx-s3.edx.org/"
@@ -43,6 +53,36 @@ class MockBucket(object):
         """ Expected method on a Bucket object. """
         return self.keys
 
+    def get_key(self, key_name):
+        """ Expected method on a Bucket object. """
+        return next(key for key in self.keys if key.key == key_name)
+
+    def initiate_multipart_upload(self, key_name, headers):  # pylint: disable=unused-argument
+        """ Expected method on a Bucket object. """
+        return MockMultiPartUpload(self, key_name)
+
+
+class MockMultiPartUpload(object):
+    """ Mocking a boto S3 MultiPartUpload object. """
+    def __init__(self, bucket, key_name):
+        self.bucket = bucket
+        self.key_name = key_name
+        self.parts = {}
+
+    def upload_part_from_file(self, fp, part_num):
+        """ Expected method on a MultiPartUpload object. """
+        self.parts[part_num] = fp.read()
+
+    def complete_upload(self):
+        """ Expected method on a MultiPartUpload object. """
+        key = MockKey(self.bucket)
+        key.key = self.key_name
+        key.set_contents_from_string(''.join(self.parts[num] for num in sorted(self.parts)), headers={})
+
+    def cancel_upload(self):
+        """ Expected method on a MultiPartUpload object. """
+        self.parts = {}
+
 
 class MockS3Connection(object):
     """ Mocking a boto S3 Connection """
@@ -84,6 +124,46 @@ class ReportStoreTestMixin(object):
             ['new_file', 'middle_file', 'old_file']
         )
 
+    def test_read_rows(self):
+        """
+        Test that rows stored with ReportStore.store_rows() can be read back.
+        """
+        report_store = self.create_report_store()
+        rows = [[u'id', u'name'], [1, u'ni\xf1o'], [2, u'a "quoted",\r\nvalue']]
+        report_store.store_rows(self.course_id, 'report.csv', rows)
+        self.assertEqual(
+            list(report_store.read_rows(self.course_id, 'report.csv')),
+            [[u'id', u'name'], [u'1', u'ni\xf1o'], [u'2', u'a "quoted",\r\nvalue']]
+        )
+
+    def test_store_rows_streaming(self):
+        """
+        Test that rows can be stored from a generator, in several chunks.
+        """
+        report_store = self.create_report_store()
+        report_store.chunk_size = 64
+        rows = ([index, u'row {}'.format(index)] for index in xrange(500))
+        report_store.store_rows(self.course_id, 'report.csv', rows)
+        self.assertEqual(
+            list(report_store.read_rows(self.course_id, 'report.csv')),
+            [[unicode(index), u'row {}'.format(index)] for index in xrange(500)]
+        )
+        self.assertEqual([link[0] for link in report_store.links_for(self.course_id)], ['report.csv'])
+
+    def test_partial_reports(self):
+        """
+        Test that parts of reports are not listed by ReportStore.links_for(),
+        and can be deleted.
+        """
+        report_store = self.create_report_store()
+        part_filename = 'report.csv.00000' + report_store.PARTIAL_REPORT_SUFFIX
+        report_store.store_rows(self.course_id, 'report.csv', [])
+        report_store.store_rows(self.course_id, part_filename, [[u'id']])
+        self.assertEqual([link[0] for link in report_store.links_for(self.course_id)], ['report.csv'])
+
+        report_store.delete(self.course_id, part_filename)
+        self.assertEqual([link[0] for link in report_store.links_for(self.course_id)], ['report.csv'])
+
 
 class LocalFSReportStoreTestCase(ReportStoreTestMixin, TestReportMixin, TestCase):
     """
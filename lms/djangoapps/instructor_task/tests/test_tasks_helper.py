@@ -7,18 +7,24 @@ Tests that CSV grade report generation works with unicode emails.
 
 """
 import ddt
+import json
+import os
 from mock import Mock, patch
 import tempfile
 import unicodecsv
+from uuid import uuid4
+from celery.states import SUCCESS, FAILURE
 from django.core.urlresolvers import reverse
+from django.test.utils import override_settings
 
 from capa.tests.response_xml_factory import MultipleChoiceResponseXMLFactory
 from certificates.tests.factories import GeneratedCertificateFactory, CertificateWhitelistFactory
 from course_modes.models import CourseMode
 from courseware.tests.factories import InstructorFactory
-from instructor_task.models import ReportStore
+from instructor_task.models import InstructorTask, ReportStore
 from instructor_task.tasks_helper import cohort_students_and_upload, upload_grades_csv, upload_students_csv, \
     upload_enrollment_report, upload_exec_summary_report
+from instructor_task.tests.factories import InstructorTaskFactory
 from instructor_task.tests.test_base import InstructorTaskCourseTestCase, TestReportMixin, InstructorTaskModuleTestCase
 from openedx.core.djangoapps.course_groups.models import CourseUserGroupPartitionGroup
 from openedx.core.djangoapps.course_groups.tests.helpers import CohortFactory
@@ -84,6 +90,55 @@ class TestInstructorGradeReport(TestReportMixin, InstructorTaskCourseTestCase):
         report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
         self.assertTrue(any('grade_report_err' in item[0] for item in report_store.links_for(self.course.id)))
 
+    @override_settings(GRADES_DOWNLOAD_STUDENTS_PER_TASK=2)
+    @patch('instructor_task.tasks_helper._get_current_task')
+    def test_sharded_grade_report(self, _mock_current_task):
+        """
+        Test that grade reports for courses with many students are graded by
+        subtasks, and that their parts are merged into a single report.
+        """
+        usernames = ['student{}'.format(index) for index in range(5)]
+        for username in usernames:
+            self.create_student(username)
+        entry = InstructorTaskFactory.create(course_id=self.course.id, task_id=str(uuid4()))
+
+        upload_grades_csv(None, entry.id, self.course.id, None, 'graded')
+
+        entry = InstructorTask.objects.get(pk=entry.id)
+        subtasks = json.loads(entry.subtasks)
+        self.assertEqual((subtasks['total'], subtasks['succeeded'], subtasks['failed']), (3, 3, 0))
+        self.assertDictContainsSubset(
+            {'attempted': 5, 'succeeded': 5, 'failed': 0},
+            json.loads(entry.task_output)
+        )
+
+        # Only the merged report remains: no error report and no parts.
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        links = report_store.links_for(self.course.id)
+        self.assertEqual(len(links), 1)
+        with open(report_store.path_to(self.course.id, links[0][0])) as csv_file:
+            self.assertEqual([row['username'] for row in unicodecsv.DictReader(csv_file)], usernames)
+        self.assertEqual(os.listdir(report_store.path_to(self.course.id, '')), [links[0][0]])
+        self.assertEqual(entry.task_state, SUCCESS)
+
+    @override_settings(GRADES_DOWNLOAD_STUDENTS_PER_TASK=2)
+    @patch('instructor_task.tasks_helper.merge_grade_report_parts', Mock(side_effect=Exception))
+    @patch('instructor_task.tasks_helper._get_current_task')
+    def test_sharded_grade_report_merge_failure(self, _mock_current_task):
+        """
+        Test that the task fails, and that the parts of the report are
+        deleted, if they cannot be merged.
+        """
+        for index in range(5):
+            self.create_student('student{}'.format(index))
+        entry = InstructorTaskFactory.create(course_id=self.course.id, task_id=str(uuid4()))
+
+        upload_grades_csv(None, entry.id, self.course.id, None, 'graded')
+
+        self.assertEqual(InstructorTask.objects.get(pk=entry.id).task_state, FAILURE)
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        self.assertEqual(os.listdir(report_store.path_to(self.course.id, '')), [])
+
     def _verify_cell_data_for_user(self, username, course_id, column_header, expected_cell_content):
         """
         Verify cell data in the grades CSV for a particular user.
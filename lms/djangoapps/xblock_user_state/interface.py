@@ -3,6 +3,7 @@ A baseclass for a generic client for accessing XBlock Scope.user_state field dat
 """
 
 from abc import abstractmethod
+from collections import namedtuple
 
 from contracts import contract, new_contract, ContractsMeta
 from opaque_keys.edx.keys import UsageKey
@@ -11,6 +12,21 @@ from xblock.fields import Scope, ScopeBase
 new_contract('UsageKey', UsageKey)
 
 
+class XBlockUserState(namedtuple('_XBlockUserState', ['username', 'block_key', 'state', 'updated', 'scope'])):
+    """
+    The state stored by a user for an XBlock usage, as yielded when iterating over the
+    states of many users.
+
+    Fields:
+        username: The name of the user the state belongs to
+        block_key (UsageKey): The UsageKey of the xblock usage
+        state (dict): A dictionary mapping field names to values
+        updated (datetime): When the state was last modified
+        scope (Scope): The scope of the state
+    """
+    __slots__ = ()
+
+
 class XBlockUserStateClient(object):
     """
     First stab at an interface for accessing XBlock User State. This will have
@@ -243,6 +259,8 @@ class XBlockUserStateClient(object):
         You get no ordering guarantees. Fetching will happen in batch_size
         increments. If you're using this method, you should be running in an
         async task.
+
+        Yields: an XBlockUserState for each user who stored state for the block.
         """
         raise NotImplementedError()
 
@@ -251,5 +269,8 @@ class XBlockUserStateClient(object):
         You get no ordering guarantees. Fetching will happen in batch_size
         increments. If you're using this method, you should be running in an
         async task.
+
+        Yields: an XBlockUserState for each user and block (of `block_type`,
+            if given) of the course for which state was stored.
         """
         raise NotImplementedError()
@@ -60,6 +60,15 @@ DISCUSSION_SETTINGS = {
     'MAX_COMMENT_DEPTH': 2,
 }
 
+# How many connections to the comments service each process keeps open
+COMMENTS_SERVICE_POOL_SIZE = 10
+# Whether the forum views make their independent requests to the comments
+# service at the same time
+COMMENTS_SERVICE_CONCURRENT_REQUESTS = True
+# For how many seconds responses of the comments service which may be a little
+# stale (e.g. users' info) are cached.  0 disables this.
+COMMENTS_SERVICE_CACHE_TIMEOUT = 0
+
 
 # Features
 FEATURES = {
@@ -408,6 +417,14 @@ FEATURES = {
 
     # Credit course API
     'ENABLE_CREDIT_API': False,
+
+    # Store subsection grades in the database and serve grade calculations
+    # from them, updating them incrementally as scores change.
+    'ENABLE_PERSISTENT_GRADES': False,
+
+    # Build the courseware table of contents from the course structure that
+    # is stored when a course is published, rather than from its blocks.
+    'ENABLE_COURSE_BLOCK_STRUCTURE': False,
 }
 
 # Ignore static asset files on import which match this pattern
@@ -451,6 +468,8 @@ NODE_PATH = ':'.join(node_paths)
 # For geolocation ip database
 GEOIP_PATH = REPO_ROOT / "common/static/data/geoip/GeoIP.dat"
 GEOIPV6_PATH = REPO_ROOT / "common/static/data/geoip/GeoIPv6.dat"
+# Number of IP address to country code lookups to remember in each process
+GEOIP_CACHE_SIZE = 10000
 
 # Where to look for a status message
 STATUS_MESSAGE_PATH = ENV_ROOT / "status_message.json"
@@ -709,6 +728,19 @@ XBLOCK_SELECT_FUNCTION = prefer_xmodules
 
 MODULESTORE_BRANCH = 'published-only'
 CONTENTSTORE = None
+
+# The size, in bytes, of the cache of split modulestore course structures kept
+# in each process, in front of the 'course_structure_cache' cache (if it is
+# configured) and mongo; 0 disables it.
+COURSE_STRUCTURE_CACHE_SIZE = 50 * 1024 * 1024
+
+# Directory in which the contentserver keeps copies of large course assets
+# (those too big for the cache), so they needn't be read from GridFS every
+# time they are served; None disables it. It is limited to
+# STATIC_CONTENT_DISK_CACHE_MAX_SIZE bytes.
+STATIC_CONTENT_DISK_CACHE_DIR = None
+STATIC_CONTENT_DISK_CACHE_MAX_SIZE = 10 * 1024 * 1024 * 1024
+
 DOC_STORE_CONFIG = {
     'host': 'localhost',
     'db': 'xmodule',
@@ -781,6 +813,29 @@ CODE_JAIL = {
 #   ]
 COURSES_WITH_UNSAFE_CODE = []
 
+# How many results of executing problems' code each process keeps in memory,
+# in front of the shared cache.  0 disables this.
+SAFE_EXEC_LOCAL_CACHE_SIZE = 1000
+
+############################ STUDENT MODULE HISTORY ############################
+# See courseware.history for what these change.
+
+# Whether the history of problems' states is written in bulk by a background
+# thread of each process, rather than by the request which saved the state.
+STUDENT_MODULE_HISTORY_DEFERRED_WRITES = False
+# How many history entries each process queues at most, before writing them in
+# the requests which saved the states.
+STUDENT_MODULE_HISTORY_QUEUE_SIZE = 10000
+# How many queued history entries are written at once.
+STUDENT_MODULE_HISTORY_BATCH_SIZE = 100
+# How many seconds to wait for the queued history entries to be written when a
+# process exits.
+STUDENT_MODULE_HISTORY_EXIT_TIMEOUT = 5
+
+# Whether history entries store the changes since the previous entry rather than
+# full copies of the state.
+STUDENT_MODULE_HISTORY_COMPACT_STATES = False
+
 ############################### DJANGO BUILT-INS ###############################
 # Change DEBUG/TEMPLATE_DEBUG in your environment settings files, not here
 DEBUG = False
@@ -1684,6 +1739,9 @@ BULK_EMAIL_LOG_SENT_EMAILS = False
 # parallel, and what the SES rate is.
 BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS = 0.02
 
+# Number of connections over which each bulk email task sends its emails at once.
+BULK_EMAIL_CONNECTIONS_PER_TASK = 4
+
 ############################# Email Opt In ####################################
 
 # Minimum age for organization-wide email opt in
@@ -1859,6 +1917,7 @@ INSTALLED_APPS = (
     'lms.djangoapps.lms_xblock',
 
     'openedx.core.djangoapps.content.course_structures',
+    'openedx.core.djangoapps.content.course_overviews',
     'course_structure_api',
 
     # Mailchimp Syncing
@@ -2070,6 +2129,10 @@ GRADES_DOWNLOAD = {
     'ROOT_PATH': '/tmp/edx-s3/grades',
 }
 
+# If set, grade reports for courses with more enrolled students than this are
+# generated by subtasks grading at most this many students each.
+GRADES_DOWNLOAD_STUDENTS_PER_TASK = None
+
 FINANCIAL_REPORTS = {
     'STORAGE_TYPE': 'localfs',
     'BUCKET': 'edx-financial-reports',
@@ -2446,6 +2509,11 @@ CHECKPOINT_PATTERN = r'(?P<checkpoint_name>[^/]+)'
 # this setting.
 FIELD_OVERRIDE_PROVIDERS = ()
 
+# Number of seconds the field overrides of a CCX are kept in the cache once
+# loaded. They are removed from it whenever an override of the CCX changes.
+# Set to 0 to not cache them beyond a single request.
+CCX_OVERRIDES_CACHE_TIMEOUT = 60 * 60
+
 # PROFILE IMAGE CONFIG
 # WARNING: Certain django storage backends do not support atomic
 # file overwrites (including the default, OverwriteStorage) - instead
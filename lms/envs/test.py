@@ -68,6 +68,18 @@ FEATURES['ALLOW_COURSE_STAFF_GRADE_DOWNLOADS'] = True
 
 # Toggles embargo on for testing
 FEATURES['EMBARGO'] = True
+# Tests mock GeoIP lookups, so their results mustn't be remembered between tests
+GEOIP_CACHE_SIZE = 0
+# Tests roll back the database between them, so ids of CCXs are reused and
+# their cached overrides would go stale
+CCX_OVERRIDES_CACHE_TIMEOUT = 0
+# Tests clear the shared cache between them, which must not leave results of
+# executed code behind
+SAFE_EXEC_LOCAL_CACHE_SIZE = 0
+# Tests check the requests made to the comments service in order
+COMMENTS_SERVICE_CONCURRENT_REQUESTS = False
+# Tests check the order in which bulk emails are sent and fail
+BULK_EMAIL_CONNECTIONS_PER_TASK = 1
 
 FEATURES['ENABLE_COMBINED_LOGIN_REGISTRATION'] = True
 
@@ -207,9 +219,15 @@ CACHES = {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
         'LOCATION': 'edx_location_mem_cache',
     },
+    'course_structure_cache': {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+    },
 
 }
 
+# Don't keep course structures between tests, which count the queries to mongo
+COURSE_STRUCTURE_CACHE_SIZE = 0
+
 # Dummy secret key for dev
 SECRET_KEY = '85920908f28904ed733fe576320db18cabd7b6cd'
 
@@ -1,4 +1,4 @@
-from .utils import merge_dict, perform_request, CommentClientRequestError
+from .utils import evict_cached_responses, merge_dict, perform_request, CommentClientRequestError
 
 import models
 import settings
@@ -29,6 +29,16 @@ class User(models.Model):
                    external_id=str(user.id),
                    username=user.username)
 
+    def save(self):
+        super(User, self).save()
+        self._evict_cached_info()
+
+    def _evict_cached_info(self):
+        """
+        Evicts the cached info of the user, after it was changed.
+        """
+        evict_cached_responses(self.url(action='get', params=self.attributes))
+
     def follow(self, source):
         params = {'source_type': source.type, 'source_id': source.id}
         response = perform_request(
@@ -38,6 +48,7 @@ class User(models.Model):
             metric_action='user.follow',
             metric_tags=self._metric_tags + ['target.type:{}'.format(source.type)],
         )
+        self._evict_cached_info()
 
     def unfollow(self, source):
         params = {'source_type': source.type, 'source_id': source.id}
@@ -48,6 +59,7 @@ class User(models.Model):
             metric_action='user.unfollow',
             metric_tags=self._metric_tags + ['target.type:{}'.format(source.type)],
         )
+        self._evict_cached_info()
 
     def vote(self, voteable, value):
         if voteable.type == 'thread':
@@ -65,6 +77,7 @@ class User(models.Model):
             metric_tags=self._metric_tags + ['target.type:{}'.format(voteable.type)],
         )
         voteable._update_from_response(response)
+        self._evict_cached_info()
 
     def unvote(self, voteable):
         if voteable.type == 'thread':
@@ -82,6 +95,7 @@ class User(models.Model):
             metric_tags=self._metric_tags + ['target.type:{}'.format(voteable.type)],
         )
         voteable._update_from_response(response)
+        self._evict_cached_info()
 
     def active_threads(self, query_params={}):
         if not self.course_id:
@@ -130,6 +144,7 @@ class User(models.Model):
                 retrieve_params,
                 metric_action='model.retrieve',
                 metric_tags=self._metric_tags,
+                cacheable=True,
             )
         except CommentClientRequestError as e:
             if e.status_code == 404:
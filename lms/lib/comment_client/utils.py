@@ -1,14 +1,23 @@
 from contextlib import contextmanager
+from cookielib import DefaultCookiePolicy
 import dogstats_wrapper as dog_stats_api
+import hashlib
 import logging
 import requests
+from requests.adapters import HTTPAdapter
+import sys
+import threading
 from django.conf import settings
+from django.core.cache import cache
 from time import time
 from uuid import uuid4
-from django.utils.translation import get_language
+from django.utils.translation import get_language, override
 
 log = logging.getLogger(__name__)
 
+_SESSION = None
+_SESSION_LOCK = threading.Lock()
+
 
 def strip_none(dic):
     return dict([(k, v) for k, v in dic.iteritems() if v is not None])
@@ -50,9 +59,105 @@ def request_timer(request_id, method, url, tags=None):
     )
 
 
+def _get_session():
+    """
+    Returns the requests.Session shared by the requests of this process to the
+    comments service, so that their connections are kept alive and reused.
+    """
+    global _SESSION  # pylint: disable=global-statement
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            session = requests.Session()
+            pool_size = getattr(settings, 'COMMENTS_SERVICE_POOL_SIZE', 10)
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            # The session is shared by the requests made for all users, so
+            # it mustn't carry cookies from one to the other
+            session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+            _SESSION = session
+    return _SESSION
+
+
+def perform_concurrently(*calls):
+    """
+    Calls each of `calls`, functions without arguments that make independent
+    requests to the comments service, at the same time, and returns the list
+    of their results.  If any of them raise an exception, the exception of the
+    first of them is re-raised.
+
+    The calls are made one after the other if
+    COMMENTS_SERVICE_CONCURRENT_REQUESTS is False.
+    """
+    if len(calls) < 2 or not getattr(settings, 'COMMENTS_SERVICE_CONCURRENT_REQUESTS', False):
+        return [call() for call in calls]
+
+    language = get_language()
+    results = [None] * len(calls)
+    errors = [None] * len(calls)
+
+    def _perform(index):
+        """
+        Stores the result of calls[index], or the exception it raised.
+        """
+        try:
+            # Requests carry the language of the current request
+            with override(language):
+                results[index] = calls[index]()
+        except Exception:  # pylint: disable=broad-except
+            errors[index] = sys.exc_info()
+
+    threads = [threading.Thread(target=_perform, args=(index,)) for index in range(1, len(calls))]
+    for thread in threads:
+        thread.start()
+    _perform(0)
+    for thread in threads:
+        thread.join()
+
+    for error in errors:
+        if error is not None:
+            raise error[0], error[1], error[2]
+    return results
+
+
+def _get_cache_version_key(url):
+    """
+    Returns the key under which the current version of the cached responses
+    to GET requests for `url` is cached.
+    """
+    return u'comment_client.response_version.{}'.format(hashlib.md5(url.encode('utf-8')).hexdigest())
+
+
+def _get_cache_key(url, params):
+    """
+    Returns the key under which the response to a GET request for `url` with
+    `params` is cached.
+    """
+    version = cache.get(_get_cache_version_key(url), u'')
+    hasher = hashlib.md5()
+    hasher.update(repr((url, version, sorted(params.items()), get_language())))
+    return u'comment_client.response.{}'.format(hasher.hexdigest())
+
+
+def evict_cached_responses(url):
+    """
+    Evicts the cached responses to GET requests for `url`, whatever their
+    params, by moving on to a new version of them.
+    """
+    cache_timeout = getattr(settings, 'COMMENTS_SERVICE_CACHE_TIMEOUT', 0)
+    if cache_timeout:
+        cache.set(_get_cache_version_key(url), uuid4().hex, cache_timeout)
+
+
 def perform_request(method, url, data_or_params=None, raw=False,
-                    metric_action=None, metric_tags=None, paged_results=False):
+                    metric_action=None, metric_tags=None, paged_results=False,
+                    cacheable=False):
+    """
+    Makes a request to the comments service, and returns its decoded response.
 
+    Responses to `cacheable` GET requests, i.e. ones whose responses may be
+    a little stale, are cached for COMMENTS_SERVICE_CACHE_TIMEOUT seconds.
+    """
     if metric_tags is None:
         metric_tags = []
 
@@ -62,6 +167,16 @@ def perform_request(method, url, data_or_params=None, raw=False,
 
     if data_or_params is None:
         data_or_params = {}
+
+    cache_timeout = getattr(settings, 'COMMENTS_SERVICE_CACHE_TIMEOUT', 0)
+    cache_key = None
+    if cacheable and method == 'get' and cache_timeout:
+        cache_key = _get_cache_key(url, data_or_params)
+        cached_response = cache.get(cache_key)
+        if cached_response is not None:
+            dog_stats_api.increment('comment_client.request.cache_hit', tags=metric_tags)
+            return cached_response
+
     headers = {
         'X-Edx-Api-Key': getattr(settings, "COMMENTS_SERVICE_KEY", None),
         'Accept-Language': get_language(),
@@ -76,7 +191,7 @@ def perform_request(method, url, data_or_params=None, raw=False,
         data = None
         params = merge_dict(data_or_params, request_id_dict)
     with request_timer(request_id, method, url, metric_tags):
-        response = requests.request(
+        response = _get_session().request(
             method,
             url,
             data=data,
@@ -129,6 +244,8 @@ def perform_request(method, url, data_or_params=None, raw=False,
                     value=data.get('num_pages', 1),
                     tags=metric_tags
                 )
+            if cache_key is not None:
+                cache.set(cache_key, data, cache_timeout)
             return data
 
 
@@ -29,6 +29,8 @@ def run():
 
     add_mimetypes()
 
+    configure_safe_exec_cache()
+
     if settings.FEATURES.get('USE_CUSTOM_THEME', False):
         enable_theme()
 
@@ -58,6 +60,15 @@ def add_mimetypes():
     mimetypes.add_type('application/font-woff', '.woff')
 
 
+def configure_safe_exec_cache():
+    """
+    Size the cache that each process keeps of the results of executing
+    problems' code.
+    """
+    from capa.safe_exec import configure_local_cache
+    configure_local_cache(settings.SAFE_EXEC_LOCAL_CACHE_SIZE)
+
+
 def enable_theme():
     """
     Enable the settings for a custom theme, whose files should be stored
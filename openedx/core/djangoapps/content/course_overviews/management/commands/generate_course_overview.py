@@ -0,0 +1,55 @@
+"""
+Command to (re)generate CourseOverviews, e.g. to backfill courses that have
+not been published since the table was introduced.
+"""
+import logging
+from optparse import make_option
+
+from django.core.management.base import BaseCommand
+from opaque_keys.edx.keys import CourseKey
+from xmodule.modulestore.django import modulestore
+
+from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
+
+
+log = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Example usage:
+        $ ./manage.py lms generate_course_overview --all --settings=bok_choy
+        $ ./manage.py lms generate_course_overview 'edX/DemoX/Demo_Course' --settings=bok_choy
+    """
+    args = '<course_id course_id ...>'
+    help = 'Generates and stores course overview for one or more courses.'
+
+    option_list = BaseCommand.option_list + (
+        make_option('--all',
+                    action='store_true',
+                    default=False,
+                    help='Generate course overview for all courses.'),
+    )
+
+    def handle(self, *args, **options):
+
+        if options['all']:
+            course_keys = [course.id for course in modulestore().get_courses()]
+        else:
+            course_keys = [CourseKey.from_string(arg) for arg in args]
+
+        if not course_keys:
+            log.fatal('No courses specified.')
+            return
+
+        log.info('Generating course overviews for %d courses.', len(course_keys))
+        log.debug('Generating course overview(s) for the following courses: %s', course_keys)
+
+        for course_key in course_keys:
+            try:
+                CourseOverview.load_from_module_store(course_key)
+            except Exception as ex:  # pylint: disable=broad-except
+                log.exception('An error occurred while generating course overview for %s: %s',
+                              unicode(course_key), ex.message)
+
+        log.info('Finished generating course overviews.')
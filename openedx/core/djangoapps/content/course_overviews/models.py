@@ -0,0 +1,355 @@
+"""
+Declaration of CourseOverview model
+"""
+import json
+import logging
+from datetime import datetime
+
+from django.db import IntegrityError, transaction
+from django.db.models.fields import BooleanField, DateTimeField, DecimalField, TextField, FloatField, IntegerField
+from django.db.models.fields import NullBooleanField
+from django.utils.timezone import UTC
+from django.utils.translation import ugettext
+from model_utils.models import TimeStampedModel
+
+from util.date_utils import strftime_localized
+from xmodule import course_module
+from xmodule.error_module import ErrorDescriptor
+from xmodule.modulestore.django import modulestore
+from xmodule_django.models import CourseKeyField, UsageKeyField
+
+
+log = logging.getLogger(__name__)  # pylint: disable=invalid-name
+
+
+class CourseOverview(TimeStampedModel):
+    """
+    Model for storing and caching basic information about a course.
+
+    This model contains basic course metadata such as an ID, display name,
+    image URL, and any other information that would be necessary to display
+    a course as part of a user dashboard or enrollment API, without loading
+    the course from the modulestore.
+
+    Rows are (re)generated when the course is published and removed when it
+    is deleted; see signals.py. Reads go through get_from_id/get_from_ids,
+    which fall back to the modulestore for courses that have no row yet.
+    """
+
+    # Bump this whenever fields are added or their meaning changes, so that
+    # rows written by older code are regenerated on read.
+    VERSION = 1
+
+    # Cache entry versioning.
+    version = IntegerField()
+
+    # Course identification
+    id = CourseKeyField(db_index=True, primary_key=True, max_length=255)  # pylint: disable=invalid-name
+    _location = UsageKeyField(max_length=255)
+    display_name = TextField(null=True)
+    display_number_with_default = TextField()
+    display_org_with_default = TextField()
+
+    # Start/end dates
+    start = DateTimeField(null=True)
+    end = DateTimeField(null=True)
+    advertised_start = TextField(null=True)
+    announcement = DateTimeField(null=True)
+    enrollment_start = DateTimeField(null=True)
+    enrollment_end = DateTimeField(null=True)
+
+    # URLs
+    course_image_url = TextField()
+    facebook_url = TextField(null=True)
+    social_sharing_url = TextField(null=True)
+    end_of_course_survey_url = TextField(null=True)
+
+    # Certification data
+    certificates_display_behavior = TextField(null=True)
+    certificates_show_before_end = BooleanField(default=False)
+    has_any_active_web_certificate = BooleanField(default=False)
+    cert_name_short = TextField()
+    cert_name_long = TextField()
+
+    # Grading
+    lowest_passing_grade = DecimalField(max_digits=5, decimal_places=2, null=True)
+
+    # Access parameters
+    days_early_for_beta = FloatField(null=True)
+    mobile_available = BooleanField(default=False)
+    visible_to_staff_only = BooleanField(default=False)
+    invitation_only = BooleanField(default=False)
+    ispublic = NullBooleanField()
+    enrollment_domain = TextField(null=True)
+    catalog_visibility = TextField(null=True)
+    _pre_requisite_courses_json = TextField()  # JSON representation of list of CourseKey strings
+
+    @classmethod
+    def _create_from_course(cls, course):
+        """
+        Creates (but does not save) a CourseOverview from the given
+        CourseDescriptor.
+        """
+        # Imported here because courseware.courses (through courseware.access)
+        # imports this module.
+        from courseware.courses import course_image_url
+
+        certificates = getattr(course, 'certificates', None) or {}
+        has_any_active_web_certificate = any(
+            config.get('is_active') for config in certificates.get('certificates', [])
+        )
+        try:
+            lowest_passing_grade = course.lowest_passing_grade
+        except (KeyError, ValueError):
+            lowest_passing_grade = None
+
+        return cls(
+            version=cls.VERSION,
+            id=course.id,
+            _location=course.location,
+            display_name=course.display_name,
+            display_number_with_default=course.display_number_with_default,
+            display_org_with_default=course.display_org_with_default,
+
+            start=course.start,
+            end=course.end,
+            advertised_start=course.advertised_start,
+            announcement=course.announcement,
+            enrollment_start=course.enrollment_start,
+            enrollment_end=course.enrollment_end,
+
+            course_image_url=course_image_url(course),
+            facebook_url=course.facebook_url,
+            social_sharing_url=course.social_sharing_url,
+            end_of_course_survey_url=course.end_of_course_survey_url,
+
+            certificates_display_behavior=course.certificates_display_behavior,
+            certificates_show_before_end=course.certificates_show_before_end,
+            has_any_active_web_certificate=has_any_active_web_certificate,
+            cert_name_short=course.cert_name_short,
+            cert_name_long=course.cert_name_long,
+            lowest_passing_grade=lowest_passing_grade,
+
+            days_early_for_beta=course.days_early_for_beta,
+            mobile_available=course.mobile_available,
+            visible_to_staff_only=course.visible_to_staff_only,
+            invitation_only=course.invitation_only,
+            ispublic=getattr(course, 'ispublic', None),
+            enrollment_domain=course.enrollment_domain,
+            catalog_visibility=course.catalog_visibility,
+            _pre_requisite_courses_json=json.dumps(course.pre_requisite_courses),
+        )
+
+    @classmethod
+    def load_from_module_store(cls, course_id):
+        """
+        Loads the course from the modulestore and (re)writes its CourseOverview.
+
+        Returns:
+            CourseOverview, or None if the course does not exist or fails to load.
+        """
+        store = modulestore()
+        with store.bulk_operations(course_id):
+            course = store.get_course(course_id)
+            if course is None:
+                return None
+            if isinstance(course, ErrorDescriptor):
+                log.warning(u"Not caching an overview of course %s because it failed to load", course_id)
+                return None
+
+            course_overview = cls._create_from_course(course)
+            # Save in a savepoint so that, if another request wrote the same
+            # row concurrently, rolling back leaves the caller's transaction
+            # usable. The overview we built is just as good, so return it anyway.
+            savepoint_id = transaction.savepoint()
+            try:
+                course_overview.save()
+            except IntegrityError:
+                transaction.savepoint_rollback(savepoint_id)
+            else:
+                transaction.savepoint_commit(savepoint_id)
+            return course_overview
+
+    @classmethod
+    def get_from_id(cls, course_id):
+        """
+        Returns the CourseOverview for the given course, reading it through
+        from the modulestore if it is missing or was written by an older
+        VERSION of this model.
+
+        Returns:
+            CourseOverview, or None if the course does not exist or fails to load.
+        """
+        try:
+            course_overview = cls.objects.get(id=course_id)
+            if course_overview.version == cls.VERSION:
+                return course_overview
+        except cls.DoesNotExist:
+            pass
+        return cls.load_from_module_store(course_id)
+
+    @classmethod
+    def get_from_ids(cls, course_ids):
+        """
+        Returns a dict mapping each of the given course ids to its
+        CourseOverview (or None, as for get_from_id), fetching all existing
+        rows with a single query.
+        """
+        course_ids = set(course_ids)
+        overviews = {
+            course_overview.id: course_overview
+            for course_overview in cls.objects.filter(id__in=course_ids, version=cls.VERSION)
+        }
+        for course_id in course_ids - set(overviews):
+            overviews[course_id] = cls.load_from_module_store(course_id)
+        return overviews
+
+    @classmethod
+    def get_all_courses(cls, org=None):
+        """
+        Returns the CourseOverviews of all the courses in the modulestore,
+        optionally only those of the given org.
+
+        The course keys are listed by the modulestore without loading the
+        courses, and their overviews are fetched with a single query. Courses
+        without a current overview, such as XML courses or courses that have
+        not been published since this table was introduced, are read through
+        from the modulestore as in get_from_ids.
+        """
+        course_keys = modulestore().get_course_keys(org=org)
+        return [
+            course_overview
+            for course_overview in cls.get_from_ids(course_keys).itervalues()
+            if course_overview is not None
+        ]
+
+    def __unicode__(self):
+        return unicode(self.id)
+
+    @property
+    def location(self):
+        """
+        Returns the UsageKey of this course.
+
+        UsageKeyField has a strange behavior where it fails to parse the "run"
+        of a course out of the serialized form of a Mongo Draft UsageKey. This
+        method is a wrapper around _location attribute that fixes the problem
+        by calling map_into_course, which restores the run attribute.
+        """
+        if self._location.run is None:
+            self._location = self._location.map_into_course(self.id)
+        return self._location
+
+    @property
+    def number(self):
+        """
+        Returns this course's number.
+
+        This is a "number" in the sense of the "course numbers" that you see at
+        lots of universities. For example, given a course
+        "Intro to Computer Science" with the course key "edX/CS-101/2014", the
+        course number would be "CS-101"
+        """
+        return self.location.course
+
+    @property
+    def url_name(self):
+        """
+        Returns this course's URL name.
+        """
+        return self.location.name
+
+    @property
+    def org(self):
+        """
+        Returns this course's organization.
+        """
+        return self.location.org
+
+    @property
+    def display_name_with_default(self):
+        """
+        Return reasonable display name for the course, as
+        XModuleDescriptor.display_name_with_default does.
+        """
+        name = self.display_name
+        if name is None:
+            name = self.url_name.replace('_', ' ')
+        return name.replace('<', '&lt;').replace('>', '&gt;')
+
+    @property
+    def pre_requisite_courses(self):
+        """
+        Returns a list of ID strings for this course's prerequisite courses.
+        """
+        return json.loads(self._pre_requisite_courses_json)
+
+    @property
+    def start_date_is_still_default(self):
+        """
+        Checks if the start date set for the course is still default, i.e.
+        .start has not been modified, and .advertised_start has not been set.
+        """
+        return course_module.course_start_date_is_still_default(self.start, self.advertised_start)
+
+    @property
+    def sorting_score(self):
+        """
+        Returns a number that can be used to sort courses according to how
+        "new" they are, as CourseDescriptor.sorting_score does.
+        """
+        return course_module.course_sorting_score(self.start, self.advertised_start, self.announcement)
+
+    def has_started(self):
+        """
+        Returns whether the the course has started.
+        """
+        return self.start is None or datetime.now(UTC()) > self.start
+
+    def has_ended(self):
+        """
+        Returns True if the current time is after the specified course end
+        date. Returns False if there is no end date specified.
+        """
+        return course_module.course_has_ended(self.end)
+
+    def may_certify(self):
+        """
+        Returns whether it is acceptable to show the student a certificate
+        download link.
+        """
+        return course_module.course_may_certify(
+            self.certificates_display_behavior,
+            self.certificates_show_before_end,
+            self.has_ended()
+        )
+
+    def start_datetime_text(self, format_string="SHORT_DATE"):
+        """
+        Returns the desired text corresponding the course's start date and
+        time in UTC. Prefers .advertised_start, then falls back to .start.
+        """
+        return course_module.course_start_datetime_text(
+            self.start,
+            self.advertised_start,
+            format_string,
+            ugettext,
+            strftime_localized
+        )
+
+    def end_datetime_text(self, format_string="SHORT_DATE"):
+        """
+        Returns the end date or date_time for the course formatted as a string.
+        """
+        return course_module.course_end_datetime_text(self.end, format_string, strftime_localized)
+
+    def clean_id(self, padding_char='='):
+        """
+        Returns a unique deterministic base32-encoded ID for the course.
+        """
+        return course_module.clean_course_id(self.id, padding_char)
+
+
+# Signals must be imported in a file that is automatically loaded at app startup (e.g. models.py). We import them
+# at the end of this file to avoid circular dependencies.
+import signals  # pylint: disable=unused-import
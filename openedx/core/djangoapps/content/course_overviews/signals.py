@@ -0,0 +1,31 @@
+"""
+Signal handlers that keep CourseOverview up to date with the modulestore.
+"""
+from django.dispatch.dispatcher import receiver
+
+from xmodule.modulestore.django import SignalHandler
+
+
+@receiver(SignalHandler.course_published)
+def listen_for_course_publish(sender, course_key, **kwargs):  # pylint: disable=unused-argument
+    """
+    Regenerates the CourseOverview of a published course in a celery task.
+    The existing row, if any, is overwritten in place.
+    """
+    # Import here to avoid a circular import.
+    from .tasks import update_course_overview
+
+    # Note: The countdown=0 kwarg is set to to ensure the method below does not attempt to access the course
+    # before the signal emitter has finished all operations. This is also necessary to ensure all tests pass.
+    update_course_overview.apply_async([unicode(course_key)], countdown=0)
+
+
+@receiver(SignalHandler.course_deleted)
+def listen_for_course_delete(sender, course_key, **kwargs):  # pylint: disable=unused-argument
+    """
+    Removes the CourseOverview of a deleted course.
+    """
+    # Import here to avoid a circular import.
+    from .models import CourseOverview
+
+    CourseOverview.objects.filter(id=course_key).delete()
@@ -0,0 +1,185 @@
+"""
+Tests for course_overviews app.
+"""
+import datetime
+
+import ddt
+from mock import patch, Mock
+from django.utils import timezone
+
+from lms.djangoapps.courseware.courses import course_image_url
+from xmodule.course_module import CATALOG_VISIBILITY_CATALOG_AND_ABOUT
+from xmodule.error_module import ErrorDescriptor
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.django import modulestore
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory, check_mongo_calls
+
+from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
+
+
+@ddt.ddt
+class CourseOverviewTestCase(ModuleStoreTestCase):
+    """
+    Tests for CourseOverview model.
+    """
+    NEXT_WEEK = timezone.now() + datetime.timedelta(days=7)
+    LAST_WEEK = timezone.now() - datetime.timedelta(days=7)
+
+    # Attributes that must be the same on a CourseDescriptor and its CourseOverview.
+    FIELDS_TO_COMPARE = [
+        'id',
+        'display_name',
+        'display_name_with_default',
+        'display_number_with_default',
+        'display_org_with_default',
+        'number',
+        'org',
+        'start',
+        'end',
+        'advertised_start',
+        'enrollment_start',
+        'enrollment_end',
+        'facebook_url',
+        'social_sharing_url',
+        'end_of_course_survey_url',
+        'certificates_display_behavior',
+        'certificates_show_before_end',
+        'cert_name_short',
+        'cert_name_long',
+        'days_early_for_beta',
+        'mobile_available',
+        'visible_to_staff_only',
+        'invitation_only',
+        'enrollment_domain',
+        'catalog_visibility',
+        'pre_requisite_courses',
+        'start_date_is_still_default',
+    ]
+
+    def check_course_overview_against_course(self, course):
+        """
+        Compares the CourseOverview of the given course to the course itself.
+        """
+        course_overview = CourseOverview.get_from_id(course.id)
+        for attribute_name in self.FIELDS_TO_COMPARE:
+            self.assertEqual(
+                getattr(course, attribute_name),
+                getattr(course_overview, attribute_name),
+                attribute_name
+            )
+        self.assertEqual(course.location, course_overview.location)
+        self.assertEqual(course.has_started(), course_overview.has_started())
+        self.assertEqual(course.has_ended(), course_overview.has_ended())
+        self.assertEqual(course.may_certify(), course_overview.may_certify())
+        self.assertEqual(course.clean_id('_'), course_overview.clean_id('_'))
+        self.assertEqual(course_image_url(course), course_overview.course_image_url)
+        self.assertEqual(course_image_url(course), course_image_url(course_overview))
+        self.assertAlmostEqual(course.lowest_passing_grade, float(course_overview.lowest_passing_grade))
+        self.assertEqual(course.end_datetime_text(), course_overview.end_datetime_text())
+        self.assertEqual(course.start_datetime_text(), course_overview.start_datetime_text())
+
+    @ddt.data(
+        {},
+        {
+            'display_name': 'Test Course',
+            'start': LAST_WEEK,
+            'end': NEXT_WEEK,
+            'advertised_start': 'Very Soon',
+            'certificates_display_behavior': 'end',
+            'cert_name_short': 'Cert',
+            'cert_name_long': 'Certificate of Completion',
+            'days_early_for_beta': 3.0,
+            'mobile_available': True,
+            'invitation_only': True,
+            'catalog_visibility': CATALOG_VISIBILITY_CATALOG_AND_ABOUT,
+            'pre_requisite_courses': ['course-v1:edX+test1+run1'],
+        },
+    )
+    def test_course_overview_behavior(self, course_info):
+        for store_type in (ModuleStoreEnum.Type.mongo, ModuleStoreEnum.Type.split):
+            course = CourseFactory.create(default_store=store_type, **course_info)
+            self.check_course_overview_against_course(course)
+
+    def test_publish_regenerates_overview(self):
+        course = CourseFactory.create(display_name='Before')
+        self.assertEqual(CourseOverview.get_from_id(course.id).display_name, 'Before')
+
+        course.display_name = 'After'
+        self.store.update_item(course, ModuleStoreEnum.UserID.test)
+        self.assertEqual(CourseOverview.objects.get(id=course.id).display_name, 'After')
+        self.assertEqual(CourseOverview.objects.filter(id=course.id).count(), 1)
+
+    def test_delete_removes_overview(self):
+        course = CourseFactory.create(default_store=ModuleStoreEnum.Type.split)
+        self.assertTrue(CourseOverview.objects.filter(id=course.id).exists())
+
+        self.store.delete_course(course.id, ModuleStoreEnum.UserID.test)
+        self.assertFalse(CourseOverview.objects.filter(id=course.id).exists())
+        self.assertIsNone(CourseOverview.get_from_id(course.id))
+
+    def test_read_through(self):
+        course = CourseFactory.create(default_store=ModuleStoreEnum.Type.split)
+        CourseOverview.objects.all().delete()
+
+        # The first read goes to the modulestore and stores the overview ...
+        course_overview = CourseOverview.get_from_id(course.id)
+        self.assertEqual(course_overview.id, course.id)
+        self.assertTrue(CourseOverview.objects.filter(id=course.id).exists())
+
+        # ... so that later reads don't.
+        with check_mongo_calls(0):
+            CourseOverview.get_from_id(course.id)
+
+    def test_old_version_is_regenerated(self):
+        course = CourseFactory.create(display_name='Old')
+        CourseOverview.objects.filter(id=course.id).update(
+            version=CourseOverview.VERSION - 1,
+            display_name='Stale',
+        )
+        self.assertEqual(CourseOverview.get_from_id(course.id).display_name, 'Old')
+        self.assertEqual(CourseOverview.objects.get(id=course.id).version, CourseOverview.VERSION)
+
+    def test_get_from_ids(self):
+        courses = [CourseFactory.create(default_store=ModuleStoreEnum.Type.split) for __ in range(3)]
+        missing_course_key = modulestore().make_course_key('Org', 'Missing', 'Run')
+        CourseOverview.objects.filter(id=courses[0].id).delete()
+
+        course_overviews = CourseOverview.get_from_ids(
+            [course.id for course in courses] + [missing_course_key]
+        )
+        self.assertIsNone(course_overviews[missing_course_key])
+        for course in courses:
+            self.assertEqual(course_overviews[course.id].id, course.id)
+
+    def test_errored_course_is_not_cached(self):
+        course = CourseFactory.create(default_store=ModuleStoreEnum.Type.mongo)
+        CourseOverview.objects.all().delete()
+
+        with patch('xmodule.modulestore.mongo.base.MongoKeyValueStore', Mock(side_effect=Exception)):
+            self.assertIsInstance(modulestore().get_course(course.id), ErrorDescriptor)
+            self.assertIsNone(CourseOverview.get_from_id(course.id))
+        self.assertFalse(CourseOverview.objects.filter(id=course.id).exists())
+
+    def test_get_all_courses(self):
+        org_courses = [CourseFactory.create(org='TestOrg') for __ in range(2)]
+        other_course = CourseFactory.create(org='OtherOrg')
+
+        self.assertEqual(
+            {course_overview.id for course_overview in CourseOverview.get_all_courses()},
+            {course.id for course in org_courses + [other_course]}
+        )
+        self.assertEqual(
+            {course_overview.id for course_overview in CourseOverview.get_all_courses(org='TestOrg')},
+            {course.id for course in org_courses}
+        )
+
+    def test_get_all_courses_reads_through(self):
+        courses = [CourseFactory.create() for __ in range(2)]
+        CourseOverview.objects.filter(id=courses[0].id).delete()
+
+        self.assertEqual(
+            {course_overview.id for course_overview in CourseOverview.get_all_courses()},
+            {course.id for course in courses}
+        )
+        self.assertTrue(CourseOverview.objects.filter(id=courses[0].id).exists())
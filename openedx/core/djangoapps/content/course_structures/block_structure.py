@@ -0,0 +1,372 @@
+"""
+Read-only access to the blocks of a course structure, as stored by
+tasks.update_course_structure, for code that needs to check access to or
+navigate through a course without instantiating its XBlocks.
+
+A BlockStructure holds the parent/child graph of a course along with the
+fields in BlockStructure.COLLECTED_FIELDS of each of its blocks, as they were
+when the course was last published. Readers that need a user specific view
+of the course (e.g. one without the blocks the user may not access) apply
+BlockStructureTransformers to it, which prune or annotate the structure.
+"""
+from xmodule.fields import Date
+from xmodule.partitions.partitions import NoSuchUserPartitionError, UserPartition
+from opaque_keys.edx.keys import UsageKey
+
+
+_DATE_FIELD = Date()
+
+
+class BlockStructureTransformer(object):
+    """
+    Base class of transformations applied to a BlockStructure when it is
+    read, typically to remove the blocks a user may not see.
+    """
+    def transform(self, user, block_structure):
+        """
+        Modifies `block_structure` for `user` in place.
+        """
+        raise NotImplementedError
+
+
+class BlockData(object):
+    """
+    The data collected for a single block of a BlockStructure.
+
+    Provides the same attributes as the block's descriptor does for the
+    collected fields, so that it can be passed to code that only reads those.
+    """
+    def __init__(self, block_structure, block_dict):
+        self._block_structure = block_structure
+        self._block_dict = block_dict
+        self._fields = block_dict.get('fields', {})
+        self.location = UsageKey.from_string(block_dict['usage_key']).map_into_course(block_structure.course_key)
+
+    @property
+    def category(self):
+        """
+        Returns the block type of the block.
+        """
+        return self._block_dict['block_type']
+
+    @property
+    def url_name(self):
+        """
+        Returns the url_name of the block.
+        """
+        return self.location.name
+
+    @property
+    def display_name(self):
+        """
+        Returns the display name of the block, or None.
+        """
+        return self._block_dict.get('display_name')
+
+    @property
+    def display_name_with_default(self):
+        """
+        Returns the display name of the block, as
+        XModuleMixin.display_name_with_default does.
+        """
+        name = self.display_name
+        if name is None:
+            name = self.url_name.replace('_', ' ')
+        return name.replace('<', '&lt;').replace('>', '&gt;')
+
+    @property
+    def graded(self):
+        """
+        Returns whether the block is graded.
+        """
+        return self._block_dict.get('graded', False)
+
+    @property
+    def format(self):
+        """
+        Returns the assignment type of the block, or None.
+        """
+        return self._block_dict.get('format')
+
+    @property
+    def start(self):
+        """
+        Returns the (inherited) start date of the block.
+        """
+        return _DATE_FIELD.from_json(self._fields.get('start'))
+
+    @property
+    def due(self):
+        """
+        Returns the (inherited) due date of the block.
+        """
+        return _DATE_FIELD.from_json(self._fields.get('due'))
+
+    @property
+    def days_early_for_beta(self):
+        """
+        Returns the (inherited) number of days beta testers may see the block
+        before its start date.
+        """
+        return self._fields.get('days_early_for_beta')
+
+    @property
+    def visible_to_staff_only(self):
+        """
+        Returns whether the block (or one of its ancestors) is visible to
+        staff only.
+        """
+        return self._fields.get('visible_to_staff_only', False)
+
+    @property
+    def hide_from_toc(self):
+        """
+        Returns whether the block is hidden from the table of contents.
+        """
+        return self._fields.get('hide_from_toc', False)
+
+    @property
+    def group_access(self):
+        """
+        Returns the group access rules set on the block itself.
+        """
+        group_access = self._fields.get('group_access') or {}
+        return {int(partition_id): group_ids for partition_id, group_ids in group_access.iteritems()}
+
+    @property
+    def discussion_id(self):
+        """
+        Returns the id of the discussion of a discussion block, or None.
+        """
+        return self._fields.get('discussion_id')
+
+    @property
+    def discussion_category(self):
+        """
+        Returns the category of the discussion of a discussion block, or None.
+        """
+        return self._fields.get('discussion_category')
+
+    @property
+    def discussion_target(self):
+        """
+        Returns the subcategory of the discussion of a discussion block, or
+        None.
+        """
+        return self._fields.get('discussion_target')
+
+    @property
+    def sort_key(self):
+        """
+        Returns the key by which a discussion block is sorted among the
+        discussions of its category, or None.
+        """
+        return self._fields.get('sort_key')
+
+    @property
+    def merged_group_access(self):
+        """
+        Returns the group access rules of the block merged with those of its
+        ancestors, as LmsBlockMixin.merged_group_access does.
+        """
+        return self._block_structure.get_merged_group_access(self.location)
+
+    @property
+    def user_partitions(self):
+        """
+        Returns the user partitions of the course.
+        """
+        return self._block_structure.user_partitions
+
+    def _get_user_partition(self, user_partition_id):
+        """
+        Returns the user partition with the specified id, as
+        LmsBlockMixin._get_user_partition does.
+        """
+        for user_partition in self.user_partitions:
+            if user_partition.id == user_partition_id:
+                return user_partition
+
+        raise NoSuchUserPartitionError("could not find a UserPartition with ID [{}]".format(user_partition_id))
+
+
+class BlockStructure(object):
+    """
+    The blocks of a course, as stored in a CourseStructure.
+    """
+    # Bump this whenever the data collected for blocks changes, so that
+    # structures stored by older code are not read.
+    VERSION = 2
+
+    # The fields of each block that are collected. Inheritable fields are
+    # collected with the values the block inherits.
+    COLLECTED_FIELDS = (
+        'start',
+        'due',
+        'days_early_for_beta',
+        'visible_to_staff_only',
+        'hide_from_toc',
+        'group_access',
+        'discussion_id',
+        'discussion_category',
+        'discussion_target',
+        'sort_key',
+    )
+
+    def __init__(self, course_key, structure):
+        self.course_key = course_key
+        self.course_version = structure.get('course_version')
+        self._blocks = structure['blocks']
+        self._user_partitions_json = structure.get('user_partitions', [])
+        self._user_partitions = None
+        self._merged_group_access = None
+        self.root = UsageKey.from_string(structure['root']).map_into_course(course_key)
+
+        self._block_data = {}
+        self._children = {}
+        self._parents = {}
+        for block_dict in self._blocks.itervalues():
+            block_data = BlockData(self, block_dict)
+            self._block_data[block_data.location] = block_data
+        for block_dict in self._blocks.itervalues():
+            usage_key = self._usage_key(block_dict['usage_key'])
+            children = [self._usage_key(child) for child in block_dict['children']]
+            self._children[usage_key] = [child for child in children if child in self._block_data]
+            for child in self._children[usage_key]:
+                self._parents.setdefault(child, []).append(usage_key)
+
+    @classmethod
+    def collect_fields(cls, block):
+        """
+        Returns a JSON-serializable dict of the COLLECTED_FIELDS of the given
+        block. Fields the block doesn't have are left out.
+        """
+        collected = {}
+        for field_name in cls.COLLECTED_FIELDS:
+            field = block.fields.get(field_name)
+            if field is not None:
+                collected[field_name] = field.to_json(getattr(block, field_name))
+        return collected
+
+    def _usage_key(self, usage_key_string):
+        """
+        Parses a serialized usage key of a block in this structure.
+        """
+        return UsageKey.from_string(usage_key_string).map_into_course(self.course_key)
+
+    def __contains__(self, usage_key):
+        return usage_key in self._block_data
+
+    def get_block(self, usage_key):
+        """
+        Returns the BlockData of the block.
+        """
+        return self._block_data[usage_key]
+
+    def get_children(self, usage_key):
+        """
+        Returns the usage keys of the children of the block, in order.
+        """
+        return list(self._children.get(usage_key, []))
+
+    def get_parents(self, usage_key):
+        """
+        Returns the usage keys of the parents of the block.
+        """
+        return list(self._parents.get(usage_key, []))
+
+    def get_blocks_of_type(self, block_type):
+        """
+        Returns the BlockData of the blocks of the given type reachable from
+        the root, in pre-order.
+        """
+        return [
+            self._block_data[usage_key] for usage_key in self.topological_traversal()
+            if self._block_data[usage_key].category == block_type
+        ]
+
+    def topological_traversal(self):
+        """
+        Yields the usage keys of the blocks reachable from the root, in
+        pre-order, so that every block is preceded by its (first) parent.
+        """
+        visited = set()
+        stack = [self.root]
+        while stack:
+            usage_key = stack.pop()
+            if usage_key in visited or usage_key not in self._block_data:
+                continue
+            visited.add(usage_key)
+            yield usage_key
+            stack.extend(reversed(self._children.get(usage_key, [])))
+
+    def remove_block(self, usage_key):
+        """
+        Removes the block from the structure, along with those of its
+        descendants that have no other parent left.
+        """
+        if usage_key not in self._block_data:
+            return
+        del self._block_data[usage_key]
+        for parent in self._parents.pop(usage_key, []):
+            if parent in self._children:
+                self._children[parent] = [child for child in self._children[parent] if child != usage_key]
+        for child in self._children.pop(usage_key, []):
+            parents = self._parents.get(child, [])
+            if usage_key in parents:
+                parents.remove(usage_key)
+            if not parents:
+                self.remove_block(child)
+
+    @property
+    def user_partitions(self):
+        """
+        Returns the user partitions of the course.
+        """
+        if self._user_partitions is None:
+            self._user_partitions = [
+                UserPartition.from_json(user_partition) for user_partition in self._user_partitions_json
+            ]
+        return self._user_partitions
+
+    def get_merged_group_access(self, usage_key):
+        """
+        Returns the group access rules of the block merged with those of its
+        ancestors, as LmsBlockMixin.merged_group_access does.
+        """
+        if self._merged_group_access is None:
+            self._merged_group_access = {}
+            for key in self.topological_traversal():
+                parents = self._parents.get(key)
+                parent_access = self._merged_group_access.get(parents[0], {}) if parents else {}
+                self._merged_group_access[key] = _merge_group_access(
+                    parent_access, self._block_data[key].group_access
+                )
+        return self._merged_group_access.get(usage_key, {})
+
+    def transform(self, user, transformers):
+        """
+        Applies the given BlockStructureTransformers for `user`, in order.
+        """
+        for transformer in transformers:
+            transformer.transform(user, self)
+        self._merged_group_access = None
+
+
+def _merge_group_access(parent_access, group_access):
+    """
+    Merges the group access rules of a block with the merged rules of its
+    parent. See LmsBlockMixin.merged_group_access.
+    """
+    merged_access = parent_access.copy()
+    for partition_id, group_ids in group_access.items():
+        if group_ids:
+            if partition_id in merged_access:
+                if merged_access[partition_id] is False:
+                    continue
+                merged_access[partition_id] = list(
+                    set(merged_access[partition_id]).intersection(group_ids)
+                ) or False
+            else:
+                merged_access[partition_id] = group_ids
+    return merged_access
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+import datetime
+from south.db import db
+from south.v2 import SchemaMigration
+from django.db import models
+
+
+class Migration(SchemaMigration):
+
+    def forwards(self, orm):
+        # Adding model 'CourseNavigationPath'
+        db.create_table('course_structures_coursenavigationpath', (
+            ('id', self.gf('django.db.models.fields.AutoField')(primary_key=True)),
+            ('course_id', self.gf('xmodule_django.models.CourseKeyField')(max_length=255, db_index=True)),
+            ('usage_key', self.gf('xmodule_django.models.UsageKeyField')(max_length=255)),
+            ('chapter', self.gf('django.db.models.fields.CharField')(max_length=255, null=True)),
+            ('section', self.gf('django.db.models.fields.CharField')(max_length=255, null=True)),
+            ('position', self.gf('django.db.models.fields.CharField')(max_length=255, null=True)),
+        ))
+        db.send_create_signal('course_structures', ['CourseNavigationPath'])
+
+        # Adding unique constraint on 'CourseNavigationPath', fields ['course_id', 'usage_key']
+        db.create_unique('course_structures_coursenavigationpath', ['course_id', 'usage_key'])
+
+
+    def backwards(self, orm):
+        # Removing unique constraint on 'CourseNavigationPath', fields ['course_id', 'usage_key']
+        db.delete_unique('course_structures_coursenavigationpath', ['course_id', 'usage_key'])
+
+        # Deleting model 'CourseNavigationPath'
+        db.delete_table('course_structures_coursenavigationpath')
+
+
+    models = {
+        'course_structures.coursenavigationpath': {
+            'Meta': {'unique_together': "(('course_id', 'usage_key'),)", 'object_name': 'CourseNavigationPath'},
+            'chapter': ('django.db.models.fields.CharField', [], {'max_length': '255', 'null': 'True'}),
+            'course_id': ('xmodule_django.models.CourseKeyField', [], {'max_length': '255', 'db_index': 'True'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'position': ('django.db.models.fields.CharField', [], {'max_length': '255', 'null': 'True'}),
+            'section': ('django.db.models.fields.CharField', [], {'max_length': '255', 'null': 'True'}),
+            'usage_key': ('xmodule_django.models.UsageKeyField', [], {'max_length': '255'})
+        },
+        'course_structures.coursestructure': {
+            'Meta': {'object_name': 'CourseStructure'},
+            'course_id': ('xmodule_django.models.CourseKeyField', [], {'unique': 'True', 'max_length': '255', 'db_index': 'True'}),
+            'created': ('model_utils.fields.AutoCreatedField', [], {'default': 'datetime.datetime.now'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'modified': ('model_utils.fields.AutoLastModifiedField', [], {'default': 'datetime.datetime.now'}),
+            'structure_json': ('util.models.CompressedTextField', [], {'null': 'True', 'blank': 'True'})
+        }
+    }
+
+    complete_apps = ['course_structures']
@@ -2,10 +2,13 @@ import json
 import logging
 
 from collections import OrderedDict
+from django.db import models, transaction
 from model_utils.models import TimeStampedModel
 
 from util.models import CompressedTextField
-from xmodule_django.models import CourseKeyField
+from xmodule_django.models import CourseKeyField, UsageKeyField
+
+from .block_structure import BlockStructure
 
 
 logger = logging.getLogger(__name__)  # pylint: disable=invalid-name
@@ -27,6 +30,24 @@ class CourseStructure(TimeStampedModel):
             return json.loads(self.structure_json)
         return None
 
+    @classmethod
+    def get_block_structure(cls, course_key, course_version=None):
+        """
+        Returns the BlockStructure of the course, or None if there is no
+        structure stored for it that was generated by the current version of
+        this app and, if `course_version` is given, from that version of the
+        course content (see util.module_utils.get_course_version).
+        """
+        try:
+            structure = cls.objects.get(course_id=course_key).structure
+        except cls.DoesNotExist:
+            return None
+        if not structure or structure.get('version') != BlockStructure.VERSION:
+            return None
+        if course_version is not None and structure.get('course_version') != course_version:
+            return None
+        return BlockStructure(course_key, structure)
+
     @property
     def ordered_blocks(self):
         """
@@ -53,6 +74,86 @@ class CourseStructure(TimeStampedModel):
         for child_node in cur_block['children']:
             self._traverse_tree(child_node, unordered_structure, ordered_blocks, parent=block)
 
+
+class CourseNavigationPath(models.Model):
+    """
+    The path through the courseware to a block of a course, as returned by
+    xmodule.modulestore.search.path_to_location, precomputed for all the
+    blocks of the stored structure of the course whenever it is updated, so
+    that links to blocks (e.g. jump_to) don't have to climb up the course.
+    """
+    # The types of blocks whose children are navigated to by position
+    POSITIONAL_BLOCK_TYPES = ('sequential', 'videosequence')
+
+    # The most paths inserted at a time
+    BATCH_SIZE = 500
+
+    class Meta(object):  # pylint: disable=missing-docstring
+        unique_together = (('course_id', 'usage_key'),)
+
+    course_id = CourseKeyField(max_length=255, db_index=True)
+    usage_key = UsageKeyField(max_length=255)
+    chapter = models.CharField(max_length=255, null=True)
+    section = models.CharField(max_length=255, null=True)
+    position = models.CharField(max_length=255, null=True)
+
+    @classmethod
+    def get_path(cls, usage_key):
+        """
+        Returns the (chapter, section, position) of the block `usage_key`, as
+        returned by path_to_location, or None if no path is stored for it.
+        """
+        try:
+            path = cls.objects.get(course_id=usage_key.course_key, usage_key=usage_key)
+        except cls.DoesNotExist:
+            return None
+        return (path.chapter, path.section, path.position)
+
+    @classmethod
+    def update_course_paths(cls, course_key, structure):
+        """
+        Replaces the paths stored for the course with the paths to the blocks
+        of `structure`, its generated structure.
+        """
+        paths = list(cls._paths_in_structure(BlockStructure(course_key, structure)))
+        with transaction.commit_on_success():
+            cls.objects.filter(course_id=course_key).delete()
+            for index in xrange(0, len(paths), cls.BATCH_SIZE):
+                cls.objects.bulk_create(paths[index:index + cls.BATCH_SIZE])
+
+    @classmethod
+    def _paths_in_structure(cls, block_structure):
+        """
+        Yields a new CourseNavigationPath for each block of `block_structure`,
+        computed as path_to_location does, going through the first parent of
+        blocks which have several.
+        """
+        visited = set()
+        # The usage key of each block is stacked along with the path of its
+        # ancestors and its position in the positional ones below the section
+        stack = [(block_structure.root, [], [])]
+        while stack:
+            usage_key, ancestors, positions = stack.pop()
+            if usage_key in visited:
+                continue
+            visited.add(usage_key)
+
+            path = ancestors + [usage_key]
+            yield cls(
+                course_id=block_structure.course_key,
+                usage_key=usage_key,
+                chapter=path[1].name if len(path) > 1 else None,
+                section=path[2].name if len(path) > 2 else None,
+                position="_".join(positions) if len(path) > 3 else None,
+            )
+
+            is_positional = len(path) > 2 and usage_key.block_type in cls.POSITIONAL_BLOCK_TYPES
+            children = block_structure.get_children(usage_key)
+            for index, child in reversed(list(enumerate(children))):
+                child_positions = positions + [str(index + 1)] if is_positional else positions
+                stack.append((child, path, child_positions))
+
+
 # Signals must be imported in a file that is automatically loaded at app startup (e.g. models.py). We import them
 # at the end of this file to avoid circular dependencies.
 import signals  # pylint: disable=unused-import
@@ -11,3 +11,15 @@ def listen_for_course_publish(sender, course_key, **kwargs):  # pylint: disable=
     # Note: The countdown=0 kwarg is set to to ensure the method below does not attempt to access the course
     # before the signal emitter has finished all operations. This is also necessary to ensure all tests pass.
     update_course_structure.apply_async([unicode(course_key)], countdown=0)
+
+
+@receiver(SignalHandler.course_deleted)
+def listen_for_course_delete(sender, course_key, **kwargs):  # pylint: disable=unused-argument
+    """
+    Removes the stored structure of a deleted course.
+    """
+    # Import here to avoid a circular import.
+    from .models import CourseNavigationPath, CourseStructure
+
+    CourseStructure.objects.filter(course_id=course_key).delete()
+    CourseNavigationPath.objects.filter(course_id=course_key).delete()
@@ -3,8 +3,12 @@ import logging
 
 from celery.task import task
 from opaque_keys.edx.keys import CourseKey
+from util.module_utils import get_course_version
+from xmodule.modulestore import ModuleStoreEnum
 from xmodule.modulestore.django import modulestore
 
+from .block_structure import BlockStructure
+
 
 log = logging.getLogger('edx.celery.task')
 
@@ -12,8 +16,22 @@ log = logging.getLogger('edx.celery.task')
 def _generate_course_structure(course_key):
     """
     Generates a course structure dictionary for the specified course.
+
+    Besides the parent/child graph, the dictionary holds the fields listed in
+    BlockStructure.COLLECTED_FIELDS for every block (with their inherited
+    values resolved), so that readers can check access to blocks and build
+    navigation without loading them from the modulestore.
+    """
+    store = modulestore()
+    with store.branch_setting(ModuleStoreEnum.Branch.published_only, course_key):
+        course = store.get_course(course_key, depth=None)
+        return _generate_structure_from_course(course)
+
+
+def _generate_structure_from_course(course):
+    """
+    Generates a course structure dictionary from the given course descriptor.
     """
-    course = modulestore().get_course(course_key, depth=None)
     blocks_stack = [course]
     blocks_dict = {}
     while blocks_stack:
@@ -36,13 +54,18 @@ def _generate_course_structure(course_key):
                 log.warning('Failed to retrieve %s attribute of block %s. Defaulting to %s.', attr, key, default)
                 block[attr] = default
 
+        block['fields'] = BlockStructure.collect_fields(curr_block)
+
         blocks_dict[key] = block
 
         # Add this blocks children to the stack so that we can traverse them as well.
         blocks_stack.extend(children)
     return {
         "root": unicode(course.scope_ids.usage_id),
-        "blocks": blocks_dict
+        "blocks": blocks_dict,
+        "version": BlockStructure.VERSION,
+        "course_version": get_course_version(course),
+        "user_partitions": [user_partition.to_json() for user_partition in course.user_partitions],
     }
 
 
@@ -52,7 +75,7 @@ def update_course_structure(course_key):
     Regenerates and updates the course structure (in the database) for the specified course.
     """
     # Import here to avoid circular import.
-    from .models import CourseStructure
+    from .models import CourseNavigationPath, CourseStructure
 
     # Ideally we'd like to accept a CourseLocator; however, CourseLocator is not JSON-serializable (by default) so
     # Celery's delayed tasks fail to start. For this reason, callers should pass the course key as a Unicode string.
@@ -77,3 +100,5 @@ def update_course_structure(course_key):
     if not created:
         cs.structure_json = structure_json
         cs.save()
+
+    CourseNavigationPath.update_course_paths(course_key, structure)
@@ -1,9 +1,17 @@
 import json
+from datetime import datetime
 
+from mock import patch
+from pytz import UTC
+
+from util.module_utils import get_course_version
+from xmodule.modulestore import ModuleStoreEnum
 from xmodule.modulestore.django import SignalHandler
+from xmodule.modulestore.search import path_to_location
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
-from openedx.core.djangoapps.content.course_structures.models import CourseStructure
+from openedx.core.djangoapps.content.course_structures.block_structure import BlockStructure
+from openedx.core.djangoapps.content.course_structures.models import CourseNavigationPath, CourseStructure
 from openedx.core.djangoapps.content.course_structures.signals import listen_for_course_publish
 from openedx.core.djangoapps.content.course_structures.tasks import _generate_course_structure, update_course_structure
 
@@ -37,7 +45,8 @@ class CourseStructureTaskTests(ModuleStoreTestCase):
                 "display_name": block.display_name,
                 "graded": block.graded,
                 "format": block.format,
-                "children": [unicode(child.location) for child in children]
+                "children": [unicode(child.location) for child in children],
+                "fields": BlockStructure.collect_fields(block),
             }
 
             for child in children:
@@ -47,7 +56,10 @@ class CourseStructureTaskTests(ModuleStoreTestCase):
 
         expected = {
             'root': unicode(self.course.location),
-            'blocks': blocks
+            'blocks': blocks,
+            'version': BlockStructure.VERSION,
+            'course_version': get_course_version(self.store.get_course(self.course.id)),
+            'user_partitions': [],
         }
 
         self.maxDiff = None
@@ -145,7 +157,8 @@ class CourseStructureTaskTests(ModuleStoreTestCase):
             "display_name": display_name,
             "graded": False,
             "format": None,
-            "children": []
+            "children": [],
+            "fields": BlockStructure.collect_fields(module),
         }
         self.assertEqual(actual, expected)
 
@@ -163,3 +176,148 @@ class CourseStructureTaskTests(ModuleStoreTestCase):
         cs = CourseStructure.objects.get(course_id=course_id)
         self.assertEqual(cs.course_id, course_id)
         self.assertEqual(cs.structure, structure)
+
+
+class BlockStructureTests(ModuleStoreTestCase):
+    """
+    Tests of the BlockStructures of stored course structures.
+    """
+    def setUp(self):
+        super(BlockStructureTests, self).setUp()
+        self.course = CourseFactory.create(start=datetime(2014, 1, 1, tzinfo=UTC))
+        self.chapter = ItemFactory.create(
+            parent=self.course, category='chapter', metadata={'group_access': {0: [1, 2]}}
+        )
+        self.sequential = ItemFactory.create(
+            parent=self.chapter,
+            category='sequential',
+            metadata={
+                'start': datetime(2015, 1, 1, tzinfo=UTC),
+                'visible_to_staff_only': True,
+                'group_access': {0: [2, 3]},
+            }
+        )
+        self.vertical = ItemFactory.create(parent=self.sequential, category='vertical')
+        self.other_chapter = ItemFactory.create(parent=self.course, category='chapter', display_name='Other_Chapter')
+        update_course_structure(unicode(self.course.id))
+
+    def _get_block_structure(self):
+        """
+        Returns the stored BlockStructure of the course.
+        """
+        return CourseStructure.get_block_structure(self.course.id)
+
+    def test_graph(self):
+        block_structure = self._get_block_structure()
+        self.assertEqual(block_structure.root, self.course.location)
+        self.assertEqual(
+            block_structure.get_children(self.course.location),
+            [self.chapter.location, self.other_chapter.location]
+        )
+        self.assertEqual(block_structure.get_parents(self.vertical.location), [self.sequential.location])
+        self.assertEqual(
+            list(block_structure.topological_traversal()),
+            [
+                self.course.location,
+                self.chapter.location,
+                self.sequential.location,
+                self.vertical.location,
+                self.other_chapter.location,
+            ]
+        )
+
+    def test_collected_fields(self):
+        block_structure = self._get_block_structure()
+        vertical = block_structure.get_block(self.vertical.location)
+        self.assertEqual(vertical.category, 'vertical')
+        # Inherited values are collected
+        self.assertEqual(vertical.start, datetime(2015, 1, 1, tzinfo=UTC))
+        self.assertTrue(vertical.visible_to_staff_only)
+        self.assertEqual(block_structure.get_block(self.other_chapter.location).start, self.course.start)
+        self.assertEqual(
+            block_structure.get_block(self.other_chapter.location).display_name_with_default,
+            'Other_Chapter'
+        )
+
+    def test_merged_group_access(self):
+        block_structure = self._get_block_structure()
+        self.assertEqual(block_structure.get_block(self.chapter.location).merged_group_access, {0: [1, 2]})
+        self.assertEqual(block_structure.get_block(self.vertical.location).merged_group_access, {0: [2]})
+        self.assertEqual(block_structure.get_block(self.other_chapter.location).merged_group_access, {})
+
+    def test_remove_block(self):
+        block_structure = self._get_block_structure()
+        block_structure.remove_block(self.chapter.location)
+        self.assertEqual(block_structure.get_children(self.course.location), [self.other_chapter.location])
+        for usage_key in (self.chapter.location, self.sequential.location, self.vertical.location):
+            self.assertNotIn(usage_key, block_structure)
+
+    def test_stale_structures_are_not_returned(self):
+        course_version = get_course_version(self.store.get_course(self.course.id))
+        self.assertIsNotNone(CourseStructure.get_block_structure(self.course.id, course_version))
+        self.assertIsNone(CourseStructure.get_block_structure(self.course.id, 'other version'))
+
+        cs = CourseStructure.objects.get(course_id=self.course.id)
+        structure = cs.structure
+        structure['version'] = BlockStructure.VERSION - 1
+        cs.structure_json = json.dumps(structure)
+        cs.save()
+        self.assertIsNone(CourseStructure.get_block_structure(self.course.id))
+
+    def test_delete_removes_structure(self):
+        with self.store.default_store(ModuleStoreEnum.Type.split):
+            course = CourseFactory.create()
+        update_course_structure(unicode(course.id))
+        self.store.delete_course(course.id, ModuleStoreEnum.UserID.test)
+        self.assertFalse(CourseStructure.objects.filter(course_id=course.id).exists())
+        self.assertFalse(CourseNavigationPath.objects.filter(course_id=course.id).exists())
+
+
+class CourseNavigationPathTests(ModuleStoreTestCase):
+    """
+    Tests of the navigation paths precomputed from stored course structures.
+    """
+    def setUp(self):
+        super(CourseNavigationPathTests, self).setUp()
+        self.course = CourseFactory.create()
+        self.chapter = ItemFactory.create(parent=self.course, category='chapter')
+        self.sequential = ItemFactory.create(parent=self.chapter, category='sequential')
+        self.verticals = [ItemFactory.create(parent=self.sequential, category='vertical') for __ in range(2)]
+        self.problem = ItemFactory.create(parent=self.verticals[1], category='problem')
+        self.other_chapter = ItemFactory.create(parent=self.course, category='chapter')
+        update_course_structure(unicode(self.course.id))
+
+    def test_paths_match_path_to_location(self):
+        blocks = [self.course, self.chapter, self.sequential, self.problem, self.other_chapter] + self.verticals
+        for block in blocks:
+            self.assertEqual(
+                (self.course.id,) + CourseNavigationPath.get_path(block.location),
+                path_to_location(self.store, block.location)
+            )
+        self.assertEqual(
+            CourseNavigationPath.get_path(self.problem.location),
+            (self.chapter.location.name, self.sequential.location.name, '2')
+        )
+
+    def test_path_to_location_uses_paths(self):
+        with patch.object(self.store, 'get_parent_location') as mock_get_parent_location:
+            with self.assertNumQueries(1):
+                path = path_to_location(
+                    self.store, self.problem.location, get_navigation_path=CourseNavigationPath.get_path
+                )
+        self.assertFalse(mock_get_parent_location.called)
+        self.assertEqual(path, (self.course.id, self.chapter.location.name, self.sequential.location.name, '2'))
+
+    def test_path_to_location_falls_back(self):
+        CourseNavigationPath.objects.filter(course_id=self.course.id, usage_key=self.problem.location).delete()
+        self.assertIsNone(CourseNavigationPath.get_path(self.problem.location))
+        self.assertEqual(
+            path_to_location(self.store, self.problem.location, get_navigation_path=CourseNavigationPath.get_path),
+            (self.course.id, self.chapter.location.name, self.sequential.location.name, '2')
+        )
+
+    def test_paths_replaced(self):
+        self.store.delete_item(self.other_chapter.location, ModuleStoreEnum.UserID.test)
+        update_course_structure(unicode(self.course.id))
+        self.assertIsNone(CourseNavigationPath.get_path(self.other_chapter.location))
+        self.assertEqual(CourseNavigationPath.objects.filter(course_id=self.course.id).count(), 6)
@@ -0,0 +1,127 @@
+"""
+Hands items over in batches to a function called from a background thread, so
+that the code producing the items doesn't wait for the function's I/O.
+"""
+import atexit
+import logging
+import os
+from Queue import Queue, Empty
+import threading
+import time
+
+from dogapi import dog_stats_api
+
+
+log = logging.getLogger(__name__)
+
+
+class BackgroundBatcher(object):
+    """
+    Queues items in memory, and passes them to `process_batch` from a
+    background thread of each process, in batches of the items that are
+    waiting, in the order in which they were queued.
+
+    The queue holds at most `max_queue_size` items; `put` raises Queue.Full
+    when it is full, and the caller decides what to do with the item. The
+    items that are waiting in the queue when the process exits are processed
+    then, waiting up to `exit_timeout` seconds for them. Errors raised by
+    `process_batch` are logged, and the next items are processed anyway.
+    """
+    def __init__(self, process_batch, max_queue_size, batch_size, exit_timeout, stats_prefix):
+        """
+        :Parameters:
+
+          - `process_batch`: the function called with each list of items.
+          - `max_queue_size`: the most items that may wait to be processed.
+          - `batch_size`: the most items passed to `process_batch` at once.
+          - `exit_timeout`: how many seconds to wait for the queued items to
+            be processed when the process exits.
+          - `stats_prefix`: the prefix of the names of the metrics sent to
+            datadog.
+        """
+        self.process_batch = process_batch
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.exit_timeout = exit_timeout
+        self.stats_prefix = stats_prefix
+
+        self._lock = threading.Lock()
+        self._queue = None
+        self._pid = None
+
+    def put(self, item, timeout=0):
+        """
+        Queues `item` to be processed, waiting up to `timeout` seconds for
+        room in the queue if it is full. Raises Queue.Full if there is none.
+        """
+        queue = self._get_queue()
+        if timeout:
+            queue.put(item, True, timeout)
+        else:
+            queue.put_nowait(item)
+
+    def flush(self, timeout=None):
+        """
+        Waits until the items queued so far have been processed, or for
+        `timeout` seconds. Returns whether all the items were processed.
+        """
+        queue = self._queue
+        if queue is None or self._pid != os.getpid():
+            return True
+
+        deadline = time.time() + timeout if timeout is not None else None
+        with queue.all_tasks_done:
+            while queue.unfinished_tasks:
+                remaining = deadline - time.time() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    return False
+                queue.all_tasks_done.wait(remaining)
+        return True
+
+    def _get_queue(self):
+        """
+        Returns the queue of items to process, and starts the thread that
+        processes them if it isn't running in this process yet (e.g. after a
+        fork).
+        """
+        pid = os.getpid()
+        if self._pid != pid:
+            with self._lock:
+                if self._pid != pid:
+                    queue = Queue(self.max_queue_size)
+                    thread = threading.Thread(target=self._process_queued_items, args=(queue,))
+                    thread.daemon = True
+                    thread.start()
+                    self._queue = queue
+                    self._pid = pid
+                    atexit.register(self.flush, self.exit_timeout)
+        return self._queue
+
+    def _process_queued_items(self, queue):
+        """
+        Processes the items of `queue` as they come.
+        """
+        while True:
+            self._process_next_batch(queue)
+
+    def _process_next_batch(self, queue):
+        """
+        Waits for items on `queue`, and processes the ones that are waiting,
+        up to `batch_size` of them.
+        """
+        items = [queue.get()]
+        while len(items) < self.batch_size:
+            try:
+                items.append(queue.get_nowait())
+            except Empty:
+                break
+        dog_stats_api.gauge('{}.queue_size'.format(self.stats_prefix), queue.qsize())
+
+        try:
+            self.process_batch(items)
+        except Exception:  # pylint: disable=broad-except
+            # Keep processing the next items
+            log.exception('Error processing a batch of %d items for %s', len(items), self.stats_prefix)
+        finally:
+            for __ in items:
+                queue.task_done()
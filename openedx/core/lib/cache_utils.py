@@ -3,6 +3,7 @@ Utilities related to caching.
 """
 
 import functools
+
 from xblock.core import XBlock
 
 
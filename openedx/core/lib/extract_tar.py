@@ -5,7 +5,10 @@ be, or symlink to a file that is, outside of the directory extracted in.
 Adapted from:
 http://stackoverflow.com/questions/10060069/safely-extract-zip-or-tar-using-python
 """
+import copy
+import operator
 from os.path import abspath, realpath, dirname, join as joinpath
+import tarfile
 from django.core.exceptions import SuspiciousOperation
 import logging
 
@@ -35,6 +38,27 @@ def _is_bad_link(info, base):
     return _is_bad_path(info.linkname, base=tip)
 
 
+def _check_member(finfo, base):
+    """
+    Raises SuspiciousOperation if the tar file member `finfo` is not safe to
+    extract in `base`.
+    """
+    if _is_bad_path(finfo.name, base):
+        log.debug("File %r is blocked (illegal path)", finfo.name)
+        raise SuspiciousOperation("Illegal path")
+    elif finfo.issym() and _is_bad_link(finfo, base):
+        log.debug("File %r is blocked: Hard link to %r", finfo.name, finfo.linkname)
+        raise SuspiciousOperation("Hard link")
+    elif finfo.islnk() and _is_bad_link(finfo, base):
+        log.debug("File %r is blocked: Symlink to %r", finfo.name,
+                  finfo.linkname)
+        raise SuspiciousOperation("Symlink")
+    elif finfo.isdev():
+        log.debug("File %r is blocked: FIFO, device or character file",
+                  finfo.name)
+        raise SuspiciousOperation("Dev file")
+
+
 def safemembers(members):
     """
     Check that all elements of a tar file are safe.
@@ -43,20 +67,7 @@ def safemembers(members):
     base = resolved(".")
 
     for finfo in members:
-        if _is_bad_path(finfo.name, base):
-            log.debug("File %r is blocked (illegal path)", finfo.name)
-            raise SuspiciousOperation("Illegal path")
-        elif finfo.issym() and _is_bad_link(finfo, base):
-            log.debug("File %r is blocked: Hard link to %r", finfo.name, finfo.linkname)
-            raise SuspiciousOperation("Hard link")
-        elif finfo.islnk() and _is_bad_link(finfo, base):
-            log.debug("File %r is blocked: Symlink to %r", finfo.name,
-                      finfo.linkname)
-            raise SuspiciousOperation("Symlink")
-        elif finfo.isdev():
-            log.debug("File %r is blocked: FIFO, device or character file",
-                      finfo.name)
-            raise SuspiciousOperation("Dev file")
+        _check_member(finfo, base)
 
     return members
 
@@ -66,3 +77,40 @@ def safetar_extractall(tarf, *args, **kwargs):
     Safe version of `tarf.extractall()`.
     """
     return tarf.extractall(members=safemembers(tarf), *args, **kwargs)
+
+
+def safetar_extractall_stream(tarf, path):
+    """
+    Safe version of `tarf.extractall(path)` for tar files opened in stream
+    mode (e.g. `tarfile.open(name, 'r|*')`), which extracts every member as
+    soon as it is read and checked, instead of reading the whole archive to
+    check it first.
+
+    The members preceding an unsafe one have already been extracted when
+    SuspiciousOperation is raised, so callers should remove `path` then.
+    """
+    base = resolved(path)
+    directories = []
+    for finfo in tarf:
+        _check_member(finfo, base)
+        if finfo.isdir():
+            # As in `tarf.extractall()`, extract directories with a mode that
+            # lets their members be extracted, and set their own mode once
+            # all the members are extracted.
+            directories.append(finfo)
+            finfo = copy.copy(finfo)
+            finfo.mode = 0700
+        tarf.extract(finfo, path)
+
+    # Set the attributes of the deepest directories first
+    directories.sort(key=operator.attrgetter('name'), reverse=True)
+    for finfo in directories:
+        dirpath = joinpath(path, finfo.name)
+        try:
+            tarf.chown(finfo, dirpath)
+            tarf.utime(finfo, dirpath)
+            tarf.chmod(finfo, dirpath)
+        except tarfile.ExtractError as err:
+            if tarf.errorlevel > 1:
+                raise
+            log.debug("tarfile: %s", err)
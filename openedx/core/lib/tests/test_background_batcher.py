@@ -0,0 +1,65 @@
+"""
+Tests for background_batcher.py
+"""
+from Queue import Full
+import threading
+from unittest import TestCase
+
+from openedx.core.lib.background_batcher import BackgroundBatcher
+
+
+class TestBackgroundBatcher(TestCase):
+    """
+    Test the BackgroundBatcher class.
+    """
+    def setUp(self):
+        super(TestBackgroundBatcher, self).setUp()
+        self.batches = []
+        # Cleared to hold up the processing of items
+        self.can_process = threading.Event()
+        self.can_process.set()
+        self.addCleanup(self.can_process.set)
+
+    def process_batch(self, items):
+        """
+        Records the batch of `items`, once allowed to.
+        """
+        self.can_process.wait()
+        self.batches.append(items)
+
+    def test_items_processed_in_order(self):
+        batcher = BackgroundBatcher(self.process_batch, 10, 2, 5, 'test')
+        for item in range(5):
+            batcher.put(item)
+        self.assertTrue(batcher.flush(timeout=5))
+        self.assertEqual(sum(self.batches, []), range(5))
+        self.assertTrue(all(len(batch) <= 2 for batch in self.batches))
+
+    def test_full_queue(self):
+        batcher = BackgroundBatcher(self.process_batch, 1, 1, 5, 'test')
+        self.can_process.clear()
+        # Fill the queue with more items than the thread can have taken off it
+        with self.assertRaises(Full):
+            for item in range(3):
+                batcher.put(item)
+        self.assertFalse(batcher.flush(timeout=0.1))
+        self.can_process.set()
+        self.assertTrue(batcher.flush(timeout=5))
+
+    def test_errors_logged(self):
+        calls = []
+
+        def fail_first_batch(items):
+            """
+            Raises on the first batch only.
+            """
+            calls.append(items)
+            if len(calls) == 1:
+                raise Exception()
+
+        batcher = BackgroundBatcher(fail_first_batch, 10, 1, 5, 'test')
+        batcher.put(1)
+        self.assertTrue(batcher.flush(timeout=5))
+        batcher.put(2)
+        self.assertTrue(batcher.flush(timeout=5))
+        self.assertEqual(calls, [[1], [2]])